@@ -1,7 +1,7 @@
 import sys
 from pathlib import Path
 import os
-from flask import Flask, send_from_directory, request, jsonify # 确保导入 jsonify
+from flask import Flask, abort, send_from_directory, request, jsonify # 确保导入 jsonify
 
 # Ensure the package parent (backend/) is on sys.path so `import app.*` works when
 # running from inside the `app` directory (e.g. `python -m app.app` executed in
@@ -18,6 +18,14 @@ from app.controllers.user_controller import bp as users_bp
 from app.controllers.homepage_section_controller import bp as sections_bp
 from app.controllers.homepage_section_item_controller import bp as items_bp
 from app.controllers.auth_controller import bp as auth_bp
+from app.controllers.admin_controller import bp as admin_bp
+from app.controllers.feed_controller import bp as feeds_bp
+from app.controllers.image_controller import bp as images_bp
+from app.controllers.autocomplete_controller import bp as autocomplete_bp
+from app.services import prerender_service, stream_service  # noqa: F401  (connect write-event receivers)
+from app.cache import start_listener
+from app.config.session import close_request_sessions
+from app import deadlines, ratelimit, slowlog
 
 # Try to import Flask-CORS; if unavailable we'll fall back to a permissive after_request.
 try:
@@ -35,6 +43,9 @@ def create_app():
     @app.route('/static/uploads/<path:filename>')
     def serve_upload(filename):
         uploads_dir = os.path.join(static_dir, 'uploads')
+        if filename.startswith('.'):
+            # partial chunked uploads (.incoming/) are not public
+            abort(404)
         return send_from_directory(uploads_dir, filename)
 
     # Enable CORS for development: prefer flask_cors if installed.
@@ -46,8 +57,9 @@ def create_app():
             # permissive CORS for local dev (adjust in production)
             response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*') or '*'
             response.headers['Access-Control-Allow-Credentials'] = 'true'
-            response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Authorization,Content-Type'
+            response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,PATCH,DELETE,OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Authorization,Content-Type,Upload-Offset'
+            response.headers['Access-Control-Expose-Headers'] = 'Upload-Offset'
             return response
             
     # =======================================================
@@ -65,6 +77,15 @@ def create_app():
         }), 200
     # =======================================================
 
+    # request ids, and slow statements recorded with their endpoint (app.slowlog)
+    slowlog.init_app(app)
+    # rate limits and admission control run before any view work
+    ratelimit.init_app(app)
+    # per-request query deadlines (SET LOCAL statement_timeout)
+    deadlines.init_app(app)
+    # sessions a request opened are closed when it ends, whichever thread or greenlet served it
+    app.teardown_appcontext(close_request_sessions)
+
     # register blueprints
     app.register_blueprint(articles_bp)
     app.register_blueprint(auth_bp)
@@ -74,6 +95,14 @@ def create_app():
     app.register_blueprint(users_bp)
     app.register_blueprint(sections_bp)
     app.register_blueprint(items_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(feeds_bp)
+    app.register_blueprint(images_bp)
+    app.register_blueprint(autocomplete_bp)
+
+    # shared response cache: one LISTEN thread per worker process (no-op when disabled);
+    # started lazily so it is created after gunicorn forks the worker
+    app.before_request(start_listener)
 
     return app
 
@@ -0,0 +1,292 @@
+"""Node-local response cache shared by all gunicorn workers, invalidated via
+Postgres LISTEN/NOTIFY.
+
+Enabled by RESPONSE_CACHE_DIR (use a tmpfs such as /dev/shm/lankalive-cache so
+entries live in shared memory). Every worker on the node reads and writes the
+same directory:
+
+    entries/<sha1 of key>   one serialized response (header line + body)
+    tags/<tag>              invalidation marker; its mtime is the last edit
+
+An entry is valid while it is newer than every marker of its tags, so
+invalidating a tag is one `touch` and needs no bookkeeping of which keys
+carry it. Entries are stamped with the time their view *started*, so a
+response computed from data older than an invalidation is never served.
+
+Writes publish the tags to invalidate with NOTIFY on CACHE_CHANNEL. One
+worker per node (holding an flock on listener.lock) LISTENs and touches the
+markers, so every node drops stale entries within one round trip of the
+commit. The publishing node also invalidates locally straight away. If the
+listener connection drops, everything is invalidated once it reconnects,
+since notifications sent while disconnected are lost.
+"""
+import hashlib
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; every worker then listens
+    fcntl = None
+
+from app.signals import (
+    ArticleChange, TaxonomyChange, article_changed, articles_changed, category_changed, tag_changed,
+)
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '')
+CACHE_CHANNEL = 'cache_invalidate'
+# upper bound on entries kept per node; oldest are removed first
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '20000'))
+CACHE_GC_INTERVAL = 60
+# Postgres rejects NOTIFY payloads of 8000 bytes or more: longer tag lists are
+# split over several notifications, and past NOTIFY_MAX_TAGS (a bulk edit)
+# everything is invalidated instead
+NOTIFY_MAX_BYTES = 7900
+NOTIFY_MAX_TAGS = 500
+ALL = '*'  # tag carried by every entry
+
+# tags used by the public endpoints
+ARTICLE_LISTS = 'article-lists'  # any list / page that embeds article cards
+TAXONOMY = 'taxonomy'  # category and tag names embedded in payloads
+CATEGORIES = 'categories'
+TAGS = 'tags'
+
+
+def article_tag(slug: str) -> str:
+    return f'article:{slug}'
+
+
+class ResponseCache:
+    def __init__(self, root: str):
+        self.root = root
+        self.entries = os.path.join(root, 'entries')
+        self.tags = os.path.join(root, 'tags')
+        os.makedirs(self.entries, exist_ok=True)
+        os.makedirs(self.tags, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.entries, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def _tag_path(self, tag: str) -> str:
+        # tags are short identifiers, but never let one name a path
+        safe = tag.replace('/', '_').replace('\\', '_')
+        return os.path.join(self.tags, safe if safe not in ('.', '..') else '_')
+
+    def _tag_mtime(self, tag: str) -> int:
+        try:
+            return os.stat(self._tag_path(tag)).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def get(self, key: str) -> Optional[Tuple[dict, bytes]]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as fh:
+                stamped = os.fstat(fh.fileno()).st_mtime_ns
+                header = json.loads(fh.readline())
+                body = fh.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        if header.get('key') != key:
+            return None
+        for tag in [ALL] + header.get('tags', []):
+            if self._tag_mtime(tag) >= stamped:
+                return None
+        return header, body
+
+    def set(self, key: str, started_ns: int, tags: Iterable[str], status: int, mimetype: str, body: bytes) -> None:
+        path = self._entry_path(key)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        header = {'key': key, 'tags': sorted(set(tags)), 'status': status, 'mimetype': mimetype}
+        with open(tmp, 'wb') as fh:
+            fh.write(json.dumps(header).encode('utf-8') + b'\n')
+            fh.write(body)
+        os.utime(tmp, ns=(started_ns, started_ns))
+        os.replace(tmp, path)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        now = time.time_ns()
+        for tag in set(tags):
+            path = self._tag_path(tag)
+            with open(path, 'a'):
+                pass
+            os.utime(path, ns=(now, now))
+
+    def gc(self) -> int:
+        """Remove invalid entries and trim to CACHE_MAX_ENTRIES; returns files removed."""
+        everything = self._tag_mtime(ALL)
+        entries = []
+        removed = 0
+        with os.scandir(self.entries) as it:
+            for e in it:
+                try:
+                    mtime = e.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime <= everything or (e.name.endswith('.tmp') and mtime < time.time_ns() - 60 * 10**9):
+                    removed += _unlink(e.path)
+                else:
+                    entries.append((mtime, e.path))
+        if len(entries) > CACHE_MAX_ENTRIES:
+            entries.sort()
+            for _, path in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+                removed += _unlink(path)
+        return removed
+
+
+def _unlink(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_DIR) if RESPONSE_CACHE_DIR else None
+
+
+# --- publishing -----------------------------------------------------------
+
+def notify_payloads(tags: Iterable[str]) -> List[str]:
+    """JSON tag lists for NOTIFY, each under NOTIFY_MAX_BYTES."""
+    tags = sorted(set(tags))
+    if len(tags) > NOTIFY_MAX_TAGS:
+        tags = [ALL]
+    payloads, chunk = [], []
+    for tag in tags:
+        if chunk and len(json.dumps(chunk + [tag]).encode('utf-8')) > NOTIFY_MAX_BYTES:
+            payloads.append(json.dumps(chunk))
+            chunk = []
+        chunk.append(tag)
+    if chunk:
+        payloads.append(json.dumps(chunk))
+    return payloads
+
+
+def publish(tags: Iterable[str]) -> None:
+    """Invalidate `tags` on this node now and on every node via NOTIFY."""
+    payloads = notify_payloads(tags)
+    if response_cache is None or not payloads:
+        return
+    response_cache.invalidate(tag for payload in payloads for tag in json.loads(payload))
+    from app.config.session import engine
+    with engine.begin() as conn:
+        for payload in payloads:
+            conn.execute(text('SELECT pg_notify(:channel, :payload)'), {'channel': CACHE_CHANNEL, 'payload': payload})
+
+
+@article_changed.connect
+def on_article_changed(sender, change: ArticleChange):
+    if change.affects_public:
+        publish({ARTICLE_LISTS} | {article_tag(s) for s in (change.slug, change.old_slug) if s})
+
+
+@articles_changed.connect
+def on_articles_changed(sender, changes):
+    # one invalidation (and one NOTIFY) for the whole batch
+    tags = set()
+    for change in changes:
+        if change.affects_public:
+            tags |= {ARTICLE_LISTS} | {article_tag(s) for s in (change.slug, change.old_slug) if s}
+    publish(tags)
+
+
+@category_changed.connect
+def on_category_changed(sender, change: TaxonomyChange):
+    publish({CATEGORIES, TAXONOMY, ARTICLE_LISTS})
+
+
+@tag_changed.connect
+def on_tag_changed(sender, change: TaxonomyChange):
+    publish({TAGS, TAXONOMY})
+
+
+# --- listening ------------------------------------------------------------
+
+class InvalidationListener(threading.Thread):
+    """LISTEN on CACHE_CHANNEL and apply invalidations to the node's cache.
+
+    Every worker starts one, but only the worker holding the node's flock
+    actually connects; the others wait to take over if it exits.
+    """
+
+    def __init__(self, cache: ResponseCache, dsn: str, poll_seconds: float = 5.0):
+        super().__init__(name='cache-listener', daemon=True)
+        self.cache = cache
+        self.dsn = dsn
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        lock_file = open(os.path.join(self.cache.root, 'listener.lock'), 'a')
+        while fcntl and not self._stop_event.is_set():
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                self._stop_event.wait(self.poll_seconds)
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+                backoff = 1.0
+            except Exception:
+                logger.exception('cache listener connection failed; retrying in %.0fs', backoff)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN {CACHE_CHANNEL}')
+            # anything published while we were not listening is unknown
+            self.cache.invalidate([ALL])
+            last_gc = time.monotonic()
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], self.poll_seconds) != ([], [], []):
+                    conn.poll()
+                    tags = set()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        try:
+                            tags.update(json.loads(note.payload))
+                        except ValueError:
+                            tags.add(ALL)
+                    if tags:
+                        self.cache.invalidate(tags)
+                if time.monotonic() - last_gc > CACHE_GC_INTERVAL:
+                    self.cache.gc()
+                    last_gc = time.monotonic()
+        finally:
+            conn.close()
+
+
+_listener = None
+
+
+def start_listener() -> None:
+    """Start this worker's listener thread (no-op when the cache is disabled)."""
+    global _listener
+    if response_cache is None or (_listener is not None and _listener.is_alive()):
+        return
+    from app.config.session import engine
+    dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+    _listener = InvalidationListener(response_cache, dsn)
+    _listener.start()
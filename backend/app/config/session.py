@@ -1,6 +1,88 @@
-from sqlalchemy.orm import sessionmaker
+"""Process-wide engine and session factory, created on first use.
+
+Importing this module opens nothing: the engine and its pool are built the
+first time a session (or `engine`) is needed. An app imported once in the
+gunicorn master (preload_app) therefore holds no connections when it forks,
+and every worker builds its own pool.
+
+Sessions opened while serving a request are registered on the request's
+application context (flask.g), which Flask keeps per thread or greenlet, so
+the registry works the same under sync, gthread and gevent workers. At the
+end of the request close_request_sessions closes whatever is still open and
+returns its connection to the pool.
+"""
+import threading
+
+from flask import g, has_app_context
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
 from app.config.db import get_engine
 
+_lock = threading.Lock()
+_engine = None
+_sessionmaker = None
+# per worker: sessions opened in requests, and those still in a transaction at
+# the end of their request (a view that forgot to close one)
+stats = {'opened': 0, 'left_open': 0}
+_stats_lock = threading.Lock()
+
+
+def get_db_engine() -> Engine:
+	"""The shared engine, created on the first call."""
+	global _engine, _sessionmaker
+	if _engine is None:
+		with _lock:
+			if _engine is None:
+				engine = get_engine()
+				_sessionmaker = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+				_engine = engine
+	return _engine
+
+
+def engine_created() -> bool:
+	return _engine is not None
+
+
+def dispose_after_fork() -> None:
+	"""Drop pooled connections inherited from a parent process (without closing
+	them, which would break the parent's)."""
+	if _engine is not None:
+		_engine.dispose(close=False)
+
+
+class _SessionLocal:
+	"""Drop-in for the former module-level sessionmaker: SessionLocal() returns a
+	Session bound to the shared engine, creating the engine on first use."""
+
+	def __call__(self, **kwargs) -> Session:
+		get_db_engine()
+		return track(_sessionmaker(**kwargs))
+
+
+SessionLocal = _SessionLocal()
+
+
+def track(session: Session) -> Session:
+	"""Register a session with the current request, if any, to be closed at its end."""
+	if has_app_context():
+		g.setdefault('db_sessions', []).append(session)
+		with _stats_lock:
+			stats['opened'] += 1
+	return session
+
+
+def close_request_sessions(exc=None) -> None:
+	"""teardown_appcontext: roll back and close the request's sessions."""
+	for session in g.pop('db_sessions', ()):
+		if session.in_transaction():
+			with _stats_lock:
+				stats['left_open'] += 1
+		session.close()
+
 
-engine = get_engine()
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+def __getattr__(name):
+	# `from app.config.session import engine` keeps working, lazily
+	if name == 'engine':
+		return get_db_engine()
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
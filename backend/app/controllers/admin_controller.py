@@ -0,0 +1,44 @@
+import os
+
+from flask import Blueprint, jsonify, request
+from app import deadlines, ratelimit, slowlog, snapshot
+from app.config import session as db_session
+from app.config.session import SessionLocal
+from app.services.stats_service import StatsService
+from app.controllers.decorators import requires_role
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+@bp.route('/stats', methods=['GET'])
+@requires_role('admin')
+def get_stats():
+    """Dashboard counts served from maintained counters (constant cost)."""
+    with SessionLocal() as session:
+        svc = StatsService(session)
+        payload = svc.dashboard()
+    # rejections and cancelled queries seen by the worker that served this request
+    payload['worker'] = {
+        'pid': os.getpid(),
+        'rejected': ratelimit.stats,
+        'queries': deadlines.stats,
+        'snapshot': snapshot.status(),
+        'slow_queries': slowlog.stats,
+        'sessions': db_session.stats,
+        'pool': db_session.get_db_engine().pool.status(),
+    }
+    return jsonify(payload)
+
+
+@bp.route('/slow-queries', methods=['GET'])
+@requires_role('admin')
+def get_slow_queries():
+    """Slow statements recorded by the worker that served this request (app.slowlog),
+    newest first; `endpoint` filters by Flask endpoint, e.g. articles.list_articles."""
+    limit = max(1, min(int(request.args.get('limit', 50)), slowlog.SLOW_QUERY_RING))
+    return jsonify({
+        'pid': os.getpid(),
+        'threshold_ms': slowlog.SLOW_QUERY_MS,
+        'explain_sample': slowlog.SLOW_QUERY_EXPLAIN_SAMPLE,
+        'queries': slowlog.recent(limit, endpoint=request.args.get('endpoint')),
+    })
@@ -1,13 +1,21 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.config.session import SessionLocal
 from app.services.article_service import ArticleService
+from app.services.archive_service import ArchiveService, MONTH_RE
 from app.models.article import Article
-from app.controllers.decorators import requires_role, is_admin
+from app.services.related_service import RelatedService, RELATED_K
+from app.services.view_service import TrendingService, TRENDING_MAX_LIMIT, TRENDING_SORTS, views
+from app.serializers import article_detail, article_summary
+from app.images import variants
+from app.controllers.decorators import requires_role, is_admin, public_cache, query_budget, rate_limit, read_session
+from app.cache import ARTICLE_LISTS, TAXONOMY, article_tag
 
 bp = Blueprint('articles', __name__, url_prefix='/api/articles')
 
 
 @bp.route('/', methods=['GET'])
+@rate_limit('list')
+@public_cache(ARTICLE_LISTS, TAXONOMY)
 def list_articles():
     limit = int(request.args.get('limit', 20))
     offset = int(request.args.get('offset', 0))
@@ -25,7 +33,7 @@ def list_articles():
     elif status == 'all':
         status = None
     
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = ArticleService(session)
         articles = svc.list(
             limit=limit, 
@@ -56,7 +64,10 @@ def list_articles():
                 'title': a.title,
                 'slug': a.slug,
                 'summary': a.summary,
+                'excerpt': a.excerpt,
+                'reading_time_minutes': a.reading_time_minutes,
                 'hero_image_url': a.hero_image_url,
+                'hero_images': variants(a.hero_image_url),
                 'published_at': a.published_at.isoformat() if a.published_at else None,
                 'status': a.status,
                 'categories': categories,
@@ -68,6 +79,42 @@ def list_articles():
         return jsonify(result)
 
 
+@bp.route('/archive', methods=['GET'])
+@public_cache(ARTICLE_LISTS, TAXONOMY)
+def article_archive():
+    """Published-article counts per year and month (and per day of `month`,
+    YYYY-MM), optionally for one `category` slug."""
+    month = request.args.get('month')
+    if month and not MONTH_RE.match(month):
+        return jsonify({'error': 'month must be YYYY-MM'}), 400
+    with read_session() as session:
+        archive = ArchiveService(session).archive(category_slug=request.args.get('category'), month=month)
+        if archive is None:
+            return jsonify({'error': 'not found'}), 404
+        return jsonify(archive)
+
+
+@bp.route('/trending', methods=['GET'])
+def trending_articles():
+    """Trending (time-decayed) or most-read articles over the last `hours`."""
+    sort = request.args.get('sort', 'trending')
+    if sort not in TRENDING_SORTS:
+        return jsonify({'error': f"sort must be one of {', '.join(TRENDING_SORTS)}"}), 400
+    hours = max(1, min(int(request.args.get('hours', 24)), 7 * 24))
+    limit = max(1, min(int(request.args.get('limit', 10)), TRENDING_MAX_LIMIT))
+    with SessionLocal() as session:
+        return jsonify(TrendingService(session).top(sort=sort, hours=hours, limit=limit))
+
+
+@bp.route('/<string:slug>/view', methods=['POST'])
+def record_view(slug):
+    """Page-view beacon; buffered in memory and written in batches."""
+    if len(slug) > 255:
+        return jsonify({'error': 'invalid slug'}), 400
+    views.record(slug)
+    return '', 204
+
+
 @bp.route('/by-id/<string:article_id>', methods=['GET'])
 @requires_role('admin')
 def get_article_by_id(article_id):
@@ -100,8 +147,9 @@ def get_article_by_id(article_id):
 
 
 @bp.route('/<string:slug>', methods=['GET'])
+@public_cache(TAXONOMY, tags_for=lambda slug: [article_tag(slug)])
 def get_article(slug):
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = ArticleService(session)
         a = svc.dao.get_by_slug(slug)
         if not a:
@@ -124,30 +172,21 @@ def get_article(slug):
                     pass
             return jsonify({'error': 'not found'}), 404
         
-        # serialize related fields
-        categories = [{'id': str(c.id), 'name': c.name, 'slug': c.slug} for c in (a.categories or [])]
-        
-        # Add primary category if it exists and isn't already in the list
-        if a.primary_category and not any(c['id'] == str(a.primary_category.id) for c in categories):
-            categories.insert(0, {
-                'id': str(a.primary_category.id),
-                'name': a.primary_category.name,
-                'slug': a.primary_category.slug
-            })
-        
-        tags = [{'id': str(t.id), 'name': t.name, 'slug': t.slug} for t in (a.tags or [])]
-        return jsonify({
-            'id': str(a.id),
-            'title': a.title,
-            'slug': a.slug,
-            'summary': a.summary,
-            'body': a.body_richtext,
-            'hero_image_url': a.hero_image_url,
-            'published_at': a.published_at.isoformat() if a.published_at else None,
-            'status': a.status,
-            'categories': categories,
-            'tags': tags,
-        })
+        return jsonify(article_detail(a))
+
+
+@bp.route('/<string:slug>/related', methods=['GET'])
+@public_cache(ARTICLE_LISTS)
+def get_related_articles(slug):
+    """Related stories from the precomputed neighbour list."""
+    limit = max(1, min(int(request.args.get('limit', 6)), RELATED_K))
+    with read_session() as session:
+        svc = ArticleService(session)
+        a = svc.dao.get_by_slug(slug)
+        if not a or a.status != 'published':
+            return jsonify({'error': 'not found'}), 404
+        related = RelatedService(session).related(a, limit=limit)
+        return jsonify([article_summary(r) for r in related])
 
 
 @bp.route('/', methods=['POST'])
@@ -182,6 +221,51 @@ def create_article():
         return jsonify({'id': str(created.id), 'slug': created.slug}), 201
 
 
+@bp.route('/bulk', methods=['POST'])
+@requires_role('admin')
+@query_budget('bulk')
+def bulk_articles():
+    """Apply one action to many articles in a single transaction.
+
+    Body: {"action": ..., "ids": [...]} or {"action": ..., "filter": {...}} where
+    filter takes the list parameters (status, category, tag, is_highlight,
+    dateFrom, dateTo; status defaults to published, 'all' for any). Action
+    parameters: status (set_status), flags (set_flags), tag_id (add_tag /
+    remove_tag), category_id and optional from_category_id (move_category).
+    """
+    from uuid import UUID
+
+    data = request.json or {}
+    if ('ids' in data) == ('filter' in data):
+        return jsonify({'error': 'provide exactly one of ids or filter'}), 400
+    try:
+        ids = [UUID(i) for i in data['ids']] if 'ids' in data else None
+        params = {key: UUID(data[key]) for key in ('tag_id', 'category_id', 'from_category_id') if data.get(key)}
+    except (TypeError, ValueError):
+        return jsonify({'error': 'invalid id'}), 400
+    filters = None
+    if ids is None:
+        f = data['filter'] or {}
+        status = f.get('status', 'published')
+        filters = {
+            'category_slug': f.get('category'),
+            'tag_slug': f.get('tag'),
+            'is_highlight': bool(f['is_highlight']) if f.get('is_highlight') is not None else None,
+            'status': None if status == 'all' else status,
+            'date_from': f.get('dateFrom'),
+            'date_to': f.get('dateTo'),
+        }
+
+    with SessionLocal() as session:
+        svc = ArticleService(session)
+        try:
+            counts = svc.bulk(data.get('action'), ids=ids, filters=filters,
+                              status=data.get('status'), flags=data.get('flags'), **params)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(counts)
+
+
 @bp.route('/<string:article_id>', methods=['PUT'])
 @requires_role('admin')
 def update_article(article_id):
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.config.session import SessionLocal
 from app.services.user_service import UserService
-from app.controllers.decorators import create_access_token
+from app.controllers.decorators import create_access_token, rate_limit
 
 try:
     import bcrypt
@@ -12,6 +12,7 @@ bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
 @bp.route('/login', methods=['POST'])
+@rate_limit('login')
 def login():
     data = request.json or {}
     email = data.get('email')
@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify, request
+from app.config.session import SessionLocal
+from app.services.autocomplete_service import AutocompleteService, AUTOCOMPLETE_MAX_LIMIT, AUTOCOMPLETE_TYPES
+from app.controllers.decorators import is_admin, rate_limit
+
+bp = Blueprint('autocomplete', __name__)
+
+
+@bp.route('/api/autocomplete', methods=['GET'])
+@rate_limit('list')
+def autocomplete():
+    """Typeahead: ?type=tag|category|article&prefix=...&limit=10.
+
+    Tags and categories match the start of the name from the worker's
+    in-memory index; articles match anywhere in the title (at least three
+    characters). Admins also get unpublished articles.
+    """
+    kind = request.args.get('type', 'tag')
+    if kind not in AUTOCOMPLETE_TYPES:
+        return jsonify({'error': f"type must be one of {', '.join(AUTOCOMPLETE_TYPES)}"}), 400
+    prefix = request.args.get('prefix', '')
+    if len(prefix) > 255:
+        return jsonify({'error': 'prefix too long'}), 400
+    limit = max(1, min(int(request.args.get('limit', 10)), AUTOCOMPLETE_MAX_LIMIT))
+    with SessionLocal() as session:
+        results = AutocompleteService(session).suggest(kind, prefix, limit, include_unpublished=is_admin())
+    return jsonify({'type': kind, 'prefix': prefix, 'results': results})
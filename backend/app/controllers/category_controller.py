@@ -3,23 +3,28 @@ from app.config.session import SessionLocal
 from app.services.category_service import CategoryService
 from app.services.article_service import ArticleService
 from app.models.category import Category
-from app.controllers.decorators import requires_role
+from app.serializers import category_page, CATEGORY_PAGE_SIZE
+from app.controllers.decorators import requires_role, public_cache, rate_limit, read_session
+from app.cache import ARTICLE_LISTS, CATEGORIES
 
 bp = Blueprint('categories', __name__, url_prefix='/api/categories')
 
 
 @bp.route('/', methods=['GET'])
+@public_cache(CATEGORIES)
 def list_categories():
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = CategoryService(session)
         cats = svc.list()
         return jsonify([{'id': str(c.id), 'name': c.name, 'slug': c.slug} for c in cats])
 
 
 @bp.route('/<string:slug>', methods=['GET'])
+@rate_limit('list')
+@public_cache(CATEGORIES, ARTICLE_LISTS)
 def get_category(slug):
     """Get category details with articles"""
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = CategoryService(session)
         category = svc.dao.get_by_slug(slug)
         if not category:
@@ -27,7 +32,7 @@ def get_category(slug):
         
         article_svc = ArticleService(session)
         
-        limit = int(request.args.get('limit', 20))
+        limit = int(request.args.get('limit', CATEGORY_PAGE_SIZE))
         offset = int(request.args.get('offset', 0))
         
         articles = article_svc.list(
@@ -37,22 +42,7 @@ def get_category(slug):
             status='published'
         )
         
-        return jsonify({
-            'id': str(category.id),
-            'name': category.name,
-            'slug': category.slug,
-            'articles': [
-                {
-                    'id': str(a.id),
-                    'title': a.title,
-                    'slug': a.slug,
-                    'summary': a.summary,
-                    'hero_image_url': a.hero_image_url,
-                    'published_at': a.published_at.isoformat() if a.published_at else None,
-                }
-                for a in articles
-            ]
-        })
+        return jsonify(category_page(category, articles))
 
 
 @bp.route('/', methods=['POST'])
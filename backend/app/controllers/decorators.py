@@ -1,7 +1,8 @@
 import os
 from functools import wraps
-from flask import request, jsonify, g, current_app
+from flask import request, jsonify, g, current_app, make_response
 from datetime import datetime, timedelta
+import time
 
 # optional import of PyJWT - don't hard-fail at import time so tests and
 # environments without the package can still import the module. When the
@@ -58,6 +59,16 @@ def is_admin():
     return user and user.get('role') == 'admin'
 
 
+def read_session():
+    """Session for a public read view: the node's read snapshot (app.snapshot)
+    if it has one, Postgres for admins, who may see unpublished content."""
+    if is_admin():
+        from app.config.session import SessionLocal
+        return SessionLocal()
+    from app.snapshot import ReadSession
+    return ReadSession()
+
+
 def requires_role(*roles):
     """Decorator factory to require a role (e.g., 'admin')."""
 
@@ -86,6 +97,66 @@ def requires_role(*roles):
             g.current_user = payload
             return f(*args, **kwargs)
 
+        if 'admin' in roles:
+            # admin views get the larger admin query budget (app.deadlines)
+            wrapped.__dict__.setdefault('query_budget', 'admin')
+        return wrapped
+
+    return decorator
+
+
+def query_budget(name):
+    """Give a view the query deadline of budget class `name`
+    (app.deadlines.QUERY_BUDGETS), e.g. 'bulk' for long admin operations."""
+
+    def decorator(f):
+        f.query_budget = name
+        return f
+
+    return decorator
+
+
+def rate_limit(name):
+    """Put a view in rate-limit class `name` (app.ratelimit.RATE_LIMITS); views
+    without one are limited as `read` (GET) or `write`."""
+
+    def decorator(f):
+        f.rate_limit_class = name
+        return f
+
+    return decorator
+
+
+def public_cache(*tags, tags_for=None):
+    """Serve anonymous GETs from the node's shared response cache (app.cache).
+
+    `tags` (and `tags_for(**view_kwargs)`, if given) name what the response
+    depends on; writes invalidate by tag. Requests carrying an Authorization
+    header always reach the view, since admins may see unpublished content.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            from app.cache import response_cache
+            if response_cache is None or request.method != 'GET' or request.headers.get('Authorization'):
+                return f(*args, **kwargs)
+            key = request.full_path
+            hit = response_cache.get(key)
+            if hit:
+                header, body = hit
+                response = current_app.response_class(body, status=header['status'], mimetype=header['mimetype'])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            started = time.time_ns()
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                entry_tags = list(tags) + list(tags_for(**kwargs) if tags_for else [])
+                response_cache.set(key, started, entry_tags, response.status_code, response.mimetype,
+                                   response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
         return wrapped
 
     return decorator
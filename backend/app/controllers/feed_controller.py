@@ -0,0 +1,54 @@
+import re
+from flask import Blueprint, jsonify, request, send_file
+from app.config.session import SessionLocal
+from app.services.feed_service import FeedService, SITE_URL
+from app.dao.category_dao import CategoryDAO
+
+# served at the site root (nginx proxies /sitemap.xml, /sitemaps/ and /feeds/)
+bp = Blueprint('feeds', __name__)
+
+_MONTH_PART = re.compile(r'^(\d{4}-(?:0[1-9]|1[0-2]))(?:-p(\d+))?$')
+
+
+def _service(session):
+    return FeedService(session, site_url=SITE_URL or request.host_url)
+
+
+def _xml(path, mimetype='application/xml'):
+    response = send_file(path, mimetype=mimetype, conditional=True)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+@bp.route('/sitemap.xml', methods=['GET'])
+def sitemap_index():
+    with SessionLocal() as session:
+        return _xml(_service(session).ensure_index())
+
+
+@bp.route('/sitemaps/<string:name>.xml', methods=['GET'])
+def sitemap_part(name):
+    match = _MONTH_PART.match(name)
+    if not match:
+        return jsonify({'error': 'not found'}), 404
+    month, part = match.group(1), int(match.group(2) or 1)
+    with SessionLocal() as session:
+        path = _service(session).ensure_month_part(month, part)
+    if not path:
+        return jsonify({'error': 'not found'}), 404
+    return _xml(path)
+
+
+@bp.route('/feeds/rss.xml', methods=['GET'])
+def rss():
+    with SessionLocal() as session:
+        return _xml(_service(session).ensure_rss(), 'application/rss+xml')
+
+
+@bp.route('/feeds/categories/<string:slug>.xml', methods=['GET'])
+def category_rss(slug):
+    with SessionLocal() as session:
+        category = CategoryDAO(session).get_by_slug(slug)
+        if not category:
+            return jsonify({'error': 'not found'}), 404
+        return _xml(_service(session).ensure_category_rss(category), 'application/rss+xml')
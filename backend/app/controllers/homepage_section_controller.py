@@ -2,14 +2,14 @@ from flask import Blueprint, jsonify, request
 from app.config.session import SessionLocal
 from app.services.homepage_section_service import HomepageSectionService
 from app.models.homepage_section import HomepageSection
-from app.controllers.decorators import requires_role
+from app.controllers.decorators import requires_role, read_session
 
 bp = Blueprint('homepage_sections', __name__, url_prefix='/api/homepage_sections')
 
 
 @bp.route('/', methods=['GET'])
 def list_sections():
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = HomepageSectionService(session)
         secs = svc.list()
         return jsonify([{'id': str(s.id), 'key': s.key, 'title': s.title} for s in secs])
@@ -3,14 +3,14 @@ from app.config.session import SessionLocal
 from app.services.homepage_section_item_service import HomepageSectionItemService
 from app.models.homepage_section_item import HomepageSectionItem
 from uuid import UUID
-from app.controllers.decorators import requires_role
+from app.controllers.decorators import requires_role, read_session
 
 bp = Blueprint('homepage_section_items', __name__, url_prefix='/api/homepage_section_items')
 
 
 @bp.route('/section/<string:section_id>', methods=['GET'])
 def list_items(section_id: str):
-    with SessionLocal() as session:
+    with read_session() as session:
         svc = HomepageSectionItemService(session)
         items = svc.list_for_section(UUID(section_id))
         return jsonify([{'id': str(i.id), 'article_id': str(i.article_id), 'order_index': i.order_index} for i in items])
@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, request, send_file
+from app.images import MIMETYPES, ImageTooLarge, cache, output_format, parse_size, verify
+
+# resized variants of uploaded images (see app/images.py); nginx proxies /static/
+bp = Blueprint('images', __name__)
+
+
+@bp.route('/static/img/<string:size>/<path:key>', methods=['GET'])
+def image_variant(size, key):
+    if parse_size(size) is None:
+        return jsonify({'error': 'not found'}), 404
+    if not verify(size, key, request.args.get('s')):
+        return jsonify({'error': 'invalid signature'}), 403
+    try:
+        path = cache.get(size, key)
+    except (FileNotFoundError, ValueError):
+        return jsonify({'error': 'not found'}), 404
+    except ImageTooLarge:
+        return jsonify({'error': 'image too large'}), 413
+    except OSError:
+        # Pillow raises UnidentifiedImageError (an OSError) for non-images
+        return jsonify({'error': 'not an image'}), 415
+    response = send_file(path, mimetype=MIMETYPES[output_format(key)], conditional=True, max_age=31536000)
+    # keys are never reused for different content (media_controller._new_key adds a random suffix)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
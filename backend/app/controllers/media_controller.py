@@ -2,29 +2,35 @@ from flask import Blueprint, jsonify, request, current_app
 from app.config.session import SessionLocal
 from app.services.media_service import MediaService
 from app.models.media import MediaAsset
-from app.controllers.decorators import requires_role
+from app.services.upload_service import MAX_CHUNK_SIZE, MAX_UPLOAD_SIZE, OffsetMismatch, UploadNotFound, UploadStore
+from app.storage import UPLOAD_DIR, get_storage
+from app.images import cache as image_cache
+from app.controllers.decorators import requires_role, rate_limit
+import io
 import os
+import re
 from werkzeug.utils import secure_filename
 from datetime import datetime
-from PIL import Image
 from uuid import UUID
+import uuid
 
 bp = Blueprint('media', __name__, url_prefix='/api/media')
 
-# Get the backend directory (parent of app directory)
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-UPLOAD_DIR = os.getenv('UPLOAD_DIR', None) or os.path.join(BACKEND_DIR, 'static', 'uploads')
+# partial chunked uploads; on local storage keep this on the UPLOAD_DIR filesystem so completing is a rename
+UPLOAD_TMP_DIR = os.getenv('UPLOAD_TMP_DIR', None) or os.path.join(UPLOAD_DIR, '.incoming')
+uploads = UploadStore(UPLOAD_TMP_DIR)
 
 
 @bp.route('/', methods=['GET'])
+@rate_limit('list')
 @requires_role('admin')
 def list_media():
-    q = request.args.get('q')
+    q = (request.args.get('q') or '').strip() or None
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
     with SessionLocal() as session:
         svc = MediaService(session)
-        medias, total = svc.list_with_count(limit=limit, offset=offset, q=q)
+        medias, total, estimated = svc.list_with_total(limit=limit, offset=offset, q=q)
         items = [
             {
                 'id': str(m.id),
@@ -40,49 +46,57 @@ def list_media():
             }
             for m in medias
         ]
-        return jsonify({'items': items, 'total': total})
+        return jsonify({'items': items, 'total': total, 'total_estimated': estimated})
 
 
-@bp.route('/upload', methods=['POST'])
-@requires_role('admin')
-def upload_media():
-    if 'file' not in request.files:
-        return jsonify({'error': 'no file'}), 400
-    f = request.files['file']
-    filename = secure_filename(f.filename)
+def _new_key(filename: str) -> str:
+    """Storage key for a new upload: <year>/<month>/<stem>-<random><ext>.
+
+    Keys are never reused, not even after the original is deleted: image
+    variants of a key are served as immutable (app/images.py).
+    """
     today = datetime.utcnow()
-    target_dir = os.path.join(UPLOAD_DIR, str(today.year), f"{today.month:02d}")
-    os.makedirs(target_dir, exist_ok=True)
-    path = os.path.join(target_dir, filename)
-    f.save(path)
-    # Generate URL relative to static folder
-    rel_path = os.path.relpath(path, os.path.join(BACKEND_DIR, 'static')).replace('\\', '/')
-    rel_url = '/static/' + rel_path
-    
-    # Extract image dimensions
-    width, height = None, None
+    stem, ext = os.path.splitext(filename)
+    while True:
+        key = f"{today.year}/{today.month:02d}/{stem}-{uuid.uuid4().hex[:12]}{ext}"
+        if not get_storage().exists(key):
+            return key
+
+
+def _image_size(head: bytes):
+    """(width, height) from the first bytes of an image, or (None, None)."""
     try:
-        with Image.open(path) as img:
-            width, height = img.size
+        # Pillow is only needed here; importing it lazily keeps worker startup fast
+        from PIL import Image
+        with Image.open(io.BytesIO(head)) as img:
+            return img.size
     except Exception as e:
         print(f"Could not extract dimensions: {e}")
-    
-    # optional metadata fields supplied as form fields
-    mime_type = f.mimetype if hasattr(f, 'mimetype') else None
-    alt_text = request.form.get('alt_text')
-    caption = request.form.get('caption')
-    credit = request.form.get('credit')
+        return None, None
+
+
+# image headers (dimensions) sit at the start of the file; read no more than this
+_HEAD_BYTES = 256 * 1024
+
 
+def _create_asset(url: str, key: str, mime_type, size, fields, file_name: str = None) -> tuple:
+    """Create the MediaAsset for a stored object and return the 201 response.
+
+    `file_name` is the name as uploaded (default: fields['file_name'], else the key's).
+    """
+    width, height = size
+    media_type = (mime_type or '').split('/')[0]
+    file_name = file_name or secure_filename(fields.get('file_name') or '') or key.rsplit('/', 1)[-1]
     m = MediaAsset(
-        type='image',
-        file_name=filename,
-        url=rel_url,  # Already has /static/ prefix
+        type=media_type if media_type in ('video', 'audio') else 'image',
+        file_name=file_name,
+        url=url,
         mime_type=mime_type,
         width=width,
         height=height,
-        alt_text=alt_text,
-        caption=caption,
-        credit=credit,
+        alt_text=fields.get('alt_text'),
+        caption=fields.get('caption'),
+        credit=fields.get('credit'),
     )
     with SessionLocal() as session:
         svc = MediaService(session)
@@ -101,6 +115,150 @@ def upload_media():
         }), 201
 
 
+@bp.route('/upload', methods=['POST'])
+@requires_role('admin')
+def upload_media():
+    if 'file' not in request.files:
+        return jsonify({'error': 'no file'}), 400
+    f = request.files['file']
+    file_name = secure_filename(f.filename)
+    key = _new_key(file_name)
+    size = _image_size(f.stream.read(_HEAD_BYTES))
+    f.stream.seek(0)
+    # optional metadata fields supplied as form fields
+    mime_type = f.mimetype if hasattr(f, 'mimetype') else None
+    url = get_storage().save(key, f.stream, mime_type)
+    return _create_asset(url, key, mime_type, size, request.form, file_name)
+
+
+# --- resumable chunked uploads (see app/services/upload_service.py) ---
+
+def _upload_status(upload: dict):
+    response = jsonify({'id': upload['id'], 'offset': upload['offset'], 'size': upload['size'],
+                        'chunk_size': MAX_CHUNK_SIZE})
+    response.headers['Upload-Offset'] = str(upload['offset'])
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/uploads', methods=['POST'])
+@requires_role('admin')
+def init_upload():
+    data = request.get_json() or {}
+    try:
+        upload = uploads.init(secure_filename(data.get('file_name') or ''), data.get('size'),
+                              **{k: data.get(k) for k in ('mime_type', 'alt_text', 'caption', 'credit')})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return _upload_status(upload), 201
+
+
+@bp.route('/uploads/<upload_id>', methods=['GET', 'HEAD'])
+@requires_role('admin')
+def upload_status(upload_id):
+    try:
+        return _upload_status(uploads.get(upload_id))
+    except UploadNotFound:
+        return jsonify({'error': 'upload not found'}), 404
+
+
+@bp.route('/uploads/<upload_id>', methods=['PATCH'])
+@requires_role('admin')
+def put_upload_chunk(upload_id):
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length is required'}), 411
+    if request.content_length > MAX_CHUNK_SIZE:
+        return jsonify({'error': f'chunks are limited to {MAX_CHUNK_SIZE} bytes'}), 413
+    try:
+        new_offset = uploads.append(upload_id, offset, request.stream, request.content_length)
+    except UploadNotFound:
+        return jsonify({'error': 'upload not found'}), 404
+    except OffsetMismatch as e:
+        response = jsonify({'error': str(e), 'offset': e.offset})
+        response.headers['Upload-Offset'] = str(e.offset)
+        return response, 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return '', 204, {'Upload-Offset': str(new_offset)}
+
+
+@bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+@requires_role('admin')
+def complete_upload(upload_id):
+    try:
+        meta = uploads.get(upload_id)
+        if meta['offset'] != meta['size']:
+            raise OffsetMismatch(f"upload incomplete: {meta['offset']} of {meta['size']} bytes", meta['offset'])
+        with open(uploads.part_path(upload_id), 'rb') as f:
+            size = _image_size(f.read(_HEAD_BYTES))
+        key = _new_key(meta['file_name'])
+        meta = uploads.complete(upload_id, get_storage(), key)
+    except UploadNotFound:
+        return jsonify({'error': 'upload not found'}), 404
+    except OffsetMismatch as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    return _create_asset(meta['url'], key, meta.get('mime_type'), size, meta)
+
+
+@bp.route('/uploads/<upload_id>', methods=['DELETE'])
+@requires_role('admin')
+def abort_upload(upload_id):
+    try:
+        uploads.abort(upload_id)
+    except UploadNotFound:
+        return jsonify({'error': 'upload not found'}), 404
+    return '', 204
+
+
+# --- direct-to-bucket uploads (MEDIA_STORAGE=s3) ---
+
+_DIRECT_KEY = re.compile(r'^\d{4}/\d{2}/[^/]+$')
+
+
+@bp.route('/direct-uploads', methods=['POST'])
+@requires_role('admin')
+def init_direct_upload():
+    """Presigned URL(s) for the browser to upload straight to the bucket."""
+    data = request.get_json() or {}
+    filename = secure_filename(data.get('file_name') or '')
+    size = data.get('size')
+    if not filename or not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'file_name and a positive size are required'}), 400
+    if size > MAX_UPLOAD_SIZE:
+        return jsonify({'error': f'size exceeds the {MAX_UPLOAD_SIZE} byte limit'}), 400
+    key = _new_key(filename)
+    try:
+        upload = get_storage().presign_upload(key, size, data.get('mime_type'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if upload is None:
+        return jsonify({'error': 'direct uploads need MEDIA_STORAGE=s3; use /api/media/uploads'}), 400
+    return jsonify(dict(upload, key=key)), 201
+
+
+@bp.route('/direct-uploads/complete', methods=['POST'])
+@requires_role('admin')
+def complete_direct_upload():
+    """Record a direct upload: finish the multipart upload (if any) and create the MediaAsset."""
+    data = request.get_json() or {}
+    key = data.get('key') or ''
+    if not _DIRECT_KEY.match(key):
+        return jsonify({'error': 'invalid key'}), 400
+    storage = get_storage()
+    try:
+        storage.complete_upload(key, data.get('upload_id'), data.get('parts') or [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not storage.exists(key):
+        return jsonify({'error': 'object not found; upload it first'}), 409
+    size = _image_size(storage.read_head(key, _HEAD_BYTES))
+    return _create_asset(storage.url(key), key, data.get('mime_type'), size, data)
+
+
 @bp.route('/<media_id>/check-usage', methods=['GET'])
 @requires_role('admin')
 def check_media_usage(media_id):
@@ -143,15 +301,14 @@ def delete_media(media_id):
                 'articles': usage_info['articles']
             }), 400
         
-        # Delete the physical file if it exists
-        if media.url:
+        # Delete the stored file if it lives in our storage
+        # URL format: /static/uploads/2025/10/filename.jpg (local) or <S3_PUBLIC_URL>/2025/10/filename.jpg
+        storage = get_storage()
+        key = storage.key_for_url(media.url)
+        if key:
             try:
-                # Convert URL to file path
-                # URL format: /static/uploads/2025/10/filename.jpg
-                rel_path = media.url.replace('/static/', '')
-                file_path = os.path.join(BACKEND_DIR, 'static', rel_path.replace('/', os.sep))
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                storage.delete(key)
+                image_cache.purge(key)
             except Exception as e:
                 print(f"Error deleting file: {e}")
         
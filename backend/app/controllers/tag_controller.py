@@ -1,18 +1,43 @@
 from flask import Blueprint, jsonify, request
 from app.config.session import SessionLocal
-from app.services.tag_service import TagService
+from app.services.tag_service import TagService, TAG_ORDERS, TAGS_MAX_LIMIT
 from app.models.tag import Tag
-from app.controllers.decorators import requires_role
+from app.controllers.decorators import requires_role, public_cache, rate_limit, read_session
+from app.cache import ARTICLE_LISTS, TAGS
 
 bp = Blueprint('tags', __name__, url_prefix='/api/tags')
 
 
+def _wants_counts() -> bool:
+    return request.args.get('with_counts') in ('1', 'true') or request.args.get('order') == 'popular'
+
+
 @bp.route('/', methods=['GET'])
+@rate_limit('list')
+@public_cache(TAGS, tags_for=lambda: [ARTICLE_LISTS] if _wants_counts() else [])
 def list_tags():
-    with SessionLocal() as session:
+    """Tags by name or, with order=popular, by published-article count.
+
+    Query: limit (max 500), offset, prefix (start of the name, any case),
+    order=name|popular, with_counts=1 to include article_count.
+    """
+    order = request.args.get('order', 'name')
+    if order not in TAG_ORDERS:
+        return jsonify({'error': f"order must be one of {', '.join(TAG_ORDERS)}"}), 400
+    limit = max(1, min(int(request.args.get('limit', 100)), TAGS_MAX_LIMIT))
+    offset = max(0, int(request.args.get('offset', 0)))
+    prefix = (request.args.get('prefix') or '').strip() or None
+    with_counts = _wants_counts()
+    with read_session() as session:
         svc = TagService(session)
-        tags = svc.list()
-        return jsonify([{'id': str(t.id), 'name': t.name, 'slug': t.slug} for t in tags])
+        tags = svc.list(limit=limit, offset=offset, prefix=prefix, order=order)
+        result = []
+        for t in tags:
+            item = {'id': str(t.id), 'name': t.name, 'slug': t.slug}
+            if with_counts:
+                item['article_count'] = t.article_count
+            result.append(item)
+        return jsonify(result)
 
 
 @bp.route('/', methods=['POST'])
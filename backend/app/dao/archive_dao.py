@@ -0,0 +1,35 @@
+from datetime import date
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import Date, Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+# article_archive_days.scope for the archive across all categories
+ALL_ARTICLES = UUID(int=0)
+
+
+class ArchiveDAO:
+    """Reads and reconciles the trigger-maintained article_archive_days table."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def days(self, scope: UUID = ALL_ARTICLES) -> List[Tuple[date, int]]:
+        """(day, published articles) for every day with any, newest first."""
+        # typed, so the same statement also reads a SQLite read snapshot (app.snapshot)
+        rows = self.session.execute(text(
+            'SELECT day, articles FROM article_archive_days WHERE scope = :scope AND articles > 0 ORDER BY day DESC'
+        ).bindparams(bindparam('scope', type_=PG_UUID(as_uuid=True))).columns(day=Date, articles=Integer),
+            {'scope': scope})
+        return [(day, int(count)) for day, count in rows]
+
+    def reconcile(self) -> List[Dict]:
+        """Recompute the archive; returns the (scope, day) rows that had drifted."""
+        rows = self.session.execute(text(
+            'SELECT archive_scope, archive_day, stored_value, actual_value FROM reconcile_article_archive()'
+        ))
+        return [
+            {'scope': str(scope), 'day': day.isoformat(), 'stored': stored, 'actual': int(actual)}
+            for scope, day, stored, actual in rows
+        ]
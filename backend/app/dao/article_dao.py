@@ -1,10 +1,27 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from typing import Dict, Optional, List, Sequence
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.article import Article
 from uuid import UUID
 from app.models.category import Category
-from sqlalchemy import or_, and_
-from datetime import datetime
+from app.models import article_category, article_tag
+from app.dao.partition_dao import is_partitioned, key_filter
+from sqlalchemy import or_, and_, select, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from datetime import datetime, timezone
+
+_IDS = bindparam('ids', type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _recent_cutoff(now: datetime = None) -> datetime:
+    """Start of the previous UTC month: the window list() tries first on a
+    partitioned table. A fixed literal, so the planner prunes older partitions."""
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    year, month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+    return datetime(year, month, 1, tzinfo=timezone.utc)
 
 
 class ArticleDAO:
@@ -14,17 +31,44 @@ class ArticleDAO:
         self.session = session
 
     def get(self, article_id: UUID) -> Optional[Article]:
-        return self.session.query(Article).get(article_id)
+        if not is_partitioned(self.session):
+            return self.session.query(Article).get(article_id)
+        return self._first_pruned(self.session.query(Article).filter(Article.id == article_id), article_id)
 
     def get_by_slug(self, slug: str) -> Optional[Article]:
-        return self.session.query(Article).filter(Article.slug == slug).first()
+        query = self.session.query(Article).filter(Article.slug == slug)
+        if not is_partitioned(self.session):
+            return query.first()
+        article_id = self.session.execute(text('SELECT id FROM article_keys WHERE slug = :slug'),
+                                          {'slug': slug}).scalar()
+        return self._first_pruned(query, article_id) if article_id else None
 
-    def list(self, limit: int = 20, offset: int = 0, category_slug: str = None,
-             tag_slug: str = None, is_highlight: bool = None, status: Optional[str] = 'published',
-             date_from: str = None, date_to: str = None) -> List[Article]:
-        
-        
-        query = self.session.query(Article).distinct()
+    def _first_pruned(self, query, article_id: UUID) -> Optional[Article]:
+        """First row of `query` searched in the article's partition only; falls back
+        to all partitions if the article moved since article_keys was read."""
+        criterion = key_filter(self.session, [article_id])
+        if criterion is None:
+            return None
+        return query.filter(criterion).first() or query.first()
+
+    def published(self, ids: Sequence[UUID]) -> List[Article]:
+        """Published articles among `ids`, with their categories loaded."""
+        query = self.session.query(Article).options(
+            selectinload(Article.categories), joinedload(Article.primary_category),
+        ).filter(Article.id.in_(list(ids)), Article.status == 'published')
+        criterion = key_filter(self.session, list(ids))
+        return (query.filter(criterion) if criterion is not None else query).all()
+
+    def list_query(self, category_slug: str = None, tag_slug: str = None, is_highlight: bool = None,
+                   status: Optional[str] = 'published', date_from: str = None, date_to: str = None):
+        """Build the filtered, ordered article query used by list().
+
+        Returns None when a category/tag slug doesn't exist. Category and tag
+        filters are semi-joins (IN subqueries) rather than joins, so rows are
+        never duplicated and no DISTINCT is needed; that lets Postgres walk
+        ix_articles_status_published_at in order and stop at LIMIT.
+        """
+        query = self.session.query(Article)
         
         # Filter by status (None means no filter - show all statuses)
         if status is not None:
@@ -36,32 +80,37 @@ class ArticleDAO:
             category = self.session.query(Category).filter(Category.slug == category_slug).first()
             if category:
                 # Article matches if it's in the many-to-many OR it's the primary category
-                query = query.outerjoin(Article.categories).filter(
+                in_junction = select(article_category.c.article_id).where(article_category.c.category_id == category.id)
+                query = query.filter(
                     or_(
-                        Category.id == category.id,  # In junction table
+                        Article.id.in_(in_junction),  # In junction table
                         Article.primary_category_id == category.id  # Is primary category
                     )
                 )
             else:
                 # Category doesn't exist, return empty
-                return []
+                return None
         # Filter by tag - check many-to-many relationship
         if tag_slug:
             from app.models.tag import Tag
             tag = self.session.query(Tag).filter(Tag.slug == tag_slug).first()
             if tag:
-                query = query.outerjoin(Article.tags).filter(Tag.id == tag.id)
+                query = query.filter(
+                    Article.id.in_(select(article_tag.c.article_id).where(article_tag.c.tag_id == tag.id))
+                )
             else:
-                return []
+                return None
         
         # Filter by highlight
         if is_highlight is not None:
             query = query.filter(Article.is_highlight == is_highlight)
         
-        # Filter by date range on published_at
+        # Filter by date range on published_at (a range scan on
+        # ix_articles_status_published_at). Dates without an offset are UTC,
+        # the days the archive (/api/articles/archive) counts in.
         if date_from:
             try:
-                date_from_obj = datetime.fromisoformat(date_from)
+                date_from_obj = _utc(datetime.fromisoformat(date_from))
                 query = query.filter(Article.published_at >= date_from_obj)
             except ValueError:
                 pass  # Invalid date format, skip filter
@@ -69,20 +118,35 @@ class ArticleDAO:
         if date_to:
             try:
                 # Add one day to include the entire end date
-                date_to_obj = datetime.fromisoformat(date_to)
+                date_to_obj = _utc(datetime.fromisoformat(date_to))
                 from datetime import timedelta
                 date_to_end = date_to_obj + timedelta(days=1)
                 query = query.filter(Article.published_at < date_to_end)
             except ValueError:
                 pass  # Invalid date format, skip filter
         
-        return (
-            query
-            .order_by(Article.published_at.desc().nullslast(), Article.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-            .all()
+        return query.order_by(Article.published_at.desc().nullslast(), Article.created_at.desc())
+
+    def list(self, limit: int = 20, offset: int = 0, category_slug: str = None,
+             tag_slug: str = None, is_highlight: bool = None, status: Optional[str] = 'published',
+             date_from: str = None, date_to: str = None) -> List[Article]:
+        query = self.list_query(
+            category_slug=category_slug,
+            tag_slug=tag_slug,
+            is_highlight=is_highlight,
+            status=status,
+            date_from=date_from,
+            date_to=date_to
         )
+        if query is None:
+            return []
+        if not (date_from or date_to) and is_partitioned(self.session):
+            # Rows inside the window sort before every row outside it, so a
+            # full page from the recent partitions is the answer.
+            page = query.filter(Article.published_at >= _recent_cutoff()).limit(limit).offset(offset).all()
+            if len(page) == limit:
+                return page
+        return query.limit(limit).offset(offset).all()
 
     def create(self, article: Article) -> Article:
         self.session.add(article)
@@ -123,26 +187,138 @@ class ArticleDAO:
             self.session.expire(article, ['categories'])
     
     def set_tags(self, article: Article, tag_ids: List[UUID]) -> None:
-        """Set article tags. Clears existing and adds new ones."""
-        from app.models.tag import Tag
-        from sqlalchemy import text
-        
-        # Delete existing relationships directly via SQL to avoid stale state issues
+        """Set article tags: unlink the ones not in `tag_ids`, link the missing ones.
+
+        Unchanged links are left alone, so saving an article only touches the
+        article_count of tags actually added or removed (migration 0008).
+        """
+        ids = list(set(tag_ids or []))
         self.session.execute(
-            text("DELETE FROM article_tag WHERE article_id = :article_id"),
-            {"article_id": article.id}
+            text("DELETE FROM article_tag WHERE article_id = :article_id AND NOT (tag_id = ANY(:ids))").bindparams(_IDS),
+            {"article_id": article.id, "ids": ids}
         )
+        if ids:
+            self.session.execute(
+                text("INSERT INTO article_tag (article_id, tag_id) "
+                     "SELECT :article_id, t.id FROM tags t WHERE t.id = ANY(:ids) ORDER BY t.id "
+                     "ON CONFLICT DO NOTHING").bindparams(_IDS),
+                {"article_id": article.id, "ids": ids}
+            )
         self.session.flush()
-        
-        # Add new tags
-        if tag_ids:
-            tags = self.session.query(Tag).filter(Tag.id.in_(tag_ids)).all()
-            for tag in tags:
-                self.session.execute(
-                    text("INSERT INTO article_tag (article_id, tag_id) VALUES (:article_id, :tag_id) ON CONFLICT DO NOTHING"),
-                    {"article_id": article.id, "tag_id": tag.id}
-                )
-            self.session.flush()
-            # Refresh the article to reload relationships
-            self.session.expire(article, ['tags'])
+        # Refresh the article to reload relationships
+        self.session.expire(article, ['tags'])
+
+    def category_ids(self, article_id: UUID) -> List[UUID]:
+        """Category ids currently linked through article_category."""
+        rows = self.session.execute(
+            select(article_category.c.category_id).where(article_category.c.article_id == article_id)
+        )
+        return [r[0] for r in rows]
+
+    def tag_ids(self, article_id: UUID) -> List[UUID]:
+        """Tag ids currently linked through article_tag."""
+        rows = self.session.execute(
+            select(article_tag.c.tag_id).where(article_tag.c.article_id == article_id)
+        )
+        return [r[0] for r in rows]
+
+    # --- bulk (set-based) writes; callers commit -------------------------
+
+    def matching_ids(self, query) -> List[UUID]:
+        """Ids selected by a list_query() result, without loading the rows."""
+        return [r[0] for r in query.order_by(None).with_entities(Article.id)]
+
+    def states(self, ids: Sequence[UUID], lock: bool = False) -> Dict[UUID, dict]:
+        """Tracked fields (as in ArticleChange) of the given articles, keyed by id.
+
+        With lock=True the rows are locked FOR UPDATE, in id order.
+        """
+        states = {}
+        sql = ('SELECT id, slug, status, published_at, is_breaking, primary_category_id '
+               'FROM articles WHERE id = ANY(:ids)')
+        if lock:
+            sql += ' ORDER BY id FOR UPDATE'
+        for article_id, slug, status, published_at, is_breaking, primary_category_id in self.session.execute(
+                text(sql).bindparams(_IDS), {'ids': list(ids)}):
+            states[article_id] = {
+                'slug': slug, 'status': status, 'published_at': published_at,
+                'is_breaking': bool(is_breaking), 'primary_category_id': primary_category_id,
+                'category_ids': set(), 'tag_ids': set(),
+            }
+        self._add_links(states)
+        return states
+
+    def _add_links(self, states: Dict[UUID, dict]) -> None:
+        if not states:
+            return
+        params = {'ids': list(states)}
+        for table, column, key in (('article_category', 'category_id', 'category_ids'),
+                                   ('article_tag', 'tag_id', 'tag_ids')):
+            rows = self.session.execute(text(
+                f'SELECT article_id, {column} FROM {table} WHERE article_id = ANY(:ids)'
+            ).bindparams(_IDS), params)
+            for article_id, linked_id in rows:
+                states[article_id][key].add(linked_id)
+
+    def bulk_update(self, ids: Sequence[UUID], values: dict) -> List[UUID]:
+        """Set column `values` on the given articles; returns the ids actually changed.
+
+        Publishing stamps published_at on rows that have none.
+        """
+        assignments = ', '.join(f'{column} = :{column}' for column in values)
+        changed = ' OR '.join(f'{column} IS DISTINCT FROM :{column}' for column in values)
+        if values.get('status') == 'published':
+            assignments += ', published_at = coalesce(published_at, now())'
+        rows = self.session.execute(text(
+            f'UPDATE articles SET {assignments}, updated_at = now() WHERE id = ANY(:ids) AND ({changed}) RETURNING id'
+        ).bindparams(_IDS), {'ids': list(ids), **values})
+        return [r[0] for r in rows]
+
+    def bulk_add_tag(self, ids: Sequence[UUID], tag_id: UUID) -> List[UUID]:
+        rows = self.session.execute(text(
+            'INSERT INTO article_tag (article_id, tag_id) '
+            'SELECT a.id, :tag_id FROM articles a WHERE a.id = ANY(:ids) ORDER BY a.id '
+            'ON CONFLICT DO NOTHING RETURNING article_id'
+        ).bindparams(_IDS), {'ids': list(ids), 'tag_id': tag_id})
+        return [r[0] for r in rows]
+
+    def bulk_remove_tag(self, ids: Sequence[UUID], tag_id: UUID) -> List[UUID]:
+        rows = self.session.execute(text(
+            'DELETE FROM article_tag WHERE tag_id = :tag_id AND article_id = ANY(:ids) RETURNING article_id'
+        ).bindparams(_IDS), {'ids': list(ids), 'tag_id': tag_id})
+        return [r[0] for r in rows]
+
+    def bulk_move_category(self, ids: Sequence[UUID], category_id: UUID,
+                           from_category_id: UUID = None) -> Dict[str, List[UUID]]:
+        """Move articles into `category_id`: out of `from_category_id` only, or out of
+        every other category when it is None. The primary category follows.
+
+        Returns the ids touched by each step: linked, unlinked, primary_updated.
+        """
+        params = {'ids': list(ids), 'to': category_id, 'from': from_category_id}
+        if from_category_id is not None:
+            unlink = 'DELETE FROM article_category WHERE article_id = ANY(:ids) AND category_id = :from'
+            primary = 'primary_category_id = :from'
+        else:
+            unlink = 'DELETE FROM article_category WHERE article_id = ANY(:ids) AND category_id <> :to'
+            primary = 'primary_category_id IS DISTINCT FROM :to'
+        touched = {'linked': [], 'unlinked': [], 'primary_updated': []}
+        if from_category_id != category_id:
+            touched['unlinked'] = [r[0] for r in self.session.execute(
+                text(unlink + ' RETURNING article_id').bindparams(_IDS), params)]
+        touched['linked'] = [r[0] for r in self.session.execute(text(
+            'INSERT INTO article_category (article_id, category_id) '
+            'SELECT a.id, :to FROM articles a WHERE a.id = ANY(:ids) ORDER BY a.id '
+            'ON CONFLICT DO NOTHING RETURNING article_id'
+        ).bindparams(_IDS), params)]
+        touched['primary_updated'] = [r[0] for r in self.session.execute(text(
+            f'UPDATE articles SET primary_category_id = :to, updated_at = now() '
+            f'WHERE id = ANY(:ids) AND {primary} RETURNING id'
+        ).bindparams(_IDS), params)]
+        return touched
 
+    def bulk_delete(self, ids: Sequence[UUID]) -> List[UUID]:
+        # links, section items and derived rows go with the foreign-key cascades
+        rows = self.session.execute(text('DELETE FROM articles WHERE id = ANY(:ids) RETURNING id').bindparams(_IDS),
+                                    {'ids': list(ids)})
+        return [r[0] for r in rows]
@@ -1,5 +1,8 @@
 from typing import Optional, List
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
+from app.models import article_category
+from app.models.article import Article
 from app.models.category import Category
 from uuid import UUID
 
@@ -30,3 +33,14 @@ class CategoryDAO:
     def delete(self, category: Category) -> None:
         self.session.delete(category)
         self.session.flush()
+
+    def published_article_ids(self, category_id: UUID) -> List[UUID]:
+        """Published articles filed under the category (linked or primary)."""
+        linked = select(article_category.c.article_id).where(article_category.c.category_id == category_id)
+        rows = self.session.execute(
+            select(Article.id).where(
+                Article.status == 'published',
+                or_(Article.id.in_(linked), Article.primary_category_id == category_id),
+            )
+        )
+        return [r[0] for r in rows]
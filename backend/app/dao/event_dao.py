@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+EVENT_CHANNEL = 'article_events'
+
+# Insert the event and announce it in the same transaction, so listeners are
+# woken only once the row is visible to them.
+_RECORD_SQL = """
+WITH ev AS (
+    INSERT INTO article_events (kind, article_id, payload)
+    VALUES (:kind, :article_id, CAST(:payload AS jsonb))
+    RETURNING id, created_at
+)
+SELECT id, created_at, pg_notify(:channel, CAST(id AS text)) FROM ev
+"""
+
+
+class EventDAO:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(self, kind: str, article_id: UUID, payload: Dict) -> int:
+        row = self.session.execute(text(_RECORD_SQL), {
+            'kind': kind, 'article_id': article_id, 'payload': json.dumps(payload), 'channel': EVENT_CHANNEL,
+        }).first()
+        return row[0]
+
+    def since(self, last_id: int, limit: int = 500, not_before: Optional[datetime] = None) -> List[Dict]:
+        """Events with id > last_id, oldest first."""
+        sql = 'SELECT id, kind, payload FROM article_events WHERE id > :last_id'
+        params = {'last_id': last_id, 'limit': limit}
+        if not_before is not None:
+            sql += ' AND created_at >= :not_before'
+            params['not_before'] = not_before
+        rows = self.session.execute(text(sql + ' ORDER BY id LIMIT :limit'), params)
+        return [{'id': i, 'kind': kind, 'data': payload} for i, kind, payload in rows]
+
+    def by_ids(self, ids: List[int]) -> List[Dict]:
+        if not ids:
+            return []
+        rows = self.session.execute(text('SELECT id, kind, payload FROM article_events WHERE id = ANY(:ids) ORDER BY id'),
+                                    {'ids': list(ids)})
+        return [{'id': i, 'kind': kind, 'data': payload} for i, kind, payload in rows]
+
+    def last_id(self) -> int:
+        return self.session.execute(text('SELECT coalesce(max(id), 0) FROM article_events')).scalar()
+
+    def prune(self, before: datetime) -> int:
+        result = self.session.execute(text('DELETE FROM article_events WHERE created_at < :before'),
+                                      {'before': before})
+        return result.rowcount
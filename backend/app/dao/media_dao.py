@@ -1,7 +1,22 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
+from sqlalchemy import func, literal_column, select, case
 from app.models.media import MediaAsset
 from uuid import UUID
+import os
+
+# Unfiltered listings report the planner's row estimate instead of an exact
+# COUNT(*) once the table is larger than this.
+EXACT_COUNT_THRESHOLD = int(os.getenv('MEDIA_EXACT_COUNT_THRESHOLD', '10000'))
+# Searches return and count at most this many of the most relevant matches; a
+# broader query reports this as an estimated total.
+SEARCH_CANDIDATES = int(os.getenv('MEDIA_SEARCH_CANDIDATES', '1000'))
+
+SEARCH_COLUMNS = (MediaAsset.file_name, MediaAsset.alt_text, MediaAsset.caption, MediaAsset.credit)
+
+
+def _escape_like(q: str) -> str:
+    return q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
 
 class MediaDAO:
@@ -11,34 +26,81 @@ class MediaDAO:
     def get(self, media_id: UUID) -> Optional[MediaAsset]:
         return self.session.query(MediaAsset).get(media_id)
 
+    def _search_filter(self, q: str):
+        """ILIKE '%q%' across the searchable columns (served by the pg_trgm GIN indexes)."""
+        like = f"%{_escape_like(q)}%"
+        clauses = [col.ilike(like, escape='\\') for col in SEARCH_COLUMNS]
+        return clauses[0] | clauses[1] | clauses[2] | clauses[3]
+
+    def _relevance(self, q: str):
+        """Best trigram word similarity of q against any searchable column."""
+        return func.greatest(*[func.word_similarity(q, func.coalesce(col, '')) for col in SEARCH_COLUMNS])
+
+    def _candidates(self, q: str):
+        """The SEARCH_CANDIDATES most relevant matches, as (id, rank, created_at)."""
+        rank = self._relevance(q).label('rank')
+        return (
+            self.session.query(MediaAsset.id, rank, MediaAsset.created_at)
+            .filter(self._search_filter(q))
+            .order_by(rank.desc(), MediaAsset.created_at.desc(), MediaAsset.id)
+            .limit(SEARCH_CANDIDATES)
+            .subquery()
+        )
+
+    def _search(self, query, q: str):
+        """Restrict `query` (over MediaAsset) to the search candidates, best first."""
+        candidates = self._candidates(q)
+        return query.join(candidates, candidates.c.id == MediaAsset.id).order_by(
+            candidates.c.rank.desc(), candidates.c.created_at.desc(), candidates.c.id
+        )
+
     def list(self, limit: int = 100, offset: int = 0, q: str = None) -> List[MediaAsset]:
         """List media assets, optional search by filename, alt_text, caption or credit."""
-        query = self.session.query(MediaAsset).order_by(MediaAsset.created_at.desc())
+        query = self.session.query(MediaAsset)
         if q:
-            like = f"%{q}%"
-            query = query.filter(
-                (MediaAsset.file_name.ilike(like)) |
-                (MediaAsset.alt_text.ilike(like)) |
-                (MediaAsset.caption.ilike(like)) |
-                (MediaAsset.credit.ilike(like))
-            )
+            query = self._search(query, q)
+        else:
+            query = query.order_by(MediaAsset.created_at.desc())
         return query.limit(limit).offset(offset).all()
 
     def list_with_count(self, limit: int = 100, offset: int = 0, q: str = None):
-        """Return a tuple (items, total_count) applying optional search."""
-        query = self.session.query(MediaAsset)
+        """Return a tuple (items, total_count) applying optional search.
+
+        Page and total come back from one statement. Searches find matches
+        through the trigram indexes, keep the SEARCH_CANDIDATES most relevant
+        and count those with a window count. Unfiltered listings walk
+        the created_at index and use the planner estimate for the total past
+        EXACT_COUNT_THRESHOLD.
+        """
+        items, total, _ = self.list_with_total(limit=limit, offset=offset, q=q)
+        return items, total
+
+    def list_with_total(self, limit: int = 100, offset: int = 0, q: str = None):
+        """Like list_with_count but also says whether the total is an estimate."""
         if q:
-            like = f"%{q}%"
-            query = query.filter(
-                (MediaAsset.file_name.ilike(like)) |
-                (MediaAsset.alt_text.ilike(like)) |
-                (MediaAsset.caption.ilike(like)) |
-                (MediaAsset.credit.ilike(like))
+            total_col = func.count().over().label('total')
+            query = self._search(self.session.query(MediaAsset, total_col), q)
+        else:
+            reltuples = literal_column(
+                "(SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = 'media_assets'::regclass)"
             )
+            exact = select(func.count()).select_from(MediaAsset).scalar_subquery()
+            # the exact COUNT(*) subquery only runs when the CASE picks it
+            total_col = case((reltuples > EXACT_COUNT_THRESHOLD, reltuples), else_=exact).label('total')
+            query = self.session.query(MediaAsset, total_col).order_by(MediaAsset.created_at.desc())
 
-        total = query.count()
-        items = query.order_by(MediaAsset.created_at.desc()).limit(limit).offset(offset).all()
-        return items, total
+        rows = query.limit(limit).offset(offset).all()
+        if rows:
+            total = int(rows[0][1])
+            estimated = total >= SEARCH_CANDIDATES if q else total > EXACT_COUNT_THRESHOLD
+            return [r[0] for r in rows], total, estimated
+        if offset <= 0:
+            return [], 0, False
+        # paged past the end: count separately so the client can recover
+        if q:
+            total = self.session.query(func.count()).select_from(self._candidates(q)).scalar()
+            return [], total, total >= SEARCH_CANDIDATES
+        return [], self.session.query(func.count(MediaAsset.id)).scalar(), False
 
     def create(self, media: MediaAsset) -> MediaAsset:
         self.session.add(media)
@@ -0,0 +1,268 @@
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, or_, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+from app.models.article import Article
+
+_IDS = bindparam('ids', type_=ARRAY(PG_UUID(as_uuid=True)))
+
+PARTITION_INTERVALS = ('month', 'year')
+DEFAULT_PARTITION = 'articles_pdefault'
+# articles_p202405 (month) / articles_p2024 (year)
+_NAME_RE = re.compile(r'^articles_p(\d{4})(\d{2})?$')
+
+# row-level BEFORE DELETE triggers that articles_partitioned_delete() replaces (migration 0011)
+_REPLACED_TRIGGERS = (
+    'trg_stat_counters_articles_before_delete',
+    'trg_article_archive_articles_before_delete',
+    'trg_tag_counts_articles_before_delete',
+)
+_TRIGGER_ROW, _TRIGGER_BEFORE, _TRIGGER_DELETE = 1, 2, 8
+_LIKE = 'INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS'
+
+_partitioned: Dict[str, bool] = {}
+
+
+def is_partitioned(session: Session) -> bool:
+    """Whether `articles` is a partitioned table; checked once per database.
+
+    Workers pick up a conversion on restart.
+    """
+    bind = session.get_bind()
+    key = str(bind.url)
+    if key not in _partitioned:
+        _partitioned[key] = bind.dialect.name == 'postgresql' and session.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass('articles')")
+        ).scalar() == 'p'
+    return _partitioned[key]
+
+
+def key_filter(session: Session, ids: Sequence[UUID]):
+    """Criterion on Article.published_at matching the given articles, so a
+    lookup by id only scans their partitions; None when `articles` isn't
+    partitioned or none of the ids exist."""
+    if not ids or not is_partitioned(session):
+        return None
+    stamps = session.execute(
+        text('SELECT DISTINCT published_at FROM article_keys WHERE id = ANY(:ids)').bindparams(_IDS),
+        {'ids': list(ids)},
+    ).scalars().all()
+    clauses = []
+    dated = [s for s in stamps if s is not None]
+    if dated:
+        clauses.append(Article.published_at.in_(dated))
+    if len(dated) < len(stamps):
+        clauses.append(Article.published_at.is_(None))
+    return or_(*clauses) if clauses else None
+
+
+def period_start(ts: datetime, interval: str) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    return datetime(ts.year, ts.month if interval == 'month' else 1, 1, tzinfo=timezone.utc)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == 'year' or start.month == 12:
+        return start.replace(year=start.year + 1, month=1 if interval == 'month' else start.month)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    return f'articles_p{start:%Y%m}' if interval == 'month' else f'articles_p{start:%Y}'
+
+
+def partition_range(name: str) -> Optional[Tuple[datetime, datetime]]:
+    """[start, end) of a partition from its name; None for the default partition."""
+    m = _NAME_RE.match(name)
+    if not m:
+        return None
+    interval = 'month' if m.group(2) else 'year'
+    start = datetime(int(m.group(1)), int(m.group(2) or 1), 1, tzinfo=timezone.utc)
+    return start, next_period(start, interval)
+
+
+def _bound(ts: datetime) -> str:
+    return f"'{ts.isoformat()}'"
+
+
+class PartitionDAO:
+    """Range partitioning of `articles` by published_at (see migration 0011).
+
+    Partitions cover one UTC month or year each; drafts (no published_at) and
+    dates outside every partition land in articles_pdefault until ensure()
+    gives them a partition.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def partitions(self) -> List[Dict]:
+        rows = self.session.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), greatest(c.reltuples, 0)::bigint, "
+            "       pg_total_relation_size(c.oid), coalesce(ts.spcname, 'pg_default') "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "LEFT JOIN pg_tablespace ts ON ts.oid = c.reltablespace "
+            "WHERE i.inhparent = to_regclass('articles') "
+            "ORDER BY c.relname"
+        ))
+        return [
+            {'name': name, 'bound': bound, 'rows': int(rows_), 'bytes': int(size), 'tablespace': space}
+            for name, bound, rows_, size, space in rows
+        ]
+
+    def interval(self) -> Optional[str]:
+        for p in self.partitions():
+            m = _NAME_RE.match(p['name'])
+            if m:
+                return 'month' if m.group(2) else 'year'
+        return None
+
+    def convert(self, interval: str = 'month', ahead: int = 3, now: datetime = None) -> List[str]:
+        """Rebuild the plain `articles` table as a partitioned one, in the
+        caller's transaction. Returns the partitions created.
+
+        Writers wait for the whole copy (the table is locked EXCLUSIVE);
+        readers keep reading the old table until commit.
+        """
+        if interval not in PARTITION_INTERVALS:
+            raise ValueError(f'interval must be one of {PARTITION_INTERVALS}')
+        if is_partitioned(self.session):
+            raise RuntimeError('articles is already partitioned')
+        execute = lambda sql: self.session.execute(text(sql))
+        execute('LOCK TABLE articles IN EXCLUSIVE MODE')
+
+        indexes = execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = 'articles' AND schemaname = current_schema() "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = 'articles'::regclass)"
+        ).scalars().all()
+        triggers = []
+        for name, definition, kind in execute(
+                "SELECT tgname, pg_get_triggerdef(oid), tgtype FROM pg_trigger "
+                "WHERE tgrelid = 'articles'::regclass AND NOT tgisinternal ORDER BY tgname"):
+            row_before_delete = kind & _TRIGGER_ROW and kind & _TRIGGER_BEFORE and kind & _TRIGGER_DELETE
+            if name in _REPLACED_TRIGGERS:
+                continue
+            if row_before_delete:
+                # it would also fire when publishing moves a row between partitions
+                raise RuntimeError(f'row-level delete trigger {name} on articles has no partitioned replacement')
+            triggers.append(definition)
+        outgoing = execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = 'articles'::regclass AND contype = 'f'"
+        ).all()
+        incoming = execute(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE confrelid = 'articles'::regclass AND contype = 'f' ORDER BY 1, 2"
+        ).all()
+
+        execute(f'CREATE TABLE articles_partitioned (LIKE articles {_LIKE}) PARTITION BY RANGE (published_at)')
+        first = execute('SELECT min(published_at) FROM articles').scalar()
+        now = now or datetime.now(timezone.utc)
+        created = []
+        start = period_start(first or now, interval)
+        stop = period_start(now, interval)
+        for _ in range(ahead):
+            stop = next_period(stop, interval)
+        while start <= stop:
+            end = next_period(start, interval)
+            name = partition_name(start, interval)
+            execute(f'CREATE TABLE {name} PARTITION OF articles_partitioned '
+                    f'FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})')
+            created.append(name)
+            start = end
+        execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF articles_partitioned DEFAULT')
+        created.append(DEFAULT_PARTITION)
+        execute('INSERT INTO articles_partitioned SELECT * FROM articles')
+
+        execute('CREATE TABLE article_keys AS SELECT id, slug, published_at FROM articles')
+        execute('ALTER TABLE article_keys ADD PRIMARY KEY (id), ADD CONSTRAINT article_keys_slug_key UNIQUE (slug)')
+
+        for table, name, _ in incoming:
+            execute(f'ALTER TABLE {table} DROP CONSTRAINT {name}')
+        execute('DROP TABLE articles')
+        execute('ALTER TABLE articles_partitioned RENAME TO articles')
+
+        for definition in indexes:
+            execute(definition)
+        execute('CREATE INDEX ix_articles_id ON articles (id)')
+        execute('CREATE INDEX ix_articles_slug ON articles (slug)')
+        for name, definition in outgoing:
+            execute(f'ALTER TABLE articles ADD CONSTRAINT {name} {definition}')
+        for definition in triggers:
+            execute(definition)
+        execute('CREATE TRIGGER trg_article_keys_articles_insert AFTER INSERT ON articles '
+                'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_keys_articles_insert()')
+        execute('CREATE TRIGGER trg_article_keys_articles_update AFTER UPDATE ON articles '
+                'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+                'FOR EACH STATEMENT EXECUTE FUNCTION article_keys_articles_update()')
+        execute('CREATE TRIGGER trg_articles_partitioned_delete AFTER DELETE ON articles '
+                'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION articles_partitioned_delete()')
+        for table, name, definition in incoming:
+            definition = re.sub(r'REFERENCES (\w+\.)?articles\(id\)', 'REFERENCES article_keys(id)', definition)
+            execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+
+        execute('ANALYZE articles')
+        execute('ANALYZE article_keys')
+        _partitioned.pop(str(self.session.get_bind().url), None)
+        return created
+
+    def ensure(self, ahead: int = 3, now: datetime = None) -> List[str]:
+        """Create the partitions for the next `ahead` periods, and for any
+        dated rows sitting in the default partition (moved into them).
+        Returns the partitions created."""
+        interval = self.interval()
+        if interval is None:
+            raise RuntimeError('articles is not partitioned')
+        existing = {p['name'] for p in self.partitions()}
+        starts = set()
+        start = period_start(now or datetime.now(timezone.utc), interval)
+        for _ in range(ahead + 1):
+            starts.add(start)
+            start = next_period(start, interval)
+        strays = self.session.execute(text(
+            f"SELECT DISTINCT date_trunc(:unit, published_at AT TIME ZONE 'UTC') "
+            f"FROM {DEFAULT_PARTITION} WHERE published_at IS NOT NULL"
+        ), {'unit': interval}).scalars().all()
+        starts.update(s.replace(tzinfo=timezone.utc) for s in strays)
+
+        created = []
+        for start in sorted(starts):
+            name = partition_name(start, interval)
+            if name in existing:
+                continue
+            end = next_period(start, interval)
+            self.session.execute(text(f'CREATE TABLE {name} (LIKE articles {_LIKE})'))
+            # statement triggers live on the parent, so moving rows between
+            # partitions directly leaves counters and article_keys alone
+            self.session.execute(text(
+                f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '
+                f'WHERE published_at >= :start AND published_at < :end RETURNING *) '
+                f'INSERT INTO {name} SELECT * FROM moved'
+            ), {'start': start, 'end': end})
+            self.session.execute(text(
+                f'ALTER TABLE articles ATTACH PARTITION {name} FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})'
+            ))
+            created.append(name)
+        return created
+
+    def archive(self, before: datetime, tablespace: str) -> List[str]:
+        """Move partitions ending on or before `before`, with their indexes, to
+        `tablespace` (e.g. one on cheaper disks). Returns the partitions moved."""
+        if not re.match(r'^\w+$', tablespace):
+            raise ValueError('invalid tablespace name')
+        moved = []
+        for p in self.partitions():
+            bounds = partition_range(p['name'])
+            if bounds is None or bounds[1] > before or p['tablespace'] == tablespace:
+                continue
+            self.session.execute(text(f'ALTER TABLE {p["name"]} SET TABLESPACE {tablespace}'))
+            for index in self.session.execute(text(
+                    'SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(:name)'
+            ), {'name': p['name']}).scalars().all():
+                self.session.execute(text(f'ALTER INDEX {index} SET TABLESPACE {tablespace}'))
+            moved.append(p['name'])
+        return moved
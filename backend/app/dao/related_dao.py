@@ -0,0 +1,142 @@
+from typing import List, Sequence
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.models.article_related import ArticleRelated
+from app.dao.partition_dao import is_partitioned, key_filter
+
+# Rebuilds the neighbour lists of :ids in one statement.
+#
+# Candidates are articles sharing at least one tag, scored by the sum of the
+# shared tags' IDF weights; tags used by more than :max_df articles are too
+# generic to generate candidates (this bounds the work per article no matter
+# how large the archive grows). The best :prefilter candidates then get a
+# boost per shared category, and the score decays with the distance in
+# publication time so recent coverage of a story ranks first.
+_REBUILD_SQL = """
+WITH src AS (
+    SELECT id, published_at FROM articles
+    WHERE id = ANY(:ids) AND status = 'published'
+),
+weights AS (
+    SELECT tag_id, ln(greatest(:n, count(*))::float / count(*)) + 1 AS weight
+    FROM article_tag
+    WHERE tag_id IN (SELECT t.tag_id FROM article_tag t JOIN src ON src.id = t.article_id)
+    GROUP BY tag_id
+    HAVING count(*) <= :max_df
+),
+candidates AS (
+    SELECT s.id AS article_id, o.id AS related_id,
+           sum(w.weight)
+             / (1 + abs(extract(epoch FROM coalesce(o.published_at - s.published_at, interval '0')))
+                    / (86400.0 * :recency_days)) AS score
+    FROM src s
+    JOIN article_tag t1 ON t1.article_id = s.id
+    JOIN weights w ON w.tag_id = t1.tag_id
+    JOIN article_tag t2 ON t2.tag_id = t1.tag_id AND t2.article_id <> s.id
+    JOIN articles o ON o.id = t2.article_id AND o.status = 'published'
+    GROUP BY s.id, o.id, s.published_at, o.published_at
+),
+shortlist AS (
+    SELECT * FROM (
+        SELECT c.*, row_number() OVER (PARTITION BY article_id ORDER BY score DESC, related_id) AS pre_rank
+        FROM candidates c
+    ) x
+    WHERE pre_rank <= :prefilter
+),
+scored AS (
+    SELECT s.article_id, s.related_id,
+           s.score * (1 + :category_weight * (
+               SELECT count(*) FROM article_category a1
+               JOIN article_category a2 ON a2.category_id = a1.category_id
+               WHERE a1.article_id = s.article_id AND a2.article_id = s.related_id
+           )) AS score
+    FROM shortlist s
+),
+ranked AS (
+    SELECT article_id, related_id, score,
+           row_number() OVER (PARTITION BY article_id ORDER BY score DESC, related_id) AS rank
+    FROM scored
+)
+INSERT INTO article_related (article_id, rank, related_id, score)
+SELECT article_id, rank, related_id, score FROM ranked WHERE rank <= :k
+"""
+
+_IDS = bindparam('ids', type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+class RelatedDAO:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def related(self, article_id: UUID, limit: int = 10) -> List[Article]:
+        """Published neighbours of an article, best first."""
+        if is_partitioned(self.session):
+            # read the list first so the articles are fetched from their partitions only
+            ids = self.session.execute(text(
+                'SELECT related_id FROM article_related WHERE article_id = :id ORDER BY rank'
+            ).bindparams(bindparam('id', type_=PG_UUID(as_uuid=True))), {'id': article_id}).scalars().all()
+            criterion = key_filter(self.session, ids)
+            if criterion is None:
+                return []
+            found = {a.id: a for a in self.session.query(Article).filter(
+                Article.id.in_(ids), Article.status == 'published', criterion)}
+            return [found[i] for i in ids if i in found][:limit]
+        return (
+            self.session.query(Article)
+            .join(ArticleRelated, ArticleRelated.related_id == Article.id)
+            .filter(ArticleRelated.article_id == article_id, Article.status == 'published')
+            .order_by(ArticleRelated.rank)
+            .limit(limit)
+            .all()
+        )
+
+    def related_ids(self, article_ids: Sequence[UUID]) -> List[UUID]:
+        """Distinct neighbours listed by any of `article_ids`."""
+        rows = self.session.execute(
+            text('SELECT DISTINCT related_id FROM article_related WHERE article_id = ANY(:ids)').bindparams(_IDS),
+            {'ids': list(article_ids)},
+        )
+        return [r[0] for r in rows]
+
+    def referencing_ids(self, article_ids: Sequence[UUID]) -> List[UUID]:
+        """Articles whose neighbour list contains any of `article_ids`."""
+        rows = self.session.execute(
+            text('SELECT DISTINCT article_id FROM article_related WHERE related_id = ANY(:ids)').bindparams(_IDS),
+            {'ids': list(article_ids)},
+        )
+        return [r[0] for r in rows]
+
+    def rebuild(self, ids: Sequence[UUID], n: int, k: int, max_df: int, prefilter: int,
+                category_weight: float, recency_days: float) -> int:
+        """Replace the neighbour lists of `ids`; returns rows written."""
+        ids = list(ids)
+        self.session.execute(text('DELETE FROM article_related WHERE article_id = ANY(:ids)').bindparams(_IDS),
+                             {'ids': ids})
+        result = self.session.execute(text(_REBUILD_SQL).bindparams(_IDS), {
+            'ids': ids, 'n': n, 'k': k, 'max_df': max_df, 'prefilter': prefilter,
+            'category_weight': category_weight, 'recency_days': recency_days,
+        })
+        return result.rowcount
+
+    def remove_from_lists(self, article_ids: Sequence[UUID]) -> None:
+        """Drop the articles' own lists and every mention of them."""
+        self.session.execute(
+            text('DELETE FROM article_related WHERE article_id = ANY(:ids) OR related_id = ANY(:ids)').bindparams(_IDS),
+            {'ids': list(article_ids)},
+        )
+
+    def published_id_batches(self, batch_size: int):
+        """Yield lists of published article ids in id order (keyset pagination)."""
+        last_id = None
+        while True:
+            query = self.session.query(Article.id).filter(Article.status == 'published')
+            if last_id is not None:
+                query = query.filter(Article.id > last_id)
+            ids = [r[0] for r in query.order_by(Article.id).limit(batch_size)]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
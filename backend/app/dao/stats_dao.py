@@ -0,0 +1,26 @@
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class StatsDAO:
+    """Reads and reconciles the trigger-maintained stat_counters table."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def counters(self, prefix: str = None) -> Dict[str, int]:
+        query = 'SELECT name, value FROM stat_counters'
+        params = {}
+        if prefix:
+            query += ' WHERE name LIKE :prefix'
+            params['prefix'] = prefix.replace('%', '\\%').replace('_', '\\_') + '%'
+        return {name: int(value) for name, value in self.session.execute(text(query), params)}
+
+    def reconcile(self) -> List[Dict]:
+        """Recompute all counters; returns the ones that had drifted."""
+        rows = self.session.execute(text('SELECT counter_name, stored_value, actual_value FROM reconcile_stat_counters()'))
+        return [
+            {'name': name, 'stored': None if stored is None else int(stored), 'actual': int(actual)}
+            for name, stored, actual in rows
+        ]
@@ -1,5 +1,8 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
+from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
+from app.models import article_tag
+from app.models.article import Article
 from app.models.tag import Tag
 from uuid import UUID
 
@@ -14,8 +17,18 @@ class TagDAO:
     def get_by_slug(self, slug: str) -> Optional[Tag]:
         return self.session.query(Tag).filter(Tag.slug == slug).first()
 
-    def list(self, limit: int = 100, offset: int = 0) -> List[Tag]:
-        return self.session.query(Tag).order_by(Tag.name).limit(limit).offset(offset).all()
+    def list(self, limit: int = 100, offset: int = 0, prefix: str = None, popular: bool = False) -> List[Tag]:
+        """Tags by name, or by article_count (most used first) when popular.
+
+        `prefix` matches the start of the name, case-insensitively
+        (ix_tags_lower_name).
+        """
+        query = self.session.query(Tag)
+        if prefix:
+            escaped = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(func.lower(Tag.name).like(escaped + '%', escape='\\'))
+        order = (Tag.article_count.desc(), Tag.name) if popular else (Tag.name,)
+        return query.order_by(*order, Tag.id).limit(limit).offset(offset).all()
 
     def create(self, tag: Tag) -> Tag:
         self.session.add(tag)
@@ -30,3 +43,19 @@ class TagDAO:
     def delete(self, tag: Tag) -> None:
         self.session.delete(tag)
         self.session.flush()
+
+    def published_article_ids(self, tag_id: UUID) -> List[UUID]:
+        """Published articles carrying the tag."""
+        rows = self.session.execute(
+            select(Article.id)
+            .join(article_tag, article_tag.c.article_id == Article.id)
+            .where(article_tag.c.tag_id == tag_id, Article.status == 'published')
+        )
+        return [r[0] for r in rows]
+
+    def reconcile_counts(self) -> List[Dict]:
+        """Recompute tags.article_count; returns the tags that had drifted."""
+        rows = self.session.execute(text(
+            'SELECT counted_tag_id, stored_value, actual_value FROM reconcile_tag_counts()'
+        ))
+        return [{'id': str(tag_id), 'stored': stored, 'actual': actual} for tag_id, stored, actual in rows]
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import List, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.dao.partition_dao import key_filter
+
+# One statement per flush: resolve slugs, upsert hourly buckets and totals.
+# Rows are inserted in key order so concurrent flushes from several workers
+# take row locks in the same order and cannot deadlock.
+_FLUSH_SQL = """
+WITH batch AS (
+    SELECT a.id AS article_id, u.bucket, sum(u.views) AS views
+    FROM unnest(CAST(:slugs AS text[]), CAST(:buckets AS timestamptz[]), CAST(:counts AS bigint[]))
+         AS u(slug, bucket, views)
+    JOIN articles a ON a.slug = u.slug AND a.status = 'published'
+    GROUP BY a.id, u.bucket
+),
+buckets AS (
+    INSERT INTO article_view_buckets (article_id, bucket, views)
+    SELECT article_id, bucket, views FROM batch ORDER BY article_id, bucket
+    ON CONFLICT (article_id, bucket) DO UPDATE SET views = article_view_buckets.views + EXCLUDED.views
+)
+INSERT INTO article_view_totals (article_id, views)
+SELECT article_id, sum(views) FROM batch GROUP BY article_id ORDER BY article_id
+ON CONFLICT (article_id) DO UPDATE SET views = article_view_totals.views + EXCLUDED.views
+"""
+
+_TRENDING_SQL = """
+SELECT article_id,
+       sum(views * exp(-ln(2) * extract(epoch FROM (:now - bucket)) / 3600.0 / :half_life)) AS score
+FROM article_view_buckets
+WHERE bucket >= :since
+GROUP BY article_id
+ORDER BY score DESC, article_id
+LIMIT :limit
+"""
+
+_MOST_READ_SQL = """
+SELECT article_id, sum(views) AS score
+FROM article_view_buckets
+WHERE bucket >= :since
+GROUP BY article_id
+ORDER BY score DESC, article_id
+LIMIT :limit
+"""
+
+
+class ViewDAO:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def flush(self, rows: Sequence[Tuple[str, datetime, int]]) -> None:
+        """Add (slug, bucket, views) counts; unknown or unpublished slugs are ignored."""
+        if not rows:
+            return
+        slugs, buckets, counts = (list(col) for col in zip(*rows))
+        self.session.execute(text(_FLUSH_SQL), {'slugs': slugs, 'buckets': buckets, 'counts': counts})
+
+    def top(self, since: datetime, now: datetime, limit: int, half_life_hours: float = None) -> List[Tuple[UUID, float]]:
+        """Best articles since `since`: time-decayed if half_life_hours, else plain view sums."""
+        if half_life_hours:
+            rows = self.session.execute(text(_TRENDING_SQL), {
+                'since': since, 'now': now, 'limit': limit, 'half_life': half_life_hours,
+            })
+        else:
+            rows = self.session.execute(text(_MOST_READ_SQL), {'since': since, 'limit': limit})
+        return [(article_id, float(score)) for article_id, score in rows]
+
+    def articles(self, ids: Sequence[UUID]) -> List[Article]:
+        """Published articles for `ids`, in the given order."""
+        if not ids:
+            return []
+        query = self.session.query(Article).filter(Article.id.in_(ids), Article.status == 'published')
+        criterion = key_filter(self.session, ids)
+        found = {a.id: a for a in (query.filter(criterion) if criterion is not None else query)}
+        return [found[i] for i in ids if i in found]
+
+    def prune(self, before: datetime) -> int:
+        result = self.session.execute(text('DELETE FROM article_view_buckets WHERE bucket < :before'),
+                                      {'before': before})
+        return result.rowcount
@@ -0,0 +1,126 @@
+"""Per-request query deadlines.
+
+Every view belongs to a budget class (QUERY_BUDGETS="read=2000,list=3000,
+write=5000,admin=15000,bulk=120000", milliseconds):
+
+  list    views marked @rate_limit('list') (paged listings and searches)
+  admin   views behind @requires_role('admin')
+  bulk    views marked @query_budget('bulk') (bulk edits, reconciles)
+  write   any other non-GET request
+  read    any other GET
+
+A view can name its class with @query_budget(name). The budget is a
+deadline for the whole request: each transaction a request's sessions
+begin on PostgreSQL runs `SET LOCAL statement_timeout` to whatever is left
+of it, so one pathological filter or ILIKE cannot hold a pooled connection
+for minutes. A statement cancelled by the timeout (SQLSTATE 57014) answers
+504, any other operational database error 503 + Retry-After; both are
+counted in `stats` and logged with the endpoint.
+
+Work that runs after the write has committed (signal receivers: related
+lists, cache NOTIFY, prerendering) is outside the deadline (`suspended`):
+cancelling it would leave derived state stale while the write succeeded.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from flask import Flask, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_BUDGETS = 'read=2000,list=3000,write=5000,admin=15000,bulk=120000'
+# never start a transaction with less than this, so the request can still fail cleanly
+MIN_STATEMENT_TIMEOUT_MS = 50
+QUERY_CANCELED = '57014'
+RETRY_AFTER_BUSY = 2
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'read=2000,bulk=120000' -> {'read': 2000, 'bulk': 120000}"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, ms = item.split('=')
+        budgets[name.strip()] = int(ms)
+    return budgets
+
+
+QUERY_BUDGETS = parse_budgets(os.getenv('QUERY_BUDGETS', DEFAULT_QUERY_BUDGETS))
+# cancelled / failed requests since the worker started
+stats = {'query_timeout': 0, 'db_unavailable': 0, 'by_endpoint': {}}
+
+
+def _budget_class(app: Flask) -> str:
+    view = app.view_functions.get(request.endpoint)
+    for attr in ('query_budget', 'rate_limit_class'):
+        name = getattr(view, attr, None)
+        if name in QUERY_BUDGETS:
+            return name
+    return 'read' if request.method in ('GET', 'HEAD') else 'write'
+
+
+def remaining_ms() -> Optional[int]:
+    """Milliseconds left of the current request's budget, or None outside one."""
+    if not has_request_context() or 'query_deadline' not in g:
+        return None
+    return int((g.query_deadline - time.monotonic()) * 1000)
+
+
+@contextmanager
+def suspended():
+    """Run the enclosed work without the request's deadline."""
+    deadline = g.pop('query_deadline', None) if has_request_context() else None
+    try:
+        yield
+    finally:
+        if deadline is not None:
+            g.query_deadline = deadline
+
+
+def before_request():
+    g.query_budget = _budget_class(current_app)
+    g.query_deadline = time.monotonic() + QUERY_BUDGETS[g.query_budget] / 1000
+
+
+def _apply_statement_timeout(session, transaction, connection):
+    if connection.dialect.name != 'postgresql':
+        return
+    left = remaining_ms()
+    if left is not None:
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {max(MIN_STATEMENT_TIMEOUT_MS, left)}')
+
+
+def _record(reason: str, exc) -> None:
+    stats[reason] += 1
+    endpoint = request.endpoint or '-'
+    counts = stats['by_endpoint'].setdefault(endpoint, {})
+    counts[reason] = counts.get(reason, 0) + 1
+    logger.warning('%s: %s %s (%s budget %d ms): %s', reason, request.method, request.path,
+                   g.get('query_budget', '-'), QUERY_BUDGETS.get(g.get('query_budget'), 0),
+                   str(getattr(exc, 'orig', exc)).strip().splitlines()[0])
+
+
+def operational_error(exc):
+    """A statement ran past the request's deadline (504) or the database failed (503)."""
+    if getattr(getattr(exc, 'orig', None), 'pgcode', None) == QUERY_CANCELED:
+        _record('query_timeout', exc)
+        response = jsonify({'error': 'query took too long'})
+        response.status_code = 504
+        return response
+    _record('db_unavailable', exc)
+    response = jsonify({'error': 'database unavailable, retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(RETRY_AFTER_BUSY)
+    return response
+
+
+def init_app(app: Flask) -> None:
+    from sqlalchemy.exc import OperationalError
+    if not event.contains(Session, 'after_begin', _apply_statement_timeout):
+        event.listen(Session, 'after_begin', _apply_statement_timeout)
+    app.before_request(before_request)
+    app.register_error_handler(OperationalError, operational_error)
@@ -0,0 +1,254 @@
+"""Resized image variants, rendered on first request and kept in a bounded disk cache.
+
+    /static/img/<w>x<h>/<key>?s=<signature>
+
+`key` is a media storage key (app/storage.py), `<w>x<h>` one of IMAGE_SIZES
+(`h` = 0 keeps the aspect ratio, otherwise the image is center-cropped to
+fill the box) and `s` an HMAC of both, so only URLs the API handed out are
+rendered. Payloads carry the signed URLs (see variants()), which keeps
+arbitrary sizes from filling the cache or the CPU.
+
+The first request for a variant decodes the original with Pillow (JPEGs in
+draft mode, which lets libjpeg decode directly at 1/2, 1/4 or 1/8 scale),
+writes it under IMAGE_CACHE_DIR and every later hit is a plain file send.
+Concurrent first requests, in this worker or any other on the node, are
+coalesced on an flock per variant: one renders, the rest wait and serve
+its file. The cache holds at most IMAGE_CACHE_MAX_BYTES; the least
+recently used variants (mtime, refreshed on hits at most hourly) go first;
+a render starts that pass on a background thread at most every GC_INTERVAL.
+"""
+import hashlib
+import hmac
+import io
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.storage import BACKEND_DIR, get_storage
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; concurrent renders are then not coalesced
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZES = tuple(os.getenv('IMAGE_SIZES', '160x160,320x180,640x360,1280x720,1920x0').split(','))
+IMAGE_URL_SECRET = (os.getenv('IMAGE_URL_SECRET') or os.getenv('SECRET_KEY') or 'dev-secret').encode('utf-8')
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', None) or os.path.join(BACKEND_DIR, 'static', 'img-cache')
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(1024 ** 3)))
+IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', '82'))
+URL_PREFIX = '/static/img/'
+GC_INTERVAL = 60
+TOUCH_INTERVAL = 3600
+
+# output format by source extension; everything else becomes JPEG
+_FORMATS = {'.png': 'PNG', '.gif': 'PNG', '.webp': 'WEBP'}
+MIMETYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+
+class ImageTooLarge(Exception):
+    """The original has more pixels than Pillow will decode (Image.MAX_IMAGE_PIXELS)."""
+
+
+def parse_size(size: str) -> Optional[Tuple[int, int]]:
+    if size not in IMAGE_SIZES:
+        return None
+    width, height = size.split('x')
+    return int(width), int(height)
+
+
+def sign(size: str, key: str) -> str:
+    return hmac.new(IMAGE_URL_SECRET, f'{size}/{key}'.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+
+def verify(size: str, key: str, signature: str) -> bool:
+    return hmac.compare_digest(sign(size, key), signature or '')
+
+
+def variant_url(url: str, size: str) -> Optional[str]:
+    """Signed URL of `url` resized to `size`, or None if it is not in our storage."""
+    key = get_storage().key_for_url(url) if url else None
+    if not key:
+        return None
+    return f'{URL_PREFIX}{size}/{key}?s={sign(size, key)}'
+
+
+def variants(url: str) -> Optional[Dict[str, str]]:
+    """Signed URLs for every allowed size, keyed by size (None for foreign URLs)."""
+    if not url or not get_storage().key_for_url(url):
+        return None
+    return {size: variant_url(url, size) for size in IMAGE_SIZES}
+
+
+def output_format(key: str) -> str:
+    return _FORMATS.get(os.path.splitext(key)[1].lower(), 'JPEG')
+
+
+def render(source, size: Tuple[int, int], fmt: str) -> bytes:
+    """Resize an image file object to `size` and encode it as `fmt`.
+
+    Raises ImageTooLarge for decompression bombs.
+    """
+    from PIL import Image, ImageOps
+
+    width, height = size
+    try:
+        img = Image.open(source)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e)) from e
+    with img:
+        src_w, src_h = img.size
+        if img.format == 'JPEG':
+            # let the decoder skip detail we would throw away anyway
+            img.draft('RGB', (width, height or max(1, src_h * width // src_w)))
+        img = ImageOps.exif_transpose(img)
+        if height:
+            img = ImageOps.fit(img, (width, height), Image.LANCZOS)
+        else:
+            img.thumbnail((width, 10 ** 6), Image.LANCZOS)
+        if fmt == 'JPEG' and img.mode != 'RGB':
+            img = img.convert('RGB')
+        elif fmt != 'JPEG' and img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGBA')
+        out = io.BytesIO()
+        options = {'quality': IMAGE_QUALITY, 'optimize': True}
+        if fmt == 'JPEG':
+            options['progressive'] = True
+        img.save(out, fmt, **options)
+        return out.getvalue()
+
+
+class VariantCache:
+    def __init__(self, root: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._last_gc = 0.0
+        self._gc_lock = threading.Lock()
+
+    def path(self, size: str, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, size, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep) or '..' in key.split('/'):
+            raise ValueError(f'invalid key {key!r}')
+        return path
+
+    def get(self, size: str, key: str) -> str:
+        """Path of the cached variant, rendering it first if needed.
+
+        Raises FileNotFoundError when the original does not exist and
+        ImageTooLarge when it is a decompression bomb.
+        """
+        path = self.path(size, key)
+        if self._hit(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.lock', 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self._hit(path):
+                    return path
+                storage = get_storage()
+                if not storage.exists(key):
+                    raise FileNotFoundError(key)
+                with storage.open(key) as source:
+                    if not getattr(source, 'seekable', lambda: False)():
+                        source = io.BytesIO(source.read())
+                    data = render(source, parse_size(size), output_format(key))
+                tmp = f'{path}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            finally:
+                _unlink_lock(lock)
+        if time.time() - self._last_gc > GC_INTERVAL:
+            self._gc_in_background()
+        return path
+
+    def _gc_in_background(self) -> None:
+        # walking the whole cache is too slow for a request thread; one pass at a time
+        if not self._gc_lock.acquire(blocking=False):
+            return
+        self._last_gc = time.time()
+        threading.Thread(target=self._gc_thread, name='image-cache-gc', daemon=True).start()
+
+    def _gc_thread(self) -> None:
+        try:
+            self.gc()
+        except Exception:
+            logger.exception('image cache gc failed')
+        finally:
+            self._gc_lock.release()
+
+    def _hit(self, path: str) -> bool:
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+        # mtime is the LRU clock; refreshing it on every hit would be a write per request
+        if time.time() - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def purge(self, key: str) -> None:
+        """Drop every variant of `key` (the original was deleted or replaced)."""
+        for size in IMAGE_SIZES:
+            try:
+                os.unlink(self.path(size, key))
+            except FileNotFoundError:
+                pass
+
+    def gc(self) -> int:
+        """Remove least recently used variants until the cache fits; returns files removed."""
+        self._last_gc = time.time()
+        entries = []
+        total = 0
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith('.tmp') or name.endswith('.lock'):
+                    if st.st_mtime < time.time() - 600:
+                        _unlink(path)
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        if total > self.max_bytes:
+            entries.sort()
+            # trim to 90% so the next few renders do not trigger another pass
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                removed += _unlink(path)
+                total -= size
+        return removed
+
+
+def _unlink(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+def _unlink_lock(lock) -> None:
+    # a waiter that got the lock after its file was unlinked must not remove a newer lock file
+    try:
+        if os.stat(lock.name).st_ino == os.fstat(lock.fileno()).st_ino:
+            os.unlink(lock.name)
+    except FileNotFoundError:
+        pass
+
+
+cache = VariantCache()
@@ -0,0 +1,339 @@
+"""Load generator: replay gunicorn access logs, or a weighted mix of the
+public endpoints, against a running backend.
+
+    # replay production traffic at its recorded pace (or --speedup 4, or a fixed --rate)
+    docker compose logs backend --no-log-prefix > access.log
+    python -m app.loadtest --target http://localhost:8000 --log access.log --concurrency 32
+
+    # the reader mix (homepage lists, article pages, related, view beacons...)
+    python -m app.loadtest --target http://localhost:8000 --mix --requests 20000 --rate 300 --seed 1
+
+    # compare two setups on the same workload
+    python -m app.loadtest ... --json gthread.json
+    python -m app.loadtest ... --baseline gthread.json
+
+Log lines are gunicorn's default access format (`"GET /path HTTP/1.1" 200 ...`
+after a `[time]` field); anything else in the file is skipped. Only GET and
+HEAD are replayed unless --methods says otherwise: POST adds the view
+beacons, other writes would need an admin token.
+
+With --rate or a log's timestamps, requests are sent on a fixed schedule
+(open loop) and latency is measured from when a request was *due*. When the
+server falls behind, the waiting time therefore shows in the percentiles
+instead of silently lowering the offered load. Without either, every worker
+sends its next request as soon as the previous one returns (closed loop).
+
+The report gives throughput, latency percentiles per route (the Flask URL
+rule the path matches), error rates (connection failures, 5xx and 4xx other
+than 429), the share of requests rejected by rate limits (429) and the share
+of shared-cache hits (X-Cache). From one client address most of a fast run
+would be quick 429s, so run against a backend with RATE_LIMIT_FILE unset.
+"""
+import argparse
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote, urlsplit
+
+# gunicorn access_log_format default: %(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
+LOG_RE = re.compile(r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+LOG_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+# (weight, method, path) of the reader mix; placeholders are filled with
+# slugs discovered on the target, recent articles more often than old ones
+DEFAULT_MIX = (
+    (20, 'GET', '/api/articles/?limit=50&offset=0&status=published'),
+    (8, 'GET', '/api/articles/?limit=5&offset=0&is_highlight=1&status=published'),
+    (6, 'GET', '/api/articles/trending?sort=most_read&hours=24&limit=5'),
+    (25, 'GET', '/api/articles/{article}'),
+    (10, 'GET', '/api/articles/{article}/related?limit=6'),
+    (15, 'POST', '/api/articles/{article}/view'),
+    (8, 'GET', '/api/articles/?limit=20&offset={offset}&category={category}&status=published'),
+    (3, 'GET', '/api/articles/?limit=20&offset=0&tag={tag}&status=published'),
+    (2, 'GET', '/api/categories/'),
+    (1, 'GET', '/api/articles/archive'),
+    (2, 'GET', '/api/tags/?order=popular&limit=20'),
+)
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    at: float = 0.0  # seconds after the first request of the log
+
+
+@dataclass
+class Result:
+    route: str
+    status: int  # 0: connection failed or timed out
+    seconds: float
+    cache_hit: bool = False
+
+
+def parse_access_log(lines: Iterable[str], methods: Sequence[str] = ('GET', 'HEAD'),
+                     prefix: str = '/api/') -> List[Request]:
+    """Requests of a gunicorn access log, with their offsets from the first one."""
+    requests = []
+    first = None
+    for line in lines:
+        m = LOG_RE.search(line)
+        if not m or m['method'] not in methods or not m['path'].startswith(prefix):
+            continue
+        try:
+            ts = datetime.strptime(m['time'], LOG_TIME_FORMAT).timestamp()
+        except ValueError:
+            continue
+        first = ts if first is None else first
+        requests.append(Request(m['method'], m['path'], ts - first))
+    return requests
+
+
+def discover(target: str, timeout: float = 10.0) -> Dict[str, List[str]]:
+    """Slugs to fill DEFAULT_MIX with, newest articles first."""
+    def get(path):
+        conn = _connect(target, timeout)
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return json.loads(response.read()) if response.status == 200 else []
+        finally:
+            conn.close()
+
+    return {
+        'article': [a['slug'] for a in get('/api/articles/?limit=200&offset=0&status=published')],
+        'category': [c['slug'] for c in get('/api/categories/')],
+        'tag': [t['slug'] for t in get('/api/tags/?order=popular&limit=100')],
+    }
+
+
+def synthetic_mix(slugs: Dict[str, List[str]], count: int, seed: int = None,
+                  mix=DEFAULT_MIX) -> List[Request]:
+    """`count` requests drawn from `mix`; entries needing a slug the target
+    doesn't have are left out."""
+    rng = random.Random(seed)
+    usable = [(w, method, path) for w, method, path in mix
+              if all(slugs.get(name) for name in re.findall(r'\{(\w+)\}', path) if name != 'offset')]
+    if not usable:
+        return []
+    weights = [w for w, _, _ in usable]
+    requests = []
+    for _ in range(count):
+        _, method, path = rng.choices(usable, weights)[0]
+        values = {name: quote(items[int(len(items) * rng.random() ** 3)])  # skewed to the first (newest)
+                  for name, items in slugs.items() if items}
+        requests.append(Request(method, path.format(offset=rng.choice((0, 0, 0, 20, 40)), **values)))
+    return requests
+
+
+def route_namer() -> Callable[[str, str], str]:
+    """Name requests by the URL rule they match in the app, e.g.
+    'GET /api/articles/<string:slug>'; unmatched paths keep their path."""
+    from app.app import create_app
+    adapter = create_app().url_map.bind('localhost')
+
+    def name(method: str, path: str) -> str:
+        path = urlsplit(path).path
+        try:
+            rule, _ = adapter.match(path, method=method, return_rule=True)
+            return f'{method} {rule.rule}'
+        except Exception:
+            return f'{method} {path}'
+
+    return name
+
+
+def _connect(target: str, timeout: float) -> http.client.HTTPConnection:
+    url = urlsplit(target)
+    cls = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    return cls(url.netloc, timeout=timeout)
+
+
+def run(target: str, requests: Sequence[Request], concurrency: int = 8, rate: float = None,
+        speedup: float = None, duration: float = None, timeout: float = 10.0,
+        route_of: Callable[[str, str], str] = None) -> Dict:
+    """Send `requests` and return the summary (see summarize()).
+
+    Paced by `rate` (requests/s) or by the log offsets divided by `speedup`;
+    closed loop when neither is given. Stops early after `duration` seconds.
+    """
+    route_of = route_of or (lambda method, path: f'{method} {urlsplit(path).path}')
+    results: List[Result] = []
+    lock = threading.Lock()
+    position = iter(range(len(requests)))
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def due(i: int) -> Optional[float]:
+        if rate:
+            return started + i / rate
+        if speedup:
+            return started + requests[i].at / speedup
+        return None
+
+    def worker():
+        conn = None
+        local = []
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                break
+            at = due(i)
+            if deadline and (at or time.perf_counter()) >= deadline:
+                break
+            if at is not None:
+                time.sleep(max(0.0, at - time.perf_counter()))
+            sent = at if at is not None else time.perf_counter()
+            request = requests[i]
+            status, hit = 0, False
+            try:
+                conn = conn or _connect(target, timeout)
+                conn.request(request.method, request.path, headers={'Connection': 'keep-alive'})
+                response = conn.getresponse()
+                response.read()
+                status, hit = response.status, response.getheader('X-Cache') == 'HIT'
+                if response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                if conn is not None:
+                    conn.close()
+                conn = None
+            local.append(Result(route_of(request.method, request.path), status,
+                                time.perf_counter() - sent, hit))
+        if conn is not None:
+            conn.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(results, time.perf_counter() - started)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+def _stats(results: Sequence[Result]) -> Dict:
+    latencies = sorted(r.seconds * 1000 for r in results)
+    rejected = sum(1 for r in results if r.status == 429)
+    errors = sum(1 for r in results if r.status == 0 or (r.status >= 400 and r.status != 429))
+    stats = {'requests': len(results), 'errors': errors,
+             'error_rate': round(errors / len(results), 4) if results else 0.0,
+             'rejected': rejected,
+             'rejected_rate': round(rejected / len(results), 4) if results else 0.0,
+             'cache_hit_rate': round(sum(r.cache_hit for r in results) / len(results), 4) if results else 0.0,
+             'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+             'max_ms': round(latencies[-1], 2) if latencies else 0.0}
+    for q in PERCENTILES:
+        stats[f'p{q}_ms'] = round(percentile(latencies, q), 2)
+    return stats
+
+
+def summarize(results: Sequence[Result], seconds: float) -> Dict:
+    by_route: Dict[str, List[Result]] = {}
+    for r in results:
+        by_route.setdefault(r.route, []).append(r)
+    summary = _stats(results)
+    summary.update(
+        seconds=round(seconds, 3),
+        throughput=round(len(results) / seconds, 2) if seconds else 0.0,
+        statuses={str(status): n for status, n in sorted(Counter(r.status for r in results).items())},
+        routes={route: _stats(rs) for route, rs in sorted(by_route.items(), key=lambda kv: -len(kv[1]))},
+    )
+    return summary
+
+
+def format_report(summary: Dict, baseline: Dict = None) -> str:
+    def delta(row, base, key):
+        if not base or not base.get(key):
+            return ''
+        return f' ({(row[key] - base[key]) / base[key]:+.0%})'
+
+    lines = [
+        f"{summary['requests']} requests in {summary['seconds']}s: {summary['throughput']} req/s"
+        f"{delta(summary, baseline, 'throughput')}, errors {summary['error_rate']:.2%}, "
+        f"rate-limited {summary['rejected_rate']:.2%}, "
+        f"cache hits {summary['cache_hit_rate']:.0%}, statuses {summary['statuses']}",
+        f"{'route':<52} {'reqs':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>9} {'err':>7} {'429':>7} {'hit':>5}",
+    ]
+    rows = [('all', summary)] + list(summary['routes'].items())
+    base_routes = dict(baseline['routes'], all=baseline) if baseline else {}
+    for route, row in rows:
+        lines.append(
+            f"{route[:52]:<52} {row['requests']:>7} {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['max_ms']:>9.1f} {row['error_rate']:>7.2%} {row['rejected_rate']:>7.2%} "
+            f"{row['cache_hit_rate']:>5.0%}"
+            f"{delta(row, base_routes.get(route), 'p90_ms')}"
+        )
+    if summary['rejected']:
+        lines.append('429s: the target is rate limiting this client; unset RATE_LIMIT_FILE on it for load runs')
+    if baseline:
+        lines.append('(in parentheses: change against the baseline; p90 for routes)')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay access logs or a reader mix against a backend')
+    parser.add_argument('--target', default='http://localhost:8000', help='Base URL of the backend (or nginx)')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--log', help='gunicorn access log to replay')
+    source.add_argument('--mix', action='store_true', help='Generate the weighted reader mix (DEFAULT_MIX)')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='Requests to send (mix: default 5000; log: first N)')
+    parser.add_argument('--methods', default='GET,HEAD', help='Methods replayed from the log')
+    parser.add_argument('--prefix', default='/api/', help='Only replay log paths starting with this')
+    parser.add_argument('--concurrency', type=int, default=8, help='Parallel connections')
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument('--rate', type=float, help='Send at this many requests/s')
+    pace.add_argument('--speedup', type=float, help='Replay the log at its recorded pace times this')
+    pace.add_argument('--closed', action='store_true', help='Ignore log timestamps, send as fast as answered')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, help='Seed for --mix (same seed and slugs, same workload)')
+    parser.add_argument('--json', help='Write the summary here')
+    parser.add_argument('--baseline', help='Summary (--json) of an earlier run to compare with')
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, encoding='utf-8', errors='replace') as f:
+            requests = parse_access_log(f, methods=args.methods.upper().split(','), prefix=args.prefix)
+        requests = requests[:args.requests] if args.requests else requests
+        speedup = None if args.rate or args.closed else (args.speedup or 1.0)
+    else:
+        requests = synthetic_mix(discover(args.target, args.timeout), args.requests or 5000, seed=args.seed)
+        speedup = None
+    if not requests:
+        parser.error('no requests to send')
+
+    summary = run(args.target, requests, concurrency=args.concurrency, rate=args.rate, speedup=speedup,
+                  duration=args.duration, timeout=args.timeout, route_of=route_namer())
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(format_report(summary, baseline))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -12,6 +12,12 @@ class Article(Base):
 	title = Column(String(1024), nullable=False)
 	summary = Column(Text)
 	body_richtext = Column(Text)
+	# derived from body_richtext at write time (see app.services.article_body)
+	body_html = Column(Text)
+	body_text = Column(Text)
+	excerpt = Column(Text)
+	word_count = Column(Integer, default=0)
+	reading_time_minutes = Column(Integer, default=0)
 	slug = Column(String(1024), unique=True)
 	primary_category_id = Column(UUID(as_uuid=True), ForeignKey('categories.id'))
 	hero_image_url = Column(String(2048))
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, ForeignKey, Float, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from app.models.base import Base
+
+
+class ArticleRelated(Base):
+	"""Precomputed neighbour list entry (see related_service)."""
+	__tablename__ = 'article_related'
+
+	article_id = Column(UUID(as_uuid=True), ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+	rank = Column(SmallInteger, primary_key=True)
+	related_id = Column(UUID(as_uuid=True), ForeignKey('articles.id', ondelete='CASCADE'), nullable=False)
+	score = Column(Float, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -10,6 +10,8 @@ class Tag(Base):
 	id = Column(UUID(as_uuid=True), primary_key=True)
 	name = Column(String(255), nullable=False)
 	slug = Column(String(255), nullable=False, unique=True)
+	# published articles carrying the tag; maintained by triggers (migration 0008)
+	article_count = Column(Integer, nullable=False, default=0)
 
 	articles = relationship('Article', secondary='article_tag', back_populates='tags')
 
@@ -0,0 +1,228 @@
+"""Per-client rate limits and admission control.
+
+Rate limits are token buckets per (route class, client), kept in a small
+memory-mapped table in RATE_LIMIT_FILE (put it on tmpfs, e.g.
+/dev/shm/lankalive-ratelimit) so every gunicorn worker on the node draws
+from the same buckets. Empty RATE_LIMIT_FILE disables rate limiting.
+
+Route classes (RATE_LIMITS="login=10/60,write=120/60,list=300/60,read=1200/60",
+i.e. requests per seconds, which is also the burst):
+
+  login   POST /api/auth/login; bcrypt makes each attempt cost a worker ~0.25 s
+  list    paged listings and searches (views marked @rate_limit('list'))
+  write   any other non-GET request
+  read    any other GET
+
+Clients are the token subject for authenticated requests, otherwise the
+peer address. The address nginx reports in X-Real-IP
+(RATE_LIMIT_CLIENT_HEADER) replaces it only when the peer is one of
+RATE_LIMIT_TRUSTED_PROXIES (addresses or networks, default loopback), so a
+client reaching the backend directly cannot pick a new key per request.
+Over the limit a request gets 429 with Retry-After.
+
+The table has RATE_LIMIT_SLOTS slots in groups of four. A key hashes to a
+group, which is guarded by an fcntl byte-range lock (and a process lock, as
+record locks do not exclude threads of one process). A new key takes the
+group's least recently used slot; the client evicted from it starts over
+with a full bucket, so under extreme churn limits err on the lenient side.
+
+Admission control fails fast with 503 + Retry-After instead of letting
+queued work inflate everyone's latency:
+
+  - a request that already waited more than ADMISSION_MAX_QUEUE_MS for a
+    worker (nginx stamps X-Request-Start) is shed, since the client has
+    probably given up on it anyway;
+  - more than ADMISSION_MAX_INFLIGHT concurrent requests in one worker
+    process (threaded workers; 0 = unlimited);
+  - no pooled DB connection within DB_POOL_TIMEOUT (see app.config.db).
+"""
+import hashlib
+import ipaddress
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, current_app, g, jsonify, request
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; buckets are then only locked per process
+    fcntl = None
+
+RATE_LIMIT_FILE = os.getenv('RATE_LIMIT_FILE', '')
+RATE_LIMIT_SLOTS = int(os.getenv('RATE_LIMIT_SLOTS', '65536'))
+RATE_LIMIT_CLIENT_HEADER = os.getenv('RATE_LIMIT_CLIENT_HEADER', 'X-Real-IP')
+RATE_LIMIT_TRUSTED_PROXIES = [
+    ipaddress.ip_network(net.strip(), strict=False)
+    for net in os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '127.0.0.1,::1').split(',') if net.strip()
+]
+DEFAULT_RATE_LIMITS = 'login=10/60,write=120/60,list=300/60,read=1200/60'
+ADMISSION_MAX_QUEUE_MS = int(os.getenv('ADMISSION_MAX_QUEUE_MS', '5000'))
+ADMISSION_MAX_INFLIGHT = int(os.getenv('ADMISSION_MAX_INFLIGHT', '0'))
+RETRY_AFTER_BUSY = 2
+EXEMPT_ENDPOINTS = ('status_check', 'static')
+
+_SLOT = struct.Struct('<Qdd')  # key hash, tokens, last refill (epoch seconds)
+_GROUP = 4
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """'login=10/60,read=1200/60' -> {'login': (10, 60.0), 'read': (1200, 60.0)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, rate = item.split('=')
+        count, seconds = rate.split('/')
+        limits[name.strip()] = (int(count), float(seconds))
+    return limits
+
+
+RATE_LIMITS = parse_limits(os.getenv('RATE_LIMITS', DEFAULT_RATE_LIMITS))
+
+
+class TokenBuckets:
+    def __init__(self, path: str, slots: int = RATE_LIMIT_SLOTS):
+        self.groups = max(1, slots // _GROUP)
+        size = self.groups * _GROUP * _SLOT.size
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: int, per: float, now: float = None) -> Tuple[bool, float, int]:
+        """Take one token from `key`'s bucket: (allowed, retry_after seconds, tokens left)."""
+        now = time.time() if now is None else now
+        digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+        group = digest % self.groups
+        start = group * _GROUP * _SLOT.size
+        refill = rate / per
+        with self._lock:
+            if fcntl:
+                fcntl.lockf(self.fd, fcntl.LOCK_EX, _GROUP * _SLOT.size, start)
+            try:
+                slot, oldest = None, None
+                for i in range(_GROUP):
+                    offset = start + i * _SLOT.size
+                    owner, tokens, stamp = _SLOT.unpack_from(self.map, offset)
+                    if owner == digest:
+                        slot = offset
+                        break
+                    if oldest is None or stamp < oldest[1]:
+                        oldest = (offset, stamp)
+                if slot is None:
+                    slot, tokens, stamp = oldest[0], float(rate), now
+                tokens = min(float(rate), tokens + max(0.0, now - stamp) * refill)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                _SLOT.pack_into(self.map, slot, digest, tokens, now)
+            finally:
+                if fcntl:
+                    fcntl.lockf(self.fd, fcntl.LOCK_UN, _GROUP * _SLOT.size, start)
+        return allowed, 0.0 if allowed else (1 - tokens) / refill, int(tokens)
+
+
+buckets: Optional[TokenBuckets] = TokenBuckets(RATE_LIMIT_FILE) if RATE_LIMIT_FILE else None
+_inflight = 0
+_inflight_lock = threading.Lock()
+# rejections since the worker started, by reason
+stats = {'rate_limited': 0, 'queue_timeout': 0, 'overloaded': 0, 'db_pool_timeout': 0}
+
+
+def _client() -> str:
+    from app.controllers.decorators import get_current_user
+    user = get_current_user() if request.headers.get('Authorization') else None
+    if user and user.get('sub'):
+        return f"user:{user['sub']}"
+    peer = request.remote_addr
+    forwarded = request.headers.get(RATE_LIMIT_CLIENT_HEADER)
+    if forwarded and _trusted(peer):
+        return forwarded
+    return peer or '-'
+
+
+def _trusted(addr: Optional[str]) -> bool:
+    try:
+        ip = ipaddress.ip_address(addr or '')
+    except ValueError:
+        return False
+    return any(ip in net for net in RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def _route_class(app: Flask) -> Optional[str]:
+    if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    view = app.view_functions.get(request.endpoint)
+    name = getattr(view, 'rate_limit_class', None)
+    return name or ('read' if request.method in ('GET', 'HEAD') else 'write')
+
+
+def _reject(status: int, reason: str, retry_after: float, message: str):
+    stats[reason] += 1
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def _queue_ms() -> Optional[float]:
+    # nginx: proxy_set_header X-Request-Start "t=${msec}";
+    stamp = request.headers.get('X-Request-Start', '')
+    try:
+        return (time.time() - float(stamp[2:] if stamp.startswith('t=') else stamp)) * 1000
+    except ValueError:
+        return None
+
+
+def before_request():
+    global _inflight
+    g.admitted = False
+    queued = _queue_ms() if ADMISSION_MAX_QUEUE_MS else None
+    if queued is not None and queued > ADMISSION_MAX_QUEUE_MS:
+        return _reject(503, 'queue_timeout', RETRY_AFTER_BUSY, 'server busy, retry shortly')
+    if ADMISSION_MAX_INFLIGHT:
+        with _inflight_lock:
+            if _inflight >= ADMISSION_MAX_INFLIGHT:
+                return _reject(503, 'overloaded', RETRY_AFTER_BUSY, 'server busy, retry shortly')
+            _inflight += 1
+            g.admitted = True
+    if buckets is not None:
+        name = _route_class(current_app)
+        if name in RATE_LIMITS:
+            rate, per = RATE_LIMITS[name]
+            allowed, retry_after, remaining = buckets.take(f'{name}:{_client()}', rate, per)
+            g.rate_limit = (rate, remaining)
+            if not allowed:
+                return _reject(429, 'rate_limited', retry_after, 'too many requests')
+
+
+def after_request(response):
+    if getattr(g, 'rate_limit', None):
+        rate, remaining = g.rate_limit
+        response.headers['RateLimit-Limit'] = str(rate)
+        response.headers['RateLimit-Remaining'] = str(remaining)
+    return response
+
+
+def teardown_request(exc=None):
+    global _inflight
+    if g.get('admitted'):
+        with _inflight_lock:
+            _inflight -= 1
+
+
+def pool_timeout(exc):
+    """No DB connection became free within DB_POOL_TIMEOUT: shed the request."""
+    return _reject(503, 'db_pool_timeout', RETRY_AFTER_BUSY, 'database busy, retry shortly')
+
+
+def init_app(app: Flask) -> None:
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
+    app.register_error_handler(PoolTimeoutError, pool_timeout)
@@ -0,0 +1,73 @@
+"""Public JSON shapes shared by the controllers and the static prerenderer.
+
+Keeping them in one place guarantees a prerendered file is byte-for-byte the
+payload Flask would have returned for the same URL.
+"""
+from typing import Dict, Iterable, List
+
+from app.images import variants
+from app.services.article_body import process_body
+
+# first page of /api/categories/<slug> (the controller's default paging)
+CATEGORY_PAGE_SIZE = 20
+
+
+def category_ref(c) -> Dict:
+    return {'id': str(c.id), 'name': c.name, 'slug': c.slug}
+
+
+def article_categories(a) -> List[Dict]:
+    """Linked categories, with the primary category first if not linked."""
+    categories = [category_ref(c) for c in (a.categories or [])]
+    if a.primary_category and not any(c['id'] == str(a.primary_category.id) for c in categories):
+        categories.insert(0, category_ref(a.primary_category))
+    return categories
+
+
+def article_detail(a) -> Dict:
+    """Payload of GET /api/articles/<slug>."""
+    tags = [{'id': str(t.id), 'name': t.name, 'slug': t.slug} for t in (a.tags or [])]
+    # body_html is sanitized at write time; rows saved before that existed
+    # are sanitized here until `article_body --reprocess` has been run
+    body = a.body_html if a.body_html is not None else process_body(a.body_richtext)['body_html']
+    return {
+        'id': str(a.id),
+        'title': a.title,
+        'slug': a.slug,
+        'summary': a.summary,
+        'body': body,
+        'excerpt': a.excerpt,
+        'word_count': a.word_count,
+        'reading_time_minutes': a.reading_time_minutes,
+        'hero_image_url': a.hero_image_url,
+        'hero_images': variants(a.hero_image_url),
+        'published_at': a.published_at.isoformat() if a.published_at else None,
+        'status': a.status,
+        'categories': article_categories(a),
+        'tags': tags,
+    }
+
+
+def article_summary(a) -> Dict:
+    """Card-sized article payload used in category pages and related lists."""
+    return {
+        'id': str(a.id),
+        'title': a.title,
+        'slug': a.slug,
+        'summary': a.summary,
+        'excerpt': a.excerpt,
+        'reading_time_minutes': a.reading_time_minutes,
+        'hero_image_url': a.hero_image_url,
+        'hero_images': variants(a.hero_image_url),
+        'published_at': a.published_at.isoformat() if a.published_at else None,
+    }
+
+
+def category_page(category, articles: Iterable) -> Dict:
+    """Payload of GET /api/categories/<slug>."""
+    return {
+        'id': str(category.id),
+        'name': category.name,
+        'slug': category.slug,
+        'articles': [article_summary(a) for a in articles],
+    }
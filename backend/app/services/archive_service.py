@@ -0,0 +1,84 @@
+"""Date archive: published-article counts per year, month and UTC day.
+
+Counts come from article_archive_days, which triggers keep current on
+publish, unpublish, re-dating and category changes (migration 0007), so an
+archive request reads at most a few thousand small rows instead of grouping
+over `articles`. Days are UTC, like the sitemap shards; list a day or month
+with GET /api/articles/?dateFrom=...&dateTo=....
+"""
+import re
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.dao.archive_dao import ALL_ARTICLES, ArchiveDAO
+from app.dao.category_dao import CategoryDAO
+
+MONTH_RE = re.compile(r'^(\d{4})-(0[1-9]|1[0-2])$')
+
+
+class ArchiveService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = ArchiveDAO(session)
+
+    def archive(self, category_slug: str = None, month: str = None) -> Optional[Dict]:
+        """Counts per year and month, newest first, plus per day for `month`
+        ('YYYY-MM') if given. None when the category doesn't exist."""
+        scope = ALL_ARTICLES
+        if category_slug:
+            category = CategoryDAO(self.session).get_by_slug(category_slug)
+            if category is None:
+                return None
+            scope = category.id
+        days = self.dao.days(scope)
+
+        years: Dict[int, Dict] = {}
+        for day, count in days:
+            year = years.setdefault(day.year, {'year': day.year, 'count': 0, 'months': {}})
+            year['count'] += count
+            year['months'][day.month] = year['months'].get(day.month, 0) + count
+        result = {
+            'category': category_slug,
+            'total': sum(year['count'] for year in years.values()),
+            'years': [
+                {
+                    'year': year['year'],
+                    'count': year['count'],
+                    'months': [{'month': m, 'count': c} for m, c in year['months'].items()],
+                }
+                for year in years.values()
+            ],
+        }
+        if month:
+            prefix = month + '-'
+            result['month'] = month
+            result['days'] = [{'date': day.isoformat(), 'count': count}
+                              for day, count in days if day.isoformat().startswith(prefix)]
+        return result
+
+    def reconcile(self) -> List[Dict]:
+        drift = self.dao.reconcile()
+        self.session.commit()
+        return drift
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Date archive maintenance')
+    parser.add_argument('--reconcile', action='store_true', help='Recompute article_archive_days from articles')
+    args = parser.parse_args()
+
+    if not args.reconcile:
+        parser.print_help()
+        return
+
+    with SessionLocal() as session:
+        drift = ArchiveService(session).reconcile()
+    for d in drift:
+        print(f"archive drift: {d['scope']} {d['day']} stored={d['stored']} actual={d['actual']}")
+    print(f'Reconciled article archive ({len(drift)} corrected)')
+
+
+if __name__ == '__main__':
+    main()
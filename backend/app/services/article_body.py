@@ -0,0 +1,242 @@
+"""Write-time processing of article bodies.
+
+`process_body` turns the editor's `body_richtext` into the derived fields stored
+on `Article` (sanitized HTML, plain text, excerpt, word count and reading time)
+so read endpoints never have to parse HTML per request.
+
+Run as a module to reprocess the existing archive:
+
+    python -m app.services.article_body --reprocess --workers 4
+"""
+import math
+import os
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, Optional
+
+# Allowlist of tags and attributes kept in the sanitized body. Anything else is
+# dropped (tag removed, text content kept) unless listed in DROP_CONTENT_TAGS.
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure', 'h2', 'h3',
+    'h4', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span', 'strong', 'sub',
+    'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title', 'target', 'rel'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRS = {'href', 'src'}
+ALLOWED_SCHEMES = {'http', 'https', 'mailto'}
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'noscript', 'template', 'head', 'title'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Tags after which plain text gets a line break so words don't run together
+BLOCK_TAGS = {
+    'blockquote', 'br', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'hr', 'li', 'p', 'pre', 'table', 'tr', 'td', 'th',
+}
+
+EXCERPT_CHARS = int(os.getenv('ARTICLE_EXCERPT_CHARS', '280'))
+WORDS_PER_MINUTE = int(os.getenv('ARTICLE_WORDS_PER_MINUTE', '200'))
+
+_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.\-]*):')
+_WS_RE = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+
+def _safe_url(value: str) -> bool:
+    # strip control characters/whitespace browsers ignore (e.g. "java\nscript:")
+    cleaned = ''.join(ch for ch in value if ord(ch) > 32).strip()
+    m = _SCHEME_RE.match(cleaned)
+    if not m:
+        return True  # relative URL, fragment or path
+    return m.group(1).lower() in ALLOWED_SCHEMES
+
+
+class _BodyParser(HTMLParser):
+    """Single pass that emits sanitized HTML and collects plain text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html_parts = []
+        self.text_parts = []
+        self.open_tags = []
+        self.drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth += 1
+            return
+        if self.drop_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text_parts.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRS.get(tag, ())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS and not _safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value, quote=True)}"')
+        if tag == 'a' and any(name == 'target' for name, _ in attrs):
+            # links opening new tabs must not get a handle on window.opener
+            rendered = [r for r in rendered if not r.startswith(' rel=')]
+            rendered.append(' rel="noopener noreferrer"')
+        self.html_parts.append(f"<{tag}{''.join(rendered)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(0, self.drop_depth - 1)
+            return
+        if self.drop_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text_parts.append('\n')
+        if tag not in ALLOWED_TAGS or tag not in self.open_tags:
+            return
+        # close any tags left open inside this one so the output stays well-formed
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html_parts.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.drop_depth:
+            return
+        self.html_parts.append(escape(data, quote=False))
+        self.text_parts.append(data)
+
+    def result(self):
+        self.close()
+        while self.open_tags:
+            self.html_parts.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.html_parts), ''.join(self.text_parts)
+
+
+def _normalize_text(text: str) -> str:
+    lines = [_WS_RE.sub(' ', line).strip() for line in text.replace('\xa0', ' ').split('\n')]
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def make_excerpt(text: str, max_chars: int = EXCERPT_CHARS) -> str:
+    """Cut plain text at a word boundary no longer than max_chars."""
+    flat = ' '.join(text.split())
+    if len(flat) <= max_chars:
+        return flat
+    cut = flat[:max_chars]
+    space = cut.rfind(' ')
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip(' ,;:.-') + '…'
+
+
+def reading_time_minutes(word_count: int, words_per_minute: int = WORDS_PER_MINUTE) -> int:
+    if word_count <= 0:
+        return 0
+    return max(1, math.ceil(word_count / words_per_minute))
+
+
+def process_body(body: Optional[str]) -> Dict:
+    """Return the derived body columns for an article body.
+
+    Keys match the `Article` column names so the result can be applied with
+    setattr or passed straight to a bulk UPDATE.
+    """
+    if not body:
+        return {
+            'body_html': body,
+            'body_text': None,
+            'excerpt': None,
+            'word_count': 0,
+            'reading_time_minutes': 0,
+        }
+    parser = _BodyParser()
+    parser.feed(body)
+    html, raw_text = parser.result()
+    text = _normalize_text(raw_text)
+    words = len(text.split())
+    return {
+        'body_html': html,
+        'body_text': text,
+        'excerpt': make_excerpt(text) if text else None,
+        'word_count': words,
+        'reading_time_minutes': reading_time_minutes(words),
+    }
+
+
+def apply_to_article(article) -> None:
+    """Populate the derived body columns on an Article instance."""
+    for key, value in process_body(article.body_richtext).items():
+        setattr(article, key, value)
+
+
+def _process_row(row):
+    article_id, body = row
+    processed = process_body(body)
+    processed['id'] = article_id
+    return processed
+
+
+def reprocess_archive(workers: int = None, batch_size: int = 500, only_missing: bool = False) -> int:
+    """Recompute derived body columns for stored articles.
+
+    Rows are read in keyset-ordered batches; each batch is processed across a
+    process pool (parsing is CPU-bound) and written back with one executemany
+    UPDATE. Workers never touch the database.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from sqlalchemy import update
+    from app.config.session import SessionLocal
+    from app.models.article import Article
+
+    workers = workers or os.cpu_count() or 1
+    processed = 0
+    last_id = None
+    with ProcessPoolExecutor(max_workers=workers) as pool, SessionLocal() as session:
+        while True:
+            query = session.query(Article.id, Article.body_richtext).order_by(Article.id)
+            if last_id is not None:
+                query = query.filter(Article.id > last_id)
+            if only_missing:
+                query = query.filter(Article.body_html.is_(None), Article.body_richtext.isnot(None))
+            rows = query.limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            chunksize = max(1, len(rows) // (workers * 4))
+            values = list(pool.map(_process_row, [tuple(r) for r in rows], chunksize=chunksize))
+            session.execute(update(Article), values)
+            session.commit()
+            processed += len(values)
+            print(f'Reprocessed {processed} articles')
+    return processed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Article body processing utilities')
+    parser.add_argument('--reprocess', action='store_true', help='Recompute derived body columns for all articles')
+    parser.add_argument('--only-missing', action='store_true', help='Only process articles without a sanitized body')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows fetched and written per batch')
+    args = parser.parse_args()
+
+    if args.reprocess:
+        total = reprocess_archive(workers=args.workers, batch_size=args.batch_size, only_missing=args.only_missing)
+        print('Reprocessing complete:', total, 'articles')
+        return
+
+    parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
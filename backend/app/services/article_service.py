@@ -1,9 +1,18 @@
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from app.dao.article_dao import ArticleDAO
 from app.models.article import Article
+from app.services.article_body import apply_to_article
+from app.services.stats_service import ARTICLE_STATUSES
+from app.signals import ArticleChange, article_changed, articles_changed, send_safely
 from uuid import UUID
 
+BULK_ACTIONS = ('set_status', 'set_flags', 'add_tag', 'remove_tag', 'move_category', 'delete')
+BULK_FLAGS = ('is_breaking', 'is_highlight', 'is_featured')
+# upper bound on articles touched by one bulk request
+BULK_MAX_ARTICLES = 50000
+
 
 class ArticleService:
     def __init__(self, session: Session):
@@ -27,23 +36,80 @@ class ArticleService:
             date_to=date_to
         )
 
+    def _process_body(self, article: Article) -> None:
+        """Refresh derived body columns when body_richtext is new or changed."""
+        state = inspect(article)
+        if state.transient or state.pending or article.body_html is None:
+            apply_to_article(article)
+        elif state.attrs.body_richtext.history.has_changes():
+            apply_to_article(article)
+
+    def _committed_state(self, article: Article) -> dict:
+        """Tracked fields as last committed, ignoring pending in-memory edits."""
+        state = inspect(article)
+
+        def committed(attr):
+            history = state.attrs[attr].history
+            return history.deleted[0] if history.deleted else getattr(article, attr)
+
+        return {
+            'slug': committed('slug'),
+            'status': committed('status'),
+            'published_at': committed('published_at'),
+            'is_breaking': bool(committed('is_breaking')),
+            'primary_category_id': committed('primary_category_id'),
+            'category_ids': set(self.dao.category_ids(article.id)),
+            'tag_ids': set(self.dao.tag_ids(article.id)),
+        }
+
+    def _current_state(self, article: Article) -> dict:
+        """Tracked fields as they will be committed (call after flush)."""
+        return {
+            'slug': article.slug,
+            'status': article.status,
+            'published_at': article.published_at,
+            'is_breaking': bool(article.is_breaking),
+            'primary_category_id': article.primary_category_id,
+            'category_ids': set(self.dao.category_ids(article.id)),
+            'tag_ids': set(self.dao.tag_ids(article.id)),
+        }
+
+    def _notify(self, action: str, article_id: UUID, before: dict = None, after: dict = None) -> None:
+        """Emit article_changed once the write is committed."""
+        change = ArticleChange(action=action, article_id=article_id, **(after or {}))
+        for key, value in (before or {}).items():
+            setattr(change, f'old_{key}', value)
+        send_safely(article_changed, self.__class__, change=change)
+
     def create(self, article: Article) -> Article:
+        self._process_body(article)
         created = self.dao.create(article)
+        after = self._current_state(created)
         self.session.commit()
+        self._notify('created', created.id, after=after)
         return created
 
     def update(self, article: Article) -> Article:
+        before = self._committed_state(article)
+        self._process_body(article)
         updated = self.dao.update(article)
+        after = self._current_state(updated)
         self.session.commit()
+        self._notify('updated', updated.id, before=before, after=after)
         return updated
 
     def delete(self, article: Article) -> None:
+        article_id = article.id
+        before = self._committed_state(article)
         self.dao.delete(article)
         self.session.commit()
+        self._notify('deleted', article_id, before=before)
     
     def create_with_relations(self, article: Article, category_ids: List[UUID] = None, 
                              tag_ids: List[UUID] = None) -> Article:
         """Create article with categories and tags."""
+        # Derive sanitized HTML / text / excerpt once, at write time
+        self._process_body(article)
         # Create article first
         created = self.dao.create(article)
         
@@ -59,12 +125,17 @@ class ArticleService:
         if tag_ids:
             self.dao.set_tags(created, tag_ids)
         
+        after = self._current_state(created)
         self.session.commit()
+        self._notify('created', created.id, after=after)
         return created
     
     def update_with_relations(self, article: Article, category_ids: List[UUID] = None, 
                              tag_ids: List[UUID] = None) -> Article:
         """Update article with categories and tags."""
+        before = self._committed_state(article)
+        # Re-derive body columns only if the body was edited
+        self._process_body(article)
         # Update article fields
         updated = self.dao.update(article)
         
@@ -79,6 +150,72 @@ class ArticleService:
         if tag_ids is not None:
             self.dao.set_tags(updated, tag_ids)
         
+        after = self._current_state(updated)
         self.session.commit()
+        self._notify('updated', updated.id, before=before, after=after)
         return updated
 
+    def bulk(self, action: str, ids: Sequence[UUID] = None, filters: dict = None, **params) -> Dict[str, int]:
+        """Apply one admin action to many articles with set-based statements in a
+        single transaction; returns affected counts.
+
+        Targets are `ids`, or every article matched by list_query(**filters).
+        Derived data is notified once, with one articles_changed signal.
+        Raises ValueError for an unknown action or bad parameters.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action {action!r}')
+        if action == 'set_status' and params.get('status') not in ARTICLE_STATUSES:
+            raise ValueError(f"status must be one of {', '.join(ARTICLE_STATUSES)}")
+        flags = {k: bool(v) for k, v in (params.get('flags') or {}).items()}
+        if action == 'set_flags' and (not flags or set(flags) - set(BULK_FLAGS)):
+            raise ValueError(f"flags must set some of {', '.join(BULK_FLAGS)}")
+        if action in ('add_tag', 'remove_tag') and not params.get('tag_id'):
+            raise ValueError('tag_id is required')
+        if action == 'move_category' and not params.get('category_id'):
+            raise ValueError('category_id is required')
+
+        if ids is None:
+            query = self.dao.list_query(**(filters or {}))
+            ids = self.dao.matching_ids(query) if query is not None else []
+        if len(ids) > BULK_MAX_ARTICLES:
+            raise ValueError(f'at most {BULK_MAX_ARTICLES} articles per request')
+
+        before = self.dao.states(ids, lock=True)
+        ids = sorted(before)
+        counts = {'matched': len(ids)}
+        if not ids:
+            return counts
+        if action == 'set_status':
+            touched = self.dao.bulk_update(ids, {'status': params['status']})
+            counts['updated'] = len(touched)
+        elif action == 'set_flags':
+            touched = self.dao.bulk_update(ids, flags)
+            counts['updated'] = len(touched)
+        elif action == 'add_tag':
+            touched = self.dao.bulk_add_tag(ids, params['tag_id'])
+            counts['added'] = len(touched)
+        elif action == 'remove_tag':
+            touched = self.dao.bulk_remove_tag(ids, params['tag_id'])
+            counts['removed'] = len(touched)
+        elif action == 'move_category':
+            steps = self.dao.bulk_move_category(ids, params['category_id'], params.get('from_category_id'))
+            counts.update({step: len(step_ids) for step, step_ids in steps.items()})
+            touched = set().union(*steps.values())
+        else:
+            touched = self.dao.bulk_delete(ids)
+            counts['deleted'] = len(touched)
+
+        touched = sorted(set(touched))
+        after = self.dao.states(touched) if action != 'delete' else {}
+        self.session.commit()
+        changes = []
+        for article_id in touched:
+            change = ArticleChange(action='deleted' if action == 'delete' else 'updated', article_id=article_id,
+                                   **after.get(article_id, {}))
+            for key, value in before[article_id].items():
+                setattr(change, f'old_{key}', value)
+            changes.append(change)
+        if changes:
+            send_safely(articles_changed, self.__class__, changes=changes)
+        return counts
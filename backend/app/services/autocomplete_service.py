@@ -0,0 +1,216 @@
+"""Typeahead suggestions for tags, categories and article titles.
+
+Tags and categories are served from an in-memory prefix index in every
+worker: (normalized name, id) pairs in a sorted list searched with bisect, so
+a lookup is two binary searches and a short slice however many tags exist.
+The index is loaded on first use and then kept current incrementally: each
+worker polls the taxonomy_changes log (migration 0009) at most every
+AUTOCOMPLETE_POLL_SECONDS and re-reads only the rows named there. A worker
+that writes a tag or category polls on its next lookup, so editors see their
+own changes straight away.
+
+Article titles are too many to hold in every worker; they are matched in
+Postgres with ILIKE '%q%' on the title trigram index (migration 0010); the
+ARTICLE_CANDIDATES newest matches are ranked by word similarity, so a common
+three-letter query never ranks half the archive and still offers the latest
+stories. Readers only see published articles.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.signals import category_changed, tag_changed
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_TYPES = ('tag', 'category', 'article')
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_POLL_SECONDS = float(os.getenv('AUTOCOMPLETE_POLL_SECONDS', '2'))
+# trigrams need three characters; shorter article queries would scan the table
+ARTICLE_MIN_CHARS = 3
+# changes are re-read this far back, so a write committed after a later one
+# (its log row carries the earlier timestamp) is not missed
+CHANGE_LOOKBACK_SECONDS = 60
+# newest matching articles ranked per query; older ones are never fetched
+ARTICLE_CANDIDATES = 200
+
+_TABLES = {'tag': 'tags', 'category': 'categories'}
+
+_ARTICLES_SQL = """
+SELECT id, title, slug, status
+FROM (
+    SELECT id, title, slug, status, published_at
+    FROM articles
+    WHERE title ILIKE :pattern ESCAPE '\\' {published}
+    ORDER BY published_at DESC NULLS LAST
+    LIMIT :candidates
+) AS candidates
+ORDER BY word_similarity(:q, title) DESC, published_at DESC NULLS LAST
+LIMIT :limit
+"""
+
+
+def normalize(value: str) -> str:
+    """Case- and accent-insensitive key: 'Élection  2024' -> 'election 2024'."""
+    if value.isascii():
+        return ' '.join(value.lower().split())
+    decomposed = unicodedata.normalize('NFKD', value.casefold())
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+class PrefixIndex:
+    """Sorted (key, id) pairs with the item behind each id."""
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self._items: Dict[str, Tuple[str, dict]] = {}  # id -> (key, item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def load(self, items: Iterable[dict]) -> None:
+        self._items = {item['id']: (normalize(item['name']), item) for item in items}
+        self._keys = sorted((key, item_id) for item_id, (key, _) in self._items.items())
+
+    def put(self, item: dict) -> None:
+        self.remove(item['id'])
+        key = normalize(item['name'])
+        self._items[item['id']] = (key, item)
+        bisect.insort(self._keys, (key, item['id']))
+
+    def remove(self, item_id: str) -> None:
+        entry = self._items.pop(item_id, None)
+        if entry is not None:
+            i = bisect.bisect_left(self._keys, (entry[0], item_id))
+            if i < len(self._keys) and self._keys[i] == (entry[0], item_id):
+                del self._keys[i]
+
+    def search(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Items whose normalized name starts with `prefix`, in name order."""
+        prefix = normalize(prefix)
+        start = bisect.bisect_left(self._keys, (prefix,))
+        found = []
+        for key, item_id in self._keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            found.append(self._items[item_id][1])
+        return found
+
+
+class TaxonomyIndex:
+    """Per-worker prefix indexes for tags and categories, synced from taxonomy_changes."""
+
+    def __init__(self, session_factory: Callable[[], Session] = None,
+                 poll_seconds: float = AUTOCOMPLETE_POLL_SECONDS):
+        self._session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.indexes = {kind: PrefixIndex() for kind in _TABLES}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._since = None  # database time of the last poll
+        self._next_poll = 0.0
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.config.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def search(self, kind: str, prefix: str, limit: int = 10) -> List[dict]:
+        self.refresh()
+        with self._lock:
+            return self.indexes[kind].search(prefix, limit)
+
+    def changed(self) -> None:
+        """A tag or category was written in this process: sync before the next lookup."""
+        self._next_poll = 0.0
+
+    def refresh(self) -> None:
+        if self._loaded and time.monotonic() < self._next_poll:
+            return
+        with self._lock:
+            if self._loaded and time.monotonic() < self._next_poll:
+                return
+            if not self._loaded:
+                with self.session_factory() as session:
+                    self._load(session)
+            else:
+                try:
+                    with self.session_factory() as session:
+                        self._poll(session)
+                except Exception:
+                    # keep serving the last known index; retry after the next interval
+                    logger.exception('autocomplete index sync failed')
+            self._next_poll = time.monotonic() + self.poll_seconds
+
+    def _rows(self, session: Session, kind: str, ids: List[str] = None) -> List[dict]:
+        sql = f'SELECT id, name, slug FROM {_TABLES[kind]}'
+        params = {}
+        if ids is not None:
+            sql += ' WHERE id = ANY(CAST(:ids AS uuid[]))'
+            params['ids'] = ids
+        return [{'id': str(i), 'name': name, 'slug': slug} for i, name, slug in session.execute(text(sql), params)]
+
+    def _load(self, session: Session) -> None:
+        self._since = session.execute(text('SELECT now()')).scalar()
+        for kind, index in self.indexes.items():
+            index.load(self._rows(session, kind))
+        self._loaded = True
+
+    def _poll(self, session: Session) -> None:
+        now, = session.execute(text('SELECT now()')).one()
+        changes = session.execute(text(
+            "SELECT DISTINCT kind, item_id FROM taxonomy_changes "
+            "WHERE changed_at >= CAST(:since AS timestamptz) - make_interval(secs => :lookback)"
+        ), {'since': self._since, 'lookback': CHANGE_LOOKBACK_SECONDS}).all()
+        self._since = now
+        by_kind: Dict[str, List[str]] = {}
+        for kind, item_id in changes:
+            if kind in self.indexes:
+                by_kind.setdefault(kind, []).append(str(item_id))
+        for kind, ids in by_kind.items():
+            index = self.indexes[kind]
+            current = {item['id']: item for item in self._rows(session, kind, ids)}
+            for item_id in ids:
+                if item_id in current:
+                    index.put(current[item_id])
+                else:
+                    index.remove(item_id)
+
+
+taxonomy_index = TaxonomyIndex()
+
+
+@tag_changed.connect
+@category_changed.connect
+def on_taxonomy_changed(sender, change):
+    taxonomy_index.changed()
+
+
+class AutocompleteService:
+    def __init__(self, session: Session, index: TaxonomyIndex = None):
+        self.session = session
+        self.index = index or taxonomy_index
+
+    def suggest(self, kind: str, prefix: str, limit: int = 10, include_unpublished: bool = False) -> List[dict]:
+        if kind == 'article':
+            return self.articles(prefix, limit, include_unpublished)
+        return self.index.search(kind, prefix, limit)
+
+    def articles(self, q: str, limit: int = 10, include_unpublished: bool = False) -> List[dict]:
+        q = q.strip()
+        if len(q) < ARTICLE_MIN_CHARS:
+            return []
+        escaped = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        sql = _ARTICLES_SQL.format(published='' if include_unpublished else "AND status = 'published'")
+        rows = self.session.execute(text(sql), {'pattern': f'%{escaped}%', 'q': q, 'limit': limit,
+                                                   'candidates': ARTICLE_CANDIDATES})
+        return [{'id': str(i), 'title': title, 'slug': slug, 'status': status} for i, title, slug, status in rows]
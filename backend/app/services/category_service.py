@@ -1,7 +1,9 @@
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.dao.category_dao import CategoryDAO
 from app.models.category import Category
+from app.signals import TaxonomyChange, category_changed, send_safely
 from uuid import UUID
 
 
@@ -16,16 +18,31 @@ class CategoryService:
     def list(self, limit: int = 50, offset: int = 0) -> List[Category]:
         return self.dao.list(limit=limit, offset=offset)
 
+    def _notify(self, change: TaxonomyChange) -> None:
+        send_safely(category_changed, self.__class__, change=change)
+
     def create(self, category: Category) -> Category:
         created = self.dao.create(category)
         self.session.commit()
+        self._notify(TaxonomyChange('created', created.id, slug=created.slug))
         return created
 
     def update(self, category: Category) -> Category:
+        history = inspect(category).attrs.slug.history
+        old_slug = history.deleted[0] if history.deleted else category.slug
         updated = self.dao.update(category)
         self.session.commit()
+        self._notify(TaxonomyChange(
+            'updated', updated.id, slug=updated.slug, old_slug=old_slug,
+            article_ids=set(self.dao.published_article_ids(updated.id)),
+        ))
         return updated
 
     def delete(self, category: Category) -> None:
+        change = TaxonomyChange(
+            'deleted', category.id, old_slug=category.slug,
+            article_ids=set(self.dao.published_article_ids(category.id)),
+        )
         self.dao.delete(category)
         self.session.commit()
+        self._notify(change)
@@ -0,0 +1,391 @@
+"""Sitemap and RSS generation backed by a file cache of pre-rendered shards.
+
+Layout under FEED_CACHE_DIR:
+
+    sitemap.xml                  sitemap index (one entry per month part)
+    sitemaps/YYYY-MM.xml         published articles of that month (first 50k)
+    sitemaps/YYYY-MM-pN.xml      further parts when a month exceeds 50k URLs
+    rss.xml                      latest articles site-wide
+    categories/<category_id>.xml latest articles per category
+
+Shards are rendered by streaming rows from a server-side cursor straight to
+disk, so memory use does not depend on archive size. When ArticleService
+commits a change that readers can see, only the month shards, category feeds
+and index it touches are marked stale; they are rebuilt on the next request.
+
+Pre-generate everything with:
+
+    python -m app.services.feed_service --build-all
+"""
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Iterable, List, Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Session, load_only
+
+from app.dao.archive_dao import ArchiveDAO
+from app.dao.article_dao import ArticleDAO
+from app.models.article import Article
+from app.models.category import Category
+from app.signals import ArticleChange, article_changed, articles_changed
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+FEED_CACHE_DIR = os.getenv('FEED_CACHE_DIR') or os.path.join(BACKEND_DIR, 'static', 'feeds')
+# public site origin used in generated links, e.g. https://example.com
+SITE_URL = os.getenv('SITE_URL', '').rstrip('/')
+SITEMAP_MAX_URLS = 50000
+FEED_ITEMS = int(os.getenv('FEED_ITEMS', '50'))
+STREAM_BATCH = 1000
+
+INDEX_NAME = 'sitemap.xml'
+RSS_NAME = 'rss.xml'
+
+
+def month_key(dt: datetime) -> str:
+    # shards are cut on UTC month boundaries
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return f'{dt.year:04d}-{dt.month:02d}'
+
+
+def month_part_name(month: str, part: int) -> str:
+    suffix = '' if part == 1 else f'-p{part}'
+    return f'sitemaps/{month}{suffix}.xml'
+
+
+def category_feed_name(category_id) -> str:
+    return f'categories/{category_id}.xml'
+
+
+def _month_bounds(month: str):
+    year, mon = (int(x) for x in month.split('-'))
+    start = datetime(year, mon, 1, tzinfo=timezone.utc)
+    end = datetime(year + (mon == 12), 1 if mon == 12 else mon + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def _w3c(dt: Optional[datetime]) -> Optional[str]:
+    if not dt:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ShardCache:
+    """Files rebuilt on demand, invalidated via per-group stale markers.
+
+    A file is fresh when its mtime is newer than its group's `.stale` marker.
+    Builders stamp the output with the time the build *started*, so an
+    invalidation that lands mid-build still marks the result stale.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _marker(self, group: str) -> str:
+        return self.path(group + '.stale')
+
+    def is_fresh(self, name: str, group: str = None) -> bool:
+        try:
+            built = os.stat(self.path(name)).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        try:
+            stale = os.stat(self._marker(group or name[:-len('.xml')])).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        return built > stale
+
+    def changed_at(self, group: str) -> Optional[datetime]:
+        """When content of `group` last changed (its latest invalidation), if known."""
+        try:
+            return datetime.fromtimestamp(os.stat(self._marker(group)).st_mtime, tz=timezone.utc)
+        except FileNotFoundError:
+            return None
+
+    def invalidate(self, groups: Iterable[str]) -> None:
+        now = time.time_ns()
+        for group in groups:
+            marker = self._marker(group)
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            with open(marker, 'a'):
+                pass
+            os.utime(marker, ns=(now, now))
+
+    def lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def writer(self, name: str, started_ns: int):
+        return _AtomicWriter(self.path(name), started_ns)
+
+
+class _AtomicWriter:
+    """Write to a temp file, then rename over the target on success."""
+
+    def __init__(self, target: str, started_ns: int):
+        self.target = target
+        self.started_ns = started_ns
+        self.tmp = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.target), exist_ok=True)
+        self.fh = open(self.tmp, 'w', encoding='utf-8')
+        return self.fh
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fh.close()
+        if exc_type:
+            os.unlink(self.tmp)
+            return False
+        os.utime(self.tmp, ns=(self.started_ns, self.started_ns))
+        os.replace(self.tmp, self.target)
+        return False
+
+
+cache = ShardCache(FEED_CACHE_DIR)
+
+
+class FeedService:
+    def __init__(self, session: Session, site_url: str = None):
+        self.session = session
+        self.site_url = (site_url or SITE_URL).rstrip('/')
+
+    # --- queries ----------------------------------------------------------
+
+    def month_counts(self):
+        """[(month, count, lastmod)] for months with published articles.
+
+        Counts come from the trigger-maintained per-day archive rollup
+        (ArchiveDAO) rather than an aggregate over every published article;
+        lastmod is the month's latest change seen by this node's feed cache.
+        """
+        counts = {}
+        for day, n in ArchiveDAO(self.session).days():
+            month = f'{day.year:04d}-{day.month:02d}'
+            counts[month] = counts.get(month, 0) + n
+        return [(month, counts[month], cache.changed_at(f'sitemaps/{month}')) for month in sorted(counts)]
+
+    def has_month(self, month: str) -> bool:
+        """True if the archive rollup has published articles in `month` (YYYY-MM)."""
+        return any(f'{day.year:04d}-{day.month:02d}' == month for day, _ in ArchiveDAO(self.session).days())
+
+    def _month_rows(self, month: str):
+        start, end = _month_bounds(month)
+        return (
+            self.session.query(Article.slug, Article.updated_at, Article.published_at)
+            .filter(
+                Article.status == 'published',
+                Article.published_at >= start,
+                Article.published_at < end,
+            )
+            .order_by(Article.published_at, Article.id)
+            .yield_per(STREAM_BATCH)  # server-side cursor; rows never all in memory
+        )
+
+    def _latest(self, category: Category = None) -> List[Article]:
+        # same index-friendly filters and ordering as the public listing
+        query = ArticleDAO(self.session).list_query(category_slug=category.slug if category else None)
+        if query is None:
+            return []
+        return query.options(load_only(
+            Article.id, Article.title, Article.slug, Article.summary, Article.excerpt,
+            Article.published_at, Article.updated_at,
+        )).limit(FEED_ITEMS).all()
+
+    # --- rendering --------------------------------------------------------
+
+    def article_url(self, slug: str) -> str:
+        return f'{self.site_url}/article/{slug}'
+
+    def build_month(self, month: str, started_ns: int) -> List[str]:
+        """Render every part of a month's sitemap; returns the part names."""
+        parts = []
+        fh = writer = None
+        count = 0
+        try:
+            for slug, updated_at, published_at in self._month_rows(month):
+                if count % SITEMAP_MAX_URLS == 0:
+                    if writer:
+                        fh.write('</urlset>\n')
+                        writer.__exit__(None, None, None)
+                    name = month_part_name(month, len(parts) + 1)
+                    parts.append(name)
+                    writer = cache.writer(name, started_ns)
+                    fh = writer.__enter__()
+                    fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                    fh.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                lastmod = _w3c(updated_at or published_at)
+                fh.write(f'<url><loc>{escape(self.article_url(slug))}</loc>')
+                if lastmod:
+                    fh.write(f'<lastmod>{lastmod}</lastmod>')
+                fh.write('</url>\n')
+                count += 1
+            if writer:
+                fh.write('</urlset>\n')
+                writer.__exit__(None, None, None)
+                writer = None
+        except BaseException as e:
+            if writer:
+                writer.__exit__(type(e), e, None)
+            raise
+        if not parts:
+            # month emptied out (e.g. its only article was unpublished)
+            name = month_part_name(month, 1)
+            with cache.writer(name, started_ns) as fh:
+                fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                fh.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"></urlset>\n')
+            parts.append(name)
+        return parts
+
+    def build_index(self, started_ns: int) -> None:
+        with cache.writer(INDEX_NAME, started_ns) as fh:
+            fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            fh.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for month, count, lastmod in self.month_counts():
+                for part in range(1, max(1, math.ceil(count / SITEMAP_MAX_URLS)) + 1):
+                    loc = f'{self.site_url}/{month_part_name(month, part)}'
+                    fh.write(f'<sitemap><loc>{escape(loc)}</loc>')
+                    if lastmod:
+                        fh.write(f'<lastmod>{_w3c(lastmod)}</lastmod>')
+                    fh.write('</sitemap>\n')
+            fh.write('</sitemapindex>\n')
+
+    def build_rss(self, name: str, started_ns: int, category: Category = None) -> None:
+        title = f'Lanka Live - {category.name}' if category else 'Lanka Live'
+        link = f'{self.site_url}/category/{category.slug}' if category else f'{self.site_url}/'
+        articles = self._latest(category)
+        with cache.writer(name, started_ns) as fh:
+            fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            fh.write('<rss version="2.0"><channel>\n')
+            fh.write(f'<title>{escape(title)}</title><link>{escape(link)}</link>')
+            fh.write(f'<description>{escape(title)} latest news</description>\n')
+            if articles and articles[0].published_at:
+                fh.write(f'<lastBuildDate>{format_datetime(articles[0].published_at)}</lastBuildDate>\n')
+            for a in articles:
+                url = self.article_url(a.slug)
+                fh.write('<item>')
+                fh.write(f'<title>{escape(a.title or "")}</title>')
+                fh.write(f'<link>{escape(url)}</link><guid isPermaLink="false">{a.id}</guid>')
+                if a.published_at:
+                    fh.write(f'<pubDate>{format_datetime(a.published_at)}</pubDate>')
+                description = a.excerpt or a.summary
+                if description:
+                    fh.write(f'<description>{escape(description)}</description>')
+                fh.write('</item>\n')
+            fh.write('</channel></rss>\n')
+
+    # --- cached access ----------------------------------------------------
+
+    def ensure_index(self) -> str:
+        return self._ensure(INDEX_NAME, None, self.build_index)
+
+    def ensure_rss(self) -> str:
+        return self._ensure(RSS_NAME, None, lambda started: self.build_rss(RSS_NAME, started))
+
+    def ensure_category_rss(self, category: Category) -> str:
+        name = category_feed_name(category.id)
+        return self._ensure(name, None, lambda started: self.build_rss(name, started, category))
+
+    def ensure_month_part(self, month: str, part: int) -> Optional[str]:
+        """Path of a month sitemap part, or None if the month has no such part."""
+        group = f'sitemaps/{month}'
+        head = month_part_name(month, 1)
+        if not cache.is_fresh(head, group):
+            # a month that emptied out is rebuilt as an empty urlset; months that
+            # never had articles get nothing written
+            if not os.path.exists(cache.path(head)) and not self.has_month(month):
+                return None
+            with cache.lock(group):
+                if not cache.is_fresh(head, group):
+                    self.build_month(month, time.time_ns())
+        # parts left over from a month that has since shrunk stay stale
+        name = month_part_name(month, part)
+        return cache.path(name) if cache.is_fresh(name, group) else None
+
+    def _ensure(self, name: str, group: Optional[str], build) -> str:
+        if not cache.is_fresh(name, group):
+            with cache.lock(name):
+                if not cache.is_fresh(name, group):
+                    build(time.time_ns())
+        return cache.path(name)
+
+    def build_all(self) -> int:
+        """Pre-render every shard; returns the number of files written."""
+        started = time.time_ns()
+        written = 0
+        for month, _, _ in self.month_counts():
+            written += len(self.build_month(month, started))
+        self.build_index(started)
+        self.build_rss(RSS_NAME, started)
+        written += 2
+        for category in self.session.query(Category).all():
+            self.build_rss(category_feed_name(category.id), started, category)
+            written += 1
+        return written
+
+
+def stale_groups(change: ArticleChange) -> set:
+    """Cache groups whose content depends on the changed article."""
+    if not change.affects_public:
+        return set()
+    groups = {INDEX_NAME[:-len('.xml')], RSS_NAME[:-len('.xml')]}
+    if change.was_published and change.old_published_at:
+        groups.add(f'sitemaps/{month_key(change.old_published_at)}')
+    if change.is_published and change.published_at:
+        groups.add(f'sitemaps/{month_key(change.published_at)}')
+    for category_id in change.listed_category_ids:
+        groups.add(category_feed_name(category_id)[:-len('.xml')])
+    return groups
+
+
+@article_changed.connect
+def on_article_changed(sender, change: ArticleChange):
+    groups = stale_groups(change)
+    if groups:
+        cache.invalidate(groups)
+
+
+@articles_changed.connect
+def on_articles_changed(sender, changes):
+    groups = set()
+    for change in changes:
+        groups |= stale_groups(change)
+    if groups:
+        cache.invalidate(groups)
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Sitemap and RSS feed cache')
+    parser.add_argument('--build-all', action='store_true', help='Pre-render every sitemap shard and feed')
+    parser.add_argument('--site-url', default=None, help='Public site origin (default: SITE_URL env)')
+    args = parser.parse_args()
+
+    if args.build_all:
+        with SessionLocal() as session:
+            written = FeedService(session, site_url=args.site_url).build_all()
+        print(f'Wrote {written} feed files to {FEED_CACHE_DIR}')
+        return
+
+    parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
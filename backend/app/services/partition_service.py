@@ -0,0 +1,90 @@
+"""Time-based partitioning and cold archiving for the articles table.
+
+Almost every read touches the last few weeks of stories, so `articles` can be
+range-partitioned by published_at, one partition per UTC month or year. The
+hot path then only plans and scans the recent partitions and their (small)
+indexes; older partitions sit untouched and can be moved to a cold tablespace.
+See migration 0011 for how ids, slugs and foreign keys are kept unique
+across partitions (article_keys).
+
+    python -m app.services.partition_service --convert month   # one-off, rewrites the table
+    python -m app.services.partition_service --ensure          # cron: next partitions
+    python -m app.services.partition_service --archive-before 2020-01-01 --tablespace cold
+    python -m app.services.partition_service --status
+
+--convert copies the table inside one transaction: writers wait until it
+commits, readers carry on. Restart the workers afterwards so they switch to
+the partition-aware lookups.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.dao.partition_dao import PartitionDAO
+
+# partitions kept ready ahead of the current period (scheduled stories)
+PARTITIONS_AHEAD = int(os.getenv('ARTICLE_PARTITIONS_AHEAD', '3'))
+
+
+class PartitionService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = PartitionDAO(session)
+
+    def status(self) -> List[Dict]:
+        return self.dao.partitions()
+
+    def convert(self, interval: str = 'month', ahead: int = PARTITIONS_AHEAD) -> List[str]:
+        created = self.dao.convert(interval, ahead)
+        self.session.commit()
+        return created
+
+    def ensure(self, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+        created = self.dao.ensure(ahead)
+        self.session.commit()
+        return created
+
+    def archive(self, before: datetime, tablespace: str) -> List[str]:
+        moved = self.dao.archive(before, tablespace)
+        self.session.commit()
+        return moved
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Articles table partitioning')
+    parser.add_argument('--convert', choices=('month', 'year'), help='Convert articles to a partitioned table')
+    parser.add_argument('--ensure', action='store_true', help='Create upcoming partitions and adopt stray rows')
+    parser.add_argument('--ahead', type=int, default=PARTITIONS_AHEAD, help='Periods to create ahead of now')
+    parser.add_argument('--archive-before', help='Move partitions ending on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--tablespace', help='Tablespace for --archive-before')
+    parser.add_argument('--status', action='store_true', help='List partitions')
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        svc = PartitionService(session)
+        if args.convert:
+            created = svc.convert(args.convert, args.ahead)
+            print(f'Converted articles: {len(created)} partitions')
+        elif args.ensure:
+            created = svc.ensure(args.ahead)
+            print(f"Created partitions: {', '.join(created) or 'none'}")
+        elif args.archive_before:
+            if not args.tablespace:
+                parser.error('--archive-before needs --tablespace')
+            before = datetime.fromisoformat(args.archive_before).replace(tzinfo=timezone.utc)
+            moved = svc.archive(before, args.tablespace)
+            print(f"Moved to {args.tablespace}: {', '.join(moved) or 'none'}")
+        elif args.status:
+            for p in svc.status():
+                print(f"{p['name']:<20} {p['rows']:>10} rows {p['bytes'] // 1024:>10} kB  {p['tablespace']}  {p['bound']}")
+        else:
+            parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""Publish-time prerendering of public article and category payloads.
+
+Optional: enabled by setting PRERENDER_DIR. Every published article and the
+first page of every category is written as the exact JSON the API returns,
+laid out so nginx can answer anonymous GETs without touching Flask:
+
+    articles/<slug>.json         GET /api/articles/<slug>
+    categories/<slug>.json       GET /api/categories/<slug>   (no query string)
+    article/<slug>/index.html    /article/<slug> HTML shell (PRERENDER_HTML=1)
+
+Files are regenerated right after the write commits (article, category and
+tag signals) and removed when an article stops being public. A single article
+is rendered before the response returns; bulk edits and category or tag
+renames, which can touch thousands of articles, render on a background
+thread, and Flask answers for the stale files meanwhile. Anything not on disk
+falls through to Flask.
+
+Rebuild everything (e.g. after enabling the mode or a bulk import) with:
+
+    python -m app.services.prerender_service --build-all
+"""
+import html
+import json
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.dao.article_dao import ArticleDAO
+from app.dao.category_dao import CategoryDAO
+from app.models.article import Article
+from app.models.category import Category
+from app.serializers import CATEGORY_PAGE_SIZE, article_detail, category_page
+from app.signals import (
+    ArticleChange, TaxonomyChange, article_changed, articles_changed, category_changed, tag_changed,
+)
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_DIR = os.getenv('PRERENDER_DIR', '')
+PRERENDER_HTML = os.getenv('PRERENDER_HTML', '').lower() in ('1', 'true', 'yes')
+# built frontend index.html used as the HTML shell template
+PRERENDER_SHELL_TEMPLATE = os.getenv('PRERENDER_SHELL_TEMPLATE', '')
+STREAM_BATCH = 500
+
+_shell_cache = {}
+
+
+def enabled() -> bool:
+    return bool(PRERENDER_DIR)
+
+
+def _write_atomic(path: str, data: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _safe_slug(slug: Optional[str]) -> bool:
+    # slugs become file names; never let one escape the output directory
+    return bool(slug) and '/' not in slug and '\\' not in slug and slug not in ('.', '..')
+
+
+def _shell_template() -> Optional[str]:
+    if not PRERENDER_SHELL_TEMPLATE:
+        return None
+    mtime = os.path.getmtime(PRERENDER_SHELL_TEMPLATE)
+    cached = _shell_cache.get(PRERENDER_SHELL_TEMPLATE)
+    if not cached or cached[0] != mtime:
+        with open(PRERENDER_SHELL_TEMPLATE, encoding='utf-8') as fh:
+            cached = _shell_cache[PRERENDER_SHELL_TEMPLATE] = (mtime, fh.read())
+    return cached[1]
+
+
+def render_shell(template: str, payload: dict) -> str:
+    """Inject title/description meta and the article payload into index.html."""
+    title = html.escape(f"{payload['title']} - Lanka Live")
+    description = html.escape(payload.get('excerpt') or payload.get('summary') or '')
+    head = [f'<title>{title}</title>', f'<meta property="og:title" content="{title}" />']
+    if description:
+        head.append(f'<meta property="og:description" content="{description}" />')
+    if payload.get('hero_image_url'):
+        head.append(f'<meta property="og:image" content="{html.escape(payload["hero_image_url"])}" />')
+    # `</` cannot appear inside a script element
+    data = json.dumps(payload, ensure_ascii=False).replace('</', '<\\/')
+    script = f'<script id="prerendered-article" type="application/json">{data}</script>'
+
+    out = template
+    if '<title>' in out:
+        start, end = out.index('<title>'), out.index('</title>') + len('</title>')
+        out = out[:start] + out[end:]
+    if description and 'name="description"' in out:
+        start = out.index('<meta name="description"')
+        end = out.index('>', start) + 1
+        out = out[:start] + f'<meta name="description" content="{description}" />' + out[end:]
+    out = out.replace('</head>', '\n'.join(head) + '\n</head>', 1)
+    return out.replace('</body>', script + '\n</body>', 1)
+
+
+def _dumps(payload: dict) -> str:
+    # byte-for-byte what Flask's default JSON provider sends
+    return json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n'
+
+
+class Prerenderer:
+    def __init__(self, session: Session, root: str = None):
+        self.session = session
+        self.root = root or PRERENDER_DIR
+        self.articles = ArticleDAO(session)
+        self.categories = CategoryDAO(session)
+
+    def article_path(self, slug: str) -> str:
+        return os.path.join(self.root, 'articles', f'{slug}.json')
+
+    def shell_path(self, slug: str) -> str:
+        return os.path.join(self.root, 'article', slug, 'index.html')
+
+    def category_path(self, slug: str) -> str:
+        return os.path.join(self.root, 'categories', f'{slug}.json')
+
+    # --- articles ---------------------------------------------------------
+
+    def render_article(self, article: Article) -> None:
+        if article.status != 'published' or not _safe_slug(article.slug):
+            self.remove_article(article.slug)
+            return
+        payload = article_detail(article)
+        _write_atomic(self.article_path(article.slug), _dumps(payload))
+        template = _shell_template() if PRERENDER_HTML else None
+        if template:
+            _write_atomic(self.shell_path(article.slug), render_shell(template, payload))
+
+    def remove_article(self, slug: Optional[str]) -> None:
+        if not _safe_slug(slug):
+            return
+        _remove(self.article_path(slug))
+        _remove(self.shell_path(slug))
+
+    def _with_relations(self, query):
+        # one query per relation per batch instead of three per article
+        return query.options(
+            selectinload(Article.categories), selectinload(Article.tags), joinedload(Article.primary_category),
+        )
+
+    def render_articles(self, article_ids: Iterable[UUID]) -> int:
+        ids = list(article_ids)
+        count = 0
+        for i in range(0, len(ids), STREAM_BATCH):
+            batch = self._with_relations(self.session.query(Article)).filter(Article.id.in_(ids[i:i + STREAM_BATCH])).all()
+            for article in batch:
+                self.render_article(article)
+                count += 1
+            self.session.expunge_all()
+        return count
+
+    # --- categories -------------------------------------------------------
+
+    def render_category(self, category: Category) -> None:
+        if not _safe_slug(category.slug):
+            return
+        articles = self.articles.list(limit=CATEGORY_PAGE_SIZE, offset=0, category_slug=category.slug)
+        _write_atomic(self.category_path(category.slug), _dumps(category_page(category, articles)))
+
+    def render_categories(self, category_ids: Iterable[UUID]) -> None:
+        for category_id in category_ids:
+            category = self.categories.get(category_id)
+            if category:
+                self.render_category(category)
+
+    def remove_category(self, slug: Optional[str]) -> None:
+        if _safe_slug(slug):
+            _remove(self.category_path(slug))
+
+    # --- full rebuild -----------------------------------------------------
+
+    def build_all(self) -> int:
+        """Render every published article and category page; returns files written."""
+        written = 0
+        last_id = None
+        while True:
+            query = self._with_relations(self.session.query(Article)).filter(Article.status == 'published').order_by(Article.id)
+            if last_id is not None:
+                query = query.filter(Article.id > last_id)
+            batch = query.limit(STREAM_BATCH).all()
+            if not batch:
+                break
+            for article in batch:
+                self.render_article(article)
+            written += len(batch)
+            last_id = batch[-1].id
+            self.session.expunge_all()
+        for category in self.session.query(Category).all():
+            self.render_category(category)
+            written += 1
+        return written
+
+    # --- change handling --------------------------------------------------
+
+    def apply_article_change(self, change: ArticleChange) -> None:
+        if not change.affects_public:
+            return
+        if not change.is_published or (change.old_slug and change.old_slug != change.slug):
+            self.remove_article(change.old_slug)
+        if change.is_published:
+            article = self.articles.get(change.article_id)
+            if article:
+                self.render_article(article)
+        self.render_categories(change.listed_category_ids)
+
+    def apply_article_changes(self, changes: Iterable[ArticleChange]) -> None:
+        """Batch form of apply_article_change: each category page is rendered once."""
+        changes = [c for c in changes if c.affects_public]
+        category_ids = set()
+        for change in changes:
+            if not change.is_published or (change.old_slug and change.old_slug != change.slug):
+                self.remove_article(change.old_slug)
+            category_ids |= change.listed_category_ids
+        self.render_articles([c.article_id for c in changes if c.is_published])
+        self.render_categories(category_ids)
+
+    def apply_category_change(self, change: TaxonomyChange) -> None:
+        if change.old_slug and change.old_slug != change.slug:
+            self.remove_category(change.old_slug)
+        if change.action != 'deleted':
+            self.render_categories([change.id])
+        # article payloads embed category names
+        self.render_articles(change.article_ids)
+
+    def apply_tag_change(self, change: TaxonomyChange) -> None:
+        # article payloads embed tag names
+        self.render_articles(change.article_ids)
+
+
+def _apply(method: str, change) -> None:
+    if not enabled():
+        return
+    from app.config.session import SessionLocal
+    with SessionLocal() as session:
+        getattr(Prerenderer(session), method)(change)
+
+
+_background_lock = threading.Lock()
+
+
+def _apply_in_background_thread(method: str, change) -> None:
+    # one batch at a time per process; batches rewrite overlapping files
+    with _background_lock:
+        started = time.monotonic()
+        try:
+            _apply(method, change)
+        except Exception:
+            logger.exception('prerender %s failed', method)
+        else:
+            logger.info('prerender %s done in %.1fs', method, time.monotonic() - started)
+
+
+def _apply_in_background(method: str, change) -> None:
+    if enabled():
+        threading.Thread(target=_apply_in_background_thread, args=(method, change), name='prerender',
+                         daemon=True).start()
+
+
+@article_changed.connect
+def on_article_changed(sender, change: ArticleChange):
+    _apply('apply_article_change', change)
+
+
+@articles_changed.connect
+def on_articles_changed(sender, changes):
+    _apply_in_background('apply_article_changes', list(changes))
+
+
+@category_changed.connect
+def on_category_changed(sender, change: TaxonomyChange):
+    _apply_in_background('apply_category_change', change)
+
+
+@tag_changed.connect
+def on_tag_changed(sender, change: TaxonomyChange):
+    _apply_in_background('apply_tag_change', change)
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Static prerendering of public pages')
+    parser.add_argument('--build-all', action='store_true', help='Render every published article and category page')
+    parser.add_argument('--dir', default=PRERENDER_DIR, help='Output directory (default: PRERENDER_DIR env)')
+    args = parser.parse_args()
+
+    if not args.build_all:
+        parser.print_help()
+        return
+    if not args.dir:
+        parser.error('no output directory: set PRERENDER_DIR or pass --dir')
+
+    with SessionLocal() as session:
+        written = Prerenderer(session, root=args.dir).build_all()
+    print(f'Prerendered {written} pages into {args.dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""Related-articles engine backed by precomputed neighbour lists.
+
+Each published article's top RELATED_K neighbours (weighted tag overlap with a
+category boost and recency decay, see RelatedDAO) are stored in
+article_related, so serving /api/articles/<slug>/related is one indexed read.
+
+Lists are refreshed incrementally after an article is saved: the article's
+own list and the lists of its neighbours. Unpublishing removes the article
+from every list that mentioned it. Build or rebuild everything offline with:
+
+    python -m app.services.related_service --rebuild [--workers 4] [--batch-size 2000]
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import cache
+from app.dao.article_dao import ArticleDAO
+from app.dao.related_dao import RelatedDAO
+from app.dao.stats_dao import StatsDAO
+from app.models.article import Article
+from app.signals import ArticleChange, article_changed, articles_changed
+
+logger = logging.getLogger(__name__)
+
+RELATED_K = int(os.getenv('RELATED_K', '10'))
+# tags on more articles than this are too generic to suggest neighbours
+RELATED_MAX_TAG_DF = int(os.getenv('RELATED_MAX_TAG_DF', '5000'))
+# candidates per article that get the (more expensive) category boost
+RELATED_PREFILTER = int(os.getenv('RELATED_PREFILTER', '50'))
+RELATED_CATEGORY_WEIGHT = float(os.getenv('RELATED_CATEGORY_WEIGHT', '0.25'))
+# score halves for neighbours published this many days apart
+RELATED_RECENCY_DAYS = float(os.getenv('RELATED_RECENCY_DAYS', '30'))
+# articles per rebuild statement when refreshing many at once
+RELATED_BATCH = 2000
+
+
+class RelatedService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = RelatedDAO(session)
+
+    def _corpus_size(self) -> int:
+        try:
+            counters = StatsDAO(self.session).counters('articles.status.published')
+            if counters:
+                return max(1, counters.get('articles.status.published', 1))
+        except Exception:
+            # stat_counters not migrated yet
+            self.session.rollback()
+        return max(1, self.session.query(Article).filter(Article.status == 'published').count())
+
+    def related(self, article: Article, limit: int = 6) -> List[Article]:
+        """Precomputed neighbours, topped up with the latest stories from the
+        article's primary category when the list is short (new or untagged)."""
+        items = self.dao.related(article.id, limit=limit)
+        if len(items) < limit and article.primary_category is not None:
+            seen = {article.id} | {a.id for a in items}
+            query = ArticleDAO(self.session).list_query(category_slug=article.primary_category.slug)
+            if query is not None:
+                for candidate in query.limit(limit + len(seen)).all():
+                    if candidate.id not in seen:
+                        items.append(candidate)
+                        seen.add(candidate.id)
+                        if len(items) >= limit:
+                            break
+        return items
+
+    def rebuild(self, ids: Sequence[UUID], corpus_size: int = None) -> int:
+        """Recompute the neighbour lists of `ids` (no commit)."""
+        if not ids:
+            return 0
+        return self.dao.rebuild(
+            ids, n=corpus_size or self._corpus_size(), k=RELATED_K, max_df=RELATED_MAX_TAG_DF,
+            prefilter=RELATED_PREFILTER, category_weight=RELATED_CATEGORY_WEIGHT,
+            recency_days=RELATED_RECENCY_DAYS,
+        )
+
+    def refresh(self, article_ids: Sequence[UUID]) -> None:
+        """After a save: the articles' lists, then their neighbours' lists (they may now include them)."""
+        n = self._corpus_size()
+        ids = list(article_ids)
+        for i in range(0, len(ids), RELATED_BATCH):
+            self.rebuild(ids[i:i + RELATED_BATCH], n)
+        own = set(ids)
+        neighbours = [i for i in self.dao.related_ids(ids) if i not in own]
+        for i in range(0, len(neighbours), RELATED_BATCH):
+            self.rebuild(neighbours[i:i + RELATED_BATCH], n)
+        self.session.commit()
+
+    def withdraw(self, article_ids: Sequence[UUID]) -> None:
+        """After an unpublish: drop the articles from every list and refill those lists."""
+        ids = set(article_ids)
+        referencing = [i for i in self.dao.referencing_ids(list(ids)) if i not in ids]
+        self.dao.remove_from_lists(list(ids))
+        n = self._corpus_size()
+        for i in range(0, len(referencing), RELATED_BATCH):
+            self.rebuild(referencing[i:i + RELATED_BATCH], n)
+        self.session.commit()
+
+
+def _needs_refresh(change: ArticleChange) -> bool:
+    if not change.affects_public:
+        return False
+    # only the article's tags/categories/status/date feed the score
+    return not (change.action == 'updated' and change.was_published and change.is_published
+                and change.tag_ids == change.old_tag_ids and change.category_ids == change.old_category_ids
+                and change.published_at == change.old_published_at)
+
+
+def apply_changes(session: Session, changes: Sequence[ArticleChange]) -> None:
+    svc = RelatedService(session)
+    published = [c.article_id for c in changes if c.is_published]
+    # deleted rows are cascaded away by the foreign keys
+    withdrawn = [c.article_id for c in changes if not c.is_published and c.was_published and c.action != 'deleted']
+    if withdrawn:
+        svc.withdraw(withdrawn)
+    if published:
+        svc.refresh(published)
+
+
+def apply_change(session: Session, change: ArticleChange) -> None:
+    apply_changes(session, [change])
+
+
+@article_changed.connect
+def on_article_changed(sender, change: ArticleChange):
+    if not _needs_refresh(change):
+        return
+    from app.config.session import SessionLocal
+    with SessionLocal() as session:
+        apply_change(session, change)
+    _invalidate_cached_lists()
+
+
+def _invalidate_cached_lists() -> None:
+    # /related responses cached while the lists were being rewritten are stale
+    cache.publish({cache.ARTICLE_LISTS})
+
+
+_bulk_lock = threading.Lock()
+
+
+def _apply_bulk(changes: List[ArticleChange]) -> None:
+    from app.config.session import SessionLocal
+    # one batch at a time per process; batches rewrite overlapping lists
+    with _bulk_lock:
+        started = time.monotonic()
+        try:
+            with SessionLocal() as session:
+                apply_changes(session, changes)
+        except Exception:
+            logger.exception('related refresh for %d bulk-changed articles failed', len(changes))
+        else:
+            logger.info('related lists refreshed for %d articles in %.1fs', len(changes), time.monotonic() - started)
+            _invalidate_cached_lists()
+
+
+@articles_changed.connect
+def on_articles_changed(sender, changes: List[ArticleChange]):
+    """Bulk edits refresh thousands of lists (and their neighbours'), which takes
+    seconds; do it off the request thread. Lists of the affected articles are
+    briefly stale, as between a save and its refresh; cached /related responses
+    are invalidated again once the refresh has committed."""
+    changes = [c for c in changes if _needs_refresh(c)]
+    if changes:
+        threading.Thread(target=_apply_bulk, args=(changes,), name='related-bulk-refresh', daemon=True).start()
+
+
+def rebuild_all(session_factory, workers: int = 1, batch_size: int = 2000, log=print) -> int:
+    """Recompute every published article's list; returns rows written.
+
+    Batches are keyset-paginated by id and committed one at a time, so memory
+    and transaction size stay constant regardless of archive size.
+    """
+    with session_factory() as session:
+        n = RelatedService(session)._corpus_size()
+
+    def run(ids):
+        with session_factory() as s:
+            written = RelatedService(s).rebuild(ids, n)
+            s.commit()
+            return len(ids), written
+
+    started = time.time()
+    done = rows = 0
+    with session_factory() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for ids in RelatedDAO(session).published_id_batches(batch_size):
+            pending.append(pool.submit(run, ids))
+            # keep at most two batches per worker in flight
+            while len(pending) >= workers * 2:
+                count, written = pending.pop(0).result()
+                done += count
+                rows += written
+                log(f'{done} articles ({rows} neighbours) in {time.time() - started:.1f}s')
+        for future in pending:
+            count, written = future.result()
+            done += count
+            rows += written
+    log(f'Rebuilt related lists for {done} articles ({rows} neighbours) in {time.time() - started:.1f}s')
+    return rows
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Related-articles neighbour lists')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute lists for all published articles')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent batches (each on its own connection)')
+    parser.add_argument('--batch-size', type=int, default=2000, help='Articles per statement/transaction')
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+    rebuild_all(SessionLocal, workers=args.workers, batch_size=args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
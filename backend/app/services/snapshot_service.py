@@ -0,0 +1,270 @@
+"""Export of the public read model to a SQLite file for edge and read nodes.
+
+The snapshot holds the published articles, their category and tag links and
+related lists, every category, tag and homepage section, and the date
+archive. Indexes match what the public endpoints filter and sort on. Nodes
+started with READ_SNAPSHOT pointing at the file serve their public reads
+from it (app.snapshot).
+
+    python -m app.services.snapshot_service --out /srv/snapshot/site.db
+    python -m app.services.snapshot_service --out /srv/snapshot/site.db --incremental --interval 60
+
+Every export reads from one REPEATABLE READ transaction, so the file is a
+consistent cut of the database. It is written next to the target and then
+renamed over it, so readers see either the old file or the new one.
+
+An incremental export starts from a copy of the previous file. It re-copies
+only the articles listed in article_changes (migration 0012) since that
+export, minus SNAPSHOT_LOOKBACK_SECONDS; the lookback covers writes that
+committed late. The small tables are copied in full each time. If the
+previous file is missing, or older than the change log keeps, a full export
+runs instead.
+"""
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, Table, create_engine, event, or_, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models import article_category, article_tag
+from app.models.article import Article
+from app.models.article_related import ArticleRelated
+from app.models.base import Base
+from app.models.category import Category
+from app.models.homepage_section import HomepageSection
+from app.models.homepage_section_item import HomepageSectionItem
+from app.models.tag import Tag
+from app.snapshot import open_engine, read_meta, snapshot_meta, snapshot_metadata
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = '1'
+# re-read changes this far before the previous export (late-committing writes)
+SNAPSHOT_LOOKBACK_SECONDS = int(os.getenv('SNAPSHOT_LOOKBACK_SECONDS', '600'))
+# article_changes keeps a day of history (migration 0012)
+CHANGE_LOG_RETENTION = timedelta(days=1)
+_BATCH = 1000
+
+_archive_metadata = MetaData()
+article_archive_days = Table(
+    'article_archive_days', _archive_metadata,
+    Column('scope', UUID(as_uuid=True), primary_key=True),
+    Column('day', Date, primary_key=True),
+    Column('articles', Integer, nullable=False),
+)
+
+articles = Article.__table__
+article_related = ArticleRelated.__table__
+_MODEL_TABLES = (
+    Category.__table__, Tag.__table__, articles, article_category, article_tag, article_related,
+    HomepageSection.__table__, HomepageSectionItem.__table__,
+)
+# copied in full on every export
+_SMALL_TABLES = (Category.__table__, Tag.__table__, HomepageSection.__table__, HomepageSectionItem.__table__)
+
+# created after the bulk load; mirror the Postgres indexes the public reads use
+SNAPSHOT_INDEXES = (
+    'CREATE INDEX ix_articles_published_at ON articles (published_at DESC, created_at DESC)',
+    'CREATE INDEX ix_articles_primary_category ON articles (primary_category_id, published_at DESC)',
+    'CREATE INDEX ix_article_category_category ON article_category (category_id, article_id)',
+    'CREATE INDEX ix_article_tag_tag ON article_tag (tag_id, article_id)',
+    'CREATE INDEX ix_article_related_related ON article_related (related_id)',
+    'CREATE INDEX ix_tags_name ON tags (name, id)',
+    'CREATE INDEX ix_tags_article_count ON tags (article_count DESC, name, id)',
+    'CREATE INDEX ix_tags_lower_name ON tags (lower(name))',
+    'CREATE INDEX ix_categories_order_index ON categories (order_index)',
+    'CREATE INDEX ix_homepage_section_items_section ON homepage_section_items (section_id, order_index)',
+)
+
+
+def _open_writer(path: str) -> Engine:
+    engine = create_engine(f'sqlite:///{path}')
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        # a failed export only leaves a temporary file behind
+        dbapi_connection.execute('PRAGMA journal_mode = OFF')
+        dbapi_connection.execute('PRAGMA synchronous = OFF')
+
+    return engine
+
+
+def create_schema(lite: Connection) -> None:
+    """Tables of an empty snapshot (indexes come after the load)."""
+    Base.metadata.create_all(lite, tables=list(_MODEL_TABLES))
+    _archive_metadata.create_all(lite)
+    snapshot_metadata.create_all(lite)
+
+
+def _chunks(ids: Sequence, size: int = _BATCH) -> Iterable[List]:
+    for i in range(0, len(ids), size):
+        yield list(ids[i:i + size])
+
+
+class SnapshotExporter:
+    def __init__(self, session: Session, path: str):
+        self.session = session
+        self.path = path
+
+    def export(self, incremental: bool = False) -> Dict:
+        """Write the snapshot to `path`; returns what was done."""
+        started = time.monotonic()
+        self.session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+        self.session.execute(text('SET TRANSACTION READ ONLY'))
+        exported_at = self.session.execute(text('SELECT now()')).scalar()
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            since = self._incremental_since(exported_at) if incremental else None
+            if since is None:
+                result = self._full(tmp)
+            else:
+                shutil.copyfile(self.path, tmp)
+                result = self._incremental(tmp, since)
+            engine = _open_writer(tmp)
+            try:
+                with engine.begin() as lite:
+                    lite.execute(snapshot_meta.delete())
+                    lite.execute(snapshot_meta.insert(), [
+                        {'key': 'format', 'value': SNAPSHOT_FORMAT},
+                        {'key': 'exported_at', 'value': exported_at.isoformat()},
+                    ])
+                    lite.exec_driver_sql('ANALYZE' if since is None else 'PRAGMA optimize')
+            finally:
+                engine.dispose()
+            with open(tmp, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            self.session.rollback()
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        result.update(path=self.path, exported_at=exported_at.isoformat(),
+                      seconds=round(time.monotonic() - started, 3))
+        return result
+
+    def _incremental_since(self, exported_at: datetime) -> Optional[datetime]:
+        """Where to read article_changes from, or None when a full export is needed."""
+        if not os.path.exists(self.path):
+            return None
+        if self.session.execute(text("SELECT to_regclass('article_changes')")).scalar() is None:
+            logger.warning('article_changes is missing (migration 0012), exporting in full')
+            return None
+        engine = open_engine(self.path)
+        try:
+            meta = read_meta(engine)
+        except Exception:
+            logger.warning('cannot read %s, exporting in full', self.path, exc_info=True)
+            return None
+        finally:
+            engine.dispose()
+        if meta.get('format') != SNAPSHOT_FORMAT or 'exported_at' not in meta:
+            return None
+        since = datetime.fromisoformat(meta['exported_at']) - timedelta(seconds=SNAPSHOT_LOOKBACK_SECONDS)
+        if since < exported_at - CHANGE_LOG_RETENTION:
+            return None
+        return since
+
+    def _full(self, tmp: str) -> Dict:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        engine = _open_writer(tmp)
+        published = select(articles.c.id).where(articles.c.status == 'published')
+        try:
+            with engine.begin() as lite:
+                create_schema(lite)
+                self._copy_small_tables(lite)
+                copied = self._copy(lite, articles, select(articles).where(articles.c.status == 'published'))
+                for link in (article_category, article_tag):
+                    self._copy(lite, link, select(link).where(link.c.article_id.in_(published)))
+                self._copy(lite, article_related, select(article_related).where(
+                    article_related.c.article_id.in_(published), article_related.c.related_id.in_(published)))
+                for ddl in SNAPSHOT_INDEXES:
+                    lite.exec_driver_sql(ddl)
+        finally:
+            engine.dispose()
+        return {'mode': 'full', 'articles': copied}
+
+    def _incremental(self, tmp: str, since: datetime) -> Dict:
+        ids = self.session.execute(
+            text('SELECT DISTINCT article_id FROM article_changes WHERE changed_at >= :since'), {'since': since}
+        ).scalars().all()
+        published = select(articles.c.id).where(articles.c.status == 'published')
+        copied = 0
+        engine = _open_writer(tmp)
+        try:
+            with engine.begin() as lite:
+                self._copy_small_tables(lite)
+                for batch in _chunks(ids):
+                    lite.execute(article_related.delete().where(or_(
+                        article_related.c.article_id.in_(batch), article_related.c.related_id.in_(batch))))
+                    for link in (article_category, article_tag):
+                        lite.execute(link.delete().where(link.c.article_id.in_(batch)))
+                    lite.execute(articles.delete().where(articles.c.id.in_(batch)))
+
+                    changed = published.where(articles.c.id.in_(batch))
+                    copied += self._copy(lite, articles, select(articles).where(
+                        articles.c.id.in_(batch), articles.c.status == 'published'))
+                    for link in (article_category, article_tag):
+                        self._copy(lite, link, select(link).where(link.c.article_id.in_(changed)))
+                    # lists of the changed articles, and mentions of them in other lists
+                    self._copy(lite, article_related, select(article_related).where(
+                        or_(article_related.c.article_id.in_(batch), article_related.c.related_id.in_(batch)),
+                        article_related.c.article_id.in_(published), article_related.c.related_id.in_(published)))
+        finally:
+            engine.dispose()
+        return {'mode': 'incremental', 'changed': len(ids), 'articles': copied}
+
+    def _copy_small_tables(self, lite: Connection) -> None:
+        for table in _SMALL_TABLES:
+            lite.execute(table.delete())
+            self._copy(lite, table, select(table))
+        lite.execute(article_archive_days.delete())
+        self._copy(lite, article_archive_days,
+                   select(article_archive_days).where(article_archive_days.c.articles > 0))
+
+    def _copy(self, lite: Connection, table: Table, query) -> int:
+        """Insert the rows of a Postgres query into the snapshot; returns the count."""
+        tz_columns = [c.name for c in table.c if isinstance(c.type, DateTime) and c.type.timezone]
+        copied = 0
+        result = self.session.execute(query.execution_options(yield_per=_BATCH))
+        for rows in result.partitions():
+            values = [dict(row._mapping) for row in rows]
+            for value in values:
+                for name in tz_columns:
+                    if value[name] is not None:
+                        # SQLite keeps no offset: store UTC, app.snapshot restores it
+                        value[name] = value[name].astimezone(timezone.utc).replace(tzinfo=None)
+            lite.execute(table.insert(), values)
+            copied += len(values)
+        return copied
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Read-only SQLite snapshot for edge and read nodes')
+    parser.add_argument('--out', required=True, help='Snapshot file to write (replaced atomically)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Update the previous snapshot from article_changes when possible')
+    parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (run as a periodic job)')
+    args = parser.parse_args()
+
+    while True:
+        with SessionLocal() as session:
+            result = SnapshotExporter(session, args.out).export(incremental=args.incremental)
+        print(f"Exported {result['mode']} snapshot to {result['path']}: {result['articles']} articles copied "
+              f"in {result['seconds']}s")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
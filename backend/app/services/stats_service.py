@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from typing import Dict, List
+from app.dao.stats_dao import StatsDAO
+from app.models.category import Category
+
+# statuses always present in the dashboard payload, even at zero
+ARTICLE_STATUSES = ('draft', 'scheduled', 'published', 'archived')
+
+
+class StatsService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = StatsDAO(session)
+
+    def dashboard(self) -> Dict:
+        """Admin dashboard counts, read from stat_counters (no COUNT(*) over content tables)."""
+        counters = self.dao.counters()
+        by_status = {status: 0 for status in ARTICLE_STATUSES}
+        for name, value in counters.items():
+            if name.startswith('articles.status.'):
+                by_status[name[len('articles.status.'):]] = value
+        media_by_type = {
+            name[len('media.type.'):]: value
+            for name, value in counters.items() if name.startswith('media.type.')
+        }
+        categories = self.session.query(Category).order_by(Category.order_index).all()
+        return {
+            'articles': {
+                'total': counters.get('articles.total', 0),
+                'by_status': by_status,
+            },
+            'media': {
+                'total': counters.get('media.total', 0),
+                'by_type': media_by_type,
+            },
+            'categories': [
+                {
+                    'id': str(c.id),
+                    'name': c.name,
+                    'slug': c.slug,
+                    'articles': counters.get(f'categories.{c.id}.articles', 0),
+                    'published': counters.get(f'categories.{c.id}.published', 0),
+                }
+                for c in categories
+            ],
+        }
+
+    def reconcile(self) -> List[Dict]:
+        drift = self.dao.reconcile()
+        self.session.commit()
+        return drift
+
+
+def main():
+    import argparse
+    import time
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Dashboard counter maintenance')
+    parser.add_argument('--reconcile', action='store_true', help='Recompute stat_counters from the content tables')
+    parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (run as a periodic job)')
+    args = parser.parse_args()
+
+    if not args.reconcile:
+        parser.print_help()
+        return
+
+    while True:
+        with SessionLocal() as session:
+            drift = StatsService(session).reconcile()
+        for d in drift:
+            print(f"counter drift: {d['name']} stored={d['stored']} actual={d['actual']}")
+        print(f'Reconciled stat counters ({len(drift)} corrected)')
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Article events for the breaking-news stream.
+
+Article writes are turned into a small set of reader-facing events, stored
+in `article_events` and announced with NOTIFY (see EventDAO). The SSE
+server (app.stream) LISTENs for them and fans them out to its clients; the
+event id is the SSE id used for Last-Event-ID resume.
+
+    published          an article became visible (card payload)
+    breaking           a published article is flagged is_breaking (card payload)
+    breaking_cleared   the breaking flag was removed ({id, slug})
+    withdrawn          the article was unpublished or deleted ({id, slug})
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.dao.article_dao import ArticleDAO
+from app.dao.event_dao import EventDAO
+from app.serializers import article_categories, article_summary
+from app.signals import ArticleChange, article_changed, articles_changed
+
+# how long events are kept for resuming clients
+STREAM_RETENTION_HOURS = int(os.getenv('STREAM_RETENTION_HOURS', '24'))
+STREAM_EVENT_KINDS = ('published', 'breaking', 'breaking_cleared', 'withdrawn')
+
+
+def classify(change: ArticleChange) -> Optional[str]:
+    """The stream event for a change, or None if readers need not hear of it."""
+    if change.is_published:
+        if change.is_breaking and not (change.was_published and change.old_is_breaking):
+            return 'breaking'
+        if not change.was_published:
+            return 'published'
+        if change.old_is_breaking and not change.is_breaking:
+            return 'breaking_cleared'
+        return None
+    if change.was_published:
+        return 'withdrawn'
+    return None
+
+
+def stream_card(a) -> Dict:
+    """Card pushed to stream clients: the list summary plus flag and categories."""
+    card = article_summary(a)
+    card['is_breaking'] = bool(a.is_breaking)
+    card['categories'] = article_categories(a)
+    return card
+
+
+class StreamService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = EventDAO(session)
+
+    def record(self, change: ArticleChange) -> Optional[int]:
+        """Store and announce the event for `change`; returns its id."""
+        ids = self.record_all([change])
+        return ids[0] if ids else None
+
+    def record_all(self, changes: List[ArticleChange]) -> List[int]:
+        """Store and announce the events for `changes` in one transaction."""
+        events = [(classify(c), c) for c in changes]
+        events = [(kind, c) for kind, c in events if kind is not None]
+        card_ids = [c.article_id for kind, c in events if kind in ('published', 'breaking')]
+        articles = {a.id: a for a in ArticleDAO(self.session).published(card_ids)} if card_ids else {}
+        event_ids = []
+        for kind, change in events:
+            if kind in ('published', 'breaking'):
+                article = articles.get(change.article_id)
+                if article is None:
+                    continue
+                payload = stream_card(article)
+            else:
+                payload = {'id': str(change.article_id), 'slug': change.old_slug or change.slug}
+            event_ids.append(self.dao.record(kind, change.article_id, payload))
+        self.session.commit()
+        return event_ids
+
+    def since(self, last_id: int, limit: int = 500) -> List[Dict]:
+        not_before = datetime.now(timezone.utc) - timedelta(hours=STREAM_RETENTION_HOURS)
+        return self.dao.since(last_id, limit, not_before)
+
+    def by_ids(self, ids: List[int]) -> List[Dict]:
+        return self.dao.by_ids(ids)
+
+    def last_id(self) -> int:
+        return self.dao.last_id()
+
+    def prune(self) -> int:
+        removed = self.dao.prune(datetime.now(timezone.utc) - timedelta(hours=STREAM_RETENTION_HOURS))
+        self.session.commit()
+        return removed
+
+
+@article_changed.connect
+def on_article_changed(sender, change: ArticleChange):
+    if classify(change) is None:
+        return
+    from app.config.session import SessionLocal
+    with SessionLocal() as session:
+        StreamService(session).record(change)
+
+
+@articles_changed.connect
+def on_articles_changed(sender, changes: List[ArticleChange]):
+    changes = [c for c in changes if classify(c) is not None]
+    if not changes:
+        return
+    from app.config.session import SessionLocal
+    with SessionLocal() as session:
+        StreamService(session).record_all(changes)
@@ -1,9 +1,14 @@
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.dao.tag_dao import TagDAO
 from app.models.tag import Tag
+from app.signals import TaxonomyChange, tag_changed, send_safely
 from uuid import UUID
 
+TAG_ORDERS = ('name', 'popular')
+TAGS_MAX_LIMIT = 500
+
 
 class TagService:
     def __init__(self, session: Session):
@@ -13,19 +18,62 @@ class TagService:
     def get(self, tag_id: UUID) -> Optional[Tag]:
         return self.dao.get(tag_id)
 
-    def list(self, limit: int = 100, offset: int = 0) -> List[Tag]:
-        return self.dao.list(limit=limit, offset=offset)
+    def list(self, limit: int = 100, offset: int = 0, prefix: str = None, order: str = 'name') -> List[Tag]:
+        return self.dao.list(limit=limit, offset=offset, prefix=prefix, popular=order == 'popular')
+
+    def reconcile_counts(self) -> List[Dict]:
+        drift = self.dao.reconcile_counts()
+        self.session.commit()
+        return drift
+
+    def _notify(self, change: TaxonomyChange) -> None:
+        send_safely(tag_changed, self.__class__, change=change)
 
     def create(self, tag: Tag) -> Tag:
         created = self.dao.create(tag)
         self.session.commit()
+        self._notify(TaxonomyChange('created', created.id, slug=created.slug))
         return created
 
     def update(self, tag: Tag) -> Tag:
+        history = inspect(tag).attrs.slug.history
+        old_slug = history.deleted[0] if history.deleted else tag.slug
         updated = self.dao.update(tag)
         self.session.commit()
+        self._notify(TaxonomyChange(
+            'updated', updated.id, slug=updated.slug, old_slug=old_slug,
+            article_ids=set(self.dao.published_article_ids(updated.id)),
+        ))
         return updated
 
     def delete(self, tag: Tag) -> None:
+        change = TaxonomyChange(
+            'deleted', tag.id, old_slug=tag.slug,
+            article_ids=set(self.dao.published_article_ids(tag.id)),
+        )
         self.dao.delete(tag)
         self.session.commit()
+        self._notify(change)
+
+
+def main():
+    import argparse
+    from app.config.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description='Tag maintenance')
+    parser.add_argument('--reconcile', action='store_true', help='Recompute tags.article_count from article_tag')
+    args = parser.parse_args()
+
+    if not args.reconcile:
+        parser.print_help()
+        return
+
+    with SessionLocal() as session:
+        drift = TagService(session).reconcile_counts()
+    for d in drift:
+        print(f"tag count drift: {d['id']} stored={d['stored']} actual={d['actual']}")
+    print(f'Reconciled tag counts ({len(drift)} corrected)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Resumable chunked uploads.
+
+Protocol (all under /api/media/uploads, admin only):
+
+  POST   /uploads                 {file_name, size, mime_type?, alt_text?, ...} -> {id, offset: 0}
+  HEAD   /uploads/<id>            Upload-Offset: bytes received so far
+  PATCH  /uploads/<id>            Upload-Offset: <n>, body = the next chunk  -> 204, Upload-Offset
+  POST   /uploads/<id>/complete   -> 201, the created media asset
+  DELETE /uploads/<id>            abandon the upload
+
+Chunks are appended to <UPLOAD_TMP_DIR>/<id>.part straight from the request
+stream, so a request never holds more than one read buffer in memory and the
+part file itself is the resume point: after a dropped connection the client
+asks for the offset and sends the rest. Upload metadata sits next to it in
+<id>.json, which makes the state visible to every worker on the node.
+Completing hands the part file to the media storage (app/storage.py): on local
+storage that is an atomic rename into the upload tree, on S3 a multipart
+upload. Abandoned uploads are pruned after UPLOAD_EXPIRE_HOURS.
+"""
+import json
+import os
+import re
+import time
+import uuid
+from typing import BinaryIO, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; appends are then unguarded
+    fcntl = None
+
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(2 * 1024 ** 3)))
+MAX_CHUNK_SIZE = int(os.getenv('MAX_CHUNK_SIZE', str(8 * 1024 ** 2)))
+UPLOAD_EXPIRE_HOURS = float(os.getenv('UPLOAD_EXPIRE_HOURS', '24'))
+COPY_BUFFER = 64 * 1024
+_META_FIELDS = ('file_name', 'size', 'mime_type', 'alt_text', 'caption', 'credit')
+_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadNotFound(LookupError):
+    pass
+
+
+class OffsetMismatch(ValueError):
+    """The chunk does not start where the stored data ends (or another request is writing)."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadStore:
+    def __init__(self, tmp_dir: str):
+        self.tmp_dir = tmp_dir
+
+    def _path(self, upload_id: str, ext: str) -> str:
+        if not _ID.match(upload_id or ''):
+            raise UploadNotFound(upload_id)
+        return os.path.join(self.tmp_dir, f'{upload_id}.{ext}')
+
+    def _write_meta(self, upload_id: str, meta: dict) -> None:
+        path = self._path(upload_id, 'json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    def get(self, upload_id: str) -> Dict:
+        """Upload metadata plus the current `offset`; raises UploadNotFound."""
+        try:
+            with open(self._path(upload_id, 'json')) as f:
+                meta = json.load(f)
+            meta['offset'] = os.path.getsize(self._path(upload_id, 'part'))
+        except (FileNotFoundError, ValueError):
+            raise UploadNotFound(upload_id)
+        meta['id'] = upload_id
+        return meta
+
+    def init(self, file_name: str, size: int, **meta) -> Dict:
+        if not file_name:
+            raise ValueError('file_name is required')
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError('size must be a positive integer')
+        if size > MAX_UPLOAD_SIZE:
+            raise ValueError(f'size exceeds the {MAX_UPLOAD_SIZE} byte limit')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.prune()
+        upload_id = uuid.uuid4().hex
+        open(self._path(upload_id, 'part'), 'xb').close()
+        record = {k: v for k, v in dict(meta, file_name=file_name, size=size).items() if k in _META_FIELDS}
+        record['created'] = time.time()
+        self._write_meta(upload_id, record)
+        return self.get(upload_id)
+
+    def append(self, upload_id: str, offset: int, stream: BinaryIO, length: int) -> int:
+        """Append `length` bytes from `stream` at `offset`; returns the new offset.
+
+        A client that disconnects mid-chunk leaves what was received; the next
+        HEAD reports it and the client resumes from there.
+        """
+        meta = self.get(upload_id)
+        if length > MAX_CHUNK_SIZE:
+            raise ValueError(f'chunks are limited to {MAX_CHUNK_SIZE} bytes')
+        with open(self._path(upload_id, 'part'), 'ab') as f:
+            if fcntl:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise OffsetMismatch('another chunk is being written', meta['offset'])
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise OffsetMismatch(f'expected offset {current}', current)
+            if current + length > meta['size']:
+                raise ValueError('chunk runs past the declared size')
+            remaining = length
+            while remaining:
+                block = stream.read(min(COPY_BUFFER, remaining))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+            f.flush()
+            return current + length - remaining
+
+    def part_path(self, upload_id: str) -> str:
+        return self._path(upload_id, 'part')
+
+    def complete(self, upload_id: str, storage, key: str) -> Dict:
+        """Hand the finished file to `storage` under `key` (on local storage an
+        atomic rename); returns the metadata with the stored `url`."""
+        meta = self.get(upload_id)
+        if meta['offset'] != meta['size']:
+            raise OffsetMismatch(f"upload incomplete: {meta['offset']} of {meta['size']} bytes", meta['offset'])
+        meta['url'] = storage.save_file(self._path(upload_id, 'part'), key, meta.get('mime_type'))
+        os.remove(self._path(upload_id, 'json'))
+        return meta
+
+    def abort(self, upload_id: str) -> None:
+        for ext in ('part', 'json'):
+            try:
+                os.remove(self._path(upload_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_age_hours: Optional[float] = None) -> int:
+        """Remove uploads not touched for `max_age_hours`; returns how many."""
+        cutoff = time.time() - 3600 * (UPLOAD_EXPIRE_HOURS if max_age_hours is None else max_age_hours)
+        removed = 0
+        try:
+            names = os.listdir(self.tmp_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.part' or not _ID.match(upload_id):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.tmp_dir, name)) < cutoff:
+                    self.abort(upload_id)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
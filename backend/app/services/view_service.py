@@ -0,0 +1,178 @@
+"""Buffered page-view counting and trending / most-read lists.
+
+Each worker process aggregates views in memory, keyed by (slug, hour), and a
+background thread flushes the whole buffer in one statement every
+VIEW_FLUSH_INTERVAL seconds. Postgres therefore sees at most one write per
+worker per interval however hot an article gets, and no row of `articles` is
+ever updated for a view. Views still buffered when a worker is killed hard
+are lost; that is the price of not writing per request.
+
+Trending lists are computed from the hourly buckets and cached per worker
+for TRENDING_TTL seconds.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.dao.view_dao import ViewDAO
+from app.serializers import article_summary
+
+logger = logging.getLogger(__name__)
+
+VIEW_FLUSH_INTERVAL = float(os.getenv('VIEW_FLUSH_INTERVAL', '10'))
+# distinct (slug, hour) keys buffered per worker; beyond this new keys are dropped
+VIEW_MAX_KEYS = int(os.getenv('VIEW_MAX_KEYS', '20000'))
+VIEW_RETENTION_HOURS = int(os.getenv('VIEW_RETENTION_HOURS', str(7 * 24)))
+VIEW_PRUNE_INTERVAL = 3600
+
+TRENDING_TTL = float(os.getenv('TRENDING_TTL', '60'))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', '6'))
+TRENDING_MAX_LIMIT = 50
+TRENDING_SORTS = ('trending', 'most_read')
+
+
+def _bucket(now: datetime) -> datetime:
+    return now.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class ViewCounter:
+    def __init__(self, session_factory=None, interval: float = VIEW_FLUSH_INTERVAL,
+                 max_keys: int = VIEW_MAX_KEYS):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.max_keys = max_keys
+        self._counts: Dict[Tuple[str, datetime], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._stop = threading.Event()
+        self._last_prune = 0.0
+        self.dropped = 0
+
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.config.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def record(self, slug: str, now: datetime = None) -> bool:
+        """Count one view; returns False if the buffer is full and it was dropped."""
+        key = (slug, _bucket(now or datetime.now(timezone.utc)))
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.max_keys:
+                self.dropped += 1
+                return False
+            self._counts[key] = self._counts.get(key, 0) + 1
+        self._ensure_flusher()
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def _drain(self) -> Dict[Tuple[str, datetime], int]:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+    def _restore(self, counts: Dict[Tuple[str, datetime], int]) -> None:
+        # put back a batch that failed to flush, within the buffer limit
+        with self._lock:
+            for key, n in counts.items():
+                if key in self._counts or len(self._counts) < self.max_keys:
+                    self._counts[key] = self._counts.get(key, 0) + n
+                else:
+                    self.dropped += n
+
+    def flush(self) -> int:
+        """Write buffered counts in one statement; returns views written."""
+        with self._flush_lock:
+            counts = self._drain()
+            if not counts:
+                return 0
+            rows = [(slug, bucket, n) for (slug, bucket), n in counts.items()]
+            try:
+                with self.session_factory()() as session:
+                    dao = ViewDAO(session)
+                    dao.flush(rows)
+                    if time.monotonic() - self._last_prune > VIEW_PRUNE_INTERVAL:
+                        dao.prune(datetime.now(timezone.utc) - timedelta(hours=VIEW_RETENTION_HOURS))
+                        self._last_prune = time.monotonic()
+                    session.commit()
+            except Exception:
+                logger.exception('view flush failed; keeping %d keys for the next attempt', len(counts))
+                self._restore(counts)
+                return 0
+            return sum(counts.values())
+
+    def _ensure_flusher(self) -> None:
+        # one flusher thread per process; re-created after a fork
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            thread = threading.Thread(target=self._run, name='view-flusher', daemon=True)
+            thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        stop = self._stop
+        while not stop.wait(self.interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+# per-process buffer used by the controllers
+views = ViewCounter()
+
+_trending_cache: Dict[tuple, Tuple[float, List[Dict]]] = {}
+_trending_lock = threading.Lock()
+
+
+class TrendingService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.dao = ViewDAO(session)
+
+    def top(self, sort: str = 'trending', hours: int = 24, limit: int = 10) -> List[Dict]:
+        """Serialized top-N articles, cached per worker for TRENDING_TTL seconds."""
+        key = (sort, hours, limit)
+        hit = _trending_cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        with _trending_lock:
+            hit = _trending_cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+            payload = self._compute(sort, hours, limit)
+            _trending_cache[key] = (time.monotonic() + TRENDING_TTL, payload)
+            return payload
+
+    def _compute(self, sort: str, hours: int, limit: int) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        half_life = TRENDING_HALF_LIFE_HOURS if sort == 'trending' else None
+        # fetch spare rows in case some were unpublished since they were counted
+        scores = self.dao.top(_bucket(now) - timedelta(hours=hours - 1), now, limit * 2, half_life)
+        score_by_id = dict(scores)
+        result = []
+        for a in self.dao.articles([article_id for article_id, _ in scores])[:limit]:
+            item = article_summary(a)
+            if sort == 'trending':
+                item['score'] = round(score_by_id[a.id], 3)
+            else:
+                item['views'] = int(score_by_id[a.id])
+            result.append(item)
+        return result
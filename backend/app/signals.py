@@ -0,0 +1,107 @@
+"""In-process signals emitted by services after a write has been committed.
+
+Receivers (feed cache, etc.) connect at import time:
+
+    from app.signals import article_changed
+
+    @article_changed.connect
+    def on_article_changed(sender, change):
+        ...
+
+Signals use blinker, which Flask already depends on.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Set
+from uuid import UUID
+
+from blinker import Namespace
+
+from app import deadlines
+
+logger = logging.getLogger(__name__)
+
+_signals = Namespace()
+
+# sent with change=ArticleChange after an article is created, updated or deleted
+article_changed = _signals.signal('article-changed')
+# sent once with changes=[ArticleChange, ...] after a bulk write touching many articles
+articles_changed = _signals.signal('articles-changed')
+# sent with change=TaxonomyChange after a category / tag is created, updated or deleted
+category_changed = _signals.signal('category-changed')
+tag_changed = _signals.signal('tag-changed')
+
+
+@dataclass
+class ArticleChange:
+    """Before/after view of the article fields that derived data depends on.
+
+    `old_*` fields describe the committed state before the write (None for a
+    create); the plain fields describe the state after it (None for a delete).
+    """
+    action: str  # 'created' | 'updated' | 'deleted'
+    article_id: UUID
+    slug: Optional[str] = None
+    status: Optional[str] = None
+    published_at: Optional[datetime] = None
+    is_breaking: bool = False
+    primary_category_id: Optional[UUID] = None
+    category_ids: Set[UUID] = field(default_factory=set)
+    tag_ids: Set[UUID] = field(default_factory=set)
+    old_slug: Optional[str] = None
+    old_status: Optional[str] = None
+    old_published_at: Optional[datetime] = None
+    old_is_breaking: bool = False
+    old_primary_category_id: Optional[UUID] = None
+    old_category_ids: Set[UUID] = field(default_factory=set)
+    old_tag_ids: Set[UUID] = field(default_factory=set)
+
+    @property
+    def was_published(self) -> bool:
+        return self.old_status == 'published'
+
+    @property
+    def is_published(self) -> bool:
+        return self.action != 'deleted' and self.status == 'published'
+
+    @property
+    def affects_public(self) -> bool:
+        """True if the change is visible to readers (before or after)."""
+        return self.was_published or self.is_published
+
+    @property
+    def listed_category_ids(self) -> Set[UUID]:
+        """Categories listing the article before or after the write: its primary
+        category and those linked through article_category (as list_query does)."""
+        primary = {self.old_primary_category_id, self.primary_category_id} - {None}
+        return self.old_category_ids | self.category_ids | primary
+
+
+@dataclass
+class TaxonomyChange:
+    """A category or tag write that changes what readers see.
+
+    `article_ids` lists the published articles linked to the category/tag
+    before the write, so receivers can refresh them after a delete.
+    """
+    action: str  # 'created' | 'updated' | 'deleted'
+    id: UUID
+    slug: Optional[str] = None
+    old_slug: Optional[str] = None
+    article_ids: Set[UUID] = field(default_factory=set)
+
+
+def send_safely(signal, sender, **kwargs):
+    """Send a signal, logging (not raising) receiver errors.
+
+    Signals fire after commit; a failing cache receiver must not turn a
+    successful write into an error response. Receivers run outside the
+    request's query deadline (app.deadlines), which is meant for the write.
+    """
+    with deadlines.suspended():
+        for receiver in signal.receivers_for(sender):
+            try:
+                receiver(sender, **kwargs)
+            except Exception:
+                logger.exception('signal receiver %r failed for %s', receiver, signal.name)
@@ -0,0 +1,202 @@
+"""Slow-query recorder.
+
+Every statement that runs longer than SLOW_QUERY_MS (default 250; 0
+disables the recorder) is captured with the following:
+
+  - its SQL and bound parameters, trimmed, with parameters withheld for
+    statements that touch passwords;
+  - the Flask endpoint, method, path and request id (X-Request-ID from nginx,
+    or one generated here; it is echoed on the response);
+  - how long it ran, and the error if it failed. Statements cancelled by the
+    request's deadline (app.deadlines) are recorded too, since they are the
+    slowest of all.
+
+Records go to a per-worker ring of the last SLOW_QUERY_RING entries, which
+admins read at GET /api/admin/slow-queries, and to this module's logger as
+one JSON line each.
+
+A fraction (SLOW_QUERY_EXPLAIN_SAMPLE, default 0.1) of slow SELECTs on
+Postgres also get `EXPLAIN (ANALYZE, BUFFERS)`. It runs afterwards on a
+background thread and on its own pooled connection, so the request that was
+already slow doesn't wait for it. Each EXPLAIN is capped at
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS and rolled back. Its plan is added to the
+record and logged. Writes are never explained: ANALYZE would run them again.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '250'))
+SLOW_QUERY_RING = int(os.getenv('SLOW_QUERY_RING', '200'))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE', '0.1'))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', '10000'))
+MAX_STATEMENT_CHARS = 4000
+MAX_PARAMETER_CHARS = 200
+# explains waiting for the background thread; more are dropped
+_EXPLAIN_BACKLOG = 8
+
+_READ_ONLY = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_WRITES = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE)\b|\bFOR\s+(UPDATE|SHARE|NO KEY UPDATE)\b|\bnextval\s*\(',
+                     re.IGNORECASE)
+_SECRET = re.compile(r'password', re.IGNORECASE)
+
+ring: deque = deque(maxlen=SLOW_QUERY_RING)
+stats = {'recorded': 0, 'explained': 0, 'explain_dropped': 0}
+_explains: queue.Queue = queue.Queue(maxsize=_EXPLAIN_BACKLOG)
+_explainer: Optional[threading.Thread] = None
+_explainer_lock = threading.Lock()
+
+
+def request_id() -> Optional[str]:
+    return g.get('request_id') if has_request_context() else None
+
+
+def _trim(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<{len(value)} bytes>'
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_PARAMETER_CHARS else text[:MAX_PARAMETER_CHARS] + '...'
+
+
+def _parameters(statement: str, parameters):
+    if _SECRET.search(statement):
+        return '<withheld>'
+    if isinstance(parameters, dict):
+        return {k: _trim(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):  # executemany
+            return {'rows': len(parameters), 'first': _parameters(statement, parameters[0])}
+        return [_trim(v) for v in parameters]
+    return _trim(parameters)
+
+
+def explainable(statement: str) -> bool:
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+def record(statement: str, parameters, seconds: float, dialect: str, error: str = None) -> Dict:
+    entry = {
+        'at': time.time(),
+        'ms': round(seconds * 1000, 1),
+        'statement': statement[:MAX_STATEMENT_CHARS],
+        'parameters': _parameters(statement, parameters),
+        'dialect': dialect,
+        'pid': os.getpid(),
+        'error': error,
+        'explain': None,
+    }
+    if has_request_context():
+        entry.update(request_id=request_id(), endpoint=request.endpoint, method=request.method, path=request.path)
+    ring.append(entry)
+    stats['recorded'] += 1
+    logger.warning('slow query %s', json.dumps(entry, default=str))
+    return entry
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('slowlog_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('slowlog_started')
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    if seconds * 1000 < SLOW_QUERY_MS or conn.get_execution_options().get('slowlog') is False:
+        return
+    entry = record(statement, parameters, seconds, conn.dialect.name)
+    if (conn.dialect.name == 'postgresql' and not executemany and explainable(statement)
+            and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE):
+        _queue_explain(conn.engine, entry, statement, parameters)
+
+
+def _handle_error(context):
+    conn = context.connection
+    started = conn.info.get('slowlog_started') if conn is not None else None
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    if seconds * 1000 >= SLOW_QUERY_MS and context.statement:
+        error = str(context.original_exception).strip().splitlines()
+        record(context.statement, context.parameters, seconds, conn.dialect.name, error[0] if error else 'error')
+
+
+def _queue_explain(engine: Engine, entry: Dict, statement: str, parameters) -> None:
+    global _explainer
+    try:
+        _explains.put_nowait((engine, entry, statement, parameters))
+    except queue.Full:
+        stats['explain_dropped'] += 1
+        return
+    if _explainer is None or not _explainer.is_alive():
+        with _explainer_lock:
+            if _explainer is None or not _explainer.is_alive():
+                _explainer = threading.Thread(target=_explain_loop, name='slowlog-explain', daemon=True)
+                _explainer.start()
+
+
+def explain(engine: Engine, statement: str, parameters) -> str:
+    """EXPLAIN (ANALYZE, BUFFERS) of a read statement, rolled back.
+
+    Runs in a read-only transaction: a SELECT that calls a function with side
+    effects (locks, writes) fails instead of repeating them.
+    """
+    with engine.connect().execution_options(slowlog=False) as conn:
+        with conn.begin() as tx:
+            conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+            conn.exec_driver_sql(f'SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}')
+            rows = conn.exec_driver_sql('EXPLAIN (ANALYZE, BUFFERS) ' + statement, parameters).all()
+            tx.rollback()
+    return '\n'.join(r[0] for r in rows)
+
+
+def _explain_loop():
+    while True:
+        engine, entry, statement, parameters = _explains.get()
+        try:
+            entry['explain'] = explain(engine, statement, parameters)
+            stats['explained'] += 1
+            logger.info('slow query plan (%s, request %s):\n%s', entry.get('endpoint'), entry.get('request_id'),
+                        entry['explain'])
+        except Exception as exc:
+            entry['explain'] = f'explain failed: {str(exc).strip().splitlines()[0] if str(exc).strip() else exc!r}'
+
+
+def recent(limit: int = 50, endpoint: str = None) -> List[Dict]:
+    """Newest slow queries of this worker first."""
+    entries = [e for e in reversed(ring) if endpoint is None or e.get('endpoint') == endpoint]
+    return entries[:limit]
+
+
+def before_request():
+    g.request_id = (request.headers.get('X-Request-ID') or '')[:64] or uuid.uuid4().hex
+
+
+def after_request(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def init_app(app: Flask) -> None:
+    app.before_request(before_request)
+    app.after_request(after_request)
+    if SLOW_QUERY_MS <= 0 or event.contains(Engine, 'after_cursor_execute', _after_cursor_execute):
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
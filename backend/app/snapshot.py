@@ -0,0 +1,177 @@
+"""Read-only SQLite snapshot serving the public read endpoints.
+
+An edge or read-only node sets READ_SNAPSHOT to the path of a snapshot file
+written by app.services.snapshot_service. It holds the published articles,
+categories, tags, homepage sections and the date archive. The public GET
+views open their sessions with ReadSession() (via
+app.controllers.decorators.read_session), so the unchanged DAOs run against
+the local file. Admin requests, writes, view beacons, trending and the
+feeds stay on Postgres.
+
+The exporter replaces the file with an atomic rename. Each worker checks the
+file's identity at most every SNAPSHOT_CHECK_SECONDS. When it changes, the
+worker opens the new file on a fresh engine and drops the old one. Sessions
+already running finish on the old file: it stays readable through their
+open descriptors. The file is opened read-only and immutable and is read
+through mmap (SNAPSHOT_MMAP_BYTES), so readers take no locks and share the
+page cache. Until the file first appears, reads go to Postgres.
+
+SQLite keeps no time zones. The exporter stores timestamps in UTC, and
+objects loaded from a snapshot get UTC tzinfo back on their timestamp
+columns. The serializers therefore produce the same output either way.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, create_engine, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config.session import SessionLocal, track
+from app.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+READ_SNAPSHOT = os.getenv('READ_SNAPSHOT', '')
+SNAPSHOT_CHECK_SECONDS = float(os.getenv('SNAPSHOT_CHECK_SECONDS', '1'))
+SNAPSHOT_MMAP_BYTES = int(os.getenv('SNAPSHOT_MMAP_BYTES', str(1 << 30)))
+
+# export bookkeeping inside the snapshot file (key -> text value)
+snapshot_metadata = MetaData()
+snapshot_meta = Table(
+    'snapshot_meta', snapshot_metadata,
+    Column('key', String(64), primary_key=True),
+    Column('value', String(255), nullable=False),
+)
+
+
+def open_engine(path: str) -> Engine:
+    """Read-only engine on a snapshot file."""
+    engine = create_engine(f'sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&immutable=1&uri=true',
+                           connect_args={'check_same_thread': False})
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        dbapi_connection.execute(f'PRAGMA mmap_size = {SNAPSHOT_MMAP_BYTES}')
+        dbapi_connection.execute('PRAGMA query_only = 1')
+
+    return engine
+
+
+def read_meta(engine: Engine) -> Dict[str, str]:
+    with engine.connect() as conn:
+        return dict(conn.execute(select(snapshot_meta.c.key, snapshot_meta.c.value)).all())
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class Snapshot:
+    """The current snapshot file of this worker, reopened when it is replaced."""
+
+    def __init__(self, path: str, check_seconds: float = SNAPSHOT_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._factory = None
+        self._file_id = None
+        self._checked = 0.0
+        self.meta: Dict[str, str] = {}
+        self.loaded_at: Optional[float] = None
+        self.swaps = 0
+
+    def session(self) -> Optional[Session]:
+        """A session on the current file, or None when there is none yet."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_seconds:
+            self._checked = now
+            file_id = _file_id(self.path)
+            if file_id is not None and file_id != self._file_id:
+                self._swap(file_id)
+        factory = self._factory
+        return track(factory()) if factory is not None else None
+
+    def _swap(self, file_id) -> None:
+        with self._lock:
+            if file_id == self._file_id:
+                return
+            engine = open_engine(self.path)
+            try:
+                meta = read_meta(engine)
+            except Exception:
+                # half-copied by hand, or not a snapshot: keep serving the current one
+                logger.exception('snapshot %s is not readable, keeping the current one', self.path)
+                engine.dispose()
+                self._file_id = file_id
+                return
+            old = self._engine
+            self._engine = engine
+            self._factory = sessionmaker(bind=engine, autoflush=False, info={'snapshot': True})
+            self._file_id = file_id
+            self.meta = meta
+            self.loaded_at = time.time()
+            self.swaps += 1
+        logger.info('read snapshot %s exported at %s', self.path, meta.get('exported_at'))
+        if old is not None:
+            old.dispose()
+            from app.cache import ALL, response_cache
+            if response_cache is not None:
+                response_cache.invalidate([ALL])
+
+    def status(self) -> Dict:
+        return {
+            'path': self.path,
+            'exported_at': self.meta.get('exported_at'),
+            'loaded_at': self.loaded_at,
+            'swaps': self.swaps,
+        }
+
+
+snapshot = Snapshot(READ_SNAPSHOT) if READ_SNAPSHOT else None
+
+
+def ReadSession() -> Session:
+    """Session for public reads: on the snapshot when this node has one,
+    otherwise (or until the first file arrives) on Postgres."""
+    if snapshot is not None:
+        session = snapshot.session()
+        if session is not None:
+            return session
+    return SessionLocal()
+
+
+def status() -> Optional[Dict]:
+    return snapshot.status() if snapshot is not None else None
+
+
+_tz_columns: Dict[type, Tuple[str, ...]] = {}
+
+
+@event.listens_for(Base, 'load', propagate=True)
+def _restore_utc(target, context):
+    if not context.session.info.get('snapshot'):
+        return
+    cls = type(target)
+    keys = _tz_columns.get(cls)
+    if keys is None:
+        keys = _tz_columns[cls] = tuple(
+            attr.key for attr in target.__mapper__.column_attrs
+            if isinstance(attr.columns[0].type, DateTime) and attr.columns[0].type.timezone
+        )
+    state = target.__dict__
+    for key in keys:
+        value = state.get(key)
+        if value is not None and value.tzinfo is None:
+            set_committed_value(target, key, value.replace(tzinfo=timezone.utc))
@@ -0,0 +1,156 @@
+"""Worker warmup and a cold-start benchmark.
+
+A fresh worker pays for its first requests: opening pool connections,
+SQLAlchemy compiling statements, per-worker caches (trending lists) being
+empty. With WARMUP=1 the gunicorn config (gunicorn.conf.py) runs warmup() in
+each worker before it accepts traffic:
+
+  1. pre-connect the pool (WARMUP_POOL connections, default the pool size)
+  2. preload taxonomy: the category list and each category's homepage list
+  3. prime hot caches by requesting WARMUP_PATHS through the app itself,
+     which also fills the node's shared response cache
+
+Every step is best effort; a failure is logged and the worker starts anyway.
+
+Measure cold start (fresh interpreter: import + create_app) with:
+
+    python -m app.startup --bench [--runs 10] [--warmup]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP = os.getenv('WARMUP', '').lower() in ('1', 'true', 'yes')
+WARMUP_POOL = int(os.getenv('WARMUP_POOL', '0'))
+# the URLs the homepage requests, spelled exactly as the frontend does so the
+# response cache entries they create are the ones readers hit
+DEFAULT_WARMUP_PATHS = (
+    '/api/articles/?limit=50&offset=0&status=published',
+    '/api/articles/?limit=5&offset=0&is_highlight=1&status=published',
+    '/api/articles/?limit=5&offset=0&status=published',
+    '/api/articles/trending?sort=most_read&hours=24&limit=5',
+    '/api/tags/',
+)
+WARMUP_PATHS = tuple(p for p in os.getenv('WARMUP_PATHS', '').split(',') if p) or DEFAULT_WARMUP_PATHS
+CATEGORY_LIST_PATH = '/api/articles/?limit=6&offset=0&category={slug}&status=published'
+
+
+def preconnect(count: int = 0) -> int:
+    """Open `count` pooled connections (default: the pool size) and return them to the pool."""
+    from app.config.session import get_db_engine
+
+    engine = get_db_engine()
+    count = count or getattr(engine.pool, 'size', lambda: 1)()
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+def _get(client, path: str):
+    response = client.get(path)
+    if response.status_code != 200:
+        logger.warning('warmup: GET %s returned %s', path, response.status_code)
+    return response
+
+
+def warmup(app, pool: int = WARMUP_POOL, paths=WARMUP_PATHS) -> Dict[str, float]:
+    """Warm this process; returns seconds spent per step."""
+    timings = {}
+    client = app.test_client()
+
+    started = time.perf_counter()
+    try:
+        preconnect(pool)
+    except Exception:
+        logger.exception('warmup: pre-connecting the pool failed')
+    timings['pool'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        categories = _get(client, '/api/categories/').get_json() or []
+        for category in categories:
+            _get(client, CATEGORY_LIST_PATH.format(slug=category['slug']))
+    except Exception:
+        logger.exception('warmup: preloading taxonomy failed')
+    timings['taxonomy'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for path in paths:
+        try:
+            _get(client, path)
+        except Exception:
+            logger.exception('warmup: GET %s failed', path)
+    timings['paths'] = time.perf_counter() - started
+
+    logger.info('worker %d warmed up in %.2fs (%s)', os.getpid(), sum(timings.values()),
+                ', '.join(f'{step} {seconds:.2f}s' for step, seconds in timings.items()))
+    return timings
+
+
+# --- benchmark ------------------------------------------------------------
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import run
+t1 = time.perf_counter()
+app = run.app
+t2 = time.perf_counter()
+result = {'import': t1 - t0, 'create_app': t2 - t1,
+          'engine_created': sys.modules['app.config.session'].engine_created(),
+          'pillow_loaded': 'PIL.Image' in sys.modules}
+if %(warmup)r:
+    from app.startup import warmup
+    result['warmup'] = sum(warmup(app).values())
+print(json.dumps(result))
+"""
+
+
+def bench(runs: int = 5, with_warmup: bool = False, cwd: Optional[str] = None) -> List[Dict]:
+    """Start `runs` fresh interpreters and time import, create_app and (optionally) warmup."""
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', _PROBE % {'warmup': with_warmup}], cwd=cwd,
+                             check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        result['process'] = time.perf_counter() - started
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Worker warmup / cold-start benchmark')
+    parser.add_argument('--bench', action='store_true', help='Time cold starts in fresh interpreters')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warmup', action='store_true', help='Include warmup() (needs the database)')
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return
+    results = bench(args.runs, args.warmup)
+    for key in ('process', 'import', 'create_app', 'warmup'):
+        values = [r[key] for r in results if key in r]
+        if values:
+            print(f'{key:<11} median {statistics.median(values) * 1000:7.1f} ms   '
+                  f'min {min(values) * 1000:7.1f} ms   max {max(values) * 1000:7.1f} ms')
+    print(f"engine created at import: {results[0]['engine_created']}   "
+          f"Pillow loaded at import: {results[0]['pillow_loaded']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""Where uploaded media bytes live.
+
+MEDIA_STORAGE selects the driver:
+
+  local (default)  files under UPLOAD_DIR, served by Flask/nginx at /static/uploads/
+  s3               an S3-compatible bucket (AWS S3, MinIO, ...):
+                     S3_BUCKET, S3_ENDPOINT_URL (MinIO: http://minio:9000), S3_REGION,
+                     S3_PUBLIC_URL (base URL readers fetch objects from; defaults to
+                     <endpoint>/<bucket>), credentials from the usual AWS_* variables
+
+Both drivers address objects by key (`2025/10/photo.jpg`) and store the public
+URL on the MediaAsset. With s3 the app servers keep no media on disk: server
+side uploads go to the bucket as parallel multipart uploads, and editors can
+upload straight to the bucket through presigned URLs (see presign_upload), so
+the upload bytes never pass through a gunicorn worker.
+"""
+import os
+import shutil
+from typing import BinaryIO, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 'local').lower()
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', None) or os.path.join(BACKEND_DIR, 'static', 'uploads')
+LOCAL_URL_PREFIX = '/static/uploads/'
+
+S3_BUCKET = os.getenv('S3_BUCKET', 'lankalive-media')
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL') or None
+S3_REGION = os.getenv('S3_REGION') or None
+S3_PUBLIC_URL = os.getenv('S3_PUBLIC_URL') or None
+# multipart part size and parallelism for server-side and presigned uploads
+S3_PART_SIZE = int(os.getenv('S3_PART_SIZE', str(16 * 1024 ** 2)))
+# S3's limit on parts per multipart upload
+S3_MAX_PARTS = 10000
+S3_MAX_CONCURRENCY = int(os.getenv('S3_MAX_CONCURRENCY', '8'))
+PRESIGN_EXPIRES = int(os.getenv('PRESIGN_EXPIRES', '3600'))
+
+
+class LocalStorage:
+    name = 'local'
+
+    def __init__(self, root: str = UPLOAD_DIR, url_prefix: str = LOCAL_URL_PREFIX):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'invalid key {key!r}')
+        return path
+
+    def url(self, key: str) -> str:
+        return self.url_prefix + key
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        return url[len(self.url_prefix):] if url and url.startswith(self.url_prefix) else None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def save(self, key: str, fileobj: BinaryIO, content_type: str = None) -> str:
+        """Write a stream under `key`; returns its URL."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            shutil.copyfileobj(fileobj, f, 64 * 1024)
+        os.replace(path + '.tmp', path)
+        return self.url(key)
+
+    def save_file(self, src_path: str, key: str, content_type: str = None) -> str:
+        """Move a finished local file to `key` (an atomic rename on one filesystem)."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(src_path, path)
+        except OSError:
+            shutil.move(src_path, path)
+        return self.url(key)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), 'rb')
+
+    def read_head(self, key: str, length: int) -> bytes:
+        with self.open(key) as f:
+            return f.read(length)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def presign_upload(self, key: str, size: int, content_type: str = None) -> Optional[Dict]:
+        return None  # clients use the chunked upload API instead
+
+    def complete_upload(self, key: str, upload_id: str, parts: List[Dict]) -> None:
+        raise ValueError('direct uploads need MEDIA_STORAGE=s3')
+
+
+class S3Storage:
+    name = 's3'
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: str = S3_ENDPOINT_URL, region: str = S3_REGION,
+                 public_url: str = S3_PUBLIC_URL, client=None):
+        # boto3 is only needed for this driver
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.client = client or boto3.client(
+            's3', endpoint_url=endpoint_url, region_name=region,
+            config=Config(signature_version='s3v4', s3={'addressing_style': 'path'},
+                          max_pool_connections=max(10, S3_MAX_CONCURRENCY)))
+        self.transfer = TransferConfig(multipart_threshold=S3_PART_SIZE, multipart_chunksize=S3_PART_SIZE,
+                                       max_concurrency=S3_MAX_CONCURRENCY)
+        if public_url:
+            base = public_url
+        elif endpoint_url:
+            base = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            base = f'https://{bucket}.s3.amazonaws.com'
+        self.url_prefix = base.rstrip('/') + '/'
+
+    def url(self, key: str) -> str:
+        return self.url_prefix + key
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        return url[len(self.url_prefix):] if url and url.startswith(self.url_prefix) else None
+
+    def _extra(self, content_type: Optional[str]) -> Dict:
+        return {'ContentType': content_type} if content_type else {}
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def save(self, key: str, fileobj: BinaryIO, content_type: str = None) -> str:
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs=self._extra(content_type),
+                                   Config=self.transfer)
+        return self.url(key)
+
+    def save_file(self, src_path: str, key: str, content_type: str = None) -> str:
+        """Upload a local file (parallel multipart above S3_PART_SIZE) and remove it."""
+        self.client.upload_file(src_path, self.bucket, key, ExtraArgs=self._extra(content_type),
+                                Config=self.transfer)
+        os.remove(src_path)
+        return self.url(key)
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+
+    def read_head(self, key: str, length: int) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key, Range=f'bytes=0-{length - 1}')['Body'].read()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presign_upload(self, key: str, size: int, content_type: str = None) -> Dict:
+        """URLs for the browser to upload `size` bytes straight to the bucket.
+
+        Small files get one presigned PUT; larger ones a multipart upload with
+        one presigned URL per part, which the client may send in parallel and
+        then finish with complete_upload(key, upload_id, [{part_number, etag}]).
+        Raises ValueError for a size that would need more than S3_MAX_PARTS.
+        """
+        if -(-size // S3_PART_SIZE) > S3_MAX_PARTS:
+            raise ValueError(f'size exceeds the {S3_MAX_PARTS * S3_PART_SIZE} byte multipart limit')
+        if size <= S3_PART_SIZE:
+            params = dict(Bucket=self.bucket, Key=key, **self._extra(content_type))
+            url = self.client.generate_presigned_url('put_object', Params=params, ExpiresIn=PRESIGN_EXPIRES)
+            return {'method': 'PUT', 'url': url, 'headers': {'Content-Type': content_type} if content_type else {}}
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key,
+                                                        **self._extra(content_type))['UploadId']
+        parts = []
+        for number in range(1, -(-size // S3_PART_SIZE) + 1):
+            url = self.client.generate_presigned_url(
+                'upload_part', ExpiresIn=PRESIGN_EXPIRES,
+                Params={'Bucket': self.bucket, 'Key': key, 'UploadId': upload_id, 'PartNumber': number})
+            parts.append({'part_number': number, 'url': url})
+        return {'method': 'PUT', 'upload_id': upload_id, 'part_size': S3_PART_SIZE, 'parts': parts}
+
+    def complete_upload(self, key: str, upload_id: str, parts: List[Dict]) -> None:
+        """Finish a presigned multipart upload; a single PUT needs no completion.
+
+        Raises ValueError for malformed parts or an upload S3 refuses to complete
+        (unknown upload id, missing or mismatched parts).
+        """
+        from botocore.exceptions import ClientError
+
+        if not upload_id:
+            return
+        try:
+            completed = sorted(({'PartNumber': int(p['part_number']), 'ETag': str(p['etag'])} for p in parts),
+                               key=lambda p: p['PartNumber'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('parts must be a list of {part_number, etag}')
+        try:
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                  MultipartUpload={'Parts': completed})
+        except ClientError as e:
+            raise ValueError(f"could not complete the upload: {e.response.get('Error', {}).get('Code', 'error')}")
+
+    def abort_upload(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+
+_storage = None
+
+
+def get_storage():
+    """The configured storage driver (created on first use)."""
+    global _storage
+    if _storage is None:
+        _storage = S3Storage() if MEDIA_STORAGE == 's3' else LocalStorage()
+    return _storage
@@ -0,0 +1,359 @@
+"""Server-sent events for breaking news: GET /api/stream/breaking.
+
+Runs as its own asyncio process next to gunicorn (sync workers would spend a
+whole worker per idle client):
+
+    python -m app.stream --port 8001
+
+One publisher per process LISTENs on the `article_events` channel, loads each
+announced event once and fans it out to every connected client through a
+small per-client queue, so an idle connection costs a socket and a queue,
+not a thread. Clients that fall STREAM_CLIENT_QUEUE events behind are
+disconnected; EventSource reconnects by itself and resumes from its
+Last-Event-ID, served from the in-memory ring of recent events or, for
+older ids, from the article_events table.
+
+Every STREAM_HEARTBEAT seconds an SSE comment is written so proxies keep the
+connection open and dead clients are noticed.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from app.services.stream_service import STREAM_EVENT_KINDS
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/stream/breaking'
+HEALTH_PATH = '/api/stream/health'
+STREAM_HEARTBEAT = float(os.getenv('STREAM_HEARTBEAT', '15'))
+STREAM_RETRY_MS = int(os.getenv('STREAM_RETRY_MS', '5000'))
+# recent events kept in memory for Last-Event-ID resume
+STREAM_BUFFER = int(os.getenv('STREAM_BUFFER', '1000'))
+STREAM_CLIENT_QUEUE = int(os.getenv('STREAM_CLIENT_QUEUE', '64'))
+STREAM_MAX_CLIENTS = int(os.getenv('STREAM_MAX_CLIENTS', '20000'))
+STREAM_PRUNE_INTERVAL = 3600
+MAX_REQUEST_HEAD = 8192
+
+
+def format_event(event: Dict) -> bytes:
+    data = json.dumps(event['data'], separators=(',', ':'), sort_keys=True)
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n".encode('utf-8')
+
+
+class Client:
+    def __init__(self, kinds: Set[str], maxsize: int = STREAM_CLIENT_QUEUE):
+        self.kinds = kinds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, event: Dict) -> None:
+        if event['kind'] not in self.kinds or self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # too slow; drop the connection and let it resume from its last id
+            self.overflowed = True
+
+
+class Broker:
+    """Fan-out of events to clients plus the ring used for resume."""
+
+    def __init__(self, buffer: int = STREAM_BUFFER):
+        self.recent: Deque[Dict] = deque(maxlen=buffer)
+        self.clients: Set[Client] = set()
+        self.last_id = 0
+
+    def publish(self, events: List[Dict]) -> None:
+        for event in events:
+            if any(seen['id'] == event['id'] for seen in self.recent):
+                continue  # already delivered (catch-up after a reconnect)
+            self.recent.append(event)
+            self.last_id = max(self.last_id, event['id'])
+            for client in list(self.clients):
+                client.offer(event)
+
+    def resume(self, last_id: int) -> Optional[List[Dict]]:
+        """Events after `last_id` from the ring, or None if it no longer reaches back that far."""
+        if last_id >= self.last_id:
+            return []
+        # ids normally arrive in order, but a slower transaction can commit a
+        # smaller id later; resume by position rather than by comparison
+        for i, event in enumerate(self.recent):
+            if event['id'] == last_id:
+                return list(self.recent)[i + 1:]
+        return None
+
+    def subscribe(self, kinds: Set[str]) -> Client:
+        client = Client(kinds)
+        self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client: Client) -> None:
+        self.clients.discard(client)
+
+
+class EventSource:
+    """Loads events from Postgres and feeds the broker from LISTEN article_events.
+
+    psycopg2 calls run in the default executor except the notification poll,
+    which is driven by the event loop watching the connection's socket.
+    """
+
+    def __init__(self, broker: Broker, session_factory=None, dsn: str = None):
+        self.broker = broker
+        self._session_factory = session_factory
+        self._dsn = dsn
+        self._conn = None
+        self._fd = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[int] = set()
+        self._wake = asyncio.Event()
+        self.connected = asyncio.Event()
+
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.config.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def dsn(self) -> str:
+        if self._dsn is None:
+            from app.config.session import engine
+            self._dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        return self._dsn
+
+    def _call(self, method: str, *args):
+        from app.services.stream_service import StreamService
+        with self.session_factory()() as session:
+            return getattr(StreamService(session), method)(*args)
+
+    async def call(self, method: str, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, self._call, method, *args)
+
+    async def history(self, last_id: int) -> List[Dict]:
+        return await self.call('since', last_id, STREAM_BUFFER)
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        backoff = 1.0
+        while True:
+            try:
+                await self._listen()
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('stream listener failed; retrying in %.0fs', backoff)
+            finally:
+                self._close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _listen(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        connect = functools.partial(psycopg2.connect, self.dsn(), keepalives=1, keepalives_idle=30,
+                                    keepalives_interval=10, keepalives_count=3)
+        conn = await self._loop.run_in_executor(None, connect)
+        self._conn = conn
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute('LISTEN article_events')
+        self._fd = conn.fileno()
+        self._loop.add_reader(self._fd, self._on_readable)
+        # catch up on anything announced while not listening
+        if self.broker.last_id:
+            self.broker.publish(await self.history(self.broker.last_id))
+        else:
+            self.broker.last_id = await self.call('last_id')
+        self.connected.set()
+        last_prune = self._loop.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                await self._heartbeat(conn)
+            self._wake.clear()
+            if self._conn is None or conn.closed:
+                raise ConnectionError('listener connection closed')
+            ids, self._pending = sorted(self._pending), set()
+            if ids:
+                self.broker.publish(await self.call('by_ids', ids))
+            if self._loop.time() - last_prune > STREAM_PRUNE_INTERVAL:
+                await self.call('prune')
+                last_prune = self._loop.time()
+
+    async def _heartbeat(self, conn) -> None:
+        """SELECT 1 on the listener connection, which also notices a dead one
+        that never becomes readable. It runs off the event loop with the reader
+        paused, so nothing else polls the connection meanwhile. Notifications
+        psycopg2 reads during the query never make the socket readable again,
+        so they are collected here."""
+        def select_one():
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+
+        self._loop.remove_reader(self._fd)
+        try:
+            await self._loop.run_in_executor(None, select_one)
+        finally:
+            if not conn.closed:
+                self._loop.add_reader(self._fd, self._on_readable)
+        self._drain()
+
+    def _drain(self) -> None:
+        while self._conn.notifies:
+            note = self._conn.notifies.pop(0)
+            try:
+                self._pending.add(int(note.payload))
+            except ValueError:
+                pass
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception:
+            self._close()
+        else:
+            self._drain()
+        self._wake.set()
+
+    def _close(self) -> None:
+        self.connected.clear()
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+
+
+class StreamServer:
+    """Minimal HTTP/1.1 server for the stream endpoints (meant to sit behind nginx)."""
+
+    def __init__(self, broker: Broker, source: Optional[EventSource] = None,
+                 heartbeat: float = STREAM_HEARTBEAT, max_clients: int = STREAM_MAX_CLIENTS):
+        self.broker = broker
+        self.source = source
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+            if len(head) > MAX_REQUEST_HEAD:
+                return await self._respond(writer, 431, {'error': 'request header too large'})
+            lines = head.decode('latin-1').split('\r\n')
+            parts = lines[0].split(' ')
+            if len(parts) != 3:
+                return await self._respond(writer, 400, {'error': 'bad request'})
+            method, target, _ = parts
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+            url = urlsplit(target)
+            if method != 'GET':
+                return await self._respond(writer, 405, {'error': 'method not allowed'})
+            if url.path == HEALTH_PATH:
+                return await self._respond(writer, 200, {
+                    'clients': len(self.broker.clients),
+                    'last_id': self.broker.last_id,
+                    'listening': self.source is None or self.source.connected.is_set(),
+                })
+            if url.path != STREAM_PATH:
+                return await self._respond(writer, 404, {'error': 'not found'})
+            await self._stream(writer, headers, parse_qs(url.query))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, body: Dict, extra: str = '') -> None:
+        data = json.dumps(body).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  431: 'Request Header Fields Too Large', 503: 'Service Unavailable'}[status]
+        writer.write((f'HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n'
+                      f'Content-Length: {len(data)}\r\nConnection: close\r\n{extra}\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    async def _stream(self, writer, headers: Dict[str, str], query: Dict[str, List[str]]) -> None:
+        if len(self.broker.clients) >= self.max_clients:
+            return await self._respond(writer, 503, {'error': 'too many stream clients'}, 'Retry-After: 30\r\n')
+        kinds = set(STREAM_EVENT_KINDS)
+        if query.get('kinds'):
+            kinds &= set(query['kinds'][0].split(','))
+        last_id = headers.get('last-event-id') or (query.get('lastEventId') or [''])[0]
+        try:
+            last_id = int(last_id) if last_id else None
+        except ValueError:
+            last_id = None
+
+        # subscribe before reading the backlog so nothing falls in between
+        client = self.broker.subscribe(kinds)
+        try:
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                         b'Cache-Control: no-cache\r\nConnection: keep-alive\r\n'
+                         b'X-Accel-Buffering: no\r\n\r\n'
+                         + f'retry: {STREAM_RETRY_MS}\n\n'.encode('ascii'))
+            sent = set()
+            if last_id is not None:
+                backlog = self.broker.resume(last_id)
+                if backlog is None and self.source is not None:
+                    backlog = await self.source.history(last_id)
+                for event in backlog or []:
+                    if event['kind'] in kinds:
+                        writer.write(format_event(event))
+                        sent.add(event['id'])
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    writer.write(b': ping\n\n')
+                else:
+                    if event is None or client.overflowed:
+                        return
+                    if event['id'] in sent:
+                        continue
+                    writer.write(format_event(event))
+                await writer.drain()
+        finally:
+            self.broker.unsubscribe(client)
+
+
+async def serve(host: str, port: int, listen: bool = True) -> None:
+    broker = Broker()
+    source = EventSource(broker) if listen else None
+    server = StreamServer(broker, source)
+    tcp = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    logger.info('stream serving on %s:%d', host, port)
+    tasks = [asyncio.ensure_future(tcp.serve_forever())]
+    if source is not None:
+        tasks.append(asyncio.ensure_future(source.run()))
+    await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Breaking-news SSE server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Gunicorn settings for the backend: gunicorn -c gunicorn.conf.py run:app
+
+The app is imported once in the master (preload_app) and workers fork with
+every module already loaded, so restarting or adding a worker costs a fork
+rather than a fresh import. Nothing connects to the database at import time
+(see app.config.session); post_fork still drops any pool a hook may have
+opened in the master. With WARMUP=1 each worker warms up (app.startup)
+before it accepts requests.
+
+GUNICORN_WORKER_CLASS picks how each worker serves requests concurrently:
+
+  sync     one request at a time (default)
+  gthread  GUNICORN_THREADS requests at once, on threads
+  gevent   up to GUNICORN_WORKER_CONNECTIONS at once, on greenlets
+           (pip install gevent); psycopg2 then waits through gevent's
+           select, and preloading is off by default so the app is imported
+           after gevent has patched the standard library
+
+Each worker's connection pool is sized from the same settings
+(app.config.db.pool_size).
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+accesslog = '-'
+errorlog = '-'
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false' if worker_class == 'gevent' else 'true').lower() in ('1', 'true', 'yes')
+
+
+def post_fork(server, worker):
+    # without preloading there is nothing inherited, and importing the app here
+    # would do it before a gevent worker patches the standard library
+    if preload_app:
+        from app.config.session import dispose_after_fork
+        dispose_after_fork()
+
+
+def post_worker_init(worker):
+    if worker_class == 'gevent':
+        from app.config.db import cooperate_with_gevent
+        cooperate_with_gevent()
+    from app.startup import WARMUP, warmup
+    if WARMUP:
+        warmup(worker.wsgi)
@@ -8,6 +8,8 @@ if str(ROOT) not in sys.path:
 
 from app.app import create_app
 
+_app = None
+
 
 def main():
     """Run Flask development server"""
@@ -15,8 +17,15 @@ def main():
     app.run(host='0.0.0.0', port=8000, debug=True)
 
 
-# Create app instance for Gunicorn (production)
-app = create_app()
+def __getattr__(name):
+    # `gunicorn run:app` builds the app on first access rather than at import,
+    # so `python run.py` no longer creates it twice
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+-- migrate: no-transaction
+-- 0001_hot_path_indexes.sql
+-- Indexes for the public listing and admin hot paths. Built CONCURRENTLY so
+-- they can be applied to a live database without blocking writes.
+
+-- ArticleDAO.list: status filter ordered by published_at desc nullslast, created_at desc
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_status_published_at
+  ON articles (status, published_at DESC NULLS LAST, created_at DESC);
+
+-- date range filters without a status filter (admin "all")
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_published_at
+  ON articles (published_at DESC NULLS LAST);
+
+-- category listing matches on primary category as well as article_category
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_primary_category_id
+  ON articles (primary_category_id);
+
+-- reverse lookups on the association tables (the PKs lead with article_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_article_category_category_id
+  ON article_category (category_id, article_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_article_tag_tag_id
+  ON article_tag (tag_id, article_id);
+
+-- HomepageSectionItemDAO.list_for_section
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_homepage_section_items_section_id
+  ON homepage_section_items (section_id, order_index);
+
+-- media library ordered by newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_created_at
+  ON media_assets (created_at DESC);
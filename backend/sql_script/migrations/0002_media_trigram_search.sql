@@ -0,0 +1,18 @@
+-- migrate: no-transaction
+-- 0002_media_trigram_search.sql
+-- Trigram GIN indexes so MediaDAO's ILIKE '%q%' search (OR over four columns)
+-- becomes a BitmapOr of index scans instead of a sequential scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_file_name_trgm
+  ON media_assets USING gin (file_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_alt_text_trgm
+  ON media_assets USING gin (alt_text gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_caption_trgm
+  ON media_assets USING gin (caption gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_credit_trgm
+  ON media_assets USING gin (credit gin_trgm_ops);
@@ -0,0 +1,244 @@
+-- 0003_stat_counters.sql
+-- Incrementally maintained counters behind GET /api/admin/stats.
+--
+-- Counter names:
+--   articles.total, articles.status.<status>
+--   media.total, media.type.<type>
+--   categories.<id>.articles   (article_category rows)
+--   categories.<id>.published  (article_category rows whose article is published)
+--
+-- Statement-level triggers with transition tables keep set-based writes to one
+-- counter upsert per statement. reconcile_stat_counters() recomputes everything
+-- from the base tables and reports drift; the migration runs it once to seed.
+
+CREATE TABLE IF NOT EXISTS stat_counters (
+  name VARCHAR(255) PRIMARY KEY,
+  value BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+
+-- articles: status totals
+CREATE OR REPLACE FUNCTION stat_counters_articles_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'articles.total' AS name, 1 AS delta FROM new_rows
+    UNION ALL
+    SELECT 'articles.status.' || status, 1 FROM new_rows
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stat_counters_articles_update() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'articles.status.' || o.status AS name, -1 AS delta
+      FROM old_rows o JOIN new_rows n ON n.id = o.id
+     WHERE o.status IS DISTINCT FROM n.status
+    UNION ALL
+    SELECT 'articles.status.' || n.status, 1
+      FROM old_rows o JOIN new_rows n ON n.id = o.id
+     WHERE o.status IS DISTINCT FROM n.status
+    UNION ALL
+    SELECT 'categories.' || ac.category_id || '.published',
+           CASE WHEN n.status = 'published' THEN 1 ELSE -1 END
+      FROM old_rows o
+      JOIN new_rows n ON n.id = o.id
+      JOIN article_category ac ON ac.article_id = n.id
+     WHERE (o.status = 'published') IS DISTINCT FROM (n.status = 'published')
+  ) d
+  GROUP BY d.name
+  HAVING sum(d.delta) <> 0
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stat_counters_articles_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'articles.total' AS name, -1 AS delta FROM old_rows
+    UNION ALL
+    SELECT 'articles.status.' || status, -1 FROM old_rows
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Published articles leave their categories before the FK cascade removes the
+-- article_category rows (the cascade can no longer see the article's status).
+CREATE OR REPLACE FUNCTION stat_counters_articles_before_delete() RETURNS trigger AS $$
+BEGIN
+  IF OLD.status = 'published' THEN
+    INSERT INTO stat_counters (name, value, updated_at)
+    SELECT 'categories.' || category_id || '.published', -1, now()
+      FROM article_category WHERE article_id = OLD.id
+    ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- article_category: per-category totals
+CREATE OR REPLACE FUNCTION stat_counters_article_category_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'categories.' || r.category_id || '.articles' AS name, 1 AS delta FROM new_rows r
+    UNION ALL
+    SELECT 'categories.' || r.category_id || '.published', 1
+      FROM new_rows r JOIN articles a ON a.id = r.article_id
+     WHERE a.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stat_counters_article_category_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    -- rows removed by a category delete cascade no longer join; their
+    -- counters are dropped by stat_counters_categories_delete()
+    SELECT 'categories.' || r.category_id || '.articles' AS name, -1 AS delta
+      FROM old_rows r JOIN categories c ON c.id = r.category_id
+    UNION ALL
+    -- rows removed by an article delete cascade no longer join (handled above)
+    SELECT 'categories.' || r.category_id || '.published', -1
+      FROM old_rows r
+      JOIN categories c ON c.id = r.category_id
+      JOIN articles a ON a.id = r.article_id
+     WHERE a.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- categories: drop counters of deleted categories
+CREATE OR REPLACE FUNCTION stat_counters_categories_delete() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM stat_counters s
+   USING old_rows r
+   WHERE s.name IN ('categories.' || r.id || '.articles', 'categories.' || r.id || '.published');
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- media_assets: totals by type
+CREATE OR REPLACE FUNCTION stat_counters_media_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'media.total' AS name, 1 AS delta FROM new_rows
+    UNION ALL
+    SELECT 'media.type.' || type, 1 FROM new_rows
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stat_counters_media_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'media.total' AS name, -1 AS delta FROM old_rows
+    UNION ALL
+    SELECT 'media.type.' || type, -1 FROM old_rows
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stat_counters_articles_insert ON articles;
+CREATE TRIGGER trg_stat_counters_articles_insert AFTER INSERT ON articles
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_articles_insert();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_articles_update ON articles;
+CREATE TRIGGER trg_stat_counters_articles_update AFTER UPDATE ON articles
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_articles_update();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_articles_delete ON articles;
+CREATE TRIGGER trg_stat_counters_articles_delete AFTER DELETE ON articles
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_articles_delete();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_articles_before_delete ON articles;
+CREATE TRIGGER trg_stat_counters_articles_before_delete BEFORE DELETE ON articles
+  FOR EACH ROW EXECUTE FUNCTION stat_counters_articles_before_delete();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_article_category_insert ON article_category;
+CREATE TRIGGER trg_stat_counters_article_category_insert AFTER INSERT ON article_category
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_article_category_insert();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_article_category_delete ON article_category;
+CREATE TRIGGER trg_stat_counters_article_category_delete AFTER DELETE ON article_category
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_article_category_delete();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_categories_delete ON categories;
+CREATE TRIGGER trg_stat_counters_categories_delete AFTER DELETE ON categories
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_categories_delete();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_media_insert ON media_assets;
+CREATE TRIGGER trg_stat_counters_media_insert AFTER INSERT ON media_assets
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_media_insert();
+
+DROP TRIGGER IF EXISTS trg_stat_counters_media_delete ON media_assets;
+CREATE TRIGGER trg_stat_counters_media_delete AFTER DELETE ON media_assets
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_media_delete();
+
+-- Recompute every counter from the base tables. Returns one row per counter
+-- whose stored value had drifted (or was missing) together with the fix.
+CREATE OR REPLACE FUNCTION reconcile_stat_counters()
+RETURNS TABLE (counter_name VARCHAR, stored_value BIGINT, actual_value BIGINT) AS $$
+BEGIN
+  -- blocks concurrent counter updates (ROW EXCLUSIVE) until we commit, so no
+  -- delta lands between the recount and the overwrite
+  LOCK TABLE stat_counters IN SHARE ROW EXCLUSIVE MODE;
+  RETURN QUERY
+  WITH fresh AS (
+    SELECT 'articles.total'::varchar AS fname, count(*)::bigint AS fvalue FROM articles
+    UNION ALL
+    SELECT ('articles.status.' || status)::varchar, count(*)::bigint FROM articles GROUP BY status
+    UNION ALL
+    SELECT 'media.total'::varchar, count(*)::bigint FROM media_assets
+    UNION ALL
+    SELECT ('media.type.' || type)::varchar, count(*)::bigint FROM media_assets GROUP BY type
+    UNION ALL
+    SELECT ('categories.' || category_id || '.articles')::varchar, count(*)::bigint
+      FROM article_category GROUP BY category_id
+    UNION ALL
+    SELECT ('categories.' || ac.category_id || '.published')::varchar, count(*)::bigint
+      FROM article_category ac JOIN articles a ON a.id = ac.article_id
+     WHERE a.status = 'published'
+     GROUP BY ac.category_id
+  ),
+  drift AS (
+    SELECT coalesce(f.fname, s.name) AS dname, s.value AS dstored, coalesce(f.fvalue, 0) AS dactual
+      FROM fresh f FULL OUTER JOIN stat_counters s ON s.name = f.fname
+     WHERE s.value IS DISTINCT FROM coalesce(f.fvalue, 0)
+  ),
+  fixed AS (
+    INSERT INTO stat_counters (name, value, updated_at)
+    SELECT dname, dactual, now() FROM drift
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value, updated_at = now()
+    RETURNING 1
+  )
+  SELECT dname, dstored, dactual FROM drift;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT count(*) FROM reconcile_stat_counters();
@@ -0,0 +1,15 @@
+-- 0004_article_related.sql
+-- Precomputed "related stories" neighbour lists, one row per (article, rank).
+-- Populated by app.services.related_service (full rebuild: --rebuild) and kept
+-- current incrementally when articles are saved.
+
+CREATE TABLE IF NOT EXISTS article_related (
+  article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+  rank SMALLINT NOT NULL,
+  related_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+  score REAL NOT NULL,
+  PRIMARY KEY (article_id, rank)
+);
+
+-- reverse lookup: "which lists mention this article" (unpublish, cascades)
+CREATE INDEX IF NOT EXISTS ix_article_related_related_id ON article_related (related_id);
@@ -0,0 +1,19 @@
+-- 0005_article_views.sql
+-- Page-view counts, written in batches by each worker's in-memory ViewCounter
+-- (app.services.view_service) instead of one UPDATE per page view.
+-- Hourly buckets feed "trending" (time-decayed) and "most read" (windowed
+-- sums); old buckets are pruned, article_view_totals keeps the all-time count.
+
+CREATE TABLE IF NOT EXISTS article_view_buckets (
+  article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+  bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+  views BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (article_id, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS ix_article_view_buckets_bucket ON article_view_buckets (bucket);
+
+CREATE TABLE IF NOT EXISTS article_view_totals (
+  article_id UUID PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+  views BIGINT NOT NULL DEFAULT 0
+);
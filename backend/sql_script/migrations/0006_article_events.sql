@@ -0,0 +1,16 @@
+-- 0006_article_events.sql
+-- Short-lived log of public article events (published / breaking / withdrawn)
+-- pushed to readers by the SSE stream (app.stream). Each row is announced with
+-- NOTIFY article_events carrying its id; the id doubles as the SSE event id so
+-- reconnecting clients resume with Last-Event-ID. Rows older than a day are
+-- pruned by the writer.
+
+CREATE TABLE IF NOT EXISTS article_events (
+  id BIGSERIAL PRIMARY KEY,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  kind VARCHAR(32) NOT NULL,
+  article_id UUID NOT NULL,
+  payload JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_article_events_created_at ON article_events (created_at);
@@ -0,0 +1,197 @@
+-- 0007_article_archive.sql
+-- Published-article counts per UTC day behind GET /api/articles/archive, kept
+-- current by triggers so the archive never groups over the articles table.
+--
+-- scope is a category id, or the nil UUID for all articles. An article counts
+-- towards its primary category and every article_category category, once
+-- each (the same membership ArticleDAO.list filters on). Rows for a day may
+-- drop to zero; readers skip them.
+--
+-- reconcile_article_archive() recomputes the table from the base tables and
+-- reports drift; the migration runs it once to seed.
+
+CREATE TABLE IF NOT EXISTS article_archive_days (
+  scope UUID NOT NULL,
+  day DATE NOT NULL,
+  articles INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (scope, day)
+);
+
+-- articles: rows whose status, published_at or primary category changed leave
+-- their old days and join their new ones
+CREATE OR REPLACE FUNCTION article_archive_articles_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT d.scope, d.day, sum(d.delta) FROM (
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid AS scope,
+           (n.published_at AT TIME ZONE 'UTC')::date AS day, 1 AS delta
+      FROM new_rows n
+     WHERE n.status = 'published' AND n.published_at IS NOT NULL
+    UNION ALL
+    SELECT c.id, (n.published_at AT TIME ZONE 'UTC')::date, 1
+      FROM new_rows n JOIN categories c ON c.id = n.primary_category_id
+     WHERE n.status = 'published' AND n.published_at IS NOT NULL
+  ) d
+  GROUP BY d.scope, d.day
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION article_archive_articles_update() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT d.scope, d.day, sum(d.delta) FROM (
+    WITH changed AS (
+      SELECT o.id,
+             o.status AS old_status, o.published_at AS old_published_at, o.primary_category_id AS old_primary,
+             n.status AS new_status, n.published_at AS new_published_at, n.primary_category_id AS new_primary
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+       WHERE (o.status, o.published_at, o.primary_category_id)
+             IS DISTINCT FROM (n.status, n.published_at, n.primary_category_id)
+    ),
+    sides AS (
+      SELECT id, old_published_at AS published_at, old_primary AS primary_category_id, -1 AS delta
+        FROM changed WHERE old_status = 'published' AND old_published_at IS NOT NULL
+      UNION ALL
+      SELECT id, new_published_at, new_primary, 1
+        FROM changed WHERE new_status = 'published' AND new_published_at IS NOT NULL
+    )
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid AS scope,
+           (s.published_at AT TIME ZONE 'UTC')::date AS day, s.delta
+      FROM sides s
+    UNION ALL
+    SELECT c.id, (s.published_at AT TIME ZONE 'UTC')::date, s.delta
+      FROM sides s
+      JOIN categories c ON c.id = s.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = s.id)
+  ) d
+  GROUP BY d.scope, d.day
+  HAVING sum(d.delta) <> 0
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Published articles leave the archive before the FK cascade removes their
+-- article_category rows.
+CREATE OR REPLACE FUNCTION article_archive_articles_before_delete() RETURNS trigger AS $$
+BEGIN
+  IF OLD.status = 'published' AND OLD.published_at IS NOT NULL THEN
+    INSERT INTO article_archive_days (scope, day, articles)
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid, (OLD.published_at AT TIME ZONE 'UTC')::date, -1
+    UNION ALL
+    SELECT c.id, (OLD.published_at AT TIME ZONE 'UTC')::date, -1
+      FROM categories c
+     WHERE c.id = OLD.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = OLD.id)
+    ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- article_category: a published article joins / leaves a category that is not
+-- already its primary one. Rows removed by an article or category delete
+-- cascade no longer join and are handled by those triggers.
+CREATE OR REPLACE FUNCTION article_archive_article_category_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT r.category_id, (a.published_at AT TIME ZONE 'UTC')::date, count(*)
+    FROM new_rows r JOIN articles a ON a.id = r.article_id
+   WHERE a.status = 'published' AND a.published_at IS NOT NULL
+     AND a.primary_category_id IS DISTINCT FROM r.category_id
+   GROUP BY 1, 2
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION article_archive_article_category_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT r.category_id, (a.published_at AT TIME ZONE 'UTC')::date, -count(*)
+    FROM old_rows r
+    JOIN articles a ON a.id = r.article_id
+    JOIN categories c ON c.id = r.category_id
+   WHERE a.status = 'published' AND a.published_at IS NOT NULL
+     AND a.primary_category_id IS DISTINCT FROM r.category_id
+   GROUP BY 1, 2
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- categories: drop the archive of deleted categories
+CREATE OR REPLACE FUNCTION article_archive_categories_delete() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM article_archive_days d USING old_rows r WHERE d.scope = r.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_article_archive_articles_insert ON articles;
+CREATE TRIGGER trg_article_archive_articles_insert AFTER INSERT ON articles
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_archive_articles_insert();
+
+DROP TRIGGER IF EXISTS trg_article_archive_articles_update ON articles;
+CREATE TRIGGER trg_article_archive_articles_update AFTER UPDATE ON articles
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_archive_articles_update();
+
+DROP TRIGGER IF EXISTS trg_article_archive_articles_before_delete ON articles;
+CREATE TRIGGER trg_article_archive_articles_before_delete BEFORE DELETE ON articles
+  FOR EACH ROW EXECUTE FUNCTION article_archive_articles_before_delete();
+
+DROP TRIGGER IF EXISTS trg_article_archive_article_category_insert ON article_category;
+CREATE TRIGGER trg_article_archive_article_category_insert AFTER INSERT ON article_category
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_archive_article_category_insert();
+
+DROP TRIGGER IF EXISTS trg_article_archive_article_category_delete ON article_category;
+CREATE TRIGGER trg_article_archive_article_category_delete AFTER DELETE ON article_category
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_archive_article_category_delete();
+
+DROP TRIGGER IF EXISTS trg_article_archive_categories_delete ON categories;
+CREATE TRIGGER trg_article_archive_categories_delete AFTER DELETE ON categories
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_archive_categories_delete();
+
+-- Recompute the archive from the base tables. Returns one row per (scope, day)
+-- whose stored count had drifted (or was missing) together with the fix.
+CREATE OR REPLACE FUNCTION reconcile_article_archive()
+RETURNS TABLE (archive_scope UUID, archive_day DATE, stored_value INTEGER, actual_value INTEGER) AS $$
+BEGIN
+  LOCK TABLE article_archive_days IN SHARE ROW EXCLUSIVE MODE;
+  RETURN QUERY
+  WITH published AS (
+    SELECT a.id, a.primary_category_id, (a.published_at AT TIME ZONE 'UTC')::date AS pday
+      FROM articles a
+     WHERE a.status = 'published' AND a.published_at IS NOT NULL
+  ),
+  fresh AS (
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid AS fscope, p.pday AS fday, count(*)::int AS fvalue
+      FROM published p GROUP BY p.pday
+    UNION ALL
+    SELECT m.category_id, m.pday, count(*)::int FROM (
+      SELECT p.id, p.primary_category_id AS category_id, p.pday FROM published p
+       WHERE p.primary_category_id IS NOT NULL
+      UNION
+      SELECT p.id, ac.category_id, p.pday FROM published p JOIN article_category ac ON ac.article_id = p.id
+    ) m
+    GROUP BY m.category_id, m.pday
+  ),
+  drift AS (
+    SELECT coalesce(f.fscope, s.scope) AS dscope, coalesce(f.fday, s.day) AS dday,
+           s.articles AS dstored, coalesce(f.fvalue, 0) AS dactual
+      FROM fresh f FULL OUTER JOIN article_archive_days s ON s.scope = f.fscope AND s.day = f.fday
+     WHERE s.articles IS DISTINCT FROM coalesce(f.fvalue, 0)
+  ),
+  fixed AS (
+    INSERT INTO article_archive_days (scope, day, articles)
+    SELECT dscope, dday, dactual FROM drift
+    ON CONFLICT (scope, day) DO UPDATE SET articles = EXCLUDED.articles
+    RETURNING 1
+  )
+  SELECT dscope, dday, dstored, dactual FROM drift;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT count(*) FROM reconcile_article_archive();
@@ -0,0 +1,122 @@
+-- 0008_tag_article_counts.sql
+-- tags.article_count: published articles carrying the tag, kept current by
+-- triggers so GET /api/tags?with_counts=1 / order=popular never groups over
+-- article_tag per request.
+--
+-- Statement-level triggers aggregate per tag, so a bulk add/remove of one tag
+-- on many articles is one counter update. Tag rows are locked in id order
+-- before updating, so concurrent writers touching several tags cannot
+-- deadlock. reconcile_tag_counts() recomputes the column and reports drift;
+-- the migration runs it once to seed.
+
+ALTER TABLE tags ADD COLUMN IF NOT EXISTS article_count INTEGER NOT NULL DEFAULT 0;
+
+-- listing pages: order=name and order=popular
+CREATE INDEX IF NOT EXISTS ix_tags_name ON tags (name, id);
+CREATE INDEX IF NOT EXISTS ix_tags_article_count ON tags (article_count DESC, name, id);
+-- prefix filter: lower(name) LIKE 'pre%'
+CREATE INDEX IF NOT EXISTS ix_tags_lower_name ON tags (lower(name) text_pattern_ops);
+
+CREATE OR REPLACE FUNCTION tag_counts_add(tag_ids UUID[], deltas INTEGER[]) RETURNS void AS $$
+BEGIN
+  PERFORM 1 FROM tags WHERE id = ANY(tag_ids) ORDER BY id FOR UPDATE;
+  UPDATE tags t SET article_count = t.article_count + d.delta
+    FROM unnest(tag_ids, deltas) AS d(id, delta)
+   WHERE t.id = d.id AND d.delta <> 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- article_tag: a published article gains / loses tags. Rows removed by an
+-- article delete cascade no longer join (see the before-delete trigger).
+CREATE OR REPLACE FUNCTION tag_counts_article_tag_insert() RETURNS trigger AS $$
+BEGIN
+  PERFORM tag_counts_add(array_agg(d.tag_id), array_agg(d.delta)) FROM (
+    SELECT r.tag_id, count(*)::int AS delta
+      FROM new_rows r JOIN articles a ON a.id = r.article_id
+     WHERE a.status = 'published'
+     GROUP BY r.tag_id
+  ) d;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tag_counts_article_tag_delete() RETURNS trigger AS $$
+BEGIN
+  PERFORM tag_counts_add(array_agg(d.tag_id), array_agg(d.delta)) FROM (
+    SELECT r.tag_id, -count(*)::int AS delta
+      FROM old_rows r JOIN articles a ON a.id = r.article_id
+     WHERE a.status = 'published'
+     GROUP BY r.tag_id
+  ) d;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- articles: publish / unpublish moves every tag of the article
+CREATE OR REPLACE FUNCTION tag_counts_articles_update() RETURNS trigger AS $$
+BEGIN
+  PERFORM tag_counts_add(array_agg(d.tag_id), array_agg(d.delta)) FROM (
+    SELECT at.tag_id, sum(CASE WHEN n.status = 'published' THEN 1 ELSE -1 END)::int AS delta
+      FROM old_rows o
+      JOIN new_rows n ON n.id = o.id
+      JOIN article_tag at ON at.article_id = n.id
+     WHERE (o.status = 'published') IS DISTINCT FROM (n.status = 'published')
+     GROUP BY at.tag_id
+  ) d;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Published articles leave their tags before the FK cascade removes the
+-- article_tag rows.
+CREATE OR REPLACE FUNCTION tag_counts_articles_before_delete() RETURNS trigger AS $$
+BEGIN
+  IF OLD.status = 'published' THEN
+    PERFORM tag_counts_add(array_agg(tag_id), array_agg(-1)) FROM article_tag WHERE article_id = OLD.id;
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_tag_counts_article_tag_insert ON article_tag;
+CREATE TRIGGER trg_tag_counts_article_tag_insert AFTER INSERT ON article_tag
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tag_counts_article_tag_insert();
+
+DROP TRIGGER IF EXISTS trg_tag_counts_article_tag_delete ON article_tag;
+CREATE TRIGGER trg_tag_counts_article_tag_delete AFTER DELETE ON article_tag
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tag_counts_article_tag_delete();
+
+DROP TRIGGER IF EXISTS trg_tag_counts_articles_update ON articles;
+CREATE TRIGGER trg_tag_counts_articles_update AFTER UPDATE ON articles
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tag_counts_articles_update();
+
+DROP TRIGGER IF EXISTS trg_tag_counts_articles_before_delete ON articles;
+CREATE TRIGGER trg_tag_counts_articles_before_delete BEFORE DELETE ON articles
+  FOR EACH ROW EXECUTE FUNCTION tag_counts_articles_before_delete();
+
+-- Recompute tags.article_count. Returns one row per tag whose stored count had
+-- drifted together with the fix.
+CREATE OR REPLACE FUNCTION reconcile_tag_counts()
+RETURNS TABLE (counted_tag_id UUID, stored_value INTEGER, actual_value INTEGER) AS $$
+BEGIN
+  LOCK TABLE tags IN SHARE ROW EXCLUSIVE MODE;
+  RETURN QUERY
+  WITH fresh AS (
+    SELECT t.id AS fid, t.article_count AS fstored, count(a.id)::int AS factual
+      FROM tags t
+      LEFT JOIN article_tag at ON at.tag_id = t.id
+      LEFT JOIN articles a ON a.id = at.article_id AND a.status = 'published'
+     GROUP BY t.id, t.article_count
+  ),
+  drift AS (
+    SELECT fid, fstored, factual FROM fresh WHERE fstored <> factual
+  ),
+  fixed AS (
+    UPDATE tags t SET article_count = d.factual FROM drift d WHERE t.id = d.fid
+    RETURNING 1
+  )
+  SELECT fid, fstored, factual FROM drift;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT count(*) FROM reconcile_tag_counts();
@@ -0,0 +1,55 @@
+-- 0009_taxonomy_changes.sql
+-- Short-lived log of tag and category writes. Each worker's in-memory
+-- autocomplete index (app.services.autocomplete_service) polls it and
+-- re-reads only the rows that changed. Renames, inserts and deletes are
+-- logged (article_count updates are not); rows older than a day are pruned by
+-- the writer.
+
+CREATE TABLE IF NOT EXISTS taxonomy_changes (
+  id BIGSERIAL PRIMARY KEY,
+  changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  kind VARCHAR(16) NOT NULL,
+  item_id UUID NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_taxonomy_changes_changed_at ON taxonomy_changes (changed_at);
+
+CREATE OR REPLACE FUNCTION taxonomy_changes_log() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO taxonomy_changes (kind, item_id) SELECT TG_ARGV[0], id FROM old_rows;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO taxonomy_changes (kind, item_id)
+    SELECT TG_ARGV[0], n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+     WHERE (o.name, o.slug) IS DISTINCT FROM (n.name, n.slug);
+  ELSE
+    INSERT INTO taxonomy_changes (kind, item_id) SELECT TG_ARGV[0], id FROM new_rows;
+  END IF;
+  DELETE FROM taxonomy_changes WHERE changed_at < now() - interval '1 day';
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_tags_insert ON tags;
+CREATE TRIGGER trg_taxonomy_changes_tags_insert AFTER INSERT ON tags
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('tag');
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_tags_update ON tags;
+CREATE TRIGGER trg_taxonomy_changes_tags_update AFTER UPDATE ON tags
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('tag');
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_tags_delete ON tags;
+CREATE TRIGGER trg_taxonomy_changes_tags_delete AFTER DELETE ON tags
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('tag');
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_categories_insert ON categories;
+CREATE TRIGGER trg_taxonomy_changes_categories_insert AFTER INSERT ON categories
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('category');
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_categories_update ON categories;
+CREATE TRIGGER trg_taxonomy_changes_categories_update AFTER UPDATE ON categories
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('category');
+
+DROP TRIGGER IF EXISTS trg_taxonomy_changes_categories_delete ON categories;
+CREATE TRIGGER trg_taxonomy_changes_categories_delete AFTER DELETE ON categories
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION taxonomy_changes_log('category');
@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+-- 0010_article_title_trgm.sql
+-- Trigram GIN index for article title autocomplete (title ILIKE '%q%',
+-- ranked by word_similarity). Needs pg_trgm (0002).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_title_trgm
+  ON articles USING gin (title gin_trgm_ops);
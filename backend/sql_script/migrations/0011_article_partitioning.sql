@@ -0,0 +1,78 @@
+-- 0011_article_partitioning.sql
+-- Trigger functions used once `articles` has been converted to a table
+-- range-partitioned by published_at (python -m app.services.partition_service
+-- --convert). Nothing here changes an unpartitioned table.
+--
+-- A partitioned table can only enforce uniqueness on keys that include the
+-- partition key, and published_at is nullable and changes on publish. So the
+-- conversion moves the article identity into article_keys (id primary key,
+-- slug unique, published_at): the unique slug constraint lives there, every
+-- foreign key that referenced articles(id) references article_keys(id)
+-- instead, and lookups by id or slug read the partition key from it first so
+-- only one partition is scanned.
+--
+-- Publishing or re-dating an article moves its row to another partition,
+-- which Postgres runs as a delete plus an insert and which fires row-level
+-- BEFORE DELETE triggers. The three such triggers from 0003, 0007 and 0008
+-- are therefore replaced by one statement-level AFTER DELETE trigger doing
+-- the same work set-based; it runs before the article_keys rows (and with
+-- them the cascades) go, so the links are still there to count. New
+-- row-level delete triggers on articles must not be added once partitioned.
+
+CREATE OR REPLACE FUNCTION article_keys_articles_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO article_keys (id, slug, published_at)
+  SELECT id, slug, published_at FROM new_rows;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION article_keys_articles_update() RETURNS trigger AS $$
+BEGIN
+  UPDATE article_keys k SET slug = n.slug, published_at = n.published_at
+    FROM new_rows n
+   WHERE k.id = n.id AND (k.slug, k.published_at) IS DISTINCT FROM (n.slug, n.published_at);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION articles_partitioned_delete() RETURNS trigger AS $$
+BEGIN
+  -- 0003: published articles leave their categories' published counters
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT 'categories.' || ac.category_id || '.published', -count(*), now()
+    FROM old_rows o JOIN article_category ac ON ac.article_id = o.id
+   WHERE o.status = 'published'
+   GROUP BY ac.category_id
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+
+  -- 0007: published articles leave the date archive
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT d.scope, d.day, sum(d.delta) FROM (
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid AS scope,
+           (o.published_at AT TIME ZONE 'UTC')::date AS day, -1 AS delta
+      FROM old_rows o
+     WHERE o.status = 'published' AND o.published_at IS NOT NULL
+    UNION ALL
+    SELECT c.id, (o.published_at AT TIME ZONE 'UTC')::date, -1
+      FROM old_rows o
+      JOIN categories c ON c.id = o.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = o.id)
+     WHERE o.status = 'published' AND o.published_at IS NOT NULL
+  ) d
+  GROUP BY d.scope, d.day
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+
+  -- 0008: published articles leave their tags
+  PERFORM tag_counts_add(array_agg(d.tag_id), array_agg(d.delta)) FROM (
+    SELECT at.tag_id, -count(*)::int AS delta
+      FROM old_rows o JOIN article_tag at ON at.article_id = o.id
+     WHERE o.status = 'published'
+     GROUP BY at.tag_id
+  ) d;
+
+  -- links, section items, views and related lists cascade from article_keys
+  DELETE FROM article_keys k USING old_rows o WHERE k.id = o.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,70 @@
+-- 0012_article_changes.sql
+-- Short-lived log of the articles whose public copy may have changed: writes
+-- to the article row, its category and tag links or its related list.
+-- Incremental read-snapshot exports (app.services.snapshot_service) re-copy
+-- only the articles named here since the previous export. Rows older than a
+-- day are pruned by the writer; exports older than that start from scratch.
+
+CREATE TABLE IF NOT EXISTS article_changes (
+  id BIGSERIAL PRIMARY KEY,
+  changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  article_id UUID NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_article_changes_changed_at ON article_changes (changed_at);
+
+-- TG_ARGV[0] is the column naming the article: id on articles, article_id on
+-- the link tables
+CREATE OR REPLACE FUNCTION article_changes_log() RETURNS trigger AS $$
+BEGIN
+  IF TG_ARGV[0] = 'id' THEN
+    IF TG_OP = 'DELETE' THEN
+      INSERT INTO article_changes (article_id) SELECT id FROM old_rows;
+    ELSE
+      INSERT INTO article_changes (article_id) SELECT id FROM new_rows;
+    END IF;
+  ELSIF TG_OP = 'DELETE' THEN
+    INSERT INTO article_changes (article_id) SELECT DISTINCT article_id FROM old_rows;
+  ELSE
+    INSERT INTO article_changes (article_id) SELECT DISTINCT article_id FROM new_rows;
+  END IF;
+  DELETE FROM article_changes WHERE changed_at < now() - interval '1 day';
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_article_changes_articles_insert ON articles;
+CREATE TRIGGER trg_article_changes_articles_insert AFTER INSERT ON articles
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_articles_update ON articles;
+CREATE TRIGGER trg_article_changes_articles_update AFTER UPDATE ON articles
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_articles_delete ON articles;
+CREATE TRIGGER trg_article_changes_articles_delete AFTER DELETE ON articles
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_category_insert ON article_category;
+CREATE TRIGGER trg_article_changes_article_category_insert AFTER INSERT ON article_category
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_category_delete ON article_category;
+CREATE TRIGGER trg_article_changes_article_category_delete AFTER DELETE ON article_category
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_tag_insert ON article_tag;
+CREATE TRIGGER trg_article_changes_article_tag_insert AFTER INSERT ON article_tag
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_tag_delete ON article_tag;
+CREATE TRIGGER trg_article_changes_article_tag_delete AFTER DELETE ON article_tag
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_related_insert ON article_related;
+CREATE TRIGGER trg_article_changes_article_related_insert AFTER INSERT ON article_related
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
+
+DROP TRIGGER IF EXISTS trg_article_changes_article_related_delete ON article_related;
+CREATE TRIGGER trg_article_changes_article_related_delete AFTER DELETE ON article_related
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION article_changes_log('article_id');
@@ -0,0 +1,233 @@
+-- 0013_category_counter_membership.sql
+-- Per-category counters behind GET /api/admin/stats (0003) counted
+-- article_category rows only. An article now counts towards its primary
+-- category and every article_category category, once each: the membership
+-- category listings (ArticleDAO.list) and the date archive (0007) use.
+--
+--   categories.<id>.articles   articles in the category
+--   categories.<id>.published  of which published
+--
+-- The article triggers account for the primary category and, when it
+-- changes or the article is deleted, for the linked ones; the
+-- article_category triggers skip links to the article's primary category.
+-- The functions are replaced in place (including the partitioned delete
+-- function from 0011) and reconcile_stat_counters() reseeds the counters.
+
+CREATE OR REPLACE FUNCTION stat_counters_articles_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'articles.total' AS name, 1 AS delta FROM new_rows
+    UNION ALL
+    SELECT 'articles.status.' || status, 1 FROM new_rows
+    UNION ALL
+    -- a new article has no article_category rows yet
+    SELECT 'categories.' || c.id || '.articles', 1
+      FROM new_rows n JOIN categories c ON c.id = n.primary_category_id
+    UNION ALL
+    SELECT 'categories.' || c.id || '.published', 1
+      FROM new_rows n JOIN categories c ON c.id = n.primary_category_id
+     WHERE n.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- rows whose status or primary category changed leave their old categories
+-- and join their new ones (the article_category links are unchanged)
+CREATE OR REPLACE FUNCTION stat_counters_articles_update() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    WITH changed AS (
+      SELECT o.id, o.status AS old_status, o.primary_category_id AS old_primary,
+             n.status AS new_status, n.primary_category_id AS new_primary
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+       WHERE (o.status, o.primary_category_id) IS DISTINCT FROM (n.status, n.primary_category_id)
+    ),
+    sides AS (
+      SELECT id, old_status AS status, old_primary AS primary_category_id, -1 AS delta FROM changed
+      UNION ALL
+      SELECT id, new_status, new_primary, 1 FROM changed
+    ),
+    members AS (
+      SELECT c.id AS category_id, s.status, s.delta
+        FROM sides s
+        JOIN categories c ON c.id = s.primary_category_id
+          OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = s.id)
+    )
+    SELECT 'articles.status.' || old_status AS name, -1 AS delta
+      FROM changed WHERE old_status IS DISTINCT FROM new_status
+    UNION ALL
+    SELECT 'articles.status.' || new_status, 1
+      FROM changed WHERE old_status IS DISTINCT FROM new_status
+    UNION ALL
+    SELECT 'categories.' || category_id || '.articles', delta FROM members
+    UNION ALL
+    SELECT 'categories.' || category_id || '.published', delta FROM members WHERE status = 'published'
+  ) d
+  GROUP BY d.name
+  HAVING sum(d.delta) <> 0
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Articles leave their categories before the FK cascade removes the
+-- article_category rows (the cascade can no longer see the article).
+CREATE OR REPLACE FUNCTION stat_counters_articles_before_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT 'categories.' || c.id || s.suffix, -1, now()
+    FROM categories c CROSS JOIN (VALUES ('.articles'), ('.published')) AS s (suffix)
+   WHERE (c.id = OLD.primary_category_id
+          OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = OLD.id))
+     AND (s.suffix = '.articles' OR OLD.status = 'published')
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- article_category: an article joins / leaves a category that is not already
+-- its primary one. Rows removed by an article or category delete cascade no
+-- longer join and are handled by those triggers.
+CREATE OR REPLACE FUNCTION stat_counters_article_category_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'categories.' || r.category_id || '.articles' AS name, 1 AS delta
+      FROM new_rows r JOIN articles a ON a.id = r.article_id
+     WHERE a.primary_category_id IS DISTINCT FROM r.category_id
+    UNION ALL
+    SELECT 'categories.' || r.category_id || '.published', 1
+      FROM new_rows r JOIN articles a ON a.id = r.article_id
+     WHERE a.primary_category_id IS DISTINCT FROM r.category_id AND a.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stat_counters_article_category_delete() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'categories.' || r.category_id || '.articles' AS name, -1 AS delta
+      FROM old_rows r
+      JOIN categories c ON c.id = r.category_id
+      JOIN articles a ON a.id = r.article_id
+     WHERE a.primary_category_id IS DISTINCT FROM r.category_id
+    UNION ALL
+    SELECT 'categories.' || r.category_id || '.published', -1
+      FROM old_rows r
+      JOIN categories c ON c.id = r.category_id
+      JOIN articles a ON a.id = r.article_id
+     WHERE a.primary_category_id IS DISTINCT FROM r.category_id AND a.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 0011's statement-level replacement for the BEFORE DELETE triggers, with the
+-- same membership for the category counters
+CREATE OR REPLACE FUNCTION articles_partitioned_delete() RETURNS trigger AS $$
+BEGIN
+  -- 0003/0013: articles leave their categories' counters
+  INSERT INTO stat_counters (name, value, updated_at)
+  SELECT d.name, sum(d.delta), now() FROM (
+    SELECT 'categories.' || c.id || '.articles' AS name, -1 AS delta
+      FROM old_rows o
+      JOIN categories c ON c.id = o.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = o.id)
+    UNION ALL
+    SELECT 'categories.' || c.id || '.published', -1
+      FROM old_rows o
+      JOIN categories c ON c.id = o.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = o.id)
+     WHERE o.status = 'published'
+  ) d
+  GROUP BY d.name
+  ON CONFLICT (name) DO UPDATE SET value = stat_counters.value + EXCLUDED.value, updated_at = now();
+
+  -- 0007: published articles leave the date archive
+  INSERT INTO article_archive_days (scope, day, articles)
+  SELECT d.scope, d.day, sum(d.delta) FROM (
+    SELECT '00000000-0000-0000-0000-000000000000'::uuid AS scope,
+           (o.published_at AT TIME ZONE 'UTC')::date AS day, -1 AS delta
+      FROM old_rows o
+     WHERE o.status = 'published' AND o.published_at IS NOT NULL
+    UNION ALL
+    SELECT c.id, (o.published_at AT TIME ZONE 'UTC')::date, -1
+      FROM old_rows o
+      JOIN categories c ON c.id = o.primary_category_id
+        OR c.id IN (SELECT ac.category_id FROM article_category ac WHERE ac.article_id = o.id)
+     WHERE o.status = 'published' AND o.published_at IS NOT NULL
+  ) d
+  GROUP BY d.scope, d.day
+  ON CONFLICT (scope, day) DO UPDATE SET articles = article_archive_days.articles + EXCLUDED.articles;
+
+  -- 0008: published articles leave their tags
+  PERFORM tag_counts_add(array_agg(d.tag_id), array_agg(d.delta)) FROM (
+    SELECT at.tag_id, -count(*)::int AS delta
+      FROM old_rows o JOIN article_tag at ON at.article_id = o.id
+     WHERE o.status = 'published'
+     GROUP BY at.tag_id
+  ) d;
+
+  -- links, section items, views and related lists cascade from article_keys
+  DELETE FROM article_keys k USING old_rows o WHERE k.id = o.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every counter from the base tables. Returns one row per counter
+-- whose stored value had drifted (or was missing) together with the fix.
+CREATE OR REPLACE FUNCTION reconcile_stat_counters()
+RETURNS TABLE (counter_name VARCHAR, stored_value BIGINT, actual_value BIGINT) AS $$
+BEGIN
+  -- blocks concurrent counter updates (ROW EXCLUSIVE) until we commit, so no
+  -- delta lands between the recount and the overwrite
+  LOCK TABLE stat_counters IN SHARE ROW EXCLUSIVE MODE;
+  RETURN QUERY
+  WITH members AS (
+    SELECT a.id, a.primary_category_id AS category_id, a.status FROM articles a
+     WHERE a.primary_category_id IS NOT NULL
+    UNION
+    SELECT a.id, ac.category_id, a.status FROM articles a JOIN article_category ac ON ac.article_id = a.id
+  ),
+  fresh AS (
+    SELECT 'articles.total'::varchar AS fname, count(*)::bigint AS fvalue FROM articles
+    UNION ALL
+    SELECT ('articles.status.' || status)::varchar, count(*)::bigint FROM articles GROUP BY status
+    UNION ALL
+    SELECT 'media.total'::varchar, count(*)::bigint FROM media_assets
+    UNION ALL
+    SELECT ('media.type.' || type)::varchar, count(*)::bigint FROM media_assets GROUP BY type
+    UNION ALL
+    SELECT ('categories.' || m.category_id || '.articles')::varchar, count(*)::bigint
+      FROM members m GROUP BY m.category_id
+    UNION ALL
+    SELECT ('categories.' || m.category_id || '.published')::varchar, count(*)::bigint
+      FROM members m WHERE m.status = 'published' GROUP BY m.category_id
+  ),
+  drift AS (
+    SELECT coalesce(f.fname, s.name) AS dname, s.value AS dstored, coalesce(f.fvalue, 0) AS dactual
+      FROM fresh f FULL OUTER JOIN stat_counters s ON s.name = f.fname
+     WHERE s.value IS DISTINCT FROM coalesce(f.fvalue, 0)
+  ),
+  fixed AS (
+    INSERT INTO stat_counters (name, value, updated_at)
+    SELECT dname, dactual, now() FROM drift
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value, updated_at = now()
+    RETURNING 1
+  )
+  SELECT dname, dstored, dactual FROM drift;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT count(*) FROM reconcile_stat_counters();
@@ -0,0 +1,38 @@
+from app.services.article_body import process_body, make_excerpt, reading_time_minutes
+
+
+def test_sanitizes_disallowed_markup():
+    body = (
+        '<p onclick="x()">Hello <script>alert(1)</script><b>world</b></p>'
+        '<a href="javascript:alert(1)">bad</a><a href="/ok" target="_blank">ok</a>'
+        '<img src="/static/uploads/a.jpg" onerror="x()"><div>kept text</div>'
+    )
+    out = process_body(body)
+    html = out['body_html']
+    assert '<script' not in html and 'alert(1)' not in html
+    assert 'onclick' not in html and 'onerror' not in html
+    assert '<a>bad</a>' in html
+    assert '<a href="/ok" target="_blank" rel="noopener noreferrer">ok</a>' in html
+    assert '<img src="/static/uploads/a.jpg">' in html
+    assert '<div>' not in html and 'kept text' in html
+
+
+def test_closes_unbalanced_tags_and_escapes_text():
+    out = process_body('<p><strong>bold &amp; <em>open</p>1 < 2')
+    assert out['body_html'] == '<p><strong>bold &amp; <em>open</em></strong></p>1 &lt; 2'
+
+
+def test_plain_text_excerpt_and_reading_time():
+    body = '<h2>Title</h2><p>' + ' '.join(['word'] * 450) + '</p>'
+    out = process_body(body)
+    assert out['body_text'].startswith('Title\n\nword word')
+    assert out['word_count'] == 451
+    assert out['reading_time_minutes'] == 3
+    assert len(out['excerpt']) <= 281 and out['excerpt'].endswith('…')
+
+
+def test_empty_body():
+    out = process_body(None)
+    assert out['body_html'] is None and out['word_count'] == 0 and out['reading_time_minutes'] == 0
+    assert reading_time_minutes(1) == 1
+    assert make_excerpt('short text') == 'short text'
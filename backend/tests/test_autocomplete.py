@@ -0,0 +1,145 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.app import create_app
+from app.services.autocomplete_service import ARTICLE_CANDIDATES, AutocompleteService, PrefixIndex, TaxonomyIndex, normalize
+
+
+def test_normalize_folds_case_accents_and_spaces():
+    assert normalize('Élection  Présidentielle ') == 'election presidentielle'
+    assert normalize('COVID-19') == 'covid-19'
+
+
+def test_prefix_index_put_remove_search():
+    index = PrefixIndex()
+    index.load([
+        {'id': '1', 'name': 'Élections', 'slug': 'elections'},
+        {'id': '2', 'name': 'Economy', 'slug': 'economy'},
+        {'id': '3', 'name': 'Education', 'slug': 'education'},
+        {'id': '4', 'name': 'Sport', 'slug': 'sport'},
+    ])
+    assert [t['id'] for t in index.search('e')] == ['2', '3', '1']
+    assert [t['id'] for t in index.search('ELE')] == ['1']
+    assert [t['id'] for t in index.search('e', limit=2)] == ['2', '3']
+    assert index.search('z') == []
+
+    index.put({'id': '4', 'name': 'Elite sport', 'slug': 'sport'})  # rename
+    assert [t['name'] for t in index.search('el')] == ['Élections', 'Elite sport']
+    assert index.search('sport') == []
+    index.remove('1')
+    index.remove('missing')
+    assert [t['id'] for t in index.search('el')] == ['4']
+    assert len(index) == 3
+
+
+def test_endpoint_validates_and_clamps(monkeypatch):
+    calls = []
+
+    class FakeAutocompleteService:
+        def __init__(self, session=None):
+            pass
+
+        def suggest(self, kind, prefix, limit=10, include_unpublished=False):
+            calls.append((kind, prefix, limit, include_unpublished))
+            return [{'id': '1', 'name': 'Elections', 'slug': 'elections'}]
+
+    monkeypatch.setattr('app.controllers.autocomplete_controller.AutocompleteService', FakeAutocompleteService)
+    app = create_app()
+    assert app.view_functions['autocomplete.autocomplete'].rate_limit_class == 'list'
+    client = app.test_client()
+
+    j = client.get('/api/autocomplete?prefix=ele').get_json()
+    assert j == {'type': 'tag', 'prefix': 'ele', 'results': [{'id': '1', 'name': 'Elections', 'slug': 'elections'}]}
+    assert calls[-1][:3] == ('tag', 'ele', 10)
+    client.get('/api/autocomplete?type=article&prefix=budget&limit=500')
+    assert calls[-1][:3] == ('article', 'budget', 20)
+    assert client.get('/api/autocomplete?type=user&prefix=a').status_code == 400
+    assert client.get('/api/autocomplete?prefix=' + 'a' * 256).status_code == 400
+
+
+def test_index_loads_once_and_keeps_serving_when_sync_fails(monkeypatch):
+    class NullSession:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    index = TaxonomyIndex(session_factory=NullSession, poll_seconds=60)
+    loads, polls = [], []
+
+    def load(session):
+        loads.append(1)
+        index.indexes['tag'].load([{'id': '1', 'name': 'Elections', 'slug': 'elections'}])
+        index._loaded = True
+
+    def poll(session):
+        polls.append(1)
+        raise RuntimeError('database down')
+
+    monkeypatch.setattr(index, '_load', load)
+    monkeypatch.setattr(index, '_poll', poll)
+
+    assert index.search('tag', 'el')[0]['slug'] == 'elections'
+    assert index.search('tag', 'el')[0]['slug'] == 'elections'
+    assert (len(loads), len(polls)) == (1, 0)
+    index.changed()
+    assert index.search('tag', 'el')[0]['slug'] == 'elections'
+    assert (len(loads), len(polls)) == (1, 1)
+
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_index_follows_writes_from_other_workers():
+    from app.config.db import get_engine
+
+    engine = get_engine(TEST_DATABASE_URL)
+    factory = sessionmaker(bind=engine)
+    index = TaxonomyIndex(session_factory=factory, poll_seconds=0)
+    tag_id = uuid.uuid4()
+    suffix = tag_id.hex[:12]
+    try:
+        index.refresh()
+        with factory() as session:  # another worker's write
+            session.execute(text('INSERT INTO tags (id, name, slug) VALUES (:id, :name, :slug)'),
+                            {'id': tag_id, 'name': f'Zz autocomplete {suffix}', 'slug': f'zz-{suffix}'})
+            session.commit()
+        assert [t['id'] for t in index.search('tag', f'zz autocomplete {suffix}')] == [str(tag_id)]
+
+        with factory() as session:
+            session.execute(text('UPDATE tags SET name = :name WHERE id = :id'),
+                            {'id': tag_id, 'name': f'Zy autocomplete {suffix}'})
+            session.commit()
+        assert index.search('tag', f'zz autocomplete {suffix}') == []
+        assert [t['id'] for t in index.search('tag', f'zy autocomplete {suffix}')] == [str(tag_id)]
+    finally:
+        with factory() as session:
+            session.execute(text('DELETE FROM tags WHERE id = :id'), {'id': tag_id})
+            session.commit()
+    assert index.search('tag', f'zy autocomplete {suffix}') == []
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_article_suggestions_include_the_newest_matches():
+    from app.config.db import get_engine
+
+    engine = get_engine(TEST_DATABASE_URL)
+    suffix = uuid.uuid4().hex[:12]
+    with sessionmaker(bind=engine)() as session:
+        # more matches than are ranked; the newest must still be offered
+        session.execute(text(
+            "INSERT INTO articles (title, slug, status, published_at) "
+            "SELECT 'Zq ' || :suffix || ' story ' || n, 'zq-' || :suffix || '-' || n, 'published', "
+            "now() - make_interval(mins => n) FROM generate_series(1, :n) AS n"
+        ), {'suffix': suffix, 'n': ARTICLE_CANDIDATES * 2})
+        results = AutocompleteService(session).articles(f'zq {suffix}', limit=ARTICLE_CANDIDATES)
+        session.rollback()
+    assert len(results) == ARTICLE_CANDIDATES
+    assert f'zq-{suffix}-1' in {r['slug'] for r in results}
+    assert f'zq-{suffix}-{ARTICLE_CANDIDATES * 2}' not in {r['slug'] for r in results}
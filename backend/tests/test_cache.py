@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+import pytest
+
+from app import cache as cache_mod
+from app.cache import ResponseCache, InvalidationListener, CACHE_CHANNEL
+from app.app import create_app
+from tests.test_endpoints import make_article_obj
+
+
+def test_entries_expire_by_tag(tmp_path):
+    c = ResponseCache(str(tmp_path))
+    c.set('/api/tags/?', time.time_ns(), ['tags'], 200, 'application/json', b'[1]')
+    c.set('/api/categories/?', time.time_ns(), ['categories'], 200, 'application/json', b'[2]')
+    assert c.get('/api/tags/?') == ({'key': '/api/tags/?', 'tags': ['tags'], 'status': 200,
+                                      'mimetype': 'application/json'}, b'[1]')
+
+    c.invalidate(['tags'])
+    assert c.get('/api/tags/?') is None
+    assert c.get('/api/categories/?')[1] == b'[2]'
+
+    c.invalidate(['*'])
+    assert c.get('/api/categories/?') is None
+    assert c.gc() == 2
+
+
+def test_response_started_before_invalidation_is_not_served(tmp_path):
+    c = ResponseCache(str(tmp_path))
+    started = time.time_ns()
+    c.invalidate(['article:x'])  # an edit commits while the view is still running
+    c.set('/api/articles/x?', started, ['article:x'], 200, 'application/json', b'old')
+    assert c.get('/api/articles/x?') is None
+
+
+def test_public_cache_decorator(tmp_path, monkeypatch):
+    c = ResponseCache(str(tmp_path))
+    monkeypatch.setattr(cache_mod, 'response_cache', c)
+    calls = []
+
+    class FakeArticleService:
+        def __init__(self, session=None):
+            self.dao = self
+
+        def get_by_slug(self, slug):
+            calls.append(slug)
+            return make_article_obj(slug=slug)
+
+    monkeypatch.setattr('app.controllers.article_controller.ArticleService', FakeArticleService)
+    client = create_app().test_client()
+
+    first = client.get('/api/articles/cached-story')
+    second = client.get('/api/articles/cached-story')
+    assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+    assert first.data == second.data and calls == ['cached-story']
+
+    # authenticated requests bypass the cache
+    client.get('/api/articles/cached-story', headers={'Authorization': 'Bearer x'})
+    assert calls == ['cached-story', 'cached-story']
+
+    c.invalidate(['article:cached-story'])
+    assert client.get('/api/articles/cached-story').headers['X-Cache'] == 'MISS'
+
+
+def test_notify_payloads_stay_under_the_postgres_limit():
+    tags = [cache_mod.article_tag('a-fairly-long-article-slug-%04d' % i) for i in range(400)]
+    payloads = cache_mod.notify_payloads(tags)
+    assert len(payloads) > 1
+    assert all(len(p.encode('utf-8')) <= cache_mod.NOTIFY_MAX_BYTES for p in payloads)
+    assert sorted(t for p in payloads for t in json.loads(p)) == sorted(tags)
+    # a bulk edit of 50k articles drops everything rather than sending 50k tags
+    assert cache_mod.notify_payloads(tags * 2 + ['x%d' % i for i in range(1000)]) == ['["*"]']
+
+
+def test_bulk_related_refresh_invalidates_cached_lists(monkeypatch):
+    import contextlib
+    import uuid
+
+    from app.services import related_service
+    from app.signals import ArticleChange
+
+    events = []
+    monkeypatch.setattr('app.config.session.SessionLocal', contextlib.nullcontext)
+    monkeypatch.setattr(related_service, 'apply_changes', lambda session, changes: events.append('refreshed'))
+    monkeypatch.setattr(cache_mod, 'publish', lambda tags: events.append(set(tags)))
+    related_service._apply_bulk([ArticleChange(action='updated', article_id=uuid.uuid4(), status='published')])
+    # /related responses cached during the refresh are dropped once it has committed
+    assert events == ['refreshed', {cache_mod.ARTICLE_LISTS}]
+
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_notify_reaches_listener(tmp_path):
+    import psycopg2
+
+    c = ResponseCache(str(tmp_path))
+    listener = InvalidationListener(c, TEST_DATABASE_URL, poll_seconds=0.1)
+    listener.start()
+    try:
+        deadline = time.time() + 5
+        while not os.path.exists(tmp_path / 'tags' / '*') and time.time() < deadline:
+            time.sleep(0.05)  # listener invalidates everything once connected
+        c.set('/k', time.time_ns(), ['article:a'], 200, 'application/json', b'x')
+
+        conn = psycopg2.connect(TEST_DATABASE_URL)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute('SELECT pg_notify(%s, %s)', (CACHE_CHANNEL, json.dumps(['article:a'])))
+        conn.close()
+
+        deadline = time.time() + 1
+        while c.get('/k') is not None and time.time() < deadline:
+            time.sleep(0.02)
+        assert c.get('/k') is None
+    finally:
+        listener.stop()
+        listener.join(2)
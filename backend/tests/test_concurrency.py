@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from werkzeug.serving import make_server
+
+from app.app import create_app
+from app.config import db, session as db_session
+from app.config.session import SessionLocal
+from test_snapshot import write_snapshot
+
+REQUESTS = 1000
+CLIENTS = 50
+POOL_SIZE = 8
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    path = str(tmp_path / 'site.db')
+    write_snapshot(path, 'Budget passed')
+    engine = create_engine(f'sqlite:///{path}', poolclass=QueuePool, pool_size=POOL_SIZE, max_overflow=0,
+                           pool_timeout=30, connect_args={'check_same_thread': False})
+    monkeypatch.setattr(db_session, '_engine', engine)
+    monkeypatch.setattr(db_session, '_sessionmaker', sessionmaker(bind=engine, autocommit=False, autoflush=False))
+    monkeypatch.setattr(db_session, 'stats', {'opened': 0, 'left_open': 0})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def server(engine):
+    app = create_app()
+
+    @app.route('/leaky')
+    def leaky():
+        # a view that never closes one of its sessions
+        SessionLocal().execute(text('SELECT 1'))
+        with SessionLocal() as session:
+            return {'titles': session.execute(text('SELECT title FROM articles')).scalars().all()}
+
+    httpd = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.status, json.loads(response.read())
+
+
+def test_parallel_requests_leave_no_sessions_or_connections_behind(engine, server):
+    paths = ['/api/articles/budget', '/api/categories/', '/api/tags/', '/leaky']
+    urls = [server + paths[i % len(paths)] for i in range(REQUESTS)]
+    with ThreadPoolExecutor(max_workers=CLIENTS) as clients:
+        results = list(clients.map(fetch, urls))
+
+    assert {status for status, _ in results} == {200}
+    assert all(body['title'] == 'Budget passed' for _, body in results[0::4])
+    assert all(body == {'titles': ['Budget passed']} for _, body in results[3::4])
+
+    # every connection is back in the pool, which never grew past its size
+    assert engine.pool.checkedout() == 0
+    assert engine.pool.checkedin() <= POOL_SIZE
+    # the leaky view's unclosed sessions were closed at the end of each request
+    assert db_session.stats['opened'] >= REQUESTS
+    assert db_session.stats['left_open'] == REQUESTS // 4
+
+
+def test_pool_is_sized_from_the_serving_mode(monkeypatch):
+    background = db.BACKGROUND_CONNECTIONS
+    assert db.worker_class('sync', 1) == 'sync'
+    assert db.worker_class('sync', 8) == 'gthread'
+    assert db.pool_size('sync', 1) == 1 + background
+    assert db.pool_size('gthread', 16) == 16 + background
+    assert db.pool_size('gevent', 1) == db.GEVENT_POOL_SIZE
+    monkeypatch.setattr(db, 'DB_POOL_SIZE', 12)
+    assert db.pool_size('gthread', 16) == 12
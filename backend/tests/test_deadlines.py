@@ -0,0 +1,100 @@
+import os
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import deadlines
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(deadlines, 'stats', {'query_timeout': 0, 'db_unavailable': 0, 'by_endpoint': {}})
+    from app.app import create_app
+    return create_app()
+
+
+@pytest.mark.parametrize('method, path, expected', [
+    ('GET', '/api/articles/some-story', 'read'),
+    ('GET', '/api/articles/', 'list'),
+    ('PUT', '/api/tags/1', 'admin'),
+    ('POST', '/api/articles/bulk', 'bulk'),
+    ('POST', '/api/articles/some-story/view', 'write'),
+])
+def test_budget_classes(app, method, path, expected):
+    with app.test_request_context(path, method=method):
+        deadlines.before_request()
+        assert deadlines._budget_class(app) == expected
+        assert 0 < deadlines.remaining_ms() <= deadlines.QUERY_BUDGETS[expected]
+
+
+class CanceledQuery(Exception):
+    pgcode = deadlines.QUERY_CANCELED
+
+
+def failing_session(orig):
+    class FailingSession:
+        def __enter__(self):
+            raise OperationalError('SELECT ...', {}, orig)
+
+        def __exit__(self, *exc):
+            return False
+
+    return lambda: FailingSession()
+
+
+def test_canceled_query_is_504_and_counted(app, monkeypatch):
+    monkeypatch.setattr('app.controllers.category_controller.read_session',
+                        failing_session(CanceledQuery('canceling statement due to statement timeout')))
+    client = app.test_client()
+    response = client.get('/api/categories/')
+    assert response.status_code == 504
+    assert deadlines.stats['query_timeout'] == 1
+    assert deadlines.stats['by_endpoint'] == {'categories.list_categories': {'query_timeout': 1}}
+
+    monkeypatch.setattr('app.controllers.category_controller.read_session',
+                        failing_session(Exception('server closed the connection unexpectedly')))
+    response = client.get('/api/categories/')
+    assert response.status_code == 503 and response.headers['Retry-After'] == '2'
+    assert deadlines.stats['db_unavailable'] == 1
+
+
+def test_signal_receivers_run_outside_the_deadline(app):
+    from blinker import Namespace
+    from flask import g
+    from app.signals import send_safely
+
+    signal = Namespace().signal('test-changed')
+    seen = []
+    signal.connect(lambda sender, **kwargs: seen.append(deadlines.remaining_ms()), weak=False)
+    with app.test_request_context('/api/articles/', method='POST'):
+        g.query_deadline = time.monotonic() + 0.01
+        send_safely(signal, None)
+        assert seen == [None]
+        assert deadlines.remaining_ms() is not None
+
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_statement_timeout_follows_the_request_deadline(app):
+    from flask import g
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+    from app.config.db import get_engine
+
+    engine = get_engine(TEST_DATABASE_URL)
+    try:
+        with app.test_request_context('/api/articles/'):
+            g.query_deadline = time.monotonic() + 0.3
+            with Session(engine) as session:
+                assert 50 <= int(session.execute(text('SHOW statement_timeout')).scalar().rstrip('ms')) <= 300
+                with pytest.raises(OperationalError) as excinfo:
+                    session.execute(text('SELECT pg_sleep(2)'))
+                assert excinfo.value.orig.pgcode == deadlines.QUERY_CANCELED
+        # outside a request nothing is set
+        with Session(engine) as session:
+            assert session.execute(text('SHOW statement_timeout')).scalar() == '0'
+    finally:
+        engine.dispose()
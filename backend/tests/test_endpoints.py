@@ -12,7 +12,10 @@ class SimpleObj:
 
 
 def make_article_obj(slug='sample-breaking-story'):
-    return SimpleObj(id=uuid.uuid4(), title='Sample', slug=slug, summary='sum', body_richtext='<p>body</p>', published_at=None)
+    return SimpleObj(id=uuid.uuid4(), title='Sample', slug=slug, summary='sum', body_richtext='<p>body</p>',
+                     body_html='<p>body</p>', excerpt='body', word_count=1, reading_time_minutes=1,
+                     published_at=None, status='published', categories=[], tags=[], primary_category=None,
+                     hero_image_url=None, is_highlight=False, is_breaking=False, is_featured=False)
 
 
 def test_list_and_get_articles(monkeypatch):
@@ -21,7 +24,7 @@ def test_list_and_get_articles(monkeypatch):
         def __init__(self, session=None):
             self.dao = self
 
-        def list(self, limit=20, offset=0):
+        def list(self, limit=20, offset=0, **filters):
             return [make_article_obj()]
 
         def get_by_slug(self, slug):
@@ -30,6 +33,9 @@ def test_list_and_get_articles(monkeypatch):
         def create(self, article):
             return SimpleObj(id=uuid.uuid4())
 
+        def create_with_relations(self, article, category_ids=None, tag_ids=None):
+            return SimpleObj(id=uuid.uuid4(), slug=article.slug)
+
     monkeypatch.setattr('app.controllers.article_controller.ArticleService', FakeArticleService)
 
     app = create_app()
@@ -64,8 +70,8 @@ def test_categories_and_tags(monkeypatch):
         def __init__(self, session=None):
             pass
 
-        def list(self, limit=100, offset=0):
-            return [SimpleObj(id=uuid.uuid4(), name='breaking', slug='breaking')]
+        def list(self, limit=100, offset=0, prefix=None, order='name'):
+            return [SimpleObj(id=uuid.uuid4(), name='breaking', slug='breaking', article_count=4)]
 
         def create(self, obj):
             return SimpleObj(id=uuid.uuid4())
@@ -91,6 +97,30 @@ def test_categories_and_tags(monkeypatch):
     assert rt2.status_code == 201
 
 
+def test_tag_listing_paging_and_counts(monkeypatch):
+    calls = []
+
+    class FakeTagService:
+        def __init__(self, session=None):
+            pass
+
+        def list(self, **kwargs):
+            calls.append(kwargs)
+            return [SimpleObj(id=uuid.uuid4(), name='Elections', slug='elections', article_count=12)]
+
+    monkeypatch.setattr('app.controllers.tag_controller.TagService', FakeTagService)
+    client = create_app().test_client()
+
+    assert 'article_count' not in client.get('/api/tags/').get_json()[0]
+    assert calls[-1] == {'limit': 100, 'offset': 0, 'prefix': None, 'order': 'name'}
+
+    j = client.get('/api/tags/?order=popular&prefix=Elec&limit=1000&offset=40').get_json()
+    assert j[0]['article_count'] == 12
+    assert calls[-1] == {'limit': 500, 'offset': 40, 'prefix': 'Elec', 'order': 'popular'}
+    assert client.get('/api/tags/?with_counts=1').get_json()[0]['article_count'] == 12
+    assert client.get('/api/tags/?order=random').status_code == 400
+
+
 def test_media_and_users_and_homepage(monkeypatch, tmp_path):
     # Media service
     class FakeMediaService:
@@ -100,6 +130,16 @@ def test_media_and_users_and_homepage(monkeypatch, tmp_path):
         def list(self, limit=100, offset=0):
             return [SimpleObj(id=uuid.uuid4(), url='/static/uploads/2025/10/hero1.jpg', file_name='hero1.jpg')]
 
+        def list_with_count(self, limit=100, offset=0, q=None):
+            item = SimpleObj(id=uuid.uuid4(), url='/static/uploads/2025/10/hero1.jpg', file_name='hero1.jpg',
+                             mime_type='image/jpeg', width=None, height=None, alt_text=None, caption=None,
+                             credit=None, created_at=None)
+            return [item], 1
+
+        def list_with_total(self, limit=100, offset=0, q=None):
+            items, total = self.list_with_count(limit=limit, offset=offset, q=q)
+            return items, total, False
+
         def create(self, media):
             return SimpleObj(id=uuid.uuid4(), url='/static/uploads/...')
 
@@ -150,3 +190,147 @@ def test_media_and_users_and_homepage(monkeypatch, tmp_path):
 
     rp = client.post('/api/homepage_section_items/', json={'section_id': str(uuid.uuid4()), 'article_id': str(uuid.uuid4())})
     assert rp.status_code == 201
+
+
+def test_admin_stats(monkeypatch):
+    class FakeStatsService:
+        def __init__(self, session=None):
+            pass
+
+        def dashboard(self):
+            return {
+                'articles': {'total': 3, 'by_status': {'draft': 1, 'scheduled': 0, 'published': 2, 'archived': 0}},
+                'media': {'total': 1, 'by_type': {'image': 1}},
+                'categories': [{'id': str(uuid.uuid4()), 'name': 'Political', 'slug': 'political-news',
+                                'articles': 2, 'published': 1}],
+            }
+
+    monkeypatch.setattr('app.controllers.admin_controller.StatsService', FakeStatsService)
+
+    app = create_app()
+    client = app.test_client()
+
+    r = client.get('/api/admin/stats')
+    assert r.status_code == 200
+    j = r.get_json()
+    assert j['articles']['by_status']['published'] == 2
+    assert j['categories'][0]['articles'] == 2
+
+
+def test_article_archive(monkeypatch):
+    from datetime import date
+
+    class FakeArchiveDAO:
+        def __init__(self, session=None):
+            pass
+
+        def days(self, scope):
+            return [(date(2026, 10, 19), 3), (date(2026, 10, 1), 2), (date(2026, 9, 30), 4), (date(2025, 12, 31), 1)]
+
+    class FakeCategoryDAO:
+        def __init__(self, session=None):
+            pass
+
+        def get_by_slug(self, slug):
+            return SimpleObj(id=uuid.uuid4()) if slug == 'political-news' else None
+
+    monkeypatch.setattr('app.services.archive_service.ArchiveDAO', FakeArchiveDAO)
+    monkeypatch.setattr('app.services.archive_service.CategoryDAO', FakeCategoryDAO)
+    client = create_app().test_client()
+
+    j = client.get('/api/articles/archive').get_json()
+    assert j['total'] == 10 and 'days' not in j
+    assert j['years'] == [
+        {'year': 2026, 'count': 9, 'months': [{'month': 10, 'count': 5}, {'month': 9, 'count': 4}]},
+        {'year': 2025, 'count': 1, 'months': [{'month': 12, 'count': 1}]},
+    ]
+    j = client.get('/api/articles/archive?category=political-news&month=2026-10').get_json()
+    assert j['category'] == 'political-news'
+    assert j['days'] == [{'date': '2026-10-19', 'count': 3}, {'date': '2026-10-01', 'count': 2}]
+    assert client.get('/api/articles/archive?month=2026-13').status_code == 400
+    assert client.get('/api/articles/archive?category=nope').status_code == 404
+
+
+def test_related_articles(monkeypatch):
+    published = make_article_obj(slug='main-story')
+    draft = make_article_obj(slug='draft-story')
+    draft.status = 'draft'
+
+    class FakeArticleService:
+        def __init__(self, session=None):
+            self.dao = self
+
+        def get_by_slug(self, slug):
+            return {'main-story': published, 'draft-story': draft}.get(slug)
+
+    class FakeRelatedService:
+        def __init__(self, session=None):
+            pass
+
+        def related(self, article, limit=6):
+            return [make_article_obj(slug=f'related-{i}') for i in range(limit)]
+
+    monkeypatch.setattr('app.controllers.article_controller.ArticleService', FakeArticleService)
+    monkeypatch.setattr('app.controllers.article_controller.RelatedService', FakeRelatedService)
+
+    client = create_app().test_client()
+    r = client.get('/api/articles/main-story/related?limit=3')
+    assert r.status_code == 200
+    assert [a['slug'] for a in r.get_json()] == ['related-0', 'related-1', 'related-2']
+    assert client.get('/api/articles/draft-story/related').status_code == 404
+    assert client.get('/api/articles/missing/related').status_code == 404
+
+
+def test_view_beacon_and_trending(monkeypatch):
+    recorded = []
+
+    class FakeTrendingService:
+        def __init__(self, session=None):
+            pass
+
+        def top(self, sort='trending', hours=24, limit=10):
+            return [{'slug': 'hot', 'sort': sort, 'hours': hours, 'limit': limit}]
+
+    monkeypatch.setattr('app.controllers.article_controller.views.record', recorded.append)
+    monkeypatch.setattr('app.controllers.article_controller.TrendingService', FakeTrendingService)
+
+    client = create_app().test_client()
+    assert client.post('/api/articles/some-story/view').status_code == 204
+    assert recorded == ['some-story']
+
+    r = client.get('/api/articles/trending?sort=most_read&hours=1000&limit=500')
+    assert r.status_code == 200
+    assert r.get_json() == [{'slug': 'hot', 'sort': 'most_read', 'hours': 168, 'limit': 50}]
+    assert client.get('/api/articles/trending?sort=random').status_code == 400
+
+
+def test_bulk_articles_validates_and_returns_counts(monkeypatch):
+    calls = []
+
+    class FakeArticleService:
+        def __init__(self, session=None):
+            pass
+
+        def bulk(self, action, ids=None, filters=None, **params):
+            calls.append((action, ids, filters, params))
+            if action == 'explode':
+                raise ValueError("unknown action 'explode'")
+            return {'matched': len(ids or []), 'updated': 1}
+
+    monkeypatch.setattr('app.controllers.article_controller.ArticleService', FakeArticleService)
+    client = create_app().test_client()
+
+    article_id = str(uuid.uuid4())
+    r = client.post('/api/articles/bulk', json={'action': 'set_status', 'status': 'draft', 'ids': [article_id]})
+    assert r.status_code == 200 and r.get_json() == {'matched': 1, 'updated': 1}
+    assert calls[-1][1] == [uuid.UUID(article_id)] and calls[-1][3]['status'] == 'draft'
+
+    r = client.post('/api/articles/bulk', json={'action': 'set_flags', 'flags': {'is_breaking': False},
+                                                'filter': {'status': 'all', 'category': 'news'}})
+    assert r.status_code == 200
+    assert calls[-1][2]['status'] is None and calls[-1][2]['category_slug'] == 'news'
+
+    assert client.post('/api/articles/bulk', json={'action': 'delete'}).status_code == 400
+    assert client.post('/api/articles/bulk', json={'action': 'delete', 'ids': ['nope']}).status_code == 400
+    r = client.post('/api/articles/bulk', json={'action': 'explode', 'ids': []})
+    assert r.status_code == 400 and 'explode' in r.get_json()['error']
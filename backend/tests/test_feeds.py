@@ -0,0 +1,122 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.services import feed_service
+from app.services.feed_service import ShardCache, month_part_name, stale_groups
+from app.signals import ArticleChange
+
+
+def test_month_part_names():
+    assert month_part_name('2024-03', 1) == 'sitemaps/2024-03.xml'
+    assert month_part_name('2024-03', 3) == 'sitemaps/2024-03-p3.xml'
+
+
+def test_shard_cache_invalidation(tmp_path):
+    cache = ShardCache(str(tmp_path))
+    assert not cache.is_fresh('rss.xml')
+
+    started = time.time_ns()
+    with cache.writer('rss.xml', started) as fh:
+        fh.write('<rss/>')
+    assert cache.is_fresh('rss.xml')
+
+    cache.invalidate(['rss'])
+    assert not cache.is_fresh('rss.xml')
+
+    # a build that started before the invalidation stays stale
+    with cache.writer('rss.xml', started) as fh:
+        fh.write('<rss/>')
+    assert not cache.is_fresh('rss.xml')
+
+    with cache.writer('rss.xml', time.time_ns()) as fh:
+        fh.write('<rss/>')
+    assert cache.is_fresh('rss.xml')
+
+
+def test_failed_build_keeps_previous_file(tmp_path):
+    cache = ShardCache(str(tmp_path))
+    with cache.writer('sitemap.xml', time.time_ns()) as fh:
+        fh.write('old')
+    try:
+        with cache.writer('sitemap.xml', time.time_ns()) as fh:
+            fh.write('partial')
+            raise RuntimeError('db went away')
+    except RuntimeError:
+        pass
+    assert (tmp_path / 'sitemap.xml').read_text() == 'old'
+    assert [p.name for p in tmp_path.iterdir()] == ['sitemap.xml']
+
+
+def test_stale_groups_only_touch_affected_shards():
+    cat_a, cat_b = uuid.uuid4(), uuid.uuid4()
+    change = ArticleChange(
+        action='updated', article_id=uuid.uuid4(), slug='s', status='published',
+        published_at=datetime(2024, 5, 2, tzinfo=timezone.utc), category_ids={cat_b},
+        old_slug='s', old_status='published',
+        old_published_at=datetime(2024, 4, 30, 23, 0, tzinfo=timezone.utc), old_category_ids={cat_a},
+    )
+    assert stale_groups(change) == {
+        'sitemap', 'rss', 'sitemaps/2024-04', 'sitemaps/2024-05',
+        f'categories/{cat_a}', f'categories/{cat_b}',
+    }
+
+    draft = ArticleChange(action='updated', article_id=uuid.uuid4(), status='draft', old_status='draft')
+    assert stale_groups(draft) == set()
+
+    # articles listed only through their primary category
+    primary_only = ArticleChange(
+        action='deleted', article_id=uuid.uuid4(), old_slug='s', old_status='published',
+        old_published_at=datetime(2024, 5, 2, tzinfo=timezone.utc), old_primary_category_id=cat_a,
+    )
+    assert f'categories/{cat_a}' in stale_groups(primary_only)
+
+
+def test_receiver_marks_cache_stale(tmp_path, monkeypatch):
+    cache = ShardCache(str(tmp_path))
+    monkeypatch.setattr(feed_service, 'cache', cache)
+    with cache.writer('rss.xml', time.time_ns()) as fh:
+        fh.write('<rss/>')
+
+    feed_service.on_article_changed(None, change=ArticleChange(
+        action='deleted', article_id=uuid.uuid4(), old_status='published',
+        old_published_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    ))
+    assert not cache.is_fresh('rss.xml')
+
+
+def test_month_counts_come_from_the_archive_rollup(tmp_path, monkeypatch):
+    from datetime import date
+
+    cache = ShardCache(str(tmp_path))
+    monkeypatch.setattr(feed_service, 'cache', cache)
+    days = [(date(2024, 5, 2), 3), (date(2024, 5, 1), 2), (date(2024, 4, 30), 1)]
+    monkeypatch.setattr(feed_service, 'ArchiveDAO', lambda session: type('DAO', (), {'days': lambda self: days})())
+    cache.invalidate(['sitemaps/2024-05'])
+
+    (april, april_n, april_lastmod), (may, may_n, may_lastmod) = feed_service.FeedService(None).month_counts()
+    assert (april, april_n, april_lastmod) == ('2024-04', 1, None)
+    assert (may, may_n) == ('2024-05', 5)
+    assert may_lastmod.tzinfo is timezone.utc
+
+
+def test_unknown_months_are_not_found(tmp_path, monkeypatch):
+    from datetime import date
+
+    cache = ShardCache(str(tmp_path))
+    monkeypatch.setattr(feed_service, 'cache', cache)
+    monkeypatch.setattr(feed_service, 'ArchiveDAO',
+                        lambda session: type('DAO', (), {'days': lambda self: [(date(2024, 5, 2), 1)]})())
+    built = []
+    monkeypatch.setattr(feed_service.FeedService, 'build_month', lambda self, month, started: built.append(month))
+    service = feed_service.FeedService(None)
+
+    assert service.ensure_month_part('2023-01', 1) is None
+    assert built == [] and list(tmp_path.iterdir()) == []
+    service.ensure_month_part('2024-05', 1)
+    assert built == ['2024-05']
+
+    from app.app import create_app
+    client = create_app().test_client()
+    for name in ('2024-13', '2024-00', '2024-5'):
+        assert client.get(f'/sitemaps/{name}.xml').status_code == 404
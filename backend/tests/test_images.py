@@ -0,0 +1,131 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from app import images
+from app.images import VariantCache, sign, variants
+from app.storage import LocalStorage
+
+
+@pytest.fixture
+def storage(monkeypatch, tmp_path):
+    storage = LocalStorage(str(tmp_path / 'uploads'))
+    monkeypatch.setattr('app.images.get_storage', lambda: storage)
+    return storage
+
+
+def jpeg(size=(1600, 1200)):
+    out = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(out, 'JPEG')
+    out.seek(0)
+    return out
+
+
+def test_variant_urls_are_signed(storage):
+    urls = variants('/static/uploads/2025/10/a.jpg')
+    assert urls['640x360'] == f"/static/img/640x360/2025/10/a.jpg?s={sign('640x360', '2025/10/a.jpg')}"
+    assert variants('https://elsewhere.example/a.jpg') is None
+    assert variants(None) is None
+
+
+def test_resize_endpoint(storage, monkeypatch, tmp_path):
+    monkeypatch.setattr('app.controllers.image_controller.cache', VariantCache(str(tmp_path / 'cache')))
+    storage.save('2025/10/a.jpg', jpeg())
+    from app.app import create_app
+    client = create_app().test_client()
+
+    url = variants('/static/uploads/2025/10/a.jpg')['640x360']
+    response = client.get(url)
+    assert response.status_code == 200 and response.mimetype == 'image/jpeg'
+    assert 'immutable' in response.headers['Cache-Control']
+    with Image.open(io.BytesIO(response.data)) as img:
+        assert img.size == (640, 360)
+    response.close()
+
+    with Image.open(io.BytesIO(client.get(variants('/static/uploads/2025/10/a.jpg')['1920x0']).data)) as img:
+        assert img.size == (1600, 1200)  # never upscaled
+
+    assert client.get('/static/img/640x360/2025/10/a.jpg?s=0000').status_code == 403
+    assert client.get(f"/static/img/641x360/2025/10/a.jpg?s={sign('641x360', '2025/10/a.jpg')}").status_code == 404
+    assert client.get(f"/static/img/640x360/2025/10/b.jpg?s={sign('640x360', '2025/10/b.jpg')}").status_code == 404
+
+
+def test_cache_renders_once_for_concurrent_requests(storage, monkeypatch, tmp_path):
+    storage.save('2025/10/a.jpg', jpeg())
+    cache = VariantCache(str(tmp_path / 'cache'))
+    calls = []
+    real_render = images.render
+
+    def slow_render(*args):
+        calls.append(1)
+        time.sleep(0.2)
+        return real_render(*args)
+
+    monkeypatch.setattr('app.images.render', slow_render)
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(cache.get('320x180', '2025/10/a.jpg')))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len(set(paths)) == 1 and len(paths) == 8
+    # later hits come straight from disk
+    cache.get('320x180', '2025/10/a.jpg')
+    assert len(calls) == 1
+
+
+def test_cache_evicts_least_recently_used(storage, tmp_path):
+    for name in ('a', 'b', 'c'):
+        storage.save(f'2025/10/{name}.jpg', jpeg((800, 800)))
+    cache = VariantCache(str(tmp_path / 'cache'), max_bytes=10 ** 9)
+    paths = {name: cache.get('160x160', f'2025/10/{name}.jpg') for name in ('a', 'b', 'c')}
+    size = sum(len(open(p, 'rb').read()) for p in paths.values())
+    now = time.time()
+    for age, name in ((300, 'a'), (200, 'b'), (100, 'c')):
+        os.utime(paths[name], (now - age, now - age))
+
+    cache.max_bytes = size - 1
+    assert cache.gc() == 1
+    assert not os.path.exists(paths['a'])
+    assert os.path.exists(paths['b']) and os.path.exists(paths['c'])
+
+    cache.purge('2025/10/b.jpg')
+    assert not os.path.exists(paths['b'])
+
+
+def test_decompression_bomb_is_rejected(storage, monkeypatch, tmp_path):
+    monkeypatch.setattr('app.controllers.image_controller.cache', VariantCache(str(tmp_path / 'cache')))
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    storage.save('2025/10/a.jpg', jpeg())
+    from app.app import create_app
+    client = create_app().test_client()
+
+    response = client.get(variants('/static/uploads/2025/10/a.jpg')['640x360'])
+    assert response.status_code == 413 and response.get_json() == {'error': 'image too large'}
+
+
+def test_gc_runs_off_the_request_thread(storage, monkeypatch, tmp_path):
+    storage.save('2025/10/a.jpg', jpeg((400, 400)))
+    cache = VariantCache(str(tmp_path / 'cache'))
+    started, release = threading.Event(), threading.Event()
+    threads = []
+
+    def slow_gc():
+        threads.append(threading.current_thread().name)
+        started.set()
+        release.wait(5)
+        return 0
+
+    monkeypatch.setattr(cache, 'gc', slow_gc)
+    cache.get('160x160', '2025/10/a.jpg')
+    assert started.wait(5)
+    # a second pass is not started while the first one is still walking
+    cache._last_gc = 0.0
+    cache.get('320x180', '2025/10/a.jpg')
+    release.set()
+    assert threads == ['image-cache-gc']
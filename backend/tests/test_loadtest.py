@@ -0,0 +1,105 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.loadtest import (
+    Request, Result, format_report, parse_access_log, percentile, route_namer, run, summarize, synthetic_mix,
+)
+
+LOG = """\
+[2026-10-19 10:00:00 +0000] [7] [INFO] Booting worker with pid: 7
+10.0.0.1 - - [19/Oct/2026:10:00:00 +0000] "GET /api/articles/?limit=50&offset=0 HTTP/1.1" 200 5120 "-" "Mozilla/5.0"
+10.0.0.2 - - [19/Oct/2026:10:00:01 +0000] "POST /api/articles/budget/view HTTP/1.1" 204 0 "-" "Mozilla/5.0"
+10.0.0.3 - - [19/Oct/2026:10:00:02 +0000] "GET /static/uploads/a.jpg HTTP/1.1" 200 90000 "-" "Mozilla/5.0"
+backend-1  | 10.0.0.4 - - [19/Oct/2026:10:00:03 +0000] "GET /api/articles/budget HTTP/1.0" 200 812 "-" "curl/8"
+"""
+
+
+def test_parse_access_log_keeps_api_reads_and_their_pace():
+    requests = parse_access_log(LOG.splitlines())
+    assert requests == [Request('GET', '/api/articles/?limit=50&offset=0', 0.0),
+                        Request('GET', '/api/articles/budget', 3.0)]
+    assert [r.method for r in parse_access_log(LOG.splitlines(), methods=('GET', 'POST'))] == ['GET', 'POST', 'GET']
+
+
+def test_routes_are_named_by_url_rule():
+    name = route_namer()
+    assert name('GET', '/api/articles/budget?x=1') == 'GET /api/articles/<string:slug>'
+    assert name('POST', '/api/articles/budget/view') == 'POST /api/articles/<string:slug>/view'
+    assert name('GET', '/nowhere') == 'GET /nowhere'
+
+
+def test_synthetic_mix_is_repeatable_and_skips_missing_slugs():
+    slugs = {'article': ['new', 'old'], 'category': ['politics'], 'tag': []}
+    first = synthetic_mix(slugs, 200, seed=3)
+    assert first == synthetic_mix(slugs, 200, seed=3)
+    assert not any('tag=' in r.path for r in first)
+    assert {r.method for r in first} == {'GET', 'POST'}
+
+
+def test_percentiles_and_summary():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+    results = [Result('GET /a', 200, 0.010, True)] * 9 + [Result('GET /b', 503, 0.100), Result('GET /b', 0, 0.5)]
+    results += [Result('GET /c', 429, 0.001), Result('GET /c', 404, 0.002)]
+    summary = summarize(results, 2.0)
+    assert (summary['requests'], summary['throughput'], summary['errors'], summary['rejected']) == (13, 6.5, 3, 1)
+    assert summary['statuses'] == {'0': 1, '200': 9, '404': 1, '429': 1, '503': 1}
+    assert summary['routes']['GET /a']['cache_hit_rate'] == 1.0
+    assert summary['routes']['GET /b']['error_rate'] == 1.0
+    assert summary['routes']['GET /c']['rejected_rate'] == 0.5
+    report = format_report(summary, baseline=summary)
+    assert 'GET /b' in report and 'RATE_LIMIT_FILE' in report
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status = 500 if self.path.startswith('/fail') else 200
+            body = b'{}'
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            if self.path.startswith('/cached'):
+                self.send_header('X-Cache', 'HIT')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_run_reports_errors_and_cache_hits(server):
+    requests = [Request('GET', '/cached')] * 30 + [Request('GET', '/fail')] * 10
+    summary = run(server, requests, concurrency=4)
+    assert summary['requests'] == 40
+    assert summary['routes']['GET /cached']['cache_hit_rate'] == 1.0
+    assert summary['routes']['GET /fail']['errors'] == 10
+    assert summary['error_rate'] == 0.25
+
+
+def test_run_keeps_the_schedule(server):
+    started = time.perf_counter()
+    summary = run(server, [Request('GET', '/cached')] * 10, concurrency=4, rate=50)
+    assert time.perf_counter() - started >= 9 / 50
+    assert summary['requests'] == 10
+
+    # log offsets / speedup: the last request is due after 0.2 s
+    requests = [Request('GET', '/cached', at) for at in (0.0, 0.2, 0.4)]
+    started = time.perf_counter()
+    run(server, requests, concurrency=2, speedup=2)
+    assert time.perf_counter() - started >= 0.2
+
+    summary = run(server, [Request('GET', '/cached')] * 100, concurrency=2, rate=20, duration=0.2)
+    assert summary['requests'] < 10
@@ -0,0 +1,123 @@
+import json
+
+from app.app import create_app
+from app.services import prerender_service
+from app.services.prerender_service import Prerenderer, render_shell
+from app.signals import ArticleChange
+from tests.test_endpoints import SimpleObj, make_article_obj
+
+
+class FakeArticleDAO:
+    def __init__(self, articles):
+        self.articles = {a.id: a for a in articles}
+
+    def get(self, article_id):
+        return self.articles.get(article_id)
+
+    def get_by_slug(self, slug):
+        return next((a for a in self.articles.values() if a.slug == slug), None)
+
+
+def make_prerenderer(tmp_path, articles):
+    p = Prerenderer.__new__(Prerenderer)
+    p.root = str(tmp_path)
+    p.articles = FakeArticleDAO(articles)
+    p.categories = SimpleObj(get=lambda category_id: None)
+    return p
+
+
+def test_prerendered_file_matches_api_response(tmp_path, monkeypatch):
+    article = make_article_obj(slug='static-story')
+    make_prerenderer(tmp_path, [article]).render_article(article)
+
+    class FakeArticleService:
+        def __init__(self, session=None):
+            self.dao = FakeArticleDAO([article])
+
+    monkeypatch.setattr('app.controllers.article_controller.ArticleService', FakeArticleService)
+    response = create_app().test_client().get('/api/articles/static-story')
+    assert response.status_code == 200
+    assert (tmp_path / 'articles' / 'static-story.json').read_bytes() == response.data
+
+
+def test_unpublish_and_slug_change_remove_stale_files(tmp_path):
+    article = make_article_obj(slug='new-slug')
+    p = make_prerenderer(tmp_path, [article])
+    (tmp_path / 'articles').mkdir()
+    (tmp_path / 'articles' / 'old-slug.json').write_text('{}')
+
+    p.apply_article_change(ArticleChange(
+        action='updated', article_id=article.id, slug='new-slug', status='published',
+        old_slug='old-slug', old_status='published',
+    ))
+    assert sorted(f.name for f in (tmp_path / 'articles').iterdir()) == ['new-slug.json']
+
+    article.status = 'draft'
+    p.apply_article_change(ArticleChange(
+        action='updated', article_id=article.id, slug='new-slug', status='draft',
+        old_slug='new-slug', old_status='published',
+    ))
+    assert list((tmp_path / 'articles').iterdir()) == []
+
+
+def test_primary_category_pages_are_rerendered(tmp_path):
+    import uuid
+
+    article = make_article_obj(slug='story')
+    p = make_prerenderer(tmp_path, [article])
+    rendered = []
+    p.render_categories = lambda category_ids: rendered.append(set(category_ids))
+    old_primary, primary, linked = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    # a primary-only article (no article_category rows) moved and then unpublished
+    p.apply_article_change(ArticleChange(
+        action='updated', article_id=article.id, slug='story', status='published', primary_category_id=primary,
+        old_slug='story', old_status='published', old_primary_category_id=old_primary,
+    ))
+    p.apply_article_changes([ArticleChange(
+        action='updated', article_id=article.id, slug='story', status='draft', primary_category_id=primary,
+        category_ids={linked}, old_slug='story', old_status='published', old_primary_category_id=primary,
+    )])
+    assert rendered == [{old_primary, primary}, {primary, linked}]
+
+
+def test_unsafe_slug_is_never_written(tmp_path):
+    article = make_article_obj(slug='../escape')
+    make_prerenderer(tmp_path, [article]).render_article(article)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_shell_injects_meta_and_payload():
+    template = ('<html><head><meta name="description" content="site" /><title>Site</title></head>'
+                '<body><div id="root"></div></body></html>')
+    payload = {'title': 'A <b> story', 'excerpt': 'Short', 'summary': None, 'hero_image_url': None,
+               'body': '<p>x</p></script>'}
+    out = render_shell(template, payload)
+    assert out.count('<title>') == 1 and '<title>A &lt;b&gt; story - Lanka Live</title>' in out
+    assert '<meta name="description" content="Short" />' in out
+    data = out.split('type="application/json">')[1].split('</script>')[0]
+    assert json.loads(data.replace('<\\/', '</')) == payload
+
+
+def test_receivers_are_noops_when_disabled(monkeypatch):
+    monkeypatch.setattr(prerender_service, 'PRERENDER_DIR', '')
+    # would need a database session if it did anything
+    prerender_service.on_article_changed(None, change=ArticleChange(
+        action='created', article_id=None, status='published'))
+
+
+def test_bulk_and_taxonomy_changes_render_off_the_request_thread(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(prerender_service, 'PRERENDER_DIR', '/nonexistent')
+    calls = []
+    done = threading.Event()
+
+    def fake_apply(method, change):
+        calls.append((method, threading.current_thread().name))
+        done.set()
+
+    monkeypatch.setattr(prerender_service, '_apply', fake_apply)
+    prerender_service.on_articles_changed(None, changes=[])
+    assert done.wait(2)
+    assert calls == [('apply_article_changes', 'prerender')]
@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import ratelimit
+from app.ratelimit import TokenBuckets
+
+
+def test_token_bucket_burst_and_refill(tmp_path):
+    buckets = TokenBuckets(str(tmp_path / 'rl'), slots=64)
+    now = 1000.0
+    assert [buckets.take('login:1.2.3.4', 3, 60, now)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, retry_after, _ = buckets.take('login:1.2.3.4', 3, 60, now)
+    assert not allowed and retry_after == pytest.approx(20)
+    # other clients have their own bucket
+    assert buckets.take('login:5.6.7.8', 3, 60, now)[0]
+    # one token back after rate/per seconds
+    assert buckets.take('login:1.2.3.4', 3, 60, now + 20)[0]
+    assert not buckets.take('login:1.2.3.4', 3, 60, now + 20)[0]
+
+
+def test_token_buckets_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'rl')
+    buckets = TokenBuckets(path, slots=64)
+    pid = os.fork()
+    if pid == 0:
+        child = TokenBuckets(path, slots=64)
+        for _ in range(5):
+            child.take('read:client', 10, 60, 1000.0)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert buckets.take('read:client', 10, 60, 1000.0)[2] == 4
+
+
+def test_full_group_evicts_least_recently_used(tmp_path):
+    buckets = TokenBuckets(str(tmp_path / 'rl'), slots=4)  # a single group of four slots
+    for i in range(4):
+        buckets.take(f'k{i}', 1, 60, 1000.0 + i)
+    assert not buckets.take('k3', 1, 60, 1004.0)[0]
+    assert buckets.take('k4', 1, 60, 1005.0)[0]  # takes k0's slot
+    assert buckets.take('k0', 1, 60, 1006.0)[0]  # starts over with a full bucket
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(ratelimit, 'buckets', TokenBuckets(str(tmp_path / 'rl'), slots=64))
+    monkeypatch.setattr(ratelimit, 'RATE_LIMITS', {'login': (2, 60), 'list': (100, 60), 'read': (100, 60),
+                                                   'write': (100, 60)})
+    from app.app import create_app
+    return create_app().test_client()
+
+
+def test_login_is_rate_limited_per_client(client):
+    for _ in range(2):
+        assert client.post('/api/auth/login', json={}, headers={'X-Real-IP': '10.0.0.1'}).status_code == 400
+    response = client.post('/api/auth/login', json={}, headers={'X-Real-IP': '10.0.0.1'})
+    assert response.status_code == 429 and int(response.headers['Retry-After']) == 30
+    assert client.post('/api/auth/login', json={}, headers={'X-Real-IP': '10.0.0.2'}).status_code == 400
+    # other route classes are unaffected
+    response = client.get('/')
+    assert response.status_code == 200 and 'RateLimit-Limit' not in response.headers
+
+
+def test_client_header_is_only_trusted_from_proxies(client):
+    direct = {'REMOTE_ADDR': '203.0.113.5'}
+    for i in range(2):
+        assert client.post('/api/auth/login', json={}, headers={'X-Real-IP': f'10.0.1.{i}'},
+                           environ_base=direct).status_code == 400
+    # a fresh X-Real-IP per request does not get a fresh bucket
+    response = client.post('/api/auth/login', json={}, headers={'X-Real-IP': '10.0.1.9'}, environ_base=direct)
+    assert response.status_code == 429
+
+
+def test_requests_that_queued_too_long_are_shed(client):
+    stale = f't={time.time() - ratelimit.ADMISSION_MAX_QUEUE_MS / 1000 - 1:.3f}'
+    response = client.post('/api/auth/login', json={}, headers={'X-Request-Start': stale})
+    assert response.status_code == 503 and response.headers['Retry-After'] == '2'
+    fresh = f't={time.time():.3f}'
+    assert client.post('/api/auth/login', json={}, headers={'X-Request-Start': fresh}).status_code == 400
+
+
+def test_pool_timeout_is_503(client, monkeypatch):
+    class BusyService:
+        def __init__(self, session=None):
+            raise PoolTimeoutError('QueuePool limit reached')
+
+    monkeypatch.setattr('app.controllers.category_controller.SessionLocal', lambda: BusyService())
+    response = client.get('/api/categories/')
+    assert response.status_code == 503 and response.headers['Retry-After'] == '2'
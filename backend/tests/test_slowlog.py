@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import slowlog
+from app.app import create_app
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = create_app()
+    monkeypatch.setattr(slowlog, 'SLOW_QUERY_MS', 0.000001)  # everything is slow
+    monkeypatch.setattr(slowlog, 'SLOW_QUERY_EXPLAIN_SAMPLE', 0.0)
+    slowlog.ring.clear()
+    yield app
+    slowlog.ring.clear()
+
+
+def test_slow_statements_are_recorded_with_their_request(app):
+    engine = create_engine('sqlite://')
+    with app.test_request_context('/api/articles/', headers={'X-Request-ID': 'req-1'}):
+        app.preprocess_request()
+        with engine.connect() as conn:
+            conn.execute(text('SELECT :body AS body'), {'body': 'x' * 1000})
+            conn.execute(text("SELECT 1 WHERE 'password_hash' = :p"), {'p': 'secret'})
+            with pytest.raises(Exception):
+                conn.execute(text('SELECT * FROM missing'))
+
+    first, secret, failed = slowlog.recent(3)[::-1]
+    assert (first['request_id'], first['endpoint'], first['method']) == ('req-1', 'articles.list_articles', 'GET')
+    assert first['statement'] == 'SELECT ? AS body'
+    assert len(first['parameters'][0]) == slowlog.MAX_PARAMETER_CHARS + 3
+    assert secret['parameters'] == '<withheld>'
+    assert 'no such table' in failed['error']
+
+    with engine.connect().execution_options(slowlog=False) as conn:
+        conn.execute(text('SELECT 2'))
+    assert len(slowlog.ring) == 3
+
+
+def test_only_reads_are_explained():
+    assert slowlog.explainable('SELECT * FROM articles WHERE id = %(id)s')
+    assert slowlog.explainable('WITH x AS (SELECT 1) SELECT * FROM x')
+    assert not slowlog.explainable('WITH moved AS (DELETE FROM t RETURNING *) INSERT INTO u SELECT * FROM moved')
+    assert not slowlog.explainable('SELECT id FROM articles WHERE id = ANY(%(ids)s) ORDER BY id FOR UPDATE')
+    assert not slowlog.explainable('UPDATE articles SET title = %(title)s')
+
+
+def test_admin_endpoint_lists_newest_first_and_sets_request_id(app):
+    slowlog.ring.clear()
+    for i in range(3):
+        slowlog.ring.append({'statement': f'SELECT {i}', 'endpoint': 'tags.list_tags' if i else 'x'})
+    client = app.test_client()
+    response = client.get('/api/admin/slow-queries?limit=2')
+    assert [q['statement'] for q in response.get_json()['queries']] == ['SELECT 2', 'SELECT 1']
+    assert response.headers['X-Request-ID']
+    j = client.get('/api/admin/slow-queries?endpoint=x').get_json()
+    assert [q['statement'] for q in j['queries']] == ['SELECT 0']
+
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_explain_analyze_runs_with_the_bound_parameters():
+    from app.config.db import get_engine
+
+    plan = slowlog.explain(get_engine(TEST_DATABASE_URL),
+                           'SELECT count(*) FROM articles WHERE status = %(status)s', {'status': 'published'})
+    assert 'actual time' in plan and 'Execution Time' in plan
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+def test_explain_never_repeats_side_effects():
+    from sqlalchemy.exc import DBAPIError
+
+    from app.config.db import get_engine
+
+    # a SELECT over a function that locks and writes fails instead of running it again
+    with pytest.raises(DBAPIError, match='read-only transaction'):
+        slowlog.explain(get_engine(TEST_DATABASE_URL), 'SELECT count(*) FROM reconcile_stat_counters()', {})
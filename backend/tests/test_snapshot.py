@@ -0,0 +1,77 @@
+import os
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.app import create_app
+from app.dao.archive_dao import ALL_ARTICLES
+from app.models import article_category, article_tag
+from app.models.article import Article
+from app.models.category import Category
+from app.models.tag import Tag
+from app.services.snapshot_service import SNAPSHOT_INDEXES, article_archive_days, create_schema
+from app.snapshot import Snapshot, snapshot_meta
+
+ARTICLE_ID = uuid.uuid4()
+CATEGORY_ID = uuid.uuid4()
+TAG_ID = uuid.uuid4()
+
+
+def write_snapshot(path, title):
+    """A one-article snapshot laid out like the exporter's (UTC, naive)."""
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as lite:
+        create_schema(lite)
+        for ddl in SNAPSHOT_INDEXES:
+            lite.exec_driver_sql(ddl)
+        lite.execute(snapshot_meta.insert(), [{'key': 'format', 'value': '1'},
+                                              {'key': 'exported_at', 'value': '2026-05-01T00:00:00+00:00'}])
+        lite.execute(article_archive_days.insert(), [{'scope': ALL_ARTICLES, 'day': date(2026, 4, 30), 'articles': 1}])
+    with Session(engine) as session:
+        session.add_all([
+            Category(id=CATEGORY_ID, name='Politics', slug='politics', order_index=1),
+            Tag(id=TAG_ID, name='Elections', slug='elections', article_count=1),
+            Article(id=ARTICLE_ID, status='published', title=title, slug='budget', body_html='<p>Vote</p>',
+                    primary_category_id=CATEGORY_ID, published_at=datetime(2026, 4, 30, 22, 15),
+                    created_at=datetime(2026, 4, 30, 22, 0)),
+        ])
+        session.flush()
+        session.execute(article_category.insert(), {'article_id': ARTICLE_ID, 'category_id': CATEGORY_ID})
+        session.execute(article_tag.insert(), {'article_id': ARTICLE_ID, 'tag_id': TAG_ID})
+        session.commit()
+    engine.dispose()
+
+
+def test_public_reads_come_from_the_snapshot_and_follow_replacements(tmp_path, monkeypatch):
+    path = str(tmp_path / 'site.db')
+    snapshot = Snapshot(path, check_seconds=0)
+    assert snapshot.session() is None  # nothing exported yet: reads stay on Postgres
+
+    write_snapshot(path, 'Budget passed')
+    monkeypatch.setattr('app.snapshot.snapshot', snapshot)
+    client = create_app().test_client()
+
+    article = client.get('/api/articles/budget').get_json()
+    assert article['title'] == 'Budget passed'
+    assert article['published_at'] == '2026-04-30T22:15:00+00:00'
+    assert [t['slug'] for t in article['tags']] == ['elections']
+    assert [a['slug'] for a in client.get('/api/articles/?category=politics').get_json()] == ['budget']
+    assert [a['slug'] for a in client.get('/api/articles/?dateFrom=2026-04-30&dateTo=2026-04-30').get_json()] == ['budget']
+    archive = client.get('/api/articles/archive?month=2026-04').get_json()
+    assert (archive['total'], archive['days']) == (1, [{'date': '2026-04-30', 'count': 1}])
+    assert [t['slug'] for t in client.get('/api/tags/?prefix=ELE').get_json()] == ['elections']
+    assert client.get('/api/categories/').get_json() == [{'id': str(CATEGORY_ID), 'name': 'Politics', 'slug': 'politics'}]
+
+    # the exporter renames a new file over the old one
+    write_snapshot(str(tmp_path / 'next.db'), 'Budget amended')
+    os.replace(tmp_path / 'next.db', path)
+    assert client.get('/api/articles/budget').get_json()['title'] == 'Budget amended'
+    assert snapshot.status()['swaps'] == 2
+
+    # a file that isn't a snapshot is ignored
+    (tmp_path / 'broken.db').write_bytes(b'not a database')
+    os.replace(tmp_path / 'broken.db', path)
+    assert client.get('/api/articles/budget').get_json()['title'] == 'Budget amended'
+    assert snapshot.status()['swaps'] == 2
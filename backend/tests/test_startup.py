@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify, request
+
+from app import startup
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_import_is_lazy():
+    # a fresh interpreter: importing and building the app opens no engine and skips Pillow
+    out = subprocess.run(
+        [sys.executable, '-c',
+         'import json, sys, run; run.app; '
+         'print(json.dumps([sys.modules["app.config.session"].engine_created(), "PIL.Image" in sys.modules]))'],
+        cwd=BACKEND, check=True, capture_output=True, text=True,
+    ).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == [False, False]
+
+
+def test_warmup_is_best_effort(monkeypatch):
+    app = Flask(__name__)
+    seen = []
+
+    @app.route('/api/categories/')
+    def categories():
+        seen.append('/api/categories/')
+        return jsonify([{'slug': 'news'}, {'slug': 'sport'}])
+
+    @app.route('/api/articles/')
+    def articles():
+        seen.append(f"articles:{request.args.get('category')}")
+        return jsonify([])
+
+    def broken_pool(count=0):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(startup, 'preconnect', broken_pool)
+    timings = startup.warmup(app, paths=('/api/articles/?limit=5', '/missing'))
+    assert set(timings) == {'pool', 'taxonomy', 'paths'}
+    assert seen == ['/api/categories/', 'articles:news', 'articles:sport', 'articles:None']
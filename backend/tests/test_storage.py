@@ -0,0 +1,117 @@
+import io
+import os
+import urllib.request
+import uuid
+
+import pytest
+
+from app.storage import LocalStorage
+
+# An S3-compatible endpoint to run the S3 driver against, e.g. a local MinIO:
+#   docker run -p 9000:9000 minio/minio server /data
+#   TEST_S3_ENDPOINT=http://localhost:9000 AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin pytest
+TEST_S3_ENDPOINT = os.getenv('TEST_S3_ENDPOINT')
+
+
+def test_local_storage(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url = storage.save('2025/10/a.jpg', io.BytesIO(b'jpeg'), 'image/jpeg')
+    assert url == '/static/uploads/2025/10/a.jpg'
+    assert storage.key_for_url(url) == '2025/10/a.jpg'
+    assert storage.key_for_url('https://elsewhere/a.jpg') is None
+    assert storage.exists('2025/10/a.jpg') and storage.read_head('2025/10/a.jpg', 2) == b'jp'
+
+    src = tmp_path / 'part'
+    src.write_bytes(b'video')
+    storage.save_file(str(src), '2025/10/b.mp4')
+    assert not src.exists() and (tmp_path / '2025' / '10' / 'b.mp4').read_bytes() == b'video'
+
+    storage.delete('2025/10/a.jpg')
+    storage.delete('2025/10/a.jpg')
+    assert not storage.exists('2025/10/a.jpg')
+    with pytest.raises(ValueError):
+        storage.path('../outside.jpg')
+    assert storage.presign_upload('2025/10/c.jpg', 10) is None
+
+
+@pytest.fixture
+def s3():
+    if not TEST_S3_ENDPOINT:
+        pytest.skip('TEST_S3_ENDPOINT not set')
+    from app import storage as storage_module
+    from app.storage import S3Storage
+
+    bucket = f'test-{uuid.uuid4().hex[:12]}'
+    storage = S3Storage(bucket=bucket, endpoint_url=TEST_S3_ENDPOINT, region='us-east-1')
+    storage.client.create_bucket(Bucket=bucket)
+    # S3's minimum multipart part size, so the multipart paths run on small files
+    part_size = 5 * 1024 ** 2
+    storage.transfer.multipart_threshold = storage.transfer.multipart_chunksize = part_size
+    original = storage_module.S3_PART_SIZE
+    storage_module.S3_PART_SIZE = part_size
+    yield storage
+    storage_module.S3_PART_SIZE = original
+    for obj in storage.client.list_objects_v2(Bucket=bucket).get('Contents', []):
+        storage.client.delete_object(Bucket=bucket, Key=obj['Key'])
+    storage.client.delete_bucket(Bucket=bucket)
+
+
+def _put(url, data, headers=None):
+    headers = dict({'Content-Type': 'application/octet-stream'}, **(headers or {}))
+    request = urllib.request.Request(url, data=data, method='PUT', headers=headers)
+    with urllib.request.urlopen(request) as response:
+        return response.headers.get('ETag')
+
+
+def test_s3_server_side_multipart_upload(s3, tmp_path):
+    data = os.urandom(11 * 1024 ** 2)
+    src = tmp_path / 'big.mp4'
+    src.write_bytes(data)
+    url = s3.save_file(str(src), '2025/10/big.mp4', 'video/mp4')
+    assert not src.exists()
+    assert url == f'{TEST_S3_ENDPOINT}/{s3.bucket}/2025/10/big.mp4'
+    assert s3.key_for_url(url) == '2025/10/big.mp4'
+    # uploaded in 3 parts
+    head = s3.client.head_object(Bucket=s3.bucket, Key='2025/10/big.mp4')
+    assert head['ContentLength'] == len(data) and head['ETag'].endswith('-3"')
+    assert s3.read_head('2025/10/big.mp4', 16) == data[:16]
+    s3.delete('2025/10/big.mp4')
+    assert not s3.exists('2025/10/big.mp4')
+
+
+def test_s3_presigned_uploads(s3):
+    single = s3.presign_upload('2025/10/small.jpg', 4, 'image/jpeg')
+    _put(single['url'], b'jpeg', single['headers'])
+    s3.complete_upload('2025/10/small.jpg', None, [])
+    assert s3.read_head('2025/10/small.jpg', 4) == b'jpeg'
+
+    data = os.urandom(6 * 1024 ** 2)
+    multi = s3.presign_upload('2025/10/clip.mp4', len(data), 'video/mp4')
+    assert len(multi['parts']) == 2
+    parts = [{'part_number': p['part_number'],
+              'etag': _put(p['url'], data[(p['part_number'] - 1) * multi['part_size']:][:multi['part_size']])}
+             for p in reversed(multi['parts'])]
+    s3.complete_upload('2025/10/clip.mp4', multi['upload_id'], parts)
+    assert s3.client.head_object(Bucket=s3.bucket, Key='2025/10/clip.mp4')['ContentLength'] == len(data)
+
+
+def test_s3_direct_upload_rejects_oversized_and_malformed_requests():
+    from botocore.exceptions import ClientError
+    from app import storage as storage_module
+    from app.storage import S3Storage
+
+    class FakeClient:
+        def create_multipart_upload(self, **kwargs):
+            raise AssertionError('no upload should be started')
+
+        def complete_multipart_upload(self, **kwargs):
+            raise ClientError({'Error': {'Code': 'NoSuchUpload'}}, 'CompleteMultipartUpload')
+
+    s3 = S3Storage(bucket='b', client=FakeClient())
+    with pytest.raises(ValueError):
+        s3.presign_upload('2025/10/huge.mp4', storage_module.S3_PART_SIZE * storage_module.S3_MAX_PARTS + 1)
+    for parts in ([{'etag': 'x'}], [None], 'abc', 5):
+        with pytest.raises(ValueError, match='parts must be'):
+            s3.complete_upload('2025/10/clip.mp4', 'upload-1', parts)
+    with pytest.raises(ValueError, match='NoSuchUpload'):
+        s3.complete_upload('2025/10/clip.mp4', 'upload-1', [{'part_number': 1, 'etag': '"e"'}])
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import uuid
+
+from app.signals import ArticleChange
+from app.services.stream_service import classify
+from app.stream import Broker, StreamServer, format_event
+
+
+def change(action='updated', **kwargs):
+    return ArticleChange(action=action, article_id=uuid.uuid4(), slug='story', **kwargs)
+
+
+def test_classify_write_events():
+    assert classify(change('created', status='published')) == 'published'
+    assert classify(change('created', status='published', is_breaking=True)) == 'breaking'
+    assert classify(change(status='published', is_breaking=True, old_status='published')) == 'breaking'
+    assert classify(change(status='published', is_breaking=False, old_status='published',
+                           old_is_breaking=True)) == 'breaking_cleared'
+    assert classify(change(status='draft', old_status='published')) == 'withdrawn'
+    assert classify(change('deleted', old_status='published')) == 'withdrawn'
+    # edits that do not change what the stream shows
+    assert classify(change(status='published', is_breaking=True, old_status='published',
+                           old_is_breaking=True)) is None
+    assert classify(change(status='published', old_status='published')) is None
+    assert classify(change('created', status='draft', is_breaking=True)) is None
+
+
+def event(i, kind='breaking'):
+    return {'id': i, 'kind': kind, 'data': {'slug': f'story-{i}'}}
+
+
+def test_format_event():
+    assert format_event(event(7)) == b'id: 7\nevent: breaking\ndata: {"slug":"story-7"}\n\n'
+
+
+def test_broker_resume_from_ring():
+    broker = Broker(buffer=3)
+    broker.publish([event(1), event(2), event(3), event(4)])
+    assert [e['id'] for e in broker.resume(2)] == [3, 4]
+    assert broker.resume(4) == []
+    # id 1 has left the ring; the caller must go to the database
+    assert broker.resume(1) is None
+    # a catch-up batch does not duplicate events already delivered
+    broker.publish([event(3), event(5)])
+    assert [e['id'] for e in broker.recent] == [3, 4, 5]
+
+
+async def _request(port, path, headers=''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: x\r\n{headers}\r\n'.encode())
+    await writer.drain()
+    return reader, writer
+
+
+async def _read_events(reader, count):
+    events = []
+    while len(events) < count:
+        block = (await asyncio.wait_for(reader.readuntil(b'\n\n'), 2)).decode()
+        if block.startswith('id:'):
+            fields = dict(line.split(': ', 1) for line in block.strip().split('\n'))
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+        elif block.startswith(':'):
+            events.append(block.strip())
+    return events
+
+
+def run_server(test, **kwargs):
+    async def main():
+        broker = Broker()
+        server = StreamServer(broker, **kwargs)
+        tcp = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = tcp.sockets[0].getsockname()[1]
+        try:
+            await test(broker, port)
+        finally:
+            tcp.close()
+    asyncio.run(main())
+
+
+def test_stream_pushes_events_and_resumes():
+    async def test(broker, port):
+        broker.publish([event(1), event(2, 'published')])
+        reader, writer = await _request(port, '/api/stream/breaking', 'Last-Event-ID: 1\r\n')
+        head = (await reader.readuntil(b'\r\n\r\n')).decode()
+        assert head.startswith('HTTP/1.1 200') and 'text/event-stream' in head
+        assert (await reader.readuntil(b'\n\n')).startswith(b'retry:')
+        assert await _read_events(reader, 1) == [(2, 'published', {'slug': 'story-2'})]
+
+        broker.publish([event(3)])
+        assert await _read_events(reader, 1) == [(3, 'breaking', {'slug': 'story-3'})]
+        assert len(broker.clients) == 1
+        writer.close()
+
+        # kinds filter
+        reader, writer = await _request(port, '/api/stream/breaking?kinds=breaking&lastEventId=1')
+        await reader.readuntil(b'\r\n\r\n')
+        await reader.readuntil(b'\n\n')
+        assert [e[0] for e in await _read_events(reader, 1)] == [3]
+        writer.close()
+    run_server(test)
+
+
+def test_stream_heartbeat_and_slow_client():
+    async def test(broker, port):
+        reader, writer = await _request(port, '/api/stream/breaking')
+        await reader.readuntil(b'\r\n\r\n')
+        await reader.readuntil(b'\n\n')
+        assert await _read_events(reader, 1) == [': ping']
+
+        client = next(iter(broker.clients))
+        for i in range(client.queue.maxsize + 1):
+            client.offer(event(i + 10))
+        assert client.overflowed
+        # the server drains what it has, then hangs up
+        rest = await asyncio.wait_for(reader.read(), 2)
+        assert rest.count(b'\nevent: breaking') <= client.queue.maxsize
+        await asyncio.sleep(0)
+        assert not broker.clients
+        writer.close()
+    run_server(test, heartbeat=0.05)
+
+
+def test_health_and_limits():
+    async def test(broker, port):
+        reader, writer = await _request(port, '/api/stream/health')
+        response = await reader.read()
+        assert b'200 OK' in response and json.loads(response.split(b'\r\n\r\n', 1)[1])['clients'] == 0
+
+        reader, writer = await _request(port, '/api/stream/nope')
+        assert b'404' in (await reader.read()).split(b'\r\n')[0]
+
+        broker.subscribe({'breaking'})
+        reader, writer = await _request(port, '/api/stream/breaking')
+        response = await reader.read()
+        assert response.startswith(b'HTTP/1.1 503') and b'Retry-After: 30' in response
+    run_server(test, max_clients=1)
+
+
+def test_heartbeat_collects_notifications_read_during_its_query():
+    import socket
+    from types import SimpleNamespace
+    from app.stream import EventSource
+
+    class Conn:
+        closed = False
+
+        def __init__(self):
+            self.notifies = []
+
+        def cursor(self):
+            conn = self
+
+            class Cursor:
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *exc):
+                    return False
+
+                def execute(self, sql):
+                    # psycopg2 reads a pending NOTIFY along with the query's result
+                    conn.notifies.append(SimpleNamespace(payload='42'))
+
+            return Cursor()
+
+    async def run():
+        a, b = socket.socketpair()
+        source = EventSource(Broker())
+        source._loop = asyncio.get_running_loop()
+        source._conn = Conn()
+        source._fd = a.fileno()
+        source._loop.add_reader(source._fd, source._on_readable)
+        try:
+            await source._heartbeat(source._conn)
+            assert source._pending == {42}
+            assert source._loop.remove_reader(source._fd)  # the reader is back
+        finally:
+            a.close()
+            b.close()
+
+    asyncio.run(run())
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import re
+import uuid
+
+import pytest
+
+from app.services.upload_service import OffsetMismatch, UploadStore
+from app.storage import LocalStorage
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    created = []
+
+    class FakeMediaService:
+        def __init__(self, session=None):
+            pass
+
+        def create(self, media):
+            created.append(media)
+            media.id = uuid.uuid4()
+            media.created_at = None
+            return media
+
+    monkeypatch.setattr('app.controllers.media_controller.MediaService', FakeMediaService)
+    monkeypatch.setattr('app.controllers.media_controller.SessionLocal', contextlib.nullcontext)
+    storage = LocalStorage(str(tmp_path / 'uploads'))
+    monkeypatch.setattr('app.controllers.media_controller.get_storage', lambda: storage)
+    monkeypatch.setattr('app.controllers.media_controller.uploads', UploadStore(str(tmp_path / 'incoming')))
+
+    from app.app import create_app
+    app = create_app()
+    app.created = created
+    return app.test_client()
+
+
+def test_store_appends_and_rejects_bad_offsets(tmp_path):
+    store = UploadStore(str(tmp_path))
+    upload = store.init('clip.mp4', 10, mime_type='video/mp4')
+    assert upload['offset'] == 0
+    assert store.append(upload['id'], 0, io.BytesIO(b'abcd'), 4) == 4
+    with pytest.raises(OffsetMismatch) as e:
+        store.append(upload['id'], 0, io.BytesIO(b'abcd'), 4)
+    assert e.value.offset == 4
+    # a dropped connection keeps what arrived
+    assert store.append(upload['id'], 4, io.BytesIO(b'ef'), 4) == 6
+    with pytest.raises(ValueError):
+        store.append(upload['id'], 6, io.BytesIO(b'x' * 5), 5)
+    storage = LocalStorage(str(tmp_path / 'out'))
+    with pytest.raises(OffsetMismatch):
+        store.complete(upload['id'], storage, '2025/10/clip.mp4')
+
+    store.append(upload['id'], 6, io.BytesIO(b'ghij'), 4)
+    assert store.complete(upload['id'], storage, '2025/10/clip.mp4')['url'] == '/static/uploads/2025/10/clip.mp4'
+    assert (tmp_path / 'out' / '2025' / '10' / 'clip.mp4').read_bytes() == b'abcdefghij'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out']
+
+
+def test_store_prunes_abandoned_uploads(tmp_path):
+    store = UploadStore(str(tmp_path))
+    store.init('a.jpg', 3)
+    assert store.prune(max_age_hours=1) == 0
+    assert store.prune(max_age_hours=-1) == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_endpoints(client, monkeypatch):
+    payload = b'0123456789' * 3
+    r = client.post('/api/media/uploads', json={'file_name': '../big clip.mp4', 'size': len(payload),
+                                                'mime_type': 'video/mp4', 'caption': 'Flood'})
+    assert r.status_code == 201
+    upload_id = r.get_json()['id']
+
+    r = client.patch(f'/api/media/uploads/{upload_id}', data=payload[:10], headers={'Upload-Offset': '0'})
+    assert r.status_code == 204 and r.headers['Upload-Offset'] == '10'
+    # a retried chunk is refused with the offset to resume from
+    r = client.patch(f'/api/media/uploads/{upload_id}', data=payload[:10], headers={'Upload-Offset': '0'})
+    assert r.status_code == 409 and r.get_json()['offset'] == 10
+    r = client.head(f'/api/media/uploads/{upload_id}')
+    assert r.headers['Upload-Offset'] == '10'
+
+    r = client.post(f'/api/media/uploads/{upload_id}/complete')
+    assert r.status_code == 409
+
+    r = client.patch(f'/api/media/uploads/{upload_id}', data=payload[10:], headers={'Upload-Offset': '10'})
+    assert r.headers['Upload-Offset'] == str(len(payload))
+    r = client.post(f'/api/media/uploads/{upload_id}/complete')
+    assert r.status_code == 201
+    body = r.get_json()
+    assert body['file_name'] == 'big_clip.mp4' and body['caption'] == 'Flood'
+    assert client.application.created[0].type == 'video'
+    assert re.fullmatch(r'/static/uploads/\d{4}/\d{2}/big_clip-[0-9a-f]{12}\.mp4', body['url'])
+
+    assert client.get(f'/api/media/uploads/{upload_id}').status_code == 404
+    assert client.patch('/api/media/uploads/nope', data=b'x', headers={'Upload-Offset': '0'}).status_code == 404
+
+
+def test_direct_upload_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr('app.controllers.media_controller.MAX_UPLOAD_SIZE', 100)
+    response = client.post('/api/media/direct-uploads', json={'file_name': 'clip.mp4', 'size': 101})
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+
+
+def test_upload_keys_are_never_reused(client):
+    from app.controllers.media_controller import _new_key
+
+    first = _new_key('photo.jpg')
+    # not even once the original is gone: variant URLs of a key are cached as immutable
+    assert _new_key('photo.jpg') != first
+    assert re.fullmatch(r'\d{4}/\d{2}/photo-[0-9a-f]{12}\.jpg', first)
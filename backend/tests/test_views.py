@@ -0,0 +1,84 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import view_service
+from app.services.view_service import ViewCounter
+
+
+class FakeSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def flushed(monkeypatch):
+    batches = []
+
+    class FakeViewDAO:
+        def __init__(self, session):
+            self.session = session
+
+        def flush(self, rows):
+            if self.session.fail:
+                raise RuntimeError('database unavailable')
+            batches.append(sorted(rows))
+
+        def prune(self, before):
+            return 0
+
+    monkeypatch.setattr(view_service, 'ViewDAO', FakeViewDAO)
+    return batches
+
+
+def counter(state, **kwargs):
+    c = ViewCounter(session_factory=lambda: FakeSession(fail=state.get('fail', False)), **kwargs)
+    c._pid = os.getpid()  # no background thread in tests
+    return c
+
+
+def test_views_are_aggregated_per_slug_and_hour(flushed):
+    c = counter({})
+    t1 = datetime(2024, 5, 1, 10, 5, tzinfo=timezone.utc)
+    t2 = datetime(2024, 5, 1, 11, 59, tzinfo=timezone.utc)
+    for _ in range(3):
+        c.record('a', t1)
+    c.record('a', t2)
+    c.record('b', t1)
+
+    assert c.flush() == 5
+    hour = lambda h: datetime(2024, 5, 1, h, tzinfo=timezone.utc)
+    assert flushed == [[('a', hour(10), 3), ('a', hour(11), 1), ('b', hour(10), 1)]]
+    assert c.flush() == 0 and len(flushed) == 1
+
+
+def test_buffer_is_bounded(flushed):
+    c = counter({}, max_keys=2)
+    now = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert c.record('a', now) and c.record('b', now)
+    assert not c.record('c', now)
+    assert c.record('a', now)  # existing keys keep counting
+    assert c.dropped == 1 and c.pending() == 3
+
+
+def test_failed_flush_keeps_counts(flushed):
+    state = {'fail': True}
+    c = counter(state)
+    now = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    c.record('a', now)
+    assert c.flush() == 0 and c.pending() == 1
+
+    state['fail'] = False
+    c.record('a', now)
+    assert c.flush() == 2
+    assert flushed == [[('a', now, 2)]]
@@ -86,6 +86,42 @@ export function getArticle(slug) {
   return request(`/api/articles/${encodeURIComponent(slug)}`, { headers: authHeaders() })
 }
 
+export function getRelatedArticles(slug, limit = 4) {
+  return request(`/api/articles/${encodeURIComponent(slug)}/related?limit=${limit}`)
+}
+
+// Published counts per year/month (and per UTC day of `month`, 'YYYY-MM')
+export function getArticleArchive({ category, month } = {}) {
+  const params = new URLSearchParams()
+  if (category) params.set('category', category)
+  if (month) params.set('month', month)
+  const qs = params.toString()
+  return request(`/api/articles/archive${qs ? `?${qs}` : ''}`)
+}
+
+export function getTrendingArticles({ sort = 'trending', hours = 24, limit = 10 } = {}) {
+  return request(`/api/articles/trending?sort=${sort}&hours=${hours}&limit=${limit}`)
+}
+
+// Page-view beacon; fire-and-forget so it never delays rendering
+export function recordView(slug) {
+  const url = `${API_BASE}/api/articles/${encodeURIComponent(slug)}/view`
+  if (navigator.sendBeacon && navigator.sendBeacon(url)) return
+  fetch(url, { method: 'POST', keepalive: true }).catch(() => {})
+}
+
+// Breaking-news push stream (server-sent events). EventSource reconnects on
+// its own and resumes from the last event id it saw.
+export function openBreakingStream(onEvent) {
+  const source = new EventSource(`${API_BASE}/api/stream/breaking`)
+  for (const kind of ['published', 'breaking', 'breaking_cleared', 'withdrawn']) {
+    source.addEventListener(kind, (e) => {
+      try { onEvent(kind, JSON.parse(e.data)) } catch (err) { console.error('Bad stream event:', err) }
+    })
+  }
+  return source
+}
+
 export function getArticleById(id) {
   // Include auth headers so backend allows admin access to draft articles
   return request(`/api/articles/by-id/${id}`, { headers: authHeaders() })
@@ -106,6 +142,11 @@ export function deleteArticle(id) {
   return request(`/api/articles/${id}`, opts)
 }
 
+// Bulk admin action on many articles, by { ids } or { filter }; returns affected counts
+export function bulkArticles(payload) {
+  return request('/api/articles/bulk', { method: 'POST', ...withJson(payload) })
+}
+
 // Categories
 export function listCategories() { return request('/api/categories/') }
 export function getCategory(slug) { return request(`/api/categories/${encodeURIComponent(slug)}`) }
@@ -114,7 +155,22 @@ export function updateCategory(id, cat) { return request(`/api/categories/${id}`
 export function deleteCategory(id) { return request(`/api/categories/${id}`, { method: 'DELETE', headers: authHeaders() }) }
 
 // Tags
-export function listTags() { return request('/api/tags/') }
+export function listTags(params = {}) {
+  const { limit, offset, prefix, order, withCounts } = params
+  const qs = new URLSearchParams()
+  if (limit) qs.set('limit', limit)
+  if (offset) qs.set('offset', offset)
+  if (prefix) qs.set('prefix', prefix)
+  if (order) qs.set('order', order)
+  if (withCounts) qs.set('with_counts', '1')
+  const query = qs.toString()
+  return request(`/api/tags/${query ? `?${query}` : ''}`)
+}
+// Typeahead: type is 'tag', 'category' or 'article'; returns matching items
+export function autocomplete(type, prefix, limit = 10) {
+  const qs = new URLSearchParams({ type, prefix, limit })
+  return request(`/api/autocomplete?${qs}`, { headers: authHeaders() }).then(r => r.results)
+}
 export function createTag(t) { return request('/api/tags/', { method: 'POST', ...withJson(t) }) }
 export function updateTag(id, t) { return request(`/api/tags/${id}`, { method: 'PUT', ...withJson(t) }) }
 export function deleteTag(id) { return request(`/api/tags/${id}`, { method: 'DELETE', headers: authHeaders() }) }
@@ -130,7 +186,16 @@ export function listMedia(params = {}) {
   if (parts.length) url += `?${parts.join('&')}`
   return request(url, { headers: authHeaders() })
 }
-export async function uploadMedia(file, meta = {}) {
+// Files above this size use the resumable chunked upload API
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+
+// With MEDIA_STORAGE=s3 on the backend, build with VITE_DIRECT_UPLOADS=1 so
+// files go straight to the bucket through presigned URLs
+const DIRECT_UPLOADS = !!import.meta.env.VITE_DIRECT_UPLOADS
+
+export async function uploadMedia(file, meta = {}, onProgress) {
+  if (DIRECT_UPLOADS) return uploadMediaDirect(file, meta, onProgress)
+  if (file.size > CHUNKED_UPLOAD_THRESHOLD) return uploadMediaChunked(file, meta, onProgress)
   const fd = new FormData()
   // Ensure uploaded files get a unique filename to avoid collisions and 'image.png' duplicates
   try {
@@ -149,6 +214,85 @@ export async function uploadMedia(file, meta = {}) {
   const opts = { method: 'POST', headers: { ...authHeaders() }, body: fd }
   return request('/api/media/upload', opts)
 }
+// Resumable upload: init, PATCH chunks at the server's offset, complete.
+// The upload id is remembered per file so a retry (or page reload) continues
+// where the last attempt stopped instead of starting from zero.
+export async function uploadMediaChunked(file, meta = {}, onProgress) {
+  const key = `upload:${file.name}:${file.size}:${file.lastModified}`
+  let upload = null
+  const saved = localStorage.getItem(key)
+  if (saved) {
+    try { upload = await request(`/api/media/uploads/${saved}`) } catch (e) { localStorage.removeItem(key) }
+  }
+  if (!upload) {
+    const uniqueSuffix = `${Date.now()}-${Math.random().toString(36).slice(2,8)}`
+    upload = await request('/api/media/uploads', { method: 'POST', ...withJson({
+      file_name: `${uniqueSuffix}-${file.name}`, size: file.size, mime_type: file.type || null,
+      alt_text: meta.alt_text, caption: meta.caption, credit: meta.credit,
+    }) })
+    localStorage.setItem(key, upload.id)
+  }
+  let offset = upload.offset
+  let failures = 0
+  while (offset < file.size) {
+    if (onProgress) onProgress(offset / file.size)
+    const resp = await fetch(`${API_BASE}/api/media/uploads/${upload.id}`, {
+      method: 'PATCH',
+      headers: { ...authHeaders(), 'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream' },
+      body: file.slice(offset, offset + upload.chunk_size),
+    }).catch(() => null)
+    if (resp && (resp.ok || resp.status === 409)) {
+      // 409: the server has a different offset (e.g. part of a lost chunk arrived); continue from it
+      offset = Number(resp.headers.get('Upload-Offset'))
+      failures = 0
+      continue
+    }
+    if (resp && resp.status < 500) throw new Error(`Upload failed (${resp.status})`)
+    if (++failures > 5) throw new Error('Upload interrupted; retry to resume')
+    await new Promise(r => setTimeout(r, 1000 * failures))
+    offset = (await request(`/api/media/uploads/${upload.id}`)).offset
+  }
+  const created = await request(`/api/media/uploads/${upload.id}/complete`, { method: 'POST', headers: authHeaders() })
+  localStorage.removeItem(key)
+  if (onProgress) onProgress(1)
+  return created
+}
+// Direct-to-bucket upload: the backend presigns one PUT (small files) or one
+// URL per multipart part, sent here a few at a time, then records the asset.
+export async function uploadMediaDirect(file, meta = {}, onProgress) {
+  const uniqueSuffix = `${Date.now()}-${Math.random().toString(36).slice(2,8)}`
+  const mime_type = file.type || null
+  const upload = await request('/api/media/direct-uploads', { method: 'POST', ...withJson({
+    file_name: `${uniqueSuffix}-${file.name}`, size: file.size, mime_type,
+  }) })
+  const put = async (url, body, headers = {}) => {
+    const resp = await fetch(url, { method: 'PUT', headers, body })
+    if (!resp.ok) throw new Error(`Upload failed (${resp.status})`)
+    return resp.headers.get('ETag')
+  }
+  const parts = []
+  if (upload.parts) {
+    let sent = 0
+    const queue = [...upload.parts]
+    const worker = async () => {
+      for (let part = queue.shift(); part; part = queue.shift()) {
+        const start = (part.part_number - 1) * upload.part_size
+        const etag = await put(part.url, file.slice(start, start + upload.part_size))
+        parts.push({ part_number: part.part_number, etag })
+        if (onProgress) onProgress(++sent / upload.parts.length)
+      }
+    }
+    await Promise.all(Array.from({ length: Math.min(4, queue.length) }, worker))
+  } else {
+    await put(upload.url, file, upload.headers)
+  }
+  const created = await request('/api/media/direct-uploads/complete', { method: 'POST', ...withJson({
+    key: upload.key, upload_id: upload.upload_id, parts, mime_type,
+    alt_text: meta.alt_text, caption: meta.caption, credit: meta.credit,
+  }) })
+  if (onProgress) onProgress(1)
+  return created
+}
 export function checkMediaUsage(mediaId) {
   return request(`/api/media/${mediaId}/check-usage`, { headers: authHeaders() })
 }
@@ -156,6 +300,9 @@ export function deleteMedia(mediaId) {
   return request(`/api/media/${mediaId}`, { method: 'DELETE', headers: authHeaders() })
 }
 
+// Admin
+export function getAdminStats() { return request('/api/admin/stats', { headers: authHeaders() }) }
+
 // Users
 export function listUsers() { return request('/api/users/') }
 export function createUser(u) { return request('/api/users/', { method: 'POST', ...withJson(u) }) }
@@ -175,10 +322,16 @@ export default {
   login,
   listArticles,
   getArticle,
+  getRelatedArticles,
+  getArticleArchive,
+  getTrendingArticles,
+  recordView,
+  openBreakingStream,
   getArticleById,
   createArticle,
   updateArticle,
   deleteArticle,
+  bulkArticles,
   listCategories,
   getCategory,
   createCategory,
@@ -188,10 +341,14 @@ export default {
   createTag,
   updateTag,
   deleteTag,
+  autocomplete,
   listMedia,
   uploadMedia,
+  uploadMediaChunked,
+  uploadMediaDirect,
   checkMediaUsage,
   deleteMedia,
+  getAdminStats,
   listUsers,
   createUser,
   updateUser,
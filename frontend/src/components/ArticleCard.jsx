@@ -10,7 +10,7 @@ export default function ArticleCard({ article, variant = 'default' }) {
           <Link to={`/article/${article.slug}`}>
             <div className="relative overflow-hidden h-36 md:h-48">
               <img 
-                src={getImageUrl(article.hero_image_url)} 
+                src={getImageUrl(article.hero_image_url, article.hero_images, '640x360')} 
                 alt={article.title}
                 className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
               />
@@ -40,7 +40,7 @@ export default function ArticleCard({ article, variant = 'default' }) {
         <Link to={`/article/${article.slug}`}>
           <div className="relative overflow-hidden h-44 md:h-52 lg:h-56">
             <img 
-              src={getImageUrl(article.hero_image_url)} 
+              src={getImageUrl(article.hero_image_url, article.hero_images, '640x360')} 
               alt={article.title}
               className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
             />
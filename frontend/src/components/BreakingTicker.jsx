@@ -0,0 +1,41 @@
+import React, { useEffect, useState } from 'react'
+import { Link } from 'react-router-dom'
+import api from '../api'
+
+const MAX_ITEMS = 5
+
+export default function BreakingTicker() {
+  const [items, setItems] = useState([])
+
+  useEffect(() => {
+    const source = api.openBreakingStream((kind, data) => {
+      if (kind === 'published') return // only breaking stories go in the ticker
+      setItems((current) => {
+        const rest = current.filter((item) => item.id !== data.id)
+        return kind === 'breaking' ? [data, ...rest].slice(0, MAX_ITEMS) : rest
+      })
+    })
+    return () => source.close()
+  }, [])
+
+  if (items.length === 0) {
+    return null // Nothing breaking since the page was opened
+  }
+
+  return (
+    <div className="bg-red-600 text-white">
+      <div className="container mx-auto px-4 py-2 flex items-center gap-3 overflow-hidden">
+        <span className="flex-shrink-0 text-xs font-bold uppercase tracking-wide bg-white text-red-600 px-2 py-0.5 rounded">
+          Breaking
+        </span>
+        <div className="flex gap-6 overflow-x-auto whitespace-nowrap text-sm">
+          {items.map((item) => (
+            <Link key={item.id} to={`/article/${item.slug}`} className="hover:underline">
+              {item.title}
+            </Link>
+          ))}
+        </div>
+      </div>
+    </div>
+  )
+}
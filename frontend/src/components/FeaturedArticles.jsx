@@ -54,7 +54,7 @@ export default function FeaturedArticles({ limit = 3 }) {
                 {article.hero_image_url && (
                   <div className="flex-shrink-0 w-16 h-16 md:w-20 md:h-20 rounded overflow-hidden">
                     <img 
-                      src={getImageUrl(article.hero_image_url)} 
+                      src={getImageUrl(article.hero_image_url, article.hero_images, '640x360')} 
                       alt={article.title}
                       className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
                     />
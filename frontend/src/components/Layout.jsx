@@ -1,11 +1,13 @@
 import React from 'react'
 import Header from './Header'
 import Footer from './Footer'
+import BreakingTicker from './BreakingTicker'
 
 export default function Layout({ children }) {
   return (
     <div className="min-h-screen flex flex-col bg-white text-gray-900">
       <Header />
+      <BreakingTicker />
       <main className="flex-1 container mx-auto px-4 py-8">{children}</main>
       <Footer />
     </div>
@@ -0,0 +1,66 @@
+import React, { useEffect, useState } from 'react'
+import { Link } from 'react-router-dom'
+import api from '../api'
+import { getImageUrl } from '../utils/image'
+
+export default function RelatedArticles({ slug, limit = 4 }) {
+  const [articles, setArticles] = useState([])
+
+  useEffect(() => {
+    let cancelled = false
+    async function loadRelated() {
+      try {
+        const data = await api.getRelatedArticles(slug, limit)
+        if (!cancelled) setArticles(data || [])
+      } catch (e) {
+        console.error('Error loading related articles:', e)
+      }
+    }
+    setArticles([])
+    loadRelated()
+    return () => { cancelled = true }
+  }, [slug, limit])
+
+  if (articles.length === 0) {
+    return null // Don't show section if there is nothing related
+  }
+
+  return (
+    <div className="bg-white rounded-lg shadow-lg p-4 md:p-6">
+      <h3 className="text-base md:text-xl font-bold text-gray-900 mb-3 md:mb-4 border-l-4 border-red-600 pl-3">
+        Related Stories
+      </h3>
+      <div className="space-y-3 md:space-y-4">
+        {articles.map((article, index) => (
+          <article key={article.id} className={`${index !== 0 ? 'pt-3 md:pt-4 border-t border-gray-200' : ''}`}>
+            <Link to={`/article/${article.slug}`} className="group">
+              <div className="flex gap-2 md:gap-3">
+                {article.hero_image_url && (
+                  <div className="flex-shrink-0 w-16 h-16 md:w-20 md:h-20 rounded overflow-hidden">
+                    <img 
+                      src={getImageUrl(article.hero_image_url, article.hero_images, '320x180')} 
+                      alt={article.title}
+                      className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
+                    />
+                  </div>
+                )}
+                <div className="flex-1 min-w-0">
+                  <h4 className="text-xs md:text-sm font-semibold text-gray-900 line-clamp-2 group-hover:text-red-600 transition-colors mb-1">
+                    {article.title}
+                  </h4>
+                  <time className="text-xs text-gray-500">
+                    {new Date(article.published_at).toLocaleDateString('en-US', { 
+                      month: 'short', 
+                      day: 'numeric',
+                      year: 'numeric'
+                    })}
+                  </time>
+                </div>
+              </div>
+            </Link>
+          </article>
+        ))}
+      </div>
+    </div>
+  )
+}
@@ -12,8 +12,13 @@ export default function Sidebar() {
       .then(setCategories)
       .catch(console.error)
 
-    // Load popular/recent articles (is_highlight or recent published)
-    api.listArticles({ is_highlight: '1', limit: 5, status: 'published' })
+    // Load most-read articles of the last day, falling back to highlights / recent published
+    api.getTrendingArticles({ sort: 'most_read', hours: 24, limit: 5 })
+      .catch(() => [])
+      .then(articles => {
+        if (articles.length > 0) return articles
+        return api.listArticles({ is_highlight: '1', limit: 5, status: 'published' })
+      })
       .then(articles => {
         // If no highlights, fall back to recent articles
         if (articles.length === 0) {
@@ -18,15 +18,13 @@ export default function AdminDashboard() {
     }
 
     Promise.all([
-      api.listArticles({ status: 'all', limit: 100 }), // retrieve all for admin total
-      api.listCategories(),
+      api.getAdminStats(), // counts come from maintained counters, not from listing everything
       api.listArticles({ status: 'published', limit: 10 }) // recent published for the list
     ])
-      .then(([allArts, cats, recentPublished]) => {
-        setTotalCount(Array.isArray(allArts) ? allArts.length : 0)
-        // derive published count from the allArts result when possible
-        setPublishedCount(Array.isArray(allArts) ? allArts.filter(a => a.status === 'published').length : 0)
-        setCategories(cats)
+      .then(([stats, recentPublished]) => {
+        setTotalCount(stats.articles.total)
+        setPublishedCount(stats.articles.by_status.published || 0)
+        setCategories(stats.categories)
         setArticles(recentPublished)
       })
       .catch(console.error)
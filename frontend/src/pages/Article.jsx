@@ -4,10 +4,24 @@ import api from '../api'
 import { getImageUrl } from '../utils/image'
 import Sidebar from '../components/Sidebar'
 import FeaturedArticles from '../components/FeaturedArticles'
+import RelatedArticles from '../components/RelatedArticles'
 import LoadingSpinner from '../components/LoadingSpinner'
 import useScrollToTop from '../hooks/useScrollToTop'
 import NotFound from './NotFound'
 
+// Payload embedded by the backend's prerendered HTML shell, if this page was served from one
+function takePrerendered(slug) {
+  const el = document.getElementById('prerendered-article')
+  if (!el) return null
+  el.remove()
+  try {
+    const data = JSON.parse(el.textContent)
+    return data && data.slug === slug ? data : null
+  } catch (e) {
+    return null
+  }
+}
+
 export default function Article() {
   const { slug } = useParams()
   const [article, setArticle] = useState(null)
@@ -21,8 +35,9 @@ export default function Article() {
     async function load() {
       setLoading(true)
       try {
-        const a = await api.getArticle(slug)
+        const a = takePrerendered(slug) || await api.getArticle(slug)
         setArticle(a)
+        if (a && a.status === 'published') api.recordView(slug)
       } catch (e) {
         console.error(e)
         // Capture HTTP status (e.g., 404) so we can show NotFound
@@ -66,7 +81,7 @@ export default function Article() {
         {article.hero_image_url && (
           <div className="w-full aspect-video bg-gray-100 overflow-hidden">
             <img 
-              src={getImageUrl(article.hero_image_url)} 
+              src={getImageUrl(article.hero_image_url, article.hero_images, '1920x0')} 
               alt={article.title} 
               className="w-full h-full object-cover"
             />
@@ -138,6 +153,7 @@ export default function Article() {
         {/* Sidebar - 1/3 width */}
         <div className="lg:col-span-1">
           <div className="space-y-4 md:space-y-6">
+            <RelatedArticles slug={article.slug} limit={4} />
             <FeaturedArticles limit={3} />
             <Sidebar />
           </div>
@@ -4,6 +4,17 @@ import * as api from '../api'
 import { getImageUrl } from '../utils/image'
 import { useAlert } from '../components/AlertSystem'
 
+// Add tags not already listed, keeping the existing order
+function mergeTags(current, more) {
+  const seen = new Set(current.map(t => t.id))
+  return [...current, ...more.filter(t => !seen.has(t.id))]
+}
+
+// Same folding as the server's autocomplete index: case, accents, spacing
+function foldName(name) {
+  return name.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().split(/\s+/).filter(Boolean).join(' ')
+}
+
 export default function ArticleEditor() {
   const { id } = useParams()
   const navigate = useNavigate()
@@ -12,6 +23,7 @@ export default function ArticleEditor() {
 
   const [categories, setCategories] = useState([])
   const [tags, setTags] = useState([])
+  const [tagQuery, setTagQuery] = useState('')
   const [media, setMedia] = useState([])
   const [mediaPickerOpen, setMediaPickerOpen] = useState(false)
   const [uploadModalOpen, setUploadModalOpen] = useState(false)
@@ -46,12 +58,12 @@ export default function ArticleEditor() {
     // Load categories, tags, media
     Promise.all([
       api.listCategories(),
-      api.listTags(),
+      api.listTags({ order: 'popular', limit: 50 }),
       api.listMedia().then(r => Array.isArray(r) ? r : (r && r.items ? r.items : [])).catch(() => []),
     ])
       .then(([cats, tgs, med]) => {
         setCategories(cats)
-        setTags(tgs)
+        setTags(prev => mergeTags(prev, tgs))
         setMedia(med)
       })
       .catch(console.error)
@@ -60,6 +72,7 @@ export default function ArticleEditor() {
     if (!isNew) {
       api.getArticleById(id)
         .then(article => {
+          setTags(prev => mergeTags(prev, article.tags || []))
           setFormData({
             title: article.title || '',
             summary: article.summary || '',
@@ -81,6 +94,23 @@ export default function ArticleEditor() {
     }
   }, [id, isNew])
 
+  // Tags beyond the popular ones are found by name as the editor types
+  useEffect(() => {
+    const q = tagQuery.trim()
+    if (!q) return
+    const timer = setTimeout(() => {
+      api.autocomplete('tag', q, 20)
+        .then(found => setTags(prev => mergeTags(prev, found)))
+        .catch(console.error)
+    }, 150)
+    return () => clearTimeout(timer)
+  }, [tagQuery])
+
+  const tagKey = tagQuery.trim() ? foldName(tagQuery) : ''
+  const visibleTags = tagKey
+    ? tags.filter(t => formData.tag_ids.includes(t.id) || foldName(t.name).startsWith(tagKey))
+    : tags
+
   const handleChange = (e) => {
     const { name, value, type, checked } = e.target
     setFormData(prev => ({
@@ -385,11 +415,18 @@ export default function ArticleEditor() {
             <label className="block text-sm font-medium text-gray-700 mb-2">
               Tags
             </label>
+            <input
+              type="search"
+              value={tagQuery}
+              onChange={(e) => setTagQuery(e.target.value)}
+              placeholder="Search tags..."
+              className="w-full mb-2 px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-red-500 focus:border-transparent"
+            />
             <div className="border border-gray-300 rounded-lg p-4 space-y-2 max-h-48 overflow-y-auto">
-              {tags.length === 0 ? (
-                <p className="text-sm text-gray-500">No tags available. Create tags first.</p>
+              {visibleTags.length === 0 ? (
+                <p className="text-sm text-gray-500">{tagQuery ? 'No matching tags.' : 'No tags available. Create tags first.'}</p>
               ) : (
-                tags.map(tag => (
+                visibleTags.map(tag => (
                   <label key={tag.id} className="flex items-center gap-2">
                     <input
                       type="checkbox"
@@ -11,6 +11,7 @@ export default function ArticlesList() {
   const [categories, setCategories] = useState([])
   const [loading, setLoading] = useState(true)
   const [currentPage, setCurrentPage] = useState(1)
+  const [selected, setSelected] = useState(new Set())
   const articlesPerPage = 20
   const [filter, setFilter] = useState({ 
     status: 'all', 
@@ -50,6 +51,7 @@ export default function ArticlesList() {
 
       const arts = await api.listArticles(params)
       setArticles(arts)
+      setSelected(new Set())
     } catch (err) {
       console.error('Error loading articles:', err)
       error('Failed to load articles')
@@ -74,6 +76,38 @@ export default function ArticlesList() {
     }
   }
 
+  const toggleSelected = (id) => {
+    setSelected(prev => {
+      const next = new Set(prev)
+      if (next.has(id)) next.delete(id)
+      else next.add(id)
+      return next
+    })
+  }
+
+  const toggleAll = () => {
+    setSelected(prev => prev.size === articles.length ? new Set() : new Set(articles.map(a => a.id)))
+  }
+
+  const handleBulk = async (action, params, label) => {
+    const ids = Array.from(selected)
+    if (action === 'delete') {
+      const confirmed = await showConfirm(`Delete ${ids.length} selected articles?`, {
+        confirmText: 'Delete',
+        type: 'danger'
+      })
+      if (!confirmed) return
+    }
+    try {
+      const counts = await api.bulkArticles({ action, ids, ...params })
+      const affected = counts.updated ?? counts.deleted ?? 0
+      success(`${label}: ${affected} of ${counts.matched} articles changed`)
+      loadData()
+    } catch (err) {
+      error('Bulk action failed: ' + err.message)
+    }
+  }
+
   const handleStatusChange = (status) => {
     setFilter(prev => ({ ...prev, status }))
     setCurrentPage(1) // Reset to first page when filter changes
@@ -247,6 +281,43 @@ export default function ArticlesList() {
           </div>
         </div>
 
+        {/* Bulk actions for the selected rows */}
+        {selected.size > 0 && (
+          <div className="bg-white rounded-lg shadow p-4 mb-4 flex flex-wrap items-center gap-2">
+            <span className="text-sm text-gray-700 mr-2">{selected.size} selected</span>
+            <button
+              onClick={() => handleBulk('set_status', { status: 'published' }, 'Published')}
+              className="px-3 py-2 bg-green-100 text-green-800 rounded-lg hover:bg-green-200 transition-colors text-sm"
+            >
+              Publish
+            </button>
+            <button
+              onClick={() => handleBulk('set_status', { status: 'draft' }, 'Unpublished')}
+              className="px-3 py-2 bg-yellow-100 text-yellow-800 rounded-lg hover:bg-yellow-200 transition-colors text-sm"
+            >
+              Unpublish
+            </button>
+            <button
+              onClick={() => handleBulk('set_status', { status: 'archived' }, 'Archived')}
+              className="px-3 py-2 bg-gray-100 text-gray-700 rounded-lg hover:bg-gray-200 transition-colors text-sm"
+            >
+              Archive
+            </button>
+            <button
+              onClick={() => handleBulk('set_flags', { flags: { is_breaking: false } }, 'Breaking cleared')}
+              className="px-3 py-2 bg-gray-100 text-gray-700 rounded-lg hover:bg-gray-200 transition-colors text-sm"
+            >
+              Clear Breaking
+            </button>
+            <button
+              onClick={() => handleBulk('delete', {}, 'Deleted')}
+              className="px-3 py-2 bg-red-100 text-red-700 rounded-lg hover:bg-red-200 transition-colors text-sm"
+            >
+              Delete
+            </button>
+          </div>
+        )}
+
         {/* Articles Table */}
         <div className="bg-white rounded-lg shadow overflow-hidden">
           {articles.length === 0 ? (
@@ -261,6 +332,14 @@ export default function ArticlesList() {
               <table className="w-full">
                 <thead className="bg-gray-50 border-b">
                   <tr>
+                    <th className="pl-6 py-3 text-left">
+                      <input
+                        type="checkbox"
+                        checked={selected.size === articles.length}
+                        onChange={toggleAll}
+                        aria-label="Select all"
+                      />
+                    </th>
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Title
                     </th>
@@ -284,6 +363,14 @@ export default function ArticlesList() {
                 <tbody className="bg-white divide-y divide-gray-200">
                   {articles.map(article => (
                     <tr key={article.id} className="hover:bg-gray-50 transition-colors">
+                      <td className="pl-6 py-4">
+                        <input
+                          type="checkbox"
+                          checked={selected.has(article.id)}
+                          onChange={() => toggleSelected(article.id)}
+                          aria-label={`Select ${article.title}`}
+                        />
+                      </td>
                       <td className="px-6 py-4">
                         <div className="flex items-center">
                           {article.hero_image_url && (
@@ -152,7 +152,7 @@ export default function Home() {
                   <a href={`/article/${featuredArticle.slug}`} className="block">
                     <div className="relative overflow-hidden h-40">
                       <img 
-                        src={getImageUrl(featuredArticle.hero_image_url)} 
+                        src={getImageUrl(featuredArticle.hero_image_url, featuredArticle.hero_images, '1280x720')} 
                         alt={featuredArticle.title}
                         className="w-full h-full object-cover"
                       />
@@ -179,7 +179,7 @@ export default function Home() {
                   <a href={`/article/${featuredArticle.slug}`} className="md:w-2/3 h-full block">
                     <div className="relative overflow-hidden h-full">
                       <img 
-                        src={getImageUrl(featuredArticle.hero_image_url)} 
+                        src={getImageUrl(featuredArticle.hero_image_url, featuredArticle.hero_images, '1280x720')} 
                         alt={featuredArticle.title}
                         className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500"
                       />
@@ -25,7 +25,7 @@ export default function TagsManagement() {
 
   async function loadTags() {
     try {
-      const tagsList = await api.listTags()
+      const tagsList = await api.listTags({ limit: 500, withCounts: true })
       setTags(tagsList)
     } catch (e) {
       console.error(e)
@@ -137,6 +137,9 @@ export default function TagsManagement() {
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Slug
                     </th>
+                    <th className="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Published
+                    </th>
                     <th className="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Actions
                     </th>
@@ -157,6 +160,9 @@ export default function TagsManagement() {
                       <td className="px-6 py-4 whitespace-nowrap">
                         <code className="text-sm text-gray-600">{tag.slug}</code>
                       </td>
+                      <td className="px-6 py-4 whitespace-nowrap text-right text-sm text-gray-600">
+                        {tag.article_count ?? 0}
+                      </td>
                       <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                         <button
                           onClick={(e) => { e.stopPropagation(); handleEdit(tag) }}
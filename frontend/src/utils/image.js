@@ -4,9 +4,12 @@ const DOMAIN = import.meta.env.VITE_DOMAIN
 /**
  * Convert a relative image URL to an absolute URL
  * @param {string} url - The image URL (e.g., /static/uploads/2025/10/image.png)
+ * @param {object} [variants] - Signed resized URLs keyed by size (article.hero_images)
+ * @param {string} [size] - Preferred variant, e.g. '640x360'; falls back to the original
  * @returns {string} - Full URL to the image
  */
-export function getImageUrl(url) {
+export function getImageUrl(url, variants, size) {
+  if (variants && size && variants[size]) url = variants[size]
   if (!url) return ''
   
   // If already absolute URL, return as is
@@ -9,6 +9,12 @@ export default defineConfig({
     host: '0.0.0.0', // Allow external connections
     port: 3000, // Default Vite port
     proxy: {
+      // breaking-news SSE server (python -m app.stream); must precede '/api'
+      '/api/stream': {
+        target: 'http://localhost:8001',
+        changeOrigin: true,
+        secure: false,
+      },
       '/api': {
         target: 'http://localhost:8000', // Your Flask backend address
         changeOrigin: true,
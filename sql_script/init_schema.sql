@@ -54,6 +54,12 @@ CREATE TABLE IF NOT EXISTS articles (
   title VARCHAR(1024) NOT NULL,
   summary TEXT,
   body_richtext TEXT,
+  -- derived from body_richtext at write time by the backend
+  body_html TEXT,
+  body_text TEXT,
+  excerpt TEXT,
+  word_count INTEGER DEFAULT 0,
+  reading_time_minutes INTEGER DEFAULT 0,
   slug VARCHAR(1024) UNIQUE,
   primary_category_id UUID REFERENCES categories(id) ON DELETE SET NULL,
   hero_image_url VARCHAR(2048),
@@ -67,6 +73,14 @@ CREATE TABLE IF NOT EXISTS articles (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- derived body columns for databases created before they were added;
+-- populate them with `python -m app.services.article_body --reprocess`
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS body_html TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS body_text TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS word_count INTEGER DEFAULT 0;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS reading_time_minutes INTEGER DEFAULT 0;
+
 -- association tables
 CREATE TABLE IF NOT EXISTS article_category (
   article_id UUID REFERENCES articles(id) ON DELETE CASCADE,